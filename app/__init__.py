@@ -196,6 +196,12 @@ def register_template_filters(app):
             bytes /= 1024.0
         return f'{bytes:.1f} TB'
 
+    @app.template_filter('preview_url')
+    def format_preview_url(file):
+        """URL of a design or product file's preview image (None if it has none)."""
+        from app.services.file_preview import preview_url
+        return preview_url(file)
+
 
 def register_context_processors(app):
     """Register context processors to inject variables into templates."""
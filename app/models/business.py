@@ -818,6 +818,10 @@ class ProductFile(db.Model):
     uploaded_by = db.Column(db.String(100))
     notes = db.Column(db.Text)
 
+    # Rendered preview (filled by app.services.file_preview)
+    preview_hash = db.Column(db.String(64))
+    preview_version = db.Column(db.Integer)
+
     # Metadata
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -907,6 +911,19 @@ class DesignFile(db.Model):
     uploaded_by = db.Column(db.String(100))
     notes = db.Column(db.Text)
 
+    # Measured geometry (filled by app.services.design_geometry)
+    cut_length_mm = db.Column(db.Numeric(12, 2))
+    pierce_count = db.Column(db.Integer)
+    part_width_mm = db.Column(db.Numeric(10, 2))
+    part_height_mm = db.Column(db.Numeric(10, 2))
+    part_area_mm2 = db.Column(db.Numeric(14, 2))
+    geometry_version = db.Column(db.Integer)
+    geometry_measured_at = db.Column(db.DateTime)
+
+    # Rendered preview (filled by app.services.file_preview)
+    preview_hash = db.Column(db.String(64))
+    preview_version = db.Column(db.Integer)
+
     # Metadata
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -914,6 +931,18 @@ class DesignFile(db.Model):
     def __repr__(self):
         return f'<DesignFile {self.original_filename}>'
 
+    def geometry_dict(self):
+        """Return the measured geometry (None if the file has not been or could not be measured)."""
+        if self.geometry_version is None or self.cut_length_mm is None:
+            return None
+        return {
+            'cut_length_mm': float(self.cut_length_mm) if self.cut_length_mm is not None else None,
+            'pierce_count': self.pierce_count,
+            'width_mm': float(self.part_width_mm) if self.part_width_mm is not None else None,
+            'height_mm': float(self.part_height_mm) if self.part_height_mm is not None else None,
+            'area_mm2': float(self.part_area_mm2) if self.part_area_mm2 is not None else None,
+        }
+
     @property
     def file_size_mb(self):
         """Return file size in megabytes."""
@@ -940,6 +969,7 @@ class DesignFile(db.Model):
             'upload_date': self.upload_date.isoformat() if self.upload_date else None,
             'uploaded_by': self.uploaded_by,
             'notes': self.notes,
+            'geometry': self.geometry_dict(),
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
@@ -2,11 +2,14 @@
 File management routes for DXF file uploads and management
 """
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file, current_app, abort
 from flask_login import login_required
 from app import db
 from app.models import DesignFile, Project, ActivityLog
 from app.utils.decorators import role_required
+from app.services.file_preview import (
+    PREVIEW_CACHE_SECONDS, ensure_preview, get_preview_folder, preview_path, queue_preview
+)
 from datetime import datetime
 import os
 from werkzeug.utils import secure_filename
@@ -145,6 +148,8 @@ def upload(project_id):
             db.session.add(activity)
             db.session.commit()
 
+            queue_preview(current_app._get_current_object(), design_file)
+
             uploaded_count += 1
 
         except Exception as e:
@@ -194,6 +199,38 @@ def detail(file_id):
     return render_template('files/detail.html', file=design_file, logs=logs)
 
 
+@bp.route('/<int:file_id>/preview')
+@login_required
+def preview(file_id):
+    """Render a file's preview on first view and redirect to the cached image."""
+    design_file = DesignFile.query.get_or_404(file_id)
+
+    digest = ensure_preview(design_file)
+    db.session.commit()  # Also stores the marker of a file that cannot be previewed
+    if not digest:
+        abort(404)
+
+    return redirect(url_for('files.preview_image', digest=digest))
+
+
+@bp.route('/preview/<digest>.svg')
+@login_required
+def preview_image(digest):
+    """Serve a rendered preview by content address (never changes, cached for a year)."""
+    if len(digest) != 64 or any(c not in '0123456789abcdef' for c in digest):
+        abort(404)
+
+    full_file_path = preview_path(digest, get_preview_folder())
+    if not os.path.exists(full_file_path):
+        abort(404)
+
+    response = send_file(full_file_path, mimetype='image/svg+xml', max_age=PREVIEW_CACHE_SECONDS, etag=digest)
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
+
+
 @bp.route('/download/<int:file_id>')
 @login_required
 def download(file_id):
@@ -4,11 +4,12 @@ Laser OS Tier 1 - Products/SKU Routes
 This module handles all product/SKU-related routes.
 """
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file, current_app, abort
 from flask_login import login_required
 from app import db
 from app.models import Product, ProjectProduct, ProductFile, Setting, ActivityLog
 from app.services.activity_logger import log_activity
+from app.services.file_preview import ensure_preview, queue_preview
 from app.utils.decorators import role_required
 from datetime import datetime
 from decimal import Decimal
@@ -438,6 +439,8 @@ def upload_file(product_id):
                 details=f'Uploaded file: {original_filename} ({product_file.file_size_mb} MB) to product {product.sku_code}'
             )
 
+            queue_preview(current_app._get_current_object(), product_file)
+
             uploaded_count += 1
 
         except Exception as e:
@@ -513,6 +516,20 @@ def download_file(file_id):
         return redirect(url_for('products.detail', id=product_file.product_id))
 
 
+@bp.route('/file/<int:file_id>/preview')
+@login_required
+def file_preview(file_id):
+    """Render a product file's preview on first view and redirect to the cached image."""
+    product_file = ProductFile.query.get_or_404(file_id)
+
+    digest = ensure_preview(product_file)
+    db.session.commit()  # Also stores the marker of a file that cannot be previewed
+    if not digest:
+        abort(404)
+
+    return redirect(url_for('files.preview_image', digest=digest))
+
+
 @bp.route('/file/<int:file_id>/delete', methods=['POST'])
 @role_required('admin', 'manager')
 def delete_file(file_id):
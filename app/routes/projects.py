@@ -486,6 +486,21 @@ def edit(id):
 
             flash(f'Project {project.project_code} updated successfully.', 'success')
 
+            # Work out the sheets required by nesting the design files when left blank
+            if not project.material_quantity_sheets and project.design_files:
+                from app.services.nesting import apply_project_nesting
+                from flask_login import current_user
+
+                performed_by = current_user.username if current_user.is_authenticated else 'admin'
+                try:
+                    nesting = apply_project_nesting(project, performed_by=performed_by, measure=False)
+                    if nesting['nested']:
+                        flash(f'Material quantity calculated by nesting: {nesting["message"]}', 'info')
+                except Exception as e:
+                    # The project update is already committed
+                    db.session.rollback()
+                    flash(f'Could not calculate material quantity by nesting: {str(e)}', 'warning')
+
             # V12.0: Check if project can be auto-advanced to Quote & Approval after edit
             if current_app.config.get('AUTO_ADVANCE_TO_QUOTE', True) and project.status == Project.STATUS_REQUEST:
                 from app.services.status_automation import auto_advance_to_quote_approval
@@ -623,6 +638,82 @@ def delete(id):
     return redirect(url_for('projects.index'))
 
 
+@bp.route('/<int:id>/estimate-cut-time', methods=['POST'])
+@role_required('admin', 'manager')
+def estimate_cut_time(id):
+    """
+    Recalculate the estimated cut time from the project's DXF design files.
+
+    Args:
+        id: Project ID
+
+    Returns:
+        Redirect to project detail page
+    """
+    from app.services.cut_time_estimator import apply_cut_time_estimate
+    from flask_login import current_user
+
+    project = Project.query.get_or_404(id)
+    performed_by = current_user.username if current_user.is_authenticated else 'admin'
+
+    try:
+        estimate = apply_cut_time_estimate(project, overwrite=True, performed_by=performed_by)
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Error estimating cut time: {str(e)}', 'error')
+        return redirect(url_for('projects.detail', id=id))
+
+    if estimate['estimated']:
+        flash(f'Estimated cut time: {estimate["message"]}', 'success')
+        if estimate['unmeasured_files']:
+            flash(f'Not included (could not be measured): {", ".join(estimate["unmeasured_files"])}', 'warning')
+    else:
+        flash(f'Could not estimate cut time: {estimate["message"]}', 'warning')
+
+    return redirect(url_for('projects.detail', id=id))
+
+
+@bp.route('/<int:id>/nest-sheets', methods=['POST'])
+@role_required('admin', 'manager')
+def nest_sheets(id):
+    """
+    Recalculate the material quantity (sheets) by nesting the project's DXF design files.
+
+    Args:
+        id: Project ID
+
+    Returns:
+        Redirect to project detail page
+    """
+    from app.services.nesting import apply_project_nesting, NESTING_MODES, NESTING_MODE_RECTANGLE
+    from flask_login import current_user
+
+    project = Project.query.get_or_404(id)
+    performed_by = current_user.username if current_user.is_authenticated else 'admin'
+
+    mode = request.form.get('mode', NESTING_MODE_RECTANGLE)
+    if mode not in NESTING_MODES:
+        mode = NESTING_MODE_RECTANGLE
+
+    try:
+        result = apply_project_nesting(project, mode=mode, overwrite=True, performed_by=performed_by,
+                                       measure=False)
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Error nesting parts: {str(e)}', 'error')
+        return redirect(url_for('projects.detail', id=id))
+
+    if result['nested']:
+        flash(f'Material quantity: {result["message"]}', 'success')
+        if result['unmeasured_files']:
+            flash(f'Not included (not measured yet or not measurable): {", ".join(result["unmeasured_files"])}',
+                  'warning')
+    else:
+        flash(f'Could not nest parts: {result["message"]}', 'warning')
+
+    return redirect(url_for('projects.detail', id=id))
+
+
 # ============================================================================
 # Phase 9: New Routes for POP, Notifications, Delivery, and Documents
 # ============================================================================
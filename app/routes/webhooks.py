@@ -6,8 +6,9 @@ Receives webhook notifications from Module N and other external services
 from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required
 from app import db
-from app.models import Project, DesignFile, Client
+from app.models import Project, DesignFile
 from app.services.activity_logger import log_activity
+from app.services.design_geometry import store_design_file_geometry
 from datetime import datetime
 import logging
 import hmac
@@ -49,6 +50,51 @@ def verify_webhook_signature(payload: bytes, signature: str, secret: str) -> boo
     return hmac.compare_digest(signature, expected)
 
 
+def verify_request_signature() -> bool:
+    """
+    Check the X-Webhook-Signature of the current request.
+
+    Returns:
+        True if the signature is valid or no WEBHOOK_SECRET is configured
+    """
+    webhook_secret = os.getenv('WEBHOOK_SECRET', '')
+    if not webhook_secret:
+        return True
+
+    signature = request.headers.get('X-Webhook-Signature', '')
+    if not verify_webhook_signature(request.get_data(), signature, webhook_secret):
+        return False
+
+    logger.debug("Webhook signature verified successfully")
+    return True
+
+
+def dispatch_event(event_type: str, file_data: dict) -> tuple:
+    """
+    Handle one Module N event.
+
+    Args:
+        event_type: Event type from the payload
+        file_data: File data from the payload
+
+    Returns:
+        JSON response tuple
+    """
+    if event_type == 'file.processed':
+        return handle_file_processed(file_data)
+    elif event_type == 'file.ingested':
+        return handle_file_ingested(file_data)
+    elif event_type == 'file.failed':
+        return handle_file_failed(file_data)
+    elif event_type == 'file.re_extracted':
+        return handle_file_re_extracted(file_data)
+    elif event_type == 'file.deleted':
+        return handle_file_deleted(file_data)
+    else:
+        logger.warning(f"Unknown event type: {event_type}")
+        return jsonify({'success': True, 'message': 'Event type not handled'}), 200
+
+
 @bp.route('/module-n/event', methods=['POST'])
 def module_n_event():
     """
@@ -89,16 +135,9 @@ def module_n_event():
     """
     try:
         # Verify webhook signature if secret is configured
-        webhook_secret = os.getenv('WEBHOOK_SECRET', '')
-        if webhook_secret:
-            signature = request.headers.get('X-Webhook-Signature', '')
-            payload = request.get_data()
-
-            if not verify_webhook_signature(payload, signature, webhook_secret):
-                logger.error("Webhook signature verification failed")
-                return jsonify({'success': False, 'error': 'Invalid signature'}), 401
-
-            logger.debug("Webhook signature verified successfully")
+        if not verify_request_signature():
+            logger.error("Webhook signature verification failed")
+            return jsonify({'success': False, 'error': 'Invalid signature'}), 401
 
         # Get webhook payload
         data = request.get_json()
@@ -114,26 +153,178 @@ def module_n_event():
         logger.info(f"Webhook received: {event_type} for ingest_id={ingest_id}")
         logger.debug(f"Webhook data: {data}")
         
-        # Handle different event types
-        if event_type == 'file.processed':
-            return handle_file_processed(file_data)
-        elif event_type == 'file.ingested':
-            return handle_file_ingested(file_data)
-        elif event_type == 'file.failed':
-            return handle_file_failed(file_data)
-        elif event_type == 'file.re_extracted':
-            return handle_file_re_extracted(file_data)
-        elif event_type == 'file.deleted':
-            return handle_file_deleted(file_data)
-        else:
-            logger.warning(f"Unknown event type: {event_type}")
-            return jsonify({'success': True, 'message': 'Event type not handled'}), 200
+        return dispatch_event(event_type, file_data)
             
     except Exception as e:
         logger.error(f"Webhook processing failed: {str(e)}", exc_info=True)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@bp.route('/module-n/events', methods=['POST'])
+def module_n_events():
+    """
+    Receive a batch of webhook events from Module N.
+
+    Payload:
+        {
+            "event_type": "batch",
+            "timestamp": "2025-10-21T10:30:00",
+            "count": 2,
+            "events": [<event as sent to /module-n/event>, ...]
+        }
+
+    file.processed and file.re_extracted events are upserted together in one
+    transaction; other events are handled one by one.
+    """
+    try:
+        if not verify_request_signature():
+            logger.error("Webhook signature verification failed")
+            return jsonify({'success': False, 'error': 'Invalid signature'}), 401
+
+        data = request.get_json()
+
+        if not data or not isinstance(data.get('events'), list):
+            logger.error("Webhook batch received with no events")
+            return jsonify({'success': False, 'error': 'No events provided'}), 400
+
+        events = data['events']
+        logger.info(f"Webhook batch received: {len(events)} event(s)")
+
+        upserts = [e.get('file_data', {}) for e in events
+                   if e.get('event_type') in ('file.processed', 'file.re_extracted')]
+        results = upsert_design_files(upserts) if upserts else []
+        db.session.commit()
+
+        other_results = []
+        for event in events:
+            if event.get('event_type') in ('file.processed', 'file.re_extracted'):
+                continue
+            response, status_code = dispatch_event(event.get('event_type'), event.get('file_data', {}))
+            other_results.append({
+                'ingest_id': event.get('ingest_id'),
+                'status_code': status_code,
+                **response.get_json()
+            })
+
+        return jsonify({
+            'success': True,
+            'count': len(events),
+            'created': sum(1 for r in results if r['status'] == 'created'),
+            'updated': sum(1 for r in results if r['status'] == 'updated'),
+            'no_project': sum(1 for r in results if r['status'] == 'no_project'),
+            'results': results + other_results
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Webhook batch processing failed: {str(e)}", exc_info=True)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def upsert_design_files(files_data: list) -> list:
+    """
+    Create or update the DesignFile records of processed files.
+
+    All project codes are resolved with one query and all existing files
+    with another; records and their activity log entries are written in a
+    single transaction (the caller commits). Geometry measured by Module N
+    is stored on the record, so the drawing is not read again in Laser OS.
+
+    Args:
+        files_data: file_data dicts from file.processed/file.re_extracted events
+
+    Returns:
+        One result dict per file: ingest_id, status ('created', 'updated'
+        or 'no_project'), design_file_id and project_id
+    """
+    project_codes = {f.get('project_code') for f in files_data if f.get('project_code')}
+    projects = {}
+    if project_codes:
+        projects = {
+            project.project_code: project
+            for project in Project.query.filter(Project.project_code.in_(project_codes)).all()
+        }
+
+    stored_filenames = {
+        f.get('stored_filename') or f.get('original_filename')
+        for f in files_data if f.get('project_code') in projects
+    }
+    existing = {}
+    if stored_filenames:
+        query = DesignFile.query.filter(
+            DesignFile.project_id.in_([project.id for project in projects.values()]),
+            DesignFile.stored_filename.in_(stored_filenames)
+        )
+        existing = {(f.project_id, f.stored_filename): f for f in query.all()}
+
+    results = []
+    touched = []
+    for file_data in files_data:
+        project = projects.get(file_data.get('project_code'))
+        if not project:
+            logger.warning(f"No project found for project_code={file_data.get('project_code')}")
+            results.append({'ingest_id': file_data.get('ingest_id'), 'status': 'no_project'})
+            continue
+
+        stored_filename = file_data.get('stored_filename') or file_data.get('original_filename')
+        design_file = existing.get((project.id, stored_filename))
+
+        if design_file:
+            # Update existing file
+            design_file.file_type = file_data.get('file_type', 'unknown')
+            design_file.file_size = file_data.get('file_size', 0)
+            design_file.file_path = file_data.get('file_path', '')
+            design_file.updated_at = datetime.utcnow()
+            # The drawing may have changed; measure it again unless Module N did
+            design_file.geometry_version = None
+            status = 'updated'
+        else:
+            # Create new file record
+            design_file = DesignFile(
+                project_id=project.id,
+                original_filename=file_data.get('original_filename') or stored_filename,
+                stored_filename=stored_filename,
+                file_type=file_data.get('file_type', 'unknown'),
+                file_size=file_data.get('file_size', 0),
+                file_path=file_data.get('file_path', ''),
+                upload_date=datetime.utcnow(),
+                uploaded_by='Module N',  # System upload
+                notes=f"Processed by Module N (ingest_id: {file_data.get('ingest_id')})"
+            )
+            db.session.add(design_file)
+            existing[(project.id, stored_filename)] = design_file
+            status = 'created'
+
+        if file_data.get('geometry'):
+            store_design_file_geometry(design_file, file_data['geometry'])
+
+        touched.append((design_file, project, file_data))
+        results.append({'ingest_id': file_data.get('ingest_id'), 'status': status, 'project_id': project.id})
+
+    # Assign IDs to new records, then log activity in the same transaction
+    db.session.flush()
+
+    touched_results = [r for r in results if r['status'] != 'no_project']
+    for (design_file, project, file_data), result in zip(touched, touched_results):
+        result['design_file_id'] = design_file.id
+        log_activity(
+            'FILE',
+            design_file.id,
+            'PROCESSED',
+            {
+                'filename': design_file.stored_filename,
+                'project': project.project_code,
+                'material': file_data.get('material'),
+                'thickness': file_data.get('thickness_mm'),
+                'quantity': file_data.get('quantity'),
+                'confidence': file_data.get('confidence_score')
+            },
+            commit=False
+        )
+
+    return results
+
+
 def handle_file_processed(file_data: dict) -> tuple:
     """
     Handle file.processed event.
@@ -146,81 +337,25 @@ def handle_file_processed(file_data: dict) -> tuple:
         JSON response tuple
     """
     try:
-        project_code = file_data.get('project_code')
-        client_code = file_data.get('client_code')
-        
-        # Find project by project_code
-        project = None
-        if project_code:
-            project = Project.query.filter_by(project_code=project_code).first()
-        
-        # If no project found and we have client_code, try to find or create
-        if not project and client_code:
-            client = Client.query.filter_by(client_code=client_code).first()
-            if client:
-                logger.info(f"Found client {client.name} for file, but no matching project")
-        
-        # Create or update DesignFile record
-        if project:
-            # Check if file already exists
-            design_file = DesignFile.query.filter_by(
-                project_id=project.id,
-                filename=file_data.get('stored_filename')
-            ).first()
-            
-            if design_file:
-                # Update existing file
-                design_file.file_type = file_data.get('file_type', 'unknown')
-                design_file.file_size = file_data.get('file_size', 0)
-                design_file.file_path = file_data.get('file_path', '')
-                design_file.updated_at = datetime.utcnow()
-                logger.info(f"Updated existing DesignFile {design_file.id} for project {project.project_code}")
-            else:
-                # Create new file record
-                design_file = DesignFile(
-                    project_id=project.id,
-                    filename=file_data.get('stored_filename', file_data.get('original_filename')),
-                    original_filename=file_data.get('original_filename'),
-                    file_type=file_data.get('file_type', 'unknown'),
-                    file_size=file_data.get('file_size', 0),
-                    file_path=file_data.get('file_path', ''),
-                    upload_date=datetime.utcnow(),
-                    uploaded_by_id=None,  # System upload
-                    notes=f"Processed by Module N (ingest_id: {file_data.get('ingest_id')})"
-                )
-                db.session.add(design_file)
-                logger.info(f"Created new DesignFile for project {project.project_code}")
-            
-            db.session.commit()
-            
-            # Log activity
-            log_activity(
-                'FILE',
-                design_file.id,
-                'PROCESSED',
-                {
-                    'filename': design_file.filename,
-                    'project': project.project_code,
-                    'material': file_data.get('material'),
-                    'thickness': file_data.get('thickness_mm'),
-                    'quantity': file_data.get('quantity'),
-                    'confidence': file_data.get('confidence_score')
-                }
-            )
-            
-            return jsonify({
-                'success': True,
-                'message': 'File processed successfully',
-                'design_file_id': design_file.id,
-                'project_id': project.id
-            }), 200
-        else:
-            logger.warning(f"No project found for project_code={project_code}")
+        result = upsert_design_files([file_data])[0]
+        db.session.commit()
+
+        if result['status'] == 'no_project':
+            project_code = file_data.get('project_code')
             return jsonify({
                 'success': True,
                 'message': 'File processed but no matching project found',
                 'warning': f'Project {project_code} not found in Laser OS'
             }), 200
+
+        logger.info(f"{result['status'].capitalize()} DesignFile {result['design_file_id']} "
+                    f"for project {file_data.get('project_code')}")
+        return jsonify({
+            'success': True,
+            'message': 'File processed successfully',
+            'design_file_id': result['design_file_id'],
+            'project_id': result['project_id']
+        }), 200
             
     except Exception as e:
         db.session.rollback()
@@ -300,7 +435,7 @@ def handle_file_deleted(file_data: dict) -> tuple:
         stored_filename = file_data.get('stored_filename')
         
         # Find and mark file as deleted (soft delete)
-        design_file = DesignFile.query.filter_by(filename=stored_filename).first()
+        design_file = DesignFile.query.filter_by(stored_filename=stored_filename).first()
         
         if design_file:
             design_file.is_deleted = True
@@ -333,6 +468,7 @@ def module_n_health():
     return jsonify({
         'status': 'healthy',
         'service': 'laser-os-webhooks',
-        'endpoint': '/webhooks/module-n/event'
+        'endpoint': '/webhooks/module-n/event',
+        'batch_endpoint': '/webhooks/module-n/events'
     }), 200
 
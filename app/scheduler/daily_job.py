@@ -88,6 +88,56 @@ def check_low_stock_job():
         print(f"[SCHEDULER ERROR] Failed to check low stock: {str(e)}")
 
 
+def estimate_cut_times_job(app):
+    """
+    Job to fill in missing estimated cut times and sheet counts from DXF
+    design files.
+    
+    Runs hourly. This is where design files get measured; request handlers
+    only use stored geometry. Manually entered values are left unchanged.
+    
+    Args:
+        app: Flask application instance (design files are resolved against
+             its UPLOAD_FOLDER)
+    """
+    from app.services.cut_time_estimator import apply_cut_time_estimates
+    from app.services.nesting import apply_project_nesting
+    from app.models.business import Project
+    from app import db
+    
+    with app.app_context():
+        try:
+            projects = Project.query.filter(
+                ~Project.status.in_([
+                    Project.STATUS_COMPLETED,
+                    Project.STATUS_CANCELLED
+                ]),
+                db.or_(
+                    Project.estimated_cut_time.is_(None),
+                    Project.material_quantity_sheets.is_(None)
+                )
+            ).all()
+            
+            result = apply_cut_time_estimates(projects)
+            print(f"[SCHEDULER] Estimated cut time for {result['updated']} of {len(projects)} projects")
+        except Exception as e:
+            print(f"[SCHEDULER ERROR] Failed to estimate cut times: {str(e)}")
+            return
+        
+        nested = 0
+        for project in projects:
+            if project.material_quantity_sheets or not project.design_files:
+                continue
+            try:
+                # Geometry was measured above
+                if apply_project_nesting(project, measure=False)['nested']:
+                    nested += 1
+            except Exception as e:
+                db.session.rollback()
+                print(f"[SCHEDULER ERROR] Failed to nest project {project.project_code}: {str(e)}")
+        print(f"[SCHEDULER] Calculated sheet count by nesting for {nested} projects")
+
+
 def init_scheduler(app):
     """
     Initialize and start the background scheduler.
@@ -130,6 +180,15 @@ def init_scheduler(app):
         replace_existing=True
     )
     
+    # 4. Cut time estimation and nesting from design files every hour
+    scheduler.add_job(
+        func=lambda: estimate_cut_times_job(app),
+        trigger=CronTrigger(minute=15, timezone=sast),  # Every hour at :15
+        id='cut_time_estimation',
+        name='Estimate Cut Times',
+        replace_existing=True
+    )
+    
     # Start scheduler
     scheduler.start()
     
@@ -137,6 +196,7 @@ def init_scheduler(app):
     print(f"[SCHEDULER] Daily report generation: 07:30 SAST")
     print(f"[SCHEDULER] Project notifications: Every hour")
     print(f"[SCHEDULER] Low stock check: Every 6 hours")
+    print(f"[SCHEDULER] Cut time estimation and nesting: Every hour")
     
     # Shutdown scheduler when app exits
     import atexit
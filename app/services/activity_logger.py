@@ -10,7 +10,7 @@ from app import db
 from app.models import ActivityLog
 
 
-def log_activity(entity_type, entity_id, action, details=None, user='admin'):
+def log_activity(entity_type, entity_id, action, details=None, user='admin', commit=True):
     """
     Log an activity to the audit trail.
     
@@ -20,6 +20,8 @@ def log_activity(entity_type, entity_id, action, details=None, user='admin'):
         action (str): Action performed (CREATED, UPDATED, DELETED, etc.)
         details (dict, optional): Additional details as dictionary
         user (str, optional): Username who performed the action. Defaults to 'admin'.
+        commit (bool, optional): Commit immediately. Pass False to add the entry to
+            the caller's transaction instead. Defaults to True.
     
     Returns:
         ActivityLog: The created activity log entry
@@ -57,6 +59,9 @@ def log_activity(entity_type, entity_id, action, details=None, user='admin'):
     
     db.session.add(activity)
     
+    if not commit:
+        return activity
+    
     try:
         db.session.commit()
     except Exception as e:
@@ -7,6 +7,8 @@ This module provides automatic queue scheduling logic for Phase 10 automation.
 from app import db
 from app.models import Project, QueueItem, ActivityLog
 from app.services.inventory_service import check_project_inventory_availability, reserve_inventory
+from app.services.cut_time_estimator import estimate_project_cut_time
+from app.services.nesting import nest_project
 from datetime import date, datetime, timedelta
 from typing import Dict, Optional
 
@@ -18,6 +20,9 @@ def check_auto_schedule_conditions(project: Project) -> Dict:
     Conditions:
     1. POP received
     2. All Material & Production fields filled
+       (estimated_cut_time and material_quantity_sheets may instead be
+       computed from the stored geometry of the DXF design files; files are
+       not read here, the hourly estimation job measures them)
     3. Inventory available
     
     Args:
@@ -28,8 +33,15 @@ def check_auto_schedule_conditions(project: Project) -> Dict:
             - eligible: bool - Whether project can be auto-scheduled
             - reasons: list - List of reasons why not eligible (if applicable)
             - inventory_check: dict - Inventory availability check result
+            - cut_time_estimate: dict or None - Geometry-based estimate used
+              when estimated_cut_time is not set
+            - nesting: dict or None - Nesting result used when
+              material_quantity_sheets is not set
     """
     reasons = []
+    cut_time_estimate = None
+    nesting = None
+    required_sheets = project.material_quantity_sheets
     
     # Condition 1: POP received
     if not project.pop_received:
@@ -42,24 +54,32 @@ def check_auto_schedule_conditions(project: Project) -> Dict:
     if not project.material_thickness:
         missing_fields.append('material_thickness')
     if not project.material_quantity_sheets:
-        missing_fields.append('material_quantity_sheets')
+        nesting = nest_project(project, measure=False)
+        if nesting['nested']:
+            required_sheets = nesting['sheet_count']
+        else:
+            missing_fields.append('material_quantity_sheets')
     if not project.parts_quantity:
         missing_fields.append('parts_quantity')
     if not project.estimated_cut_time:
-        missing_fields.append('estimated_cut_time')
+        cut_time_estimate = estimate_project_cut_time(project, measure=False)
+        if not cut_time_estimate['estimated']:
+            missing_fields.append('estimated_cut_time')
     
     if missing_fields:
         reasons.append(f'Missing fields: {", ".join(missing_fields)}')
     
     # Condition 3: Inventory available
-    inventory_check = check_project_inventory_availability(project)
+    inventory_check = check_project_inventory_availability(project, required_sheets)
     if not inventory_check['available']:
         reasons.append(inventory_check['message'])
     
     return {
         'eligible': len(reasons) == 0,
         'reasons': reasons,
-        'inventory_check': inventory_check
+        'inventory_check': inventory_check,
+        'cut_time_estimate': cut_time_estimate,
+        'nesting': nesting
     }
 
 
@@ -134,6 +154,15 @@ def auto_schedule_project(project: Project, performed_by: str = 'System (Auto)')
         # Determine scheduled date (today or next business day)
         scheduled_date = get_next_business_day(date.today())
         
+        # Plan with the geometry-based estimate when no cut time was entered
+        if not project.estimated_cut_time and conditions['cut_time_estimate']:
+            project.estimated_cut_time = conditions['cut_time_estimate']['estimated_minutes']
+        
+        # Reserve the sheet count from nesting when none was entered
+        if not project.material_quantity_sheets and conditions['nesting']:
+            project.material_quantity_sheets = conditions['nesting']['sheet_count']
+            project.sheets_required = conditions['nesting']['sheet_count']
+        
         # Create queue item with sensible defaults
         queue_item = QueueItem(
             project_id=project.id,
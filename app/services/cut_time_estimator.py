@@ -0,0 +1,270 @@
+"""
+Laser OS - Cut Time Estimator Service
+
+This module estimates Project.estimated_cut_time from the project's DXF
+design files and the machine settings preset for its material and thickness:
+
+    minutes per part = cut_length / cut_speed + pierce_count * pierce_time / 60
+    estimated minutes = sum over design files * parts_quantity
+
+Projects can be estimated one at a time or in batches (one preset query and
+one design file query for the whole batch).
+"""
+
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+
+from app import db
+from app.models import DesignFile, MachineSettingsPreset, Project
+from app.services.activity_logger import log_activity
+from app.services.design_geometry import get_design_file_geometry
+
+# Max difference (mm) between project and preset thickness for a preset to match
+PRESET_THICKNESS_TOLERANCE = 0.3
+
+
+def estimate_cut_minutes(cut_length_mm: float, pierce_count: int, cut_speed: float,
+                         pierce_time: Optional[float] = None, quantity: int = 1) -> float:
+    """
+    Estimate cutting time for a part.
+
+    Args:
+        cut_length_mm: Total cut length in mm
+        pierce_count: Number of pierces (closed contours)
+        cut_speed: Cutting speed in mm/min
+        pierce_time: Pierce time in seconds (None = 0)
+        quantity: Number of parts
+
+    Returns:
+        Cutting time in minutes
+    """
+    if not cut_speed or cut_speed <= 0:
+        raise ValueError('Cut speed must be greater than zero')
+
+    minutes = cut_length_mm / cut_speed + (pierce_count or 0) * (pierce_time or 0) / 60.0
+    return minutes * max(quantity or 1, 1)
+
+
+def get_project_thickness(project: Project) -> Optional[float]:
+    """Get the project's material thickness in mm."""
+    if project.material_thickness:
+        return float(project.material_thickness)
+    if project.thickness_mm:
+        try:
+            return float(project.thickness_mm)
+        except ValueError:
+            return None
+    return None
+
+
+def find_preset(material_type: Optional[str], thickness: Optional[float],
+                presets: Optional[Sequence[MachineSettingsPreset]] = None) -> Optional[MachineSettingsPreset]:
+    """
+    Find the active preset with a cut speed for a material and thickness.
+
+    Matches material type case-insensitively and picks the closest thickness
+    within PRESET_THICKNESS_TOLERANCE.
+
+    Args:
+        material_type: Material type (e.g., 'Mild Steel')
+        thickness: Material thickness in mm
+        presets: Preloaded presets (default: query active presets)
+
+    Returns:
+        MachineSettingsPreset or None
+    """
+    if not material_type or thickness is None:
+        return None
+
+    if presets is None:
+        presets = MachineSettingsPreset.query.filter_by(is_active=True).all()
+
+    candidates = [
+        preset for preset in presets
+        if preset.is_active
+        and preset.cut_speed
+        and preset.material_type.strip().lower() == material_type.strip().lower()
+        and abs(float(preset.thickness) - thickness) <= PRESET_THICKNESS_TOLERANCE
+    ]
+    if not candidates:
+        return None
+
+    return min(candidates, key=lambda preset: abs(float(preset.thickness) - thickness))
+
+
+def estimate_project_cut_time(project: Project,
+                              presets: Optional[Sequence[MachineSettingsPreset]] = None,
+                              design_files: Optional[List[DesignFile]] = None,
+                              measure: bool = True) -> Dict:
+    """
+    Estimate the cutting time of a project from its design files.
+
+    Design files are measured on first use (see design_geometry); the caller
+    commits to keep the measurements.
+
+    Args:
+        project: Project instance
+        presets: Preloaded active presets (default: query)
+        design_files: Preloaded design files (default: project.design_files)
+        measure: Read DXF files that have no stored geometry (request handlers
+            pass False and only use stored geometry)
+
+    Returns:
+        Dictionary with:
+            - estimated: bool - Whether an estimate could be made
+            - estimated_minutes: int or None - Estimate rounded up to whole minutes
+            - preset_id: int or None - Preset used
+            - quantity: int - Parts quantity applied
+            - files: list - Per-file cut length, pierce count and minutes per part
+            - unmeasured_files: list - Files that could not be measured
+            - message: str - Human-readable result
+    """
+    result = {
+        'project_id': project.id,
+        'estimated': False,
+        'estimated_minutes': None,
+        'preset_id': None,
+        'quantity': project.parts_quantity or 1,
+        'files': [],
+        'unmeasured_files': [],
+        'message': ''
+    }
+
+    thickness = get_project_thickness(project)
+    preset = find_preset(project.material_type, thickness, presets)
+    if not preset:
+        result['message'] = f'No active preset with a cut speed for {project.material_type} {thickness}mm'
+        return result
+    result['preset_id'] = preset.id
+
+    if design_files is None:
+        design_files = project.design_files
+
+    cut_speed = float(preset.cut_speed)
+    pierce_time = float(preset.pierce_time) if preset.pierce_time else 0.0
+    minutes_per_set = 0.0
+
+    for design_file in design_files:
+        geometry = get_design_file_geometry(design_file, measure=measure)
+        if not geometry or not geometry['cut_length_mm']:
+            result['unmeasured_files'].append(design_file.original_filename)
+            continue
+
+        minutes = estimate_cut_minutes(geometry['cut_length_mm'], geometry['pierce_count'], cut_speed, pierce_time)
+        minutes_per_set += minutes
+        result['files'].append({
+            'design_file_id': design_file.id,
+            'filename': design_file.original_filename,
+            'cut_length_mm': geometry['cut_length_mm'],
+            'pierce_count': geometry['pierce_count'],
+            'minutes_per_part': round(minutes, 2)
+        })
+
+    if not result['files']:
+        result['message'] = 'No measurable DXF design files'
+        return result
+
+    total_minutes = minutes_per_set * result['quantity']
+    result['estimated'] = True
+    result['estimated_minutes'] = max(1, math.ceil(total_minutes))
+    result['message'] = (
+        f'{result["estimated_minutes"]} minutes for {result["quantity"]} x {len(result["files"])} part(s) '
+        f'using preset {preset.preset_name}'
+    )
+    return result
+
+
+def estimate_projects_cut_time(projects: Sequence[Project]) -> Dict[int, Dict]:
+    """
+    Estimate cutting time for many projects at once.
+
+    Loads all active presets and all design files of the batch with one query
+    each instead of one per project.
+
+    Args:
+        projects: Project instances
+
+    Returns:
+        Dictionary of project ID -> estimate (see estimate_project_cut_time)
+    """
+    if not projects:
+        return {}
+
+    presets = MachineSettingsPreset.query.filter_by(is_active=True).all()
+
+    files_by_project = defaultdict(list)
+    design_files = DesignFile.query.filter(
+        DesignFile.project_id.in_([project.id for project in projects])
+    ).order_by(DesignFile.id).all()
+    for design_file in design_files:
+        files_by_project[design_file.project_id].append(design_file)
+
+    return {
+        project.id: estimate_project_cut_time(project, presets, files_by_project[project.id])
+        for project in projects
+    }
+
+
+def apply_cut_time_estimates(projects: Sequence[Project], overwrite: bool = False,
+                             performed_by: str = 'System (Auto)') -> Dict:
+    """
+    Estimate and store Project.estimated_cut_time for many projects.
+
+    Args:
+        projects: Project instances
+        overwrite: Replace existing (manually entered) values
+        performed_by: User who triggered the action
+
+    Returns:
+        Dictionary with:
+            - updated: int - Projects whose estimated_cut_time changed
+            - skipped: int - Projects that kept their value or could not be estimated
+            - estimates: dict - Project ID -> estimate
+    """
+    estimates = estimate_projects_cut_time(projects)
+    changes = []
+
+    for project in projects:
+        estimate = estimates[project.id]
+        if not estimate['estimated']:
+            continue
+        if project.estimated_cut_time and not overwrite:
+            continue
+        if project.estimated_cut_time != estimate['estimated_minutes']:
+            changes.append((project, project.estimated_cut_time, estimate))
+            project.estimated_cut_time = estimate['estimated_minutes']
+
+    # Measured geometry and new estimates are written together
+    db.session.commit()
+
+    for project, old_minutes, estimate in changes:
+        log_activity(
+            'PROJECT',
+            project.id,
+            'UPDATED',
+            {'changes': f'estimated_cut_time: {old_minutes} → {estimate["estimated_minutes"]} (from geometry)'},
+            user=performed_by
+        )
+
+    return {
+        'updated': len(changes),
+        'skipped': len(projects) - len(changes),
+        'estimates': estimates
+    }
+
+
+def apply_cut_time_estimate(project: Project, overwrite: bool = False,
+                            performed_by: str = 'System (Auto)') -> Dict:
+    """
+    Estimate and store Project.estimated_cut_time for one project.
+
+    Args:
+        project: Project instance
+        overwrite: Replace an existing (manually entered) value
+        performed_by: User who triggered the action
+
+    Returns:
+        Estimate dictionary (see estimate_project_cut_time)
+    """
+    return apply_cut_time_estimates([project], overwrite, performed_by)['estimates'][project.id]
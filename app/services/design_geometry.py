@@ -0,0 +1,564 @@
+"""
+Laser OS - Design File Geometry Service
+
+This module measures DXF design files (cut length, pierce count, part size and
+net area) so production planning can work from the drawing instead of typed-in
+estimates. Measurements are stored on the DesignFile row and only recomputed
+when GEOMETRY_VERSION changes. Files ingested through Module N arrive with
+Module N's measurement in the webhook (see app.routes.webhooks), so only files
+uploaded directly to Laser OS are read here - measured the way Module N's DXF
+parser measures them, so both give the same values for the same drawing.
+"""
+
+import logging
+import math
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Bump when the measurement changes (forces stored geometry to be recomputed)
+GEOMETRY_VERSION = 2
+
+# Layers that are never cut (same conventions as Module N's DXF parser)
+NON_CUT_LAYERS = ('NOTES', 'TEXT', 'ANNOTATION', 'LABEL', 'CENTER', 'DIM', 'DEFPOINTS')
+
+# Max distance (mm) between two endpoints that are joined into one contour
+JOIN_TOLERANCE = 0.01
+
+# Max deviation (mm) when flattening arcs and circles into contour points
+# (their length, area and extent are measured exactly)
+FLATTEN_DISTANCE = 0.05
+
+# Max deviation (mm) when flattening ellipses and splines, which are measured
+# on the flattened points (same tolerance as Module N)
+CURVE_FLATTEN_DISTANCE = 0.01
+
+# Bulges smaller than this are treated as straight segments
+BULGE_EPSILON = 1e-9
+
+# Max nesting depth when exploding block references
+MAX_BLOCK_DEPTH = 8
+
+# Grid cells a contour may cover in the containment index before it is
+# tested against every contour instead (e.g. the outline of a nested sheet)
+MAX_GRID_CELLS_PER_CONTOUR = 16
+
+Point = Tuple[float, float]
+
+# (min_x, min_y, max_x, max_y)
+Box = Tuple[float, float, float, float]
+
+# A cut entity or polyline: (points, length, area, box, closed). The points
+# are flattened for chaining and containment tests; length, box and the
+# signed area term (shoelace plus circular segments, traversed from the
+# first to the last point) are exact.
+CutPath = Tuple[List[Point], float, float, Box, bool]
+
+
+def get_design_file_path(design_file) -> str:
+    """
+    Get the absolute path of a stored design file.
+
+    Args:
+        design_file: DesignFile instance (file_path is relative to UPLOAD_FOLDER)
+
+    Returns:
+        Absolute file path
+    """
+    base_folder = current_app.config.get('UPLOAD_FOLDER', 'data/files/projects')
+    return os.path.abspath(os.path.join(base_folder, design_file.file_path))
+
+
+def measure_dxf(file_path: str) -> Dict:
+    """
+    Measure the cut geometry of a DXF file.
+
+    Entities are read the way Module N's DXF parser reads them, so a file
+    measured here gets the same values as one ingested through Module N:
+    lines, arcs and polyline bulges are measured exactly, ellipses and
+    splines on flattened points. Paths whose ends meet are chained into
+    closed contours; each closed contour (and each circle) is one pierce.
+
+    Args:
+        file_path: Path to the DXF file
+
+    Returns:
+        Dictionary with:
+            - cut_length_mm: float - Total cut length
+            - pierce_count: int - Number of closed contours
+            - open_contour_count: int - Chains that do not close
+            - width_mm / height_mm: float - Bounding box of the cut geometry
+            - area_mm2: float - Net part area (outer contours minus holes)
+            - outlines: list - Outer contours as point lists
+    """
+    return _measure_paths(_read_cut_paths(file_path))
+
+
+def flatten_dxf(file_path: str) -> List[List[Point]]:
+    """
+    Read the cut entities of a DXF file as flattened polylines.
+
+    Args:
+        file_path: Path to the DXF file
+
+    Returns:
+        Point lists (one per entity or polyline), in drawing units
+    """
+    return [points for points, _, _, _, _ in _read_cut_paths(file_path)]
+
+
+def _read_cut_paths(file_path: str) -> List[CutPath]:
+    """Read the cut paths of a DXF file's modelspace."""
+    import ezdxf
+
+    doc = ezdxf.readfile(file_path)
+    return _cut_paths(doc.modelspace())
+
+
+def _cut_paths(entities: Iterable, depth: int = 0, block_layer: Optional[str] = None) -> List[CutPath]:
+    """Convert cut entities to cut paths, exploding block references."""
+    paths = []
+
+    for entity in entities:
+        entity_type = entity.dxftype()
+
+        # Entities on layer 0 inside a block take the layer of the INSERT
+        layer = entity.dxf.get('layer', '0')
+        if block_layer is not None and layer == '0':
+            layer = block_layer
+
+        if entity_type == 'INSERT':
+            if depth < MAX_BLOCK_DEPTH:
+                try:
+                    paths.extend(_cut_paths(entity.virtual_entities(), depth + 1, layer))
+                except Exception as e:
+                    logger.debug(f"Skipping block reference {entity.dxf.get('name')}: {e}")
+            continue
+
+        if any(pattern in layer.upper() for pattern in NON_CUT_LAYERS):
+            continue
+
+        try:
+            path = _entity_path(entity, entity_type)
+        except Exception as e:
+            logger.debug(f"Skipping {entity_type} entity: {e}")
+            continue
+        if path is not None:
+            paths.append(path)
+
+    return paths
+
+
+def _entity_path(entity, entity_type: str) -> Optional[CutPath]:
+    """Cut path of one entity, or None for entities that are not cut."""
+    dxf = entity.dxf
+
+    if entity_type == 'LINE':
+        return _polyline_path([(dxf.start.x, dxf.start.y, 0.0), (dxf.end.x, dxf.end.y, 0.0)], False)
+
+    if entity_type == 'LWPOLYLINE':
+        return _polyline_path(entity.get_points('xyb'), entity.is_closed)
+
+    if entity_type == 'POLYLINE':
+        if not (entity.is_2d_polyline or entity.is_3d_polyline):
+            return None
+        vertices = [
+            (vertex.dxf.location.x, vertex.dxf.location.y, vertex.dxf.get('bulge', 0.0))
+            for vertex in entity.vertices
+        ]
+        return _polyline_path(vertices, entity.is_closed)
+
+    if entity_type == 'ARC':
+        sweep = (dxf.end_angle - dxf.start_angle) % 360.0 or 360.0
+        points, length, area, box = _arc(dxf.center.x, dxf.center.y, dxf.radius,
+                                         math.radians(dxf.start_angle), math.radians(sweep))
+        if length <= JOIN_TOLERANCE:
+            return None
+        return points, length, area, box, False
+
+    if entity_type == 'CIRCLE':
+        if dxf.radius <= JOIN_TOLERANCE:
+            return None
+        points, length, area, box = _arc(dxf.center.x, dxf.center.y, dxf.radius, 0.0, 2.0 * math.pi)
+        return points, length, area, box, True
+
+    if entity_type in ('ELLIPSE', 'SPLINE'):
+        vertices = [(point.x, point.y, 0.0) for point in entity.flattening(CURVE_FLATTEN_DISTANCE)]
+        return _polyline_path(vertices, False)
+
+    return None
+
+
+def _polyline_path(vertices: Iterable[Sequence[float]], closed: bool) -> Optional[CutPath]:
+    """
+    Cut path of polyline vertices (x, y, bulge).
+
+    Segments no longer than JOIN_TOLERANCE keep their points but are not
+    measured, as in Module N's contour assembly.
+    """
+    vertices = [(x, y, bulge or 0.0) for x, y, bulge in vertices]
+    if len(vertices) < 2:
+        return None
+    if closed:
+        vertices.append((vertices[0][0], vertices[0][1], 0.0))
+
+    x, y, _ = vertices[0]
+    points = [(x, y)]
+    length = 0.0
+    area = 0.0
+    box = (x, y, x, y)
+
+    for (x1, y1, bulge), (x2, y2, _) in zip(vertices, vertices[1:]):
+        if x1 == x2 and y1 == y2:
+            continue
+
+        if abs(bulge) < BULGE_EPSILON:
+            segment_points = [(x2, y2)]
+            segment_length = math.hypot(x2 - x1, y2 - y1)
+            segment_area = (x1 * y2 - x2 * y1) / 2.0
+            segment_box = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+        else:
+            # Bulge = tan of a quarter of the included angle, positive counter-clockwise
+            theta = 4.0 * math.atan(bulge)
+            chord = math.hypot(x2 - x1, y2 - y1)
+            radius = chord / (2.0 * abs(math.sin(theta / 2.0)))
+            offset = chord * (1.0 - bulge * bulge) / (4.0 * bulge)
+            cx = (x1 + x2) / 2.0 - (y2 - y1) / chord * offset
+            cy = (y1 + y2) / 2.0 + (x2 - x1) / chord * offset
+            arc_points, segment_length, segment_area, segment_box = _arc(
+                cx, cy, radius, math.atan2(y1 - cy, x1 - cx), theta
+            )
+            # Exact end point, so chained contours close
+            segment_points = arc_points[1:-1] + [(x2, y2)]
+
+        points.extend(segment_points)
+        box = _union_box(box, segment_box)
+        if segment_length > JOIN_TOLERANCE:
+            length += segment_length
+            area += segment_area
+
+    if len(points) < 2 or length == 0.0:
+        return None
+    return points, length, area, box, closed
+
+
+def _arc(cx: float, cy: float, radius: float, start: float, sweep: float) -> Tuple[List[Point], float, float, Box]:
+    """
+    Flattened points, length, signed area term and exact extent of an arc.
+
+    Args:
+        cx, cy: Centre
+        radius: Radius
+        start: Start angle in radians
+        sweep: Included angle in radians (negative = clockwise)
+    """
+    if radius > FLATTEN_DISTANCE:
+        step = 2.0 * math.acos(1.0 - FLATTEN_DISTANCE / radius)
+        count = max(1, math.ceil(abs(sweep) / step))
+    else:
+        count = 1
+    points = [
+        (cx + radius * math.cos(start + sweep * i / count), cy + radius * math.sin(start + sweep * i / count))
+        for i in range(count + 1)
+    ]
+
+    (x1, y1), (x2, y2) = points[0], points[-1]
+    included = abs(sweep)
+    area = (x1 * y2 - x2 * y1) / 2.0 + math.copysign(radius * radius * (included - math.sin(included)) / 2.0, sweep)
+
+    # Extent: both ends plus every axis point the arc passes
+    low = start if sweep >= 0 else start + sweep
+    xs = [x1, x2]
+    ys = [y1, y2]
+    for quarter in range(4):
+        angle = quarter * math.pi / 2.0
+        if (angle - low) % (2.0 * math.pi) <= included:
+            xs.append(cx + radius * math.cos(angle))
+            ys.append(cy + radius * math.sin(angle))
+
+    return points, radius * included, area, (min(xs), min(ys), max(xs), max(ys))
+
+
+def _union_box(a: Box, b: Box) -> Box:
+    """Bounding box covering two bounding boxes"""
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+
+def measure_polylines(polylines: Sequence[Sequence[Point]], tolerance: float = JOIN_TOLERANCE) -> Dict:
+    """
+    Chain flattened polylines (straight segments) into contours and measure them.
+
+    Args:
+        polylines: Point lists (one per entity or sub path)
+        tolerance: Max gap between endpoints that are joined
+
+    Returns:
+        Measurement dictionary (see measure_dxf)
+    """
+    paths = []
+    for points in polylines:
+        path = _polyline_path([(x, y, 0.0) for x, y in points], False)
+        if path is not None:
+            paths.append(path)
+    return _measure_paths(paths, tolerance)
+
+
+def _measure_paths(paths: Sequence[CutPath], tolerance: float = JOIN_TOLERANCE) -> Dict:
+    """Chain cut paths into contours and measure them (see measure_dxf)."""
+    cut_length = sum(length for _, length, _, _, _ in paths)
+
+    width = height = 0.0
+    if paths:
+        extent = paths[0][3]
+        for _, _, _, box, _ in paths[1:]:
+            extent = _union_box(extent, box)
+        width = extent[2] - extent[0]
+        height = extent[3] - extent[1]
+
+    contours, open_count = _chain_contours(paths, tolerance)
+
+    # Largest first, so every contour only needs testing against bigger ones
+    contours = [(loop, abs(area)) for loop, area in contours if len(loop) >= 3]
+    contours.sort(key=lambda contour: contour[1], reverse=True)
+    loops = [loop for loop, _ in contours]
+    areas = [area for _, area in contours]
+    boxes = [_bounding_box(loop) for loop in loops]
+
+    net_area = 0.0
+    outlines = []
+    for i, (loop, depth) in enumerate(zip(loops, _nesting_depths(loops, boxes))):
+        if depth % 2 == 0:
+            net_area += areas[i]
+        else:
+            net_area -= areas[i]
+        if depth == 0:
+            outlines.append(loop)
+
+    return {
+        'cut_length_mm': round(cut_length, 2),
+        'pierce_count': len(loops),
+        'open_contour_count': open_count,
+        'width_mm': round(width, 2),
+        'height_mm': round(height, 2),
+        'area_mm2': round(net_area, 2) if loops else round(width * height, 2),
+        'outlines': outlines
+    }
+
+
+def _nesting_depths(loops: Sequence[Sequence[Point]], boxes: Sequence[Box]) -> List[int]:
+    """
+    Count how many larger contours enclose each contour.
+
+    Contours are sorted largest first. Each one is registered in the cells
+    of a uniform grid (cell size: median contour extent) that its bounding
+    box covers, so a contour is only tested against the contours registered
+    in the cell of its probe point, plus the few that cover too many cells.
+
+    Returns:
+        Nesting depth per contour (0 = outer boundary, 1 = hole, ...)
+    """
+    if len(loops) < 2:
+        return [0] * len(loops)
+
+    extents = sorted(max(box[2] - box[0], box[3] - box[1]) for box in boxes)
+    cell_size = max(extents[len(extents) // 2], 1e-9)
+
+    def cell(x: float, y: float) -> Tuple[int, int]:
+        return (math.floor(x / cell_size), math.floor(y / cell_size))
+
+    grid = defaultdict(list)
+    wide = []
+    for index, box in enumerate(boxes):
+        (x0, y0), (x1, y1) = cell(box[0], box[1]), cell(box[2], box[3])
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > MAX_GRID_CELLS_PER_CONTOUR:
+            wide.append(index)
+            continue
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                grid[(cx, cy)].append(index)
+
+    depths = []
+    for i, loop in enumerate(loops):
+        probe = loop[0]
+        candidates = wide + grid.get(cell(*probe), [])
+        depths.append(sum(
+            1 for j in candidates
+            if j < i and _box_encloses(boxes[j], boxes[i]) and _point_in_polygon(probe, loops[j])
+        ))
+    return depths
+
+
+def _chain_contours(paths: Sequence[CutPath], tolerance: float) -> Tuple[List[Tuple[List[Point], float]], int]:
+    """
+    Join cut paths end to end into closed loops.
+
+    Endpoints are bucketed in a spatial hash with cell size `tolerance`;
+    neighbouring cells are probed so ends that straddle a cell boundary
+    still meet.
+
+    Returns:
+        Tuple of (closed loops as (points, signed area), number of open chains)
+    """
+    def cell(point: Point) -> Tuple[int, int]:
+        return (round(point[0] / tolerance), round(point[1] / tolerance))
+
+    def close_enough(a: Point, b: Point) -> bool:
+        return abs(a[0] - b[0]) <= tolerance and abs(a[1] - b[1]) <= tolerance
+
+    loops = []
+    pieces = []
+    for points, _, area, _, closed in paths:
+        if closed or (len(points) > 2 and close_enough(points[0], points[-1])):
+            loops.append((list(points[:-1]), area))
+        else:
+            pieces.append((points, area))
+
+    ends = defaultdict(list)
+    for index, (points, _) in enumerate(pieces):
+        ends[cell(points[0])].append((index, False))
+        ends[cell(points[-1])].append((index, True))
+
+    used = [False] * len(pieces)
+
+    def next_piece(point: Point) -> Optional[Tuple[int, bool]]:
+        cx, cy = cell(point)
+        for dx in (0, -1, 1):
+            for dy in (0, -1, 1):
+                for index, at_end in ends.get((cx + dx, cy + dy), ()):
+                    if not used[index]:
+                        end_point = pieces[index][0][-1] if at_end else pieces[index][0][0]
+                        if close_enough(point, end_point):
+                            return index, at_end
+        return None
+
+    open_count = 0
+    for start in range(len(pieces)):
+        if used[start]:
+            continue
+        used[start] = True
+        chain = list(pieces[start][0])
+        chain_area = pieces[start][1]
+        closed = False
+
+        # Extend forward, then (if still open) backward from the other end
+        for _ in range(2):
+            while True:
+                if len(chain) > 2 and close_enough(chain[-1], chain[0]):
+                    closed = True
+                    break
+                found = next_piece(chain[-1])
+                if found is None:
+                    break
+                index, at_end = found
+                used[index] = True
+                points, area = pieces[index]
+                if at_end:
+                    # Traversed backwards, so its area term changes sign
+                    points, area = points[::-1], -area
+                chain.extend(points[1:])
+                chain_area += area
+            if closed:
+                break
+            chain.reverse()
+            chain_area = -chain_area
+
+        if closed:
+            loops.append((chain[:-1], chain_area))
+        else:
+            open_count += 1
+
+    return loops, open_count
+
+
+def _bounding_box(points: Sequence[Point]) -> Box:
+    """Bounding box (min_x, min_y, max_x, max_y) of a point list"""
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _box_encloses(outer: Box, inner: Box) -> bool:
+    """Check if a bounding box lies inside another one"""
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and inner[2] <= outer[2] and inner[3] <= outer[3]
+
+
+def _point_in_polygon(point: Point, polygon: Sequence[Point]) -> bool:
+    """Ray-casting point-in-polygon test"""
+    x, y = point
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def store_design_file_geometry(design_file, geometry: Optional[Dict]) -> None:
+    """
+    Store a measurement on a design file (the caller commits).
+
+    Args:
+        design_file: DesignFile instance
+        geometry: Dictionary with cut_length_mm, pierce_count, width_mm,
+            height_mm and area_mm2 (from measure_dxf or Module N), or None to
+            record that the file cannot be measured, so it is not read again
+            until it changes or GEOMETRY_VERSION is bumped
+    """
+    geometry = geometry or {}
+    design_file.cut_length_mm = geometry.get('cut_length_mm')
+    design_file.pierce_count = geometry.get('pierce_count')
+    design_file.part_width_mm = geometry.get('width_mm')
+    design_file.part_height_mm = geometry.get('height_mm')
+    design_file.part_area_mm2 = geometry.get('area_mm2')
+    design_file.geometry_version = GEOMETRY_VERSION
+    design_file.geometry_measured_at = datetime.utcnow()
+
+
+def get_design_file_geometry(design_file, refresh: bool = False, measure: bool = True) -> Optional[Dict]:
+    """
+    Get the measured geometry of a design file, measuring it if needed.
+
+    Measurements are stored on the DesignFile row (the caller commits), so
+    each drawing is read once per GEOMETRY_VERSION. Files that cannot be
+    measured are stored as such and not read again.
+
+    Args:
+        design_file: DesignFile instance
+        refresh: Re-measure even if stored geometry is current
+        measure: Read the DXF file if no current geometry is stored; request
+            handlers pass False and leave measuring to background jobs
+
+    Returns:
+        Dictionary with cut_length_mm, pierce_count, width_mm, height_mm and
+        area_mm2, or None if the file is not a DXF, cannot be measured or
+        has not been measured yet
+    """
+    if not refresh and design_file.geometry_version == GEOMETRY_VERSION:
+        return design_file.geometry_dict()
+
+    if not measure or (design_file.file_type or '').lower() != 'dxf':
+        return None
+
+    file_path = get_design_file_path(design_file)
+    if not os.path.exists(file_path):
+        logger.warning(f"Design file {design_file.id} not found on disk: {file_path}")
+        store_design_file_geometry(design_file, None)
+        return None
+
+    try:
+        geometry = measure_dxf(file_path)
+    except Exception as e:
+        logger.warning(f"Could not measure design file {design_file.id}: {e}")
+        store_design_file_geometry(design_file, None)
+        return None
+
+    store_design_file_geometry(design_file, geometry)
+    return design_file.geometry_dict()
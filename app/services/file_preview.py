@@ -0,0 +1,490 @@
+"""
+Laser OS - Design File Preview Service
+
+This module renders downscaled SVG previews of DXF and LightBurn (.lbrn2)
+files for DesignFile and ProductFile records.
+
+Previews are content-addressed: the file name is a SHA-256 of the source
+file (and PREVIEW_VERSION), so identical uploads share one preview and a
+preview URL never changes its content. Rendering happens once per file,
+either in a background worker right after upload or on first view; the
+digest is stored on the record so list pages only build URLs. Files that
+cannot be drawn (other file types, unreadable drawings) are marked once
+and never offered a preview.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from flask import current_app, url_for
+
+from app.services.design_geometry import flatten_dxf, get_design_file_path
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rendering changes (forces stored previews to be re-rendered)
+PREVIEW_VERSION = 1
+
+# File extensions previews are rendered for
+PREVIEW_FILE_TYPES = ('dxf', 'lbrn2')
+
+# preview_hash stored (with the current PREVIEW_VERSION) for files that have no preview
+NO_PREVIEW = ''
+
+# Longest side of the preview in pixels
+PREVIEW_SIZE = 480
+
+# Blank border around the drawing in pixels
+PREVIEW_MARGIN = 8
+
+# Preview URLs are content-addressed, so browsers may cache them for a year
+PREVIEW_CACHE_SECONDS = 365 * 24 * 3600
+
+# Background render threads (rendering is CPU bound; keep requests responsive)
+PREVIEW_WORKERS = 2
+
+# Line segments per cubic bezier in LightBurn paths
+BEZIER_SEGMENTS = 12
+
+# Line segments per full LightBurn ellipse
+ELLIPSE_SEGMENTS = 72
+
+Point = Tuple[float, float]
+Matrix = Tuple[float, float, float, float, float, float]
+
+IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+_NUMBER = r'-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?'
+_VERTEX_PATTERN = re.compile(rf'V({_NUMBER})\s+({_NUMBER})((?:c[01][xy]{_NUMBER})*)')
+_CONTROL_PATTERN = re.compile(rf'c([01])([xy])({_NUMBER})')
+_PRIMITIVE_PATTERN = re.compile(r'([LB])(\d+)\s+(\d+)')
+
+_executor = ThreadPoolExecutor(max_workers=PREVIEW_WORKERS, thread_name_prefix='preview')
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def get_preview_folder() -> str:
+    """Get the folder that holds rendered previews."""
+    folder = current_app.config.get('PREVIEW_FOLDER')
+    if not folder:
+        folder = os.path.join(current_app.config.get('UPLOAD_FOLDER', 'data/files'), 'previews')
+    return folder
+
+
+def preview_type(file_record) -> Optional[str]:
+    """
+    File type a record's preview is rendered as.
+
+    Taken from the filename extension: uploads store file_type 'dxf' for
+    any file that is not .lbrn2 (PDFs and images included).
+
+    Args:
+        file_record: DesignFile or ProductFile instance
+
+    Returns:
+        'dxf' or 'lbrn2', or None if the file type has no preview
+    """
+    filename = file_record.original_filename or file_record.stored_filename or ''
+    extension = os.path.splitext(filename)[1].lower().lstrip('.')
+    return extension if extension in PREVIEW_FILE_TYPES else None
+
+
+def has_preview(file_record) -> bool:
+    """True unless the file type has no preview or rendering it failed."""
+    if preview_type(file_record) is None:
+        return False
+    return not (file_record.preview_version == PREVIEW_VERSION and file_record.preview_hash == NO_PREVIEW)
+
+
+def preview_digest(file_path: str) -> str:
+    """
+    Content address of a file's preview.
+
+    Args:
+        file_path: Path to the source file
+
+    Returns:
+        Hex SHA-256 of PREVIEW_VERSION and the file content
+    """
+    sha = hashlib.sha256(f'laser-os-preview-v{PREVIEW_VERSION}\n'.encode())
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def preview_path(digest: str, preview_folder: str) -> str:
+    """Path of a rendered preview (sharded by the first two hex digits)."""
+    return os.path.join(preview_folder, digest[:2], f'{digest}.svg')
+
+
+def read_lbrn2(file_path: str) -> List[List[Point]]:
+    """
+    Read the shapes of a LightBurn project as flattened polylines.
+
+    Rectangles, ellipses, paths and groups are supported; text and bitmaps
+    are skipped. Coordinates are in mm.
+
+    Args:
+        file_path: Path to the .lbrn2 file
+
+    Returns:
+        Point lists
+    """
+    root = ET.parse(file_path).getroot()
+    polylines = []
+    shared_vertices = {}
+    shared_primitives = {}
+
+    for shape in root.findall('Shape'):
+        _read_lbrn2_shape(shape, IDENTITY, polylines, shared_vertices, shared_primitives)
+
+    return polylines
+
+
+def _read_lbrn2_shape(shape: ET.Element, parent: Matrix, polylines: List[List[Point]],
+                      shared_vertices: Dict, shared_primitives: Dict) -> None:
+    """Append the polylines of one LightBurn shape (recursing into groups)."""
+    matrix = _multiply(parent, _parse_xform(shape.find('XForm')))
+    shape_type = shape.get('Type')
+
+    if shape_type == 'Group':
+        children = shape.find('Children')
+        for child in (children.findall('Shape') if children is not None else ()):
+            _read_lbrn2_shape(child, matrix, polylines, shared_vertices, shared_primitives)
+        return
+
+    if shape_type == 'Rect':
+        w = float(shape.get('W', 0)) / 2.0
+        h = float(shape.get('H', 0)) / 2.0
+        points = [(-w, -h), (w, -h), (w, h), (-w, h), (-w, -h)]
+    elif shape_type == 'Ellipse':
+        rx = float(shape.get('Rx', 0))
+        ry = float(shape.get('Ry', 0))
+        points = [
+            (rx * math.cos(2 * math.pi * i / ELLIPSE_SEGMENTS), ry * math.sin(2 * math.pi * i / ELLIPSE_SEGMENTS))
+            for i in range(ELLIPSE_SEGMENTS + 1)
+        ]
+    elif shape_type == 'Path':
+        vertices = _shared_list(shape, 'VertList', 'VertID', shared_vertices, _parse_vertices)
+        primitives = _shared_list(shape, 'PrimList', 'PrimID', shared_primitives, _parse_primitives)
+        for points in _path_polylines(vertices, primitives):
+            polylines.append([_apply(matrix, point) for point in points])
+        return
+    else:
+        return
+
+    polylines.append([_apply(matrix, point) for point in points])
+
+
+def _shared_list(shape: ET.Element, tag: str, id_attribute: str, shared: Dict, parse) -> list:
+    """Parse a vertex or primitive list, resolving references to earlier shapes."""
+    element = shape.find(tag)
+    list_id = shape.get(id_attribute)
+    if element is not None and element.text:
+        parsed = parse(element.text)
+        if list_id is not None:
+            shared[list_id] = parsed
+        return parsed
+    return shared.get(list_id, [])
+
+
+def _parse_vertices(text: str) -> List[Dict]:
+    """Parse a LightBurn VertList ("V x y" with optional c0x/c0y/c1x/c1y control points)."""
+    vertices = []
+    for match in _VERTEX_PATTERN.finditer(text):
+        vertex = {'point': (float(match.group(1)), float(match.group(2)))}
+        controls = {f'c{n}{axis}': float(value) for n, axis, value in _CONTROL_PATTERN.findall(match.group(3))}
+        for n in '01':
+            if f'c{n}x' in controls and f'c{n}y' in controls:
+                vertex[f'c{n}'] = (controls[f'c{n}x'], controls[f'c{n}y'])
+        vertices.append(vertex)
+    return vertices
+
+
+def _parse_primitives(text: str) -> List[Tuple[str, int, int]]:
+    """Parse a LightBurn PrimList ("L a b" lines, "B a b" beziers or "LineClosed")."""
+    if text.strip().startswith('LineClosed'):
+        return [('LineClosed', 0, 0)]
+    return [(kind, int(start), int(end)) for kind, start, end in _PRIMITIVE_PATTERN.findall(text)]
+
+
+def _path_polylines(vertices: Sequence[Dict], primitives: Sequence[Tuple[str, int, int]]) -> List[List[Point]]:
+    """Turn LightBurn path primitives into polylines, joining consecutive segments."""
+    if not vertices:
+        return []
+    if not primitives or primitives[0][0] == 'LineClosed':
+        points = [vertex['point'] for vertex in vertices]
+        if primitives:
+            points.append(points[0])
+        return [points] if len(points) >= 2 else []
+
+    polylines = []
+    current = None
+    last_end = None
+    for kind, start, end in primitives:
+        if start >= len(vertices) or end >= len(vertices):
+            continue
+        if current is None or start != last_end:
+            current = [vertices[start]['point']]
+            polylines.append(current)
+
+        p0 = vertices[start]['point']
+        p3 = vertices[end]['point']
+        if kind == 'B':
+            c0 = vertices[start].get('c0', p0)
+            c1 = vertices[end].get('c1', p3)
+            current.extend(_bezier(p0, c0, c1, p3))
+        else:
+            current.append(p3)
+        last_end = end
+
+    return [points for points in polylines if len(points) >= 2]
+
+
+def _bezier(p0: Point, p1: Point, p2: Point, p3: Point) -> List[Point]:
+    """Flatten a cubic bezier (excluding its start point)."""
+    points = []
+    for i in range(1, BEZIER_SEGMENTS + 1):
+        t = i / BEZIER_SEGMENTS
+        u = 1 - t
+        points.append((
+            u ** 3 * p0[0] + 3 * u * u * t * p1[0] + 3 * u * t * t * p2[0] + t ** 3 * p3[0],
+            u ** 3 * p0[1] + 3 * u * u * t * p1[1] + 3 * u * t * t * p2[1] + t ** 3 * p3[1],
+        ))
+    return points
+
+
+def _parse_xform(element: Optional[ET.Element]) -> Matrix:
+    """Parse a LightBurn XForm ("a b c d e f" affine matrix)."""
+    if element is None or not element.text:
+        return IDENTITY
+    try:
+        values = [float(value) for value in element.text.split()]
+    except ValueError:
+        return IDENTITY
+    return tuple(values) if len(values) == 6 else IDENTITY
+
+
+def _multiply(m: Matrix, n: Matrix) -> Matrix:
+    """Compose two affine matrices (n is applied first)."""
+    a, b, c, d, e, f = m
+    a2, b2, c2, d2, e2, f2 = n
+    return (
+        a * a2 + c * b2, b * a2 + d * b2,
+        a * c2 + c * d2, b * c2 + d * d2,
+        a * e2 + c * f2 + e, b * e2 + d * f2 + f,
+    )
+
+
+def _apply(m: Matrix, point: Point) -> Point:
+    """Transform a point by an affine matrix."""
+    x, y = point
+    return (m[0] * x + m[2] * y + m[4], m[1] * x + m[3] * y + m[5])
+
+
+def render_svg(polylines: Sequence[Sequence[Point]], size: int = PREVIEW_SIZE) -> Optional[str]:
+    """
+    Render polylines as a downscaled SVG.
+
+    Coordinates are scaled to `size` pixels on the longest side (Y flipped
+    to screen orientation) and points closer than half a pixel are dropped,
+    so the preview stays small even for very detailed drawings.
+
+    Args:
+        polylines: Point lists in drawing units (Y up)
+        size: Longest side of the drawing area in pixels
+
+    Returns:
+        SVG document, or None if there is nothing to draw
+    """
+    all_x = [x for points in polylines for x, _ in points]
+    all_y = [y for points in polylines for _, y in points]
+    if not all_x:
+        return None
+
+    min_x, max_x = min(all_x), max(all_x)
+    min_y, max_y = min(all_y), max(all_y)
+    extent = max(max_x - min_x, max_y - min_y)
+    if extent <= 0:
+        return None
+
+    scale = size / extent
+    width = round((max_x - min_x) * scale) + 2 * PREVIEW_MARGIN
+    height = round((max_y - min_y) * scale) + 2 * PREVIEW_MARGIN
+
+    commands = []
+    for points in polylines:
+        pixels = [
+            ((x - min_x) * scale + PREVIEW_MARGIN, (max_y - y) * scale + PREVIEW_MARGIN)
+            for x, y in points
+        ]
+        pixels = _simplify(pixels, 0.5)
+        if len(pixels) < 2:
+            continue
+        closed = len(points) > 2 and points[0] == points[-1]
+        if closed:
+            pixels = pixels[:-1]
+        path = 'M' + 'L'.join(f'{x:.1f} {y:.1f}' for x, y in pixels)
+        commands.append(path + ('Z' if closed else ''))
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">'
+        f'<path d="{"".join(commands)}" fill="none" stroke="#1f2937" stroke-width="1" '
+        f'stroke-linejoin="round" stroke-linecap="round"/></svg>'
+    )
+
+
+def _simplify(points: Sequence[Point], min_distance: float) -> List[Point]:
+    """Drop points closer than min_distance to the previously kept point (keeps the last point)."""
+    if len(points) <= 2:
+        return list(points)
+    kept = [points[0]]
+    for point in points[1:-1]:
+        last = kept[-1]
+        if abs(point[0] - last[0]) >= min_distance or abs(point[1] - last[1]) >= min_distance:
+            kept.append(point)
+    kept.append(points[-1])
+    return kept
+
+
+def generate_preview(file_path: str, file_type: str, preview_folder: str) -> Optional[str]:
+    """
+    Render a file's preview unless it already exists.
+
+    Args:
+        file_path: Path to the DXF or .lbrn2 file
+        file_type: 'dxf' or 'lbrn2'
+        preview_folder: Folder that holds rendered previews
+
+    Returns:
+        Preview digest, or None if the file has nothing to draw
+    """
+    digest = preview_digest(file_path)
+    target = preview_path(digest, preview_folder)
+    if os.path.exists(target):
+        return digest
+
+    if (file_type or '').lower() == 'lbrn2':
+        polylines = read_lbrn2(file_path)
+    else:
+        polylines = flatten_dxf(file_path)
+
+    svg = render_svg(polylines)
+    if svg is None:
+        return None
+
+    # Write to a temporary name first so readers never see a partial file
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temp_path = f'{target}.{threading.get_ident()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(svg)
+    os.replace(temp_path, target)
+    return digest
+
+
+def ensure_preview(file_record) -> Optional[str]:
+    """
+    Get the preview digest of a DesignFile or ProductFile, rendering it if needed.
+
+    The digest is stored on the record, or NO_PREVIEW when the drawing
+    cannot be rendered, so it is not read again (the caller commits).
+
+    Args:
+        file_record: DesignFile or ProductFile instance
+
+    Returns:
+        Preview digest, or None if no preview can be rendered
+    """
+    if not has_preview(file_record):
+        return None
+
+    preview_folder = get_preview_folder()
+    if (file_record.preview_version == PREVIEW_VERSION and file_record.preview_hash
+            and os.path.exists(preview_path(file_record.preview_hash, preview_folder))):
+        return file_record.preview_hash
+
+    file_path = get_design_file_path(file_record)
+    if not os.path.exists(file_path):
+        logger.warning(f"{type(file_record).__name__} {file_record.id} not found on disk: {file_path}")
+        return None
+
+    try:
+        digest = generate_preview(file_path, preview_type(file_record), preview_folder)
+    except Exception as e:
+        logger.warning(f"Could not render preview for {type(file_record).__name__} {file_record.id}: {e}")
+        digest = None
+
+    file_record.preview_hash = digest or NO_PREVIEW
+    file_record.preview_version = PREVIEW_VERSION
+    return digest
+
+
+def preview_url(file_record) -> Optional[str]:
+    """
+    URL of a file's preview image.
+
+    Rendered previews link straight to the content-addressed (cacheable)
+    URL; other files link to the route that renders on first view. Files
+    without a preview get None.
+    """
+    from app.models import ProductFile
+
+    if not has_preview(file_record):
+        return None
+    if file_record.preview_hash and file_record.preview_version == PREVIEW_VERSION:
+        return url_for('files.preview_image', digest=file_record.preview_hash)
+    if isinstance(file_record, ProductFile):
+        return url_for('products.file_preview', file_id=file_record.id)
+    return url_for('files.preview', file_id=file_record.id)
+
+
+def queue_preview(app, file_record) -> None:
+    """
+    Render a file's preview in a background thread.
+
+    Does nothing for files without a preview, if PREVIEW_ON_UPLOAD is
+    disabled or if the file is already queued; the preview is then
+    rendered on first view instead.
+
+    Args:
+        app: Flask application instance
+        file_record: DesignFile or ProductFile instance (committed)
+    """
+    if not app.config.get('PREVIEW_ON_UPLOAD', True) or not has_preview(file_record):
+        return
+
+    key = (type(file_record), file_record.id)
+    with _pending_lock:
+        if key in _pending:
+            return
+        _pending.add(key)
+
+    _executor.submit(_render_in_background, app, key)
+
+
+def _render_in_background(app, key) -> None:
+    """Worker: render and store one preview."""
+    from app import db
+
+    model, file_id = key
+    try:
+        with app.app_context():
+            file_record = model.query.get(file_id)
+            if file_record is not None:
+                ensure_preview(file_record)
+                db.session.commit()  # The digest or the NO_PREVIEW marker
+    except Exception as e:
+        logger.warning(f"Background preview for {model.__name__} {file_id} failed: {e}")
+    finally:
+        with _pending_lock:
+            _pending.discard(key)
@@ -105,17 +105,21 @@ def check_inventory_availability(material_type: str, thickness: float, required_
     }
 
 
-def check_project_inventory_availability(project: Project) -> Dict:
+def check_project_inventory_availability(project: Project, required_sheets: Optional[float] = None) -> Dict:
     """
     Check if inventory has enough material for a specific project.
 
     Args:
         project: Project instance
+        required_sheets: Sheets needed (default: project.material_quantity_sheets)
 
     Returns:
         Dictionary with availability information (same as check_inventory_availability)
     """
-    if not project.material_type or not project.material_thickness or not project.material_quantity_sheets:
+    if required_sheets is None:
+        required_sheets = project.material_quantity_sheets
+
+    if not project.material_type or not project.material_thickness or not required_sheets:
         return {
             'available': False,
             'inventory_item': None,
@@ -129,7 +133,7 @@ def check_project_inventory_availability(project: Project) -> Dict:
     return check_inventory_availability(
         material_type=project.material_type,
         thickness=float(project.material_thickness),
-        required_quantity=float(project.material_quantity_sheets)
+        required_quantity=float(required_sheets)
     )
 
 
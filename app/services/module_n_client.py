@@ -112,6 +112,96 @@ class ModuleNClient:
             logger.error(f"Module N request failed: {str(e)}")
             raise
     
+    def submit_ingest_job(
+        self,
+        files: List[FileStorage],
+        client_code: Optional[str] = None,
+        project_code: Optional[str] = None,
+        mode: str = "AUTO"
+    ) -> Dict[str, Any]:
+        """
+        Send files to Module N for background ingestion.
+        
+        Returns as soon as the files are uploaded, so large batches do not
+        hit the request timeout. Poll get_job_status() for progress.
+        
+        Args:
+            files: List of FileStorage objects
+            client_code: Optional client code (e.g., "CL-0001")
+            project_code: Optional project code (e.g., "JB-2025-10-CL0001-001")
+            mode: Processing mode (AUTO, dxf, pdf, excel, etc.)
+        
+        Returns:
+            Job dictionary with job_id, status_url and results_url
+        
+        Raises:
+            requests.exceptions.RequestException: If request fails
+        """
+        if not self.enabled:
+            raise RuntimeError("Module N is not enabled")
+        
+        url = f"{self.base_url}/ingest/jobs"
+        
+        files_data = []
+        for file in files:
+            file.seek(0)
+            files_data.append(
+                ('files', (file.filename, file.stream, file.content_type))
+            )
+        
+        data = {
+            'mode': mode
+        }
+        if client_code:
+            data['client_code'] = client_code
+        if project_code:
+            data['project_code'] = project_code
+        
+        try:
+            logger.info(f"Submitting ingest job with {len(files)} file(s) to Module N")
+            # The timeout applies to the upload only, not to processing
+            response = requests.post(
+                url,
+                files=files_data,
+                data=data,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            
+            job = response.json()
+            logger.info(f"Module N accepted ingest job {job.get('job_id')}")
+            return job
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Module N job submission failed: {str(e)}")
+            raise
+    
+    def get_job_status(self, job_id: str) -> Dict[str, Any]:
+        """
+        Get progress of a background ingest job.
+        
+        Args:
+            job_id: Job ID returned by submit_ingest_job()
+        
+        Returns:
+            Job status dictionary with per-file progress
+        
+        Raises:
+            requests.exceptions.RequestException: If request fails
+        """
+        if not self.enabled:
+            raise RuntimeError("Module N is not enabled")
+        
+        url = f"{self.base_url}/jobs/{job_id}"
+        
+        try:
+            response = requests.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Module N job status check failed: {str(e)}")
+            raise
+    
     def get_ingest_status(self, ingest_id: int) -> Dict[str, Any]:
         """
         Get status of a file ingestion.
@@ -0,0 +1,614 @@
+"""
+Laser OS - Sheet Nesting Service
+
+This module packs a project's parts onto stock sheets to work out how many
+sheets it needs (Project.material_quantity_sheets) and how well they are used.
+
+Two modes are available:
+- rectangle (default): skyline bottom-left packing of part bounding boxes.
+  Fast enough for hundreds of parts in well under a second.
+- true_shape: bottom-left fill on a raster of the sheet, using the real
+  part outlines, so irregular parts can sit in each other's empty corners.
+"""
+
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app import db
+from app.constants.material_thickness import SHEET_SIZES
+from app.models import InventoryItem, Project
+from app.services.activity_logger import log_activity
+from app.services.cut_time_estimator import get_project_thickness
+from app.services.design_geometry import get_design_file_geometry, get_design_file_path, measure_dxf
+
+logger = logging.getLogger(__name__)
+
+NESTING_MODE_RECTANGLE = 'rectangle'
+NESTING_MODE_TRUE_SHAPE = 'true_shape'
+NESTING_MODES = [NESTING_MODE_RECTANGLE, NESTING_MODE_TRUE_SHAPE]
+
+# Used when neither the project nor inventory specifies a sheet size
+DEFAULT_SHEET_SIZE = SHEET_SIZES[0]
+
+# Gap (mm) kept between parts and unused border (mm) around the sheet
+PART_SPACING_MM = 5.0
+SHEET_MARGIN_MM = 10.0
+
+# Raster cell size (mm) for true-shape nesting
+RASTER_CELL_MM = 5.0
+
+# Part rotations tried in true-shape mode (degrees)
+TRUE_SHAPE_ROTATIONS = (0, 90, 180, 270)
+
+EPSILON = 1e-6
+
+
+def parse_sheet_size(sheet_size: Optional[str]) -> Optional[Tuple[float, float]]:
+    """
+    Parse a sheet size string.
+
+    Args:
+        sheet_size: Size as "<width>x<height>" in mm (e.g., "3000x1500")
+
+    Returns:
+        Tuple of (width, height) or None if the string is not a size
+    """
+    if not sheet_size:
+        return None
+    try:
+        width, height = sheet_size.lower().replace(' ', '').split('x')
+        width, height = float(width), float(height)
+    except ValueError:
+        return None
+    if width <= 0 or height <= 0:
+        return None
+    return width, height
+
+
+def nest_parts(parts: Sequence[Dict], sheet_width: float, sheet_height: float,
+               mode: str = NESTING_MODE_RECTANGLE, spacing: float = PART_SPACING_MM,
+               margin: float = SHEET_MARGIN_MM) -> Dict:
+    """
+    Pack parts onto as few sheets as possible.
+
+    Args:
+        parts: Part dictionaries with:
+            - name: str
+            - width / height: float - Bounding box in mm
+            - area: float - Net part area in mm² (used for utilisation)
+            - quantity: int
+            - outlines: list - Outer contours as point lists (true_shape mode)
+        sheet_width: Sheet width in mm
+        sheet_height: Sheet height in mm
+        mode: 'rectangle' or 'true_shape'
+        spacing: Gap between parts in mm
+        margin: Unused border around the sheet in mm
+
+    Returns:
+        Dictionary with:
+            - sheet_count: int - Sheets needed
+            - utilisation: float - Part area / sheet area of all sheets (percent)
+            - placed: int - Part instances placed
+            - unplaced: list - Names of parts too large for the sheet
+            - sheets: list - Per sheet part count and utilisation
+            - mode: str - Nesting mode used
+            - elapsed_ms: float - Time spent nesting
+    """
+    if mode not in NESTING_MODES:
+        raise ValueError(f'Unknown nesting mode: {mode}')
+
+    started = time.perf_counter()
+
+    # Inflating parts and the usable area by the spacing keeps the gap
+    # between parts without a gap along the margin
+    usable_width = sheet_width - 2 * margin + spacing
+    usable_height = sheet_height - 2 * margin + spacing
+
+    instances = []
+    for part in parts:
+        instances.extend([part] * max(int(part.get('quantity') or 1), 0))
+
+    # Largest first gives the packers the best chance to fill gaps later
+    instances.sort(key=lambda part: (part['width'] * part['height'], max(part['width'], part['height'])), reverse=True)
+
+    if mode == NESTING_MODE_TRUE_SHAPE:
+        sheets, unplaced = _nest_raster(instances, usable_width, usable_height, spacing)
+    else:
+        sheets, unplaced = _nest_skyline(instances, usable_width, usable_height, spacing)
+
+    sheet_area = sheet_width * sheet_height
+    total_area = sum(sheet.used_area for sheet in sheets)
+
+    return {
+        'sheet_count': len(sheets),
+        'utilisation': round(100.0 * total_area / (sheet_area * len(sheets)), 1) if sheets else 0.0,
+        'placed': sum(sheet.part_count for sheet in sheets),
+        'unplaced': sorted(set(unplaced)),
+        'sheets': [
+            {'parts': sheet.part_count, 'utilisation': round(100.0 * sheet.used_area / sheet_area, 1)}
+            for sheet in sheets
+        ],
+        'mode': mode,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
+
+
+# ---------------------------------------------------------------------------
+# Rectangle mode: skyline bottom-left packing
+# ---------------------------------------------------------------------------
+
+class _SkylineSheet:
+    """Sheet whose free space is tracked as a skyline of [x, y, width] segments."""
+
+    def __init__(self, width: float, height: float):
+        self.width = width
+        self.height = height
+        self.skyline = [[0.0, 0.0, width]]
+        self.used_area = 0.0
+        self.part_count = 0
+
+    def find_position(self, width: float, height: float) -> Optional[Tuple[float, float, int]]:
+        """
+        Find the bottom-left position for a rectangle.
+
+        Returns:
+            Tuple of (top edge after placing, x, skyline index), or None if it does not fit
+        """
+        best = None
+        for index, (x, _, _) in enumerate(self.skyline):
+            if x + width > self.width + EPSILON:
+                break
+
+            # The rectangle rests on the highest segment it spans
+            y = 0.0
+            remaining = width
+            segment = index
+            while remaining > EPSILON:
+                y = max(y, self.skyline[segment][1])
+                remaining -= self.skyline[segment][2]
+                segment += 1
+
+            if y + height > self.height + EPSILON:
+                continue
+            if best is None or (y + height, x) < best[:2]:
+                best = (y + height, x, index)
+
+        return best
+
+    def place(self, x: float, top: float, width: float, index: int):
+        """Raise the skyline under a placed rectangle."""
+        skyline = self.skyline
+        skyline.insert(index, [x, top, width])
+
+        # Trim or drop the segments now covered by the rectangle
+        right = x + width
+        segment = index + 1
+        while segment < len(skyline) and skyline[segment][0] < right - EPSILON:
+            seg_x, seg_y, seg_width = skyline[segment]
+            if seg_x + seg_width <= right + EPSILON:
+                del skyline[segment]
+            else:
+                skyline[segment] = [right, seg_y, seg_x + seg_width - right]
+                break
+
+        # Merge neighbouring segments of equal height
+        segment = 0
+        while segment < len(skyline) - 1:
+            if abs(skyline[segment][1] - skyline[segment + 1][1]) <= EPSILON:
+                skyline[segment][2] += skyline[segment + 1][2]
+                del skyline[segment + 1]
+            else:
+                segment += 1
+
+
+def _nest_skyline(instances: Sequence[Dict], width: float, height: float,
+                  spacing: float) -> Tuple[List[_SkylineSheet], List[str]]:
+    """Pack part bounding boxes first-fit across sheets."""
+    sheets: List[_SkylineSheet] = []
+    unplaced = []
+
+    for part in instances:
+        orientations = [(part['width'] + spacing, part['height'] + spacing)]
+        if abs(part['width'] - part['height']) > EPSILON:
+            orientations.append((part['height'] + spacing, part['width'] + spacing))
+
+        if not any(w <= width + EPSILON and h <= height + EPSILON for w, h in orientations):
+            unplaced.append(part['name'])
+            continue
+
+        for sheet in sheets + [None]:
+            if sheet is None:
+                sheet = _SkylineSheet(width, height)
+                sheets.append(sheet)
+
+            best = None
+            for w, h in orientations:
+                position = sheet.find_position(w, h)
+                if position and (best is None or position[:2] < best[0][:2]):
+                    best = (position, w)
+
+            if best:
+                (top, x, index), w = best
+                sheet.place(x, top, w, index)
+                sheet.used_area += part['area']
+                sheet.part_count += 1
+                break
+
+    return sheets, unplaced
+
+
+# ---------------------------------------------------------------------------
+# True-shape mode: bottom-left fill on a raster
+# ---------------------------------------------------------------------------
+
+class _RasterSheet:
+    """Sheet occupancy as one integer bitmask per raster row (bit x = column x)."""
+
+    def __init__(self, columns: int, rows: int):
+        self.columns = columns
+        self.rows = [0] * rows
+        self.full_row = (1 << columns) - 1
+        self.used_area = 0.0
+        self.part_count = 0
+        # Lowest row worth scanning per mask. The sheet only fills up, so a
+        # mask can never fit below (or left of) where it last fitted.
+        self.start_rows = {}
+
+    def find_position(self, mask: List[int], runs: List[List[Tuple[int, int]]],
+                      mask_width: int) -> Optional[Tuple[int, int]]:
+        """
+        Find the lowest row, then leftmost column, where a part mask fits.
+
+        Args:
+            mask: Part rows as bitmasks
+            runs: Per part row, the (start, length) runs of set bits
+            mask_width: Part width in cells
+
+        Returns:
+            Tuple of (row, column) or None
+        """
+        if mask_width > self.columns or len(mask) > len(self.rows):
+            return None
+
+        valid_columns = (1 << (self.columns - mask_width + 1)) - 1
+        windows = {}
+        last_row = len(self.rows) - len(mask)
+
+        for y in range(self.start_rows.get(id(mask), 0), last_row + 1):
+            if self.rows[y] == self.full_row:
+                continue
+
+            # Bit x of `blocked` is set when placing the part at column x collides
+            blocked = 0
+            for i, row_runs in enumerate(runs):
+                sheet_row = self.rows[y + i]
+                if not sheet_row:
+                    continue
+                for start, length in row_runs:
+                    key = (y + i, length)
+                    window = windows.get(key)
+                    if window is None:
+                        window = windows[key] = _window_any(sheet_row, length)
+                    blocked |= window >> start
+                if blocked & valid_columns == valid_columns:
+                    break
+
+            free = valid_columns & ~blocked
+            if free:
+                self.start_rows[id(mask)] = y
+                return y, (free & -free).bit_length() - 1
+
+        self.start_rows[id(mask)] = last_row + 1
+        return None
+
+    def place(self, mask: List[int], y: int, x: int):
+        """Mark a part mask as occupied."""
+        for i, row in enumerate(mask):
+            self.rows[y + i] |= row << x
+
+
+def _window_any(bits: int, length: int) -> int:
+    """Bit x of the result is set when any bit in [x, x + length) is set."""
+    result = bits
+    span = 1
+    while span * 2 <= length:
+        result |= result >> span
+        span *= 2
+    if span < length:
+        result |= result >> (length - span)
+    return result
+
+
+def _rasterize(outlines: Sequence[Sequence[Tuple[float, float]]], rotation: int,
+               cell: float, dilate: int) -> Tuple[List[int], int]:
+    """
+    Rasterize part outlines (even-odd fill at cell centres) and grow the
+    mask by `dilate` cells so parts keep their spacing.
+
+    Returns:
+        Tuple of (row bitmasks, width in cells)
+    """
+    radians = math.radians(rotation)
+    cos_r, sin_r = math.cos(radians), math.sin(radians)
+    polygons = [
+        [(x * cos_r - y * sin_r, x * sin_r + y * cos_r) for x, y in outline]
+        for outline in outlines
+    ]
+    min_x = min(x for polygon in polygons for x, _ in polygon)
+    min_y = min(y for polygon in polygons for _, y in polygon)
+    max_x = max(x for polygon in polygons for x, _ in polygon)
+    max_y = max(y for polygon in polygons for _, y in polygon)
+
+    columns = max(1, math.ceil((max_x - min_x) / cell))
+    row_count = max(1, math.ceil((max_y - min_y) / cell))
+
+    edges = []
+    for polygon in polygons:
+        for (x1, y1), (x2, y2) in zip(polygon, polygon[1:] + polygon[:1]):
+            if y1 != y2:
+                edges.append(((x1 - min_x) / cell, (y1 - min_y) / cell, (x2 - min_x) / cell, (y2 - min_y) / cell))
+
+    rows = []
+    for row in range(row_count):
+        centre_y = row + 0.5
+        crossings = sorted(
+            x1 + (centre_y - y1) * (x2 - x1) / (y2 - y1)
+            for x1, y1, x2, y2 in edges
+            if (y1 > centre_y) != (y2 > centre_y)
+        )
+        bits = 0
+        for enter, leave in zip(crossings[::2], crossings[1::2]):
+            first = max(0, math.ceil(enter - 0.5))
+            last = min(columns - 1, math.floor(leave - 0.5))
+            if last >= first:
+                bits |= ((1 << (last - first + 1)) - 1) << first
+        rows.append(bits)
+
+    # Thin parts may miss every cell centre; keep at least their bounding box row
+    if not any(rows):
+        rows = [(1 << columns) - 1] * row_count
+
+    if dilate:
+        rows = [0] * dilate + rows + [0] * dilate
+        rows = [
+            _window_any(_spread(rows, index, dilate), 2 * dilate + 1)
+            for index in range(len(rows))
+        ]
+        columns += 2 * dilate
+
+    return rows, columns
+
+
+def _spread(rows: List[int], index: int, distance: int) -> int:
+    """Vertical dilation of one row (shifted left so _window_any widens it both ways)."""
+    bits = 0
+    for row in rows[max(0, index - distance):index + distance + 1]:
+        bits |= row
+    return bits << distance
+
+
+def _row_runs(row: int) -> List[Tuple[int, int]]:
+    """(start, length) of every run of set bits in a row."""
+    runs = []
+    position = 0
+    while row:
+        skip = (row & -row).bit_length() - 1
+        row >>= skip
+        position += skip
+        length = (~row & (row + 1)).bit_length() - 1
+        runs.append((position, length))
+        row >>= length
+        position += length
+    return runs
+
+
+def _nest_raster(instances: Sequence[Dict], width: float, height: float,
+                 spacing: float) -> Tuple[List[_RasterSheet], List[str]]:
+    """Bottom-left fill of rasterized outlines first-fit across sheets."""
+    cell = RASTER_CELL_MM
+    columns = int(width // cell)
+    rows = int(height // cell)
+    # Both neighbours are grown, so each one carries half the spacing
+    dilate = max(1, math.ceil(spacing / (2 * cell))) if spacing > 0 else 0
+
+    sheets: List[_RasterSheet] = []
+    unplaced = []
+    masks = {}
+
+    for part in instances:
+        key = id(part)
+        if key not in masks:
+            outlines = part.get('outlines') or [[
+                (0.0, 0.0), (part['width'], 0.0), (part['width'], part['height']), (0.0, part['height'])
+            ]]
+            masks[key] = []
+            for rotation in TRUE_SHAPE_ROTATIONS:
+                mask, mask_width = _rasterize(outlines, rotation, cell, dilate)
+                masks[key].append((mask, [_row_runs(row) for row in mask], mask_width))
+
+        orientations = masks[key]
+        if not any(mask_width <= columns and len(mask) <= rows for mask, _, mask_width in orientations):
+            unplaced.append(part['name'])
+            continue
+
+        for sheet in sheets + [None]:
+            if sheet is None:
+                sheet = _RasterSheet(columns, rows)
+                sheets.append(sheet)
+
+            best = None
+            for mask, runs, mask_width in orientations:
+                position = sheet.find_position(mask, runs, mask_width)
+                if position and (best is None or position < best[0]):
+                    best = (position, mask)
+
+            if best:
+                (y, x), mask = best
+                sheet.place(mask, y, x)
+                sheet.used_area += part['area']
+                sheet.part_count += 1
+                break
+
+    return sheets, unplaced
+
+
+# ---------------------------------------------------------------------------
+# Projects
+# ---------------------------------------------------------------------------
+
+def get_project_sheet_size(project: Project) -> str:
+    """
+    Get the sheet size to nest a project on.
+
+    Uses the project's sheet size, then the sheet size of a matching sheet
+    metal inventory item, then DEFAULT_SHEET_SIZE.
+
+    Args:
+        project: Project instance
+
+    Returns:
+        Sheet size string (e.g., "3000x1500")
+    """
+    if parse_sheet_size(project.sheet_size):
+        return project.sheet_size
+
+    thickness = get_project_thickness(project)
+    if project.material_type and thickness is not None:
+        items = InventoryItem.query.filter(
+            InventoryItem.category == InventoryItem.CATEGORY_SHEET_METAL,
+            InventoryItem.material_type == project.material_type,
+            InventoryItem.sheet_size.isnot(None)
+        ).all()
+        items = [item for item in items if item.thickness is not None and parse_sheet_size(item.sheet_size)]
+        if items:
+            item = min(items, key=lambda item: (abs(float(item.thickness) - thickness), -float(item.quantity_on_hand)))
+            return item.sheet_size
+
+    return DEFAULT_SHEET_SIZE
+
+
+def get_project_parts(project: Project, true_shape: bool = False,
+                      measure: bool = True) -> Tuple[List[Dict], List[str]]:
+    """
+    Build the part list of a project from its measured DXF design files.
+
+    Every design file is one part, needed parts_quantity times.
+
+    Args:
+        project: Project instance
+        true_shape: Include part outlines (reads the DXF files)
+        measure: Read DXF files that have no stored geometry
+
+    Returns:
+        Tuple of (parts, filenames that could not be measured)
+    """
+    parts = []
+    unmeasured = []
+    quantity = project.parts_quantity or 1
+
+    for design_file in project.design_files:
+        geometry = get_design_file_geometry(design_file, measure=measure)
+        if not geometry or not geometry['width_mm'] or not geometry['height_mm']:
+            unmeasured.append(design_file.original_filename)
+            continue
+
+        part = {
+            'name': design_file.original_filename,
+            'width': geometry['width_mm'],
+            'height': geometry['height_mm'],
+            'area': geometry['area_mm2'] or geometry['width_mm'] * geometry['height_mm'],
+            'quantity': quantity
+        }
+        if true_shape:
+            try:
+                part['outlines'] = measure_dxf(get_design_file_path(design_file))['outlines']
+            except Exception as e:
+                logger.warning(f"Using bounding box for {design_file.original_filename}: {e}")
+        parts.append(part)
+
+    return parts, unmeasured
+
+
+def nest_project(project: Project, mode: str = NESTING_MODE_RECTANGLE,
+                 sheet_size: Optional[str] = None, measure: bool = True) -> Dict:
+    """
+    Nest a project's parts and work out the sheets it needs.
+
+    Args:
+        project: Project instance
+        mode: 'rectangle' or 'true_shape'
+        sheet_size: Sheet size to use (default: get_project_sheet_size)
+        measure: Read DXF files that have no stored geometry (request handlers
+            pass False and only use stored geometry)
+
+    Returns:
+        nest_parts() result plus:
+            - nested: bool - Whether any part could be nested
+            - sheet_size: str - Sheet size used
+            - unmeasured_files: list - Files left out (not measurable)
+            - message: str - Human-readable result
+    """
+    sheet_size = sheet_size or get_project_sheet_size(project)
+    dimensions = parse_sheet_size(sheet_size)
+    if not dimensions:
+        return {'nested': False, 'sheet_size': sheet_size, 'sheet_count': 0, 'unmeasured_files': [],
+                'message': f'Invalid sheet size: {sheet_size}'}
+
+    parts, unmeasured = get_project_parts(project, true_shape=(mode == NESTING_MODE_TRUE_SHAPE), measure=measure)
+    if not parts:
+        return {'nested': False, 'sheet_size': sheet_size, 'sheet_count': 0, 'unmeasured_files': unmeasured,
+                'message': 'No measurable DXF design files'}
+
+    result = nest_parts(parts, dimensions[0], dimensions[1], mode=mode)
+    result['nested'] = result['sheet_count'] > 0
+    result['sheet_size'] = sheet_size
+    result['unmeasured_files'] = unmeasured
+    result['message'] = (
+        f'{result["sheet_count"]} sheet(s) of {sheet_size} at {result["utilisation"]}% utilisation '
+        f'({result["placed"]} parts, {mode.replace("_", " ")} nesting)'
+    )
+    if result['unplaced']:
+        result['message'] += f'; too large for the sheet: {", ".join(result["unplaced"])}'
+
+    logger.info(f"Nested project {project.project_code}: {result['message']} in {result['elapsed_ms']}ms")
+    return result
+
+
+def apply_project_nesting(project: Project, mode: str = NESTING_MODE_RECTANGLE, overwrite: bool = False,
+                          performed_by: str = 'System (Auto)', measure: bool = True) -> Dict:
+    """
+    Nest a project and store the sheet count as material_quantity_sheets.
+
+    Args:
+        project: Project instance
+        mode: 'rectangle' or 'true_shape'
+        overwrite: Replace an existing (manually entered) sheet count
+        performed_by: User who triggered the action
+        measure: Read DXF files that have no stored geometry (request handlers
+            pass False and leave measuring to the hourly job)
+
+    Returns:
+        nest_project() result
+    """
+    result = nest_project(project, mode, measure=measure)
+    old_sheets = project.material_quantity_sheets
+
+    if result['nested'] and (overwrite or not old_sheets):
+        project.material_quantity_sheets = result['sheet_count']
+        project.sheets_required = result['sheet_count']
+
+    # Measured geometry and the sheet count are written together
+    db.session.commit()
+
+    if project.material_quantity_sheets != old_sheets:
+        log_activity(
+            'PROJECT',
+            project.id,
+            'UPDATED',
+            {'changes': f'material_quantity_sheets: {old_sheets} → {project.material_quantity_sheets} (nesting)'},
+            user=performed_by
+        )
+
+    return result
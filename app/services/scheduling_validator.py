@@ -279,7 +279,8 @@ def validate_scheduling(
     Args:
         project: Project to schedule
         scheduled_date: Proposed scheduled date (defaults to today)
-        estimated_time_minutes: Estimated time (defaults to project.estimated_cut_time)
+        estimated_time_minutes: Estimated time (defaults to project.estimated_cut_time,
+            then to an estimate from the stored geometry of the project's DXF design files)
     
     Returns:
         dict: Combined validation result with all checks
@@ -294,7 +295,12 @@ def validate_scheduling(
         scheduled_date = date.today()
     
     if estimated_time_minutes is None:
-        estimated_time_minutes = project.estimated_cut_time or 60  # Default 1 hour
+        estimated_time_minutes = project.estimated_cut_time
+    
+    if not estimated_time_minutes:
+        from app.services.cut_time_estimator import estimate_project_cut_time
+        estimate = estimate_project_cut_time(project, measure=False)
+        estimated_time_minutes = estimate['estimated_minutes'] or 60  # Default 1 hour
     
     errors = []
     warnings = []
@@ -32,6 +32,8 @@ class Config:
     # File Upload
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or str(basedir / 'data' / 'files')
     DOCUMENTS_FOLDER = os.environ.get('DOCUMENTS_FOLDER') or str(basedir / 'data' / 'documents')  # Phase 9: Project documents
+    PREVIEW_FOLDER = os.environ.get('PREVIEW_FOLDER') or str(basedir / 'data' / 'previews')  # Rendered DXF/LightBurn previews
+    PREVIEW_ON_UPLOAD = os.environ.get('PREVIEW_ON_UPLOAD', 'True').lower() in ('true', '1', 'yes')  # Render previews in the background after upload
     MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE', 52428800))  # 50MB default
     ALLOWED_EXTENSIONS = {'dxf', 'lbrn2', 'pdf', 'jpg', 'jpeg', 'png', 'doc', 'docx'}  # Phase 10: Added lbrn2
     ALLOWED_DOCUMENT_EXTENSIONS = {'pdf', 'jpg', 'jpeg', 'png', 'doc', 'docx', 'xlsx', 'xls'}  # Phase 9: Document types
@@ -146,6 +148,7 @@ class Config:
         os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
         os.makedirs(Path(app.config['UPLOAD_FOLDER']) / 'clients', exist_ok=True)
         os.makedirs(Path(app.config['UPLOAD_FOLDER']) / 'reports', exist_ok=True)
+        os.makedirs(app.config['PREVIEW_FOLDER'], exist_ok=True)
 
         # Create logs directory
         os.makedirs('logs', exist_ok=True)
@@ -280,6 +283,9 @@ class TestingConfig(Config):
     # Disable CSRF for testing
     WTF_CSRF_ENABLED = False
 
+    # Render previews on first view instead of in background threads
+    PREVIEW_ON_UPLOAD = False
+
 
 # Configuration dictionary
 config = {
@@ -24,6 +24,9 @@ DROP INDEX IF EXISTS idx_file_ingests_file_type;
 DROP INDEX IF EXISTS idx_file_ingests_created_at;
 DROP INDEX IF EXISTS idx_file_ingests_client_code;
 DROP INDEX IF EXISTS idx_file_ingests_project_code;
+DROP INDEX IF EXISTS idx_file_ingests_created_id;
+DROP INDEX IF EXISTS idx_file_ingests_client_status;
+DROP INDEX IF EXISTS idx_file_ingests_material_thickness;
 
 -- file_extractions indexes
 DROP INDEX IF EXISTS idx_file_extractions_file_ingest_id;
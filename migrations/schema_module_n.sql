@@ -61,6 +61,11 @@ CREATE INDEX IF NOT EXISTS idx_file_ingests_created_at ON file_ingests(created_a
 CREATE INDEX IF NOT EXISTS idx_file_ingests_client_code ON file_ingests(client_code);
 CREATE INDEX IF NOT EXISTS idx_file_ingests_project_code ON file_ingests(project_code);
 
+-- GET /files keyset pagination and common filter pairs
+CREATE INDEX IF NOT EXISTS idx_file_ingests_created_id ON file_ingests(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_file_ingests_client_status ON file_ingests(client_code, status, created_at);
+CREATE INDEX IF NOT EXISTS idx_file_ingests_material_thickness ON file_ingests(material, thickness_mm, created_at);
+
 -- ============================================================================
 -- Table 2: file_extractions
 -- Stores raw extraction data in JSON format for flexibility
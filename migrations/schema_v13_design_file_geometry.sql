@@ -0,0 +1,20 @@
+-- ============================================================================
+-- Laser OS - Version 13.0: Design File Geometry
+-- ============================================================================
+-- Version: 13.0
+-- Date: 2026-10-16
+-- Description: Store measured DXF geometry on design files so cut time can be
+--              estimated from the drawing (cut length, pierce count, part size)
+-- Dependencies: Requires schema v4 (design_files)
+-- ============================================================================
+
+ALTER TABLE design_files ADD COLUMN cut_length_mm NUMERIC(12, 2);
+ALTER TABLE design_files ADD COLUMN pierce_count INTEGER;
+ALTER TABLE design_files ADD COLUMN part_width_mm NUMERIC(10, 2);
+ALTER TABLE design_files ADD COLUMN part_height_mm NUMERIC(10, 2);
+ALTER TABLE design_files ADD COLUMN part_area_mm2 NUMERIC(14, 2);
+ALTER TABLE design_files ADD COLUMN geometry_version INTEGER;
+ALTER TABLE design_files ADD COLUMN geometry_measured_at DATETIME;
+
+-- Update schema version
+UPDATE settings SET value = '13.0' WHERE key = 'schema_version';
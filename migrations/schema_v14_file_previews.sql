@@ -0,0 +1,17 @@
+-- ============================================================================
+-- Laser OS - Version 14.0: File Previews
+-- ============================================================================
+-- Version: 14.0
+-- Date: 2026-10-16
+-- Description: Store the content address of rendered DXF/LightBurn previews on
+--              design and product files so pages link to cached previews
+-- Dependencies: Requires schema v13 (design file geometry)
+-- ============================================================================
+
+ALTER TABLE design_files ADD COLUMN preview_hash VARCHAR(64);
+ALTER TABLE design_files ADD COLUMN preview_version INTEGER;
+ALTER TABLE product_files ADD COLUMN preview_hash VARCHAR(64);
+ALTER TABLE product_files ADD COLUMN preview_version INTEGER;
+
+-- Update schema version
+UPDATE settings SET value = '14.0' WHERE key = 'schema_version';
@@ -20,12 +20,28 @@ class Settings(BaseSettings):
     
     # Database Configuration
     DATABASE_URL: str = "sqlite:///data/laser_os.db"
+    DB_POOL_SIZE: int = 10  # Pooled connections kept open (per process)
+    DB_MAX_OVERFLOW: int = 10  # Extra connections opened under load
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a free pooled connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a server connection is replaced (not SQLite)
+    SQLITE_JOURNAL_MODE: str = "WAL"  # Readers don't block behind the writer ("" = SQLite default)
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # No fsync per commit in WAL mode; FULL for maximum durability
+    SQLITE_CACHE_SIZE_KB: int = 65536  # 64 MB page cache per connection (0 = SQLite default)
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MB memory-mapped reads (0 = disabled)
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # Wait this long for a locked database before failing
+    FILES_COUNT_CACHE_TTL: int = 30  # Seconds a GET /files total is reused per filter combination (0 = no cache)
     
     # File Storage Configuration
     UPLOAD_FOLDER: str = "data/files"
     MAX_UPLOAD_SIZE: int = 52428800  # 50 MB
+    UPLOAD_CHUNK_SIZE: int = 1048576  # 1 MB - uploads are streamed to disk in chunks of this size
     AUTO_VERSION: bool = True  # Automatically increment version on filename collision
 
+    # ZIP Archive Uploads (members are streamed out one at a time, never extracted in bulk)
+    ZIP_MAX_MEMBERS: int = 500  # Max files per archive (0 = unlimited)
+    ZIP_MAX_UNCOMPRESSED_SIZE: int = 1073741824  # 1 GB - max total uncompressed size (0 = unlimited)
+    ZIP_MEMBER_CONCURRENCY: int = 4  # Archive members processed at once by POST /ingest
+
     # Allowed File Extensions
     ALLOWED_DXF_EXTENSIONS: list = ['.dxf']
     ALLOWED_PDF_EXTENSIONS: list = ['.pdf']
@@ -41,15 +57,70 @@ class Settings(BaseSettings):
     WEBHOOK_RETRY_DELAY: int = 5  # Delay in seconds between retry attempts (exponential backoff)
     WEBHOOK_SECRET: str = ""  # Secret key for webhook signature (HMAC-SHA256)
     WEBHOOK_ENABLED_EVENTS: list = []  # List of enabled event types (empty = all events)
+    WEBHOOK_QUEUE_FILE: str = "data/webhook_queue.db"  # SQLite webhook outbox (delivered in the background)
+    WEBHOOK_QUEUE_BATCH_SIZE: int = 100  # Webhooks claimed per delivery run (also the max batch size)
+    WEBHOOK_QUEUE_LEASE_SECONDS: int = 300  # A claimed webhook is retried by another worker after this long
+    LASER_OS_WEBHOOK_BATCH_URL: str = "http://localhost:8080/webhooks/module-n/events"  # Receiver for batched events
+    WEBHOOK_BATCH_ENABLED: bool = True  # Coalesce file.processed webhooks into batches
+    WEBHOOK_BATCH_WINDOW_MS: int = 250  # Events within this window go out in one batch
+    WEBHOOK_DISPATCH_POLL_INTERVAL: float = 5.0  # Seconds between outbox polls (retries, leftovers)
+    WEBHOOK_HTTP_MAX_CONNECTIONS: int = 20  # Pooled connections to Laser OS
+    WEBHOOK_HTTP_MAX_KEEPALIVE: int = 10  # Idle keep-alive connections kept open
+    WEBHOOK_HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept
+    WEBHOOK_HTTP_CONNECT_TIMEOUT: float = 5.0  # Connect timeout in seconds (LASER_OS_TIMEOUT for the rest)
+    WEBHOOK_METRICS_FILE: str = "data/webhook_metrics.jsonl"  # Delivery metrics (JSON Lines, appended in batches)
+    WEBHOOK_METRICS_MAX: int = 10000  # Metrics kept in memory (ring buffer)
+    WEBHOOK_METRICS_FLUSH_INTERVAL: float = 5.0  # Seconds between metric flushes to disk
     
     # OCR Settings
     TESSERACT_LANGUAGES: str = "eng+afr"
     TESSERACT_CONFIG: str = "--oem 3 --psm 6"
+    OCR_WORKERS: int = 1  # Dedicated OCR processes (image parsing never uses the general parser pool)
+    OCR_TIMEOUT_SECONDS: int = 30  # Tesseract is killed after this long (0 = no limit)
+    OCR_TARGET_DPI: int = 300  # Scans above this resolution are downscaled to it before recognition
+    OCR_MAX_PIXELS: int = 4000000  # Images are downscaled to at most this many pixels before recognition
+    OCR_CACHE_ENABLED: bool = True  # Reuse OCR text for images identical after preprocessing (SHA-256 of the pixels)
+    OCR_CACHE_MAX_DISTANCE: int = 0  # Also reuse it for near-identical images within this many perceptual hash bits (of 256; 0 = off)
+    OCR_CACHE_MAX_ENTRIES: int = 2000  # Max cached OCR results (0 = unlimited)
     
     # Processing Settings
     CONFIDENCE_THRESHOLD: float = 0.70
     AUTO_PROCESS: bool = True
-    
+
+    # Parser Execution Pool
+    PARSER_POOL_ENABLED: bool = True  # Run parsers in a process pool (False = thread pool)
+    PARSER_POOL_WORKERS: int = 0  # Number of parser processes (0 = one per CPU core)
+    PARSER_CONCURRENCY_LIMITS: dict = {  # Max concurrent parses per file type
+        'dxf': 4,
+        'pdf': 2,
+        'excel': 2,
+        'lbrn2': 4,
+        'image': 1
+    }
+
+    # Background Ingest Jobs (POST /ingest/jobs)
+    INGEST_JOB_CONCURRENCY: int = 8  # Files of one job processed at once (parsing is also bounded by the pool)
+    INGEST_JOB_RETENTION: int = 200  # Jobs kept in memory for status polling
+
+    # Bulk Re-extraction (POST /reextract/jobs)
+    REEXTRACT_BATCH_SIZE: int = 50  # Files parsed and committed per batch (also the resume granularity)
+    REEXTRACT_CONCURRENCY: int = 2  # Files of a job parsed at once, leaves parser slots for live uploads
+    REEXTRACT_BATCH_DELAY: float = 0.0  # Seconds to wait between batches (extra throttling)
+    REEXTRACT_LEASE_SECONDS: int = 300  # A running job without a heartbeat for this long is resumed elsewhere
+    REEXTRACT_RESUME_ON_STARTUP: bool = True  # Resume interrupted jobs when the service starts
+
+    # Parse Result Cache
+    PARSE_CACHE_ENABLED: bool = True  # Reuse parse results for byte-identical files
+    PARSE_CACHE_MAX_ENTRIES: int = 5000  # Max cached results (0 = unlimited)
+    PARSE_CACHE_MAX_BYTES: int = 268435456  # 256 MB - max total cached content size (0 = unlimited)
+    PARSE_CACHE_EVICT_INTERVAL: int = 100  # Puts between limit checks (also checked once the size estimate is over a limit)
+
+    # PDF Extraction
+    PDF_MAX_PAGES: int = 200  # Pages read per PDF (0 = all); the rest is skipped and flagged as truncated
+    PDF_PARALLEL_MIN_PAGES: int = 40  # Split PDFs with at least this many pages into page ranges read in parallel
+    PDF_PAGE_WORKERS: int = 0  # Max page ranges a long PDF is read in, in the parser pool (0 = one per pool worker)
+    PDF_TABLE_EXTRACTION: str = "auto"  # auto = only pages with table-like layout, always, never
+
     # Google APIs (Phase 2)
     GOOGLE_CLIENT_ID: Optional[str] = None
     GOOGLE_CLIENT_SECRET: Optional[str] = None
@@ -58,6 +129,10 @@ class Settings(BaseSettings):
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "logs/module_n.log"
+
+    # Metrics (GET /metrics)
+    METRICS_ENABLED: bool = True  # Record per-stage, per-parser timings and counters in memory
+    METRICS_TRACE_REQUESTS: bool = False  # Log a stage timing line for every request (else only with X-Module-N-Trace: 1)
     
     class Config:
         env_file = ".env.module_n"
@@ -1,33 +1,81 @@
 """Module N - Database Package"""
 
-from .models import FileIngest, FileExtraction, FileMetadata, Base
+from .models import FileIngest, FileExtraction, FileMetadata, ParseCacheEntry, OCRCacheEntry, FileVersion, ReextractJob, Base
+from .engine import create_db_engine
 from .operations import (
     init_db,
     get_session,
     save_file_ingest,
     save_file_extraction,
     save_file_metadata,
+    IngestRecord,
+    save_ingest_result,
+    save_ingest_results,
     get_file_ingest,
     get_file_ingests,
+    get_file_ingest_page,
+    count_file_ingests,
     update_file_ingest,
     delete_file_ingest,
-    re_extract_file
+    re_extract_file,
+    get_parse_cache_entry,
+    save_parse_cache_entry,
+    evict_parse_cache,
+    get_parse_cache_stats,
+    find_ocr_cache_entry,
+    save_ocr_cache_entry,
+    allocate_file_version,
+    get_stale_parser_versions,
+    get_reextract_candidates,
+    count_reextract_candidates,
+    create_reextract_job,
+    get_reextract_job,
+    get_reextract_jobs,
+    claim_reextract_job,
+    update_reextract_job,
+    save_reextract_batch
 )
 
 __all__ = [
     'FileIngest',
     'FileExtraction',
     'FileMetadata',
+    'ParseCacheEntry',
+    'OCRCacheEntry',
+    'FileVersion',
+    'ReextractJob',
     'Base',
+    'create_db_engine',
     'init_db',
     'get_session',
     'save_file_ingest',
     'save_file_extraction',
     'save_file_metadata',
+    'IngestRecord',
+    'save_ingest_result',
+    'save_ingest_results',
     'get_file_ingest',
     'get_file_ingests',
+    'get_file_ingest_page',
+    'count_file_ingests',
     'update_file_ingest',
     'delete_file_ingest',
-    're_extract_file'
+    're_extract_file',
+    'get_parse_cache_entry',
+    'save_parse_cache_entry',
+    'evict_parse_cache',
+    'get_parse_cache_stats',
+    'find_ocr_cache_entry',
+    'save_ocr_cache_entry',
+    'allocate_file_version',
+    'get_stale_parser_versions',
+    'get_reextract_candidates',
+    'count_reextract_candidates',
+    'create_reextract_job',
+    'get_reextract_job',
+    'get_reextract_jobs',
+    'claim_reextract_job',
+    'update_reextract_job',
+    'save_reextract_batch'
 ]
 
@@ -0,0 +1,117 @@
+"""
+Module N - Database Engine
+Engine factory: connection pool sizing and SQLite pragmas (WAL, synchronous,
+cache, mmap, busy timeout). Switching to PostgreSQL only needs a DATABASE_URL change
+"""
+
+import logging
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def is_sqlite(database_url: str) -> bool:
+    """Check whether a database URL points at SQLite"""
+    return make_url(database_url).get_backend_name() == 'sqlite'
+
+
+def is_memory_sqlite(database_url: str) -> bool:
+    """Check whether a database URL is an in-memory SQLite database"""
+    url = make_url(database_url)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def get_sqlite_pragmas() -> Dict[str, Any]:
+    """
+    PRAGMAs applied to every new SQLite connection (from settings).
+
+    Empty/zero settings leave the SQLite default in place.
+    """
+    pragmas = {}
+    if settings.SQLITE_JOURNAL_MODE:
+        pragmas['journal_mode'] = settings.SQLITE_JOURNAL_MODE
+    if settings.SQLITE_SYNCHRONOUS:
+        pragmas['synchronous'] = settings.SQLITE_SYNCHRONOUS
+    if settings.SQLITE_CACHE_SIZE_KB:
+        pragmas['cache_size'] = -settings.SQLITE_CACHE_SIZE_KB  # Negative = KiB instead of pages
+    if settings.SQLITE_MMAP_SIZE:
+        pragmas['mmap_size'] = settings.SQLITE_MMAP_SIZE
+    if settings.SQLITE_BUSY_TIMEOUT_MS:
+        pragmas['busy_timeout'] = settings.SQLITE_BUSY_TIMEOUT_MS
+    return pragmas
+
+
+def _install_sqlite_pragmas(engine: Engine, pragmas: Dict[str, Any]) -> None:
+    """Run the PRAGMAs on every connection the pool opens"""
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_db_engine(database_url: str) -> Engine:
+    """
+    Create the SQLAlchemy engine for Module N.
+
+    SQLite files get WAL journaling (readers no longer block behind the
+    ingest writer), synchronous=NORMAL (no fsync per commit, still safe in
+    WAL), a larger page cache, memory-mapped reads and a busy timeout so
+    concurrent writers wait for the lock instead of failing. In-memory
+    SQLite keeps SQLAlchemy's default pool (every connection would be a
+    separate database otherwise).
+
+    Other databases (PostgreSQL) get a sized connection pool with
+    pre-ping and recycling. Worker processes must not reuse the parent's
+    connections - see operations.dispose_engine_after_fork().
+
+    Args:
+        database_url: SQLAlchemy database URL
+
+    Returns:
+        Configured Engine
+    """
+    if is_memory_sqlite(database_url):
+        return create_engine(database_url, echo=False, connect_args={'check_same_thread': False})
+
+    pool_options = dict(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+
+    if is_sqlite(database_url):
+        engine = create_engine(
+            database_url,
+            echo=False,
+            connect_args={
+                # Sessions are used from the threadpool (asyncio.to_thread, FastAPI sync routes)
+                'check_same_thread': False,
+                # sqlite3's own busy handler, in seconds (also set as PRAGMA below)
+                'timeout': settings.SQLITE_BUSY_TIMEOUT_MS / 1000.0,
+            },
+            **pool_options
+        )
+        pragmas = get_sqlite_pragmas()
+        _install_sqlite_pragmas(engine, pragmas)
+        logger.info(f"SQLite engine: pool {settings.DB_POOL_SIZE}+{settings.DB_MAX_OVERFLOW}, pragmas {pragmas}")
+        return engine
+
+    engine = create_engine(
+        database_url,
+        echo=False,
+        pool_pre_ping=True,  # Verify connections before using (server may have dropped them)
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        **pool_options
+    )
+    logger.info(f"{engine.dialect.name} engine: pool {settings.DB_POOL_SIZE}+{settings.DB_MAX_OVERFLOW}")
+    return engine
@@ -3,6 +3,7 @@ Module N - Database Models
 SQLAlchemy ORM models for file ingestion and metadata storage
 """
 
+import json
 from datetime import datetime
 from typing import Optional
 from sqlalchemy import (
@@ -186,6 +187,145 @@ class FileMetadata(Base):
         }
 
 
+class ParseCacheEntry(Base):
+    """
+    Cached parser output keyed on file content hash and parser version
+    """
+    __tablename__ = 'parse_cache'
+    
+    # Primary Key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    # Cache Key
+    parser_name = Column(String(50), nullable=False)  # 'dxf_parser', 'pdf_parser', etc.
+    parser_version = Column(String(20), nullable=False)
+    file_hash = Column(String(64), nullable=False)  # SHA-256 of the file content
+    
+    # Cached Content
+    content = Column(Text, nullable=False)  # JSON format (output of parser.extract_content())
+    size_bytes = Column(Integer, nullable=False, default=0)
+    hit_count = Column(Integer, default=0)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<ParseCacheEntry(id={self.id}, parser='{self.parser_name}', hash='{self.file_hash[:12]}')>"
+
+
+class OCRCacheEntry(Base):
+    """
+    Cached OCR text keyed on the SHA-256 of the (downscaled) image's pixels,
+    so an image is recognised once however often it is uploaded
+    """
+    __tablename__ = 'ocr_text_cache'
+    
+    # Primary Key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    # Cache Key
+    ocr_config = Column(String(200), nullable=False)  # Languages, Tesseract config and preprocessing version
+    image_hash = Column(String(64), nullable=False)  # SHA-256 of the preprocessed image (hex)
+    phash = Column(String(64), nullable=False)  # 256-bit difference hash for opt-in near matches (hex)
+    
+    # Cached Content
+    text = Column(Text, nullable=False)
+    hit_count = Column(Integer, default=0)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<OCRCacheEntry(id={self.id}, image_hash='{self.image_hash[:12]}')>"
+
+
+class FileVersion(Base):
+    """
+    Latest stored version per versioned filename, so save_file() allocates
+    the next -vN with one indexed update instead of scanning the folder
+    """
+    __tablename__ = 'file_versions'
+    
+    # Primary Key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    # Version Key ('' when the file has no client/project code)
+    client_code = Column(String(50), nullable=False, default='')
+    project_code = Column(String(100), nullable=False, default='')
+    base_filename = Column(String(255), nullable=False)  # Normalized filename without -vN and extension
+    
+    # Latest allocated version
+    current_version = Column(Integer, nullable=False, default=0)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<FileVersion(base='{self.base_filename}', version={self.current_version})>"
+
+
+class ReextractJob(Base):
+    """
+    Bulk re-extraction job; files are processed in id order and last_file_id
+    is the resume cursor, advanced in the same commit as each batch's results
+    """
+    __tablename__ = 'reextract_jobs'
+    
+    # Primary Key
+    id = Column(String(32), primary_key=True)
+    
+    # Selection (None = any)
+    file_type = Column(String(50), nullable=True)
+    client_code = Column(String(50), nullable=True)
+    parser_versions = Column(Text, nullable=False)  # JSON: parser type -> files extracted by an older version are selected
+    
+    # Progress
+    status = Column(String(20), nullable=False, default='pending')  # 'pending', 'running', 'paused', 'completed', 'failed'
+    last_file_id = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    succeeded = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    errors = Column(Text, nullable=True)  # JSON list of the most recent per-file errors
+    error_message = Column(Text, nullable=True)
+    
+    # Lease (the worker running the job heartbeats with every batch)
+    claimed_by = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<ReextractJob(id={self.id}, status='{self.status}', processed={self.processed}/{self.total})>"
+    
+    def to_dict(self):
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'file_type': self.file_type,
+            'client_code': self.client_code,
+            'parser_versions': json.loads(self.parser_versions) if self.parser_versions else {},
+            'last_file_id': self.last_file_id,
+            'total': self.total,
+            'processed': self.processed,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'errors': json.loads(self.errors) if self.errors else [],
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
 # Indexes for performance
 Index('idx_file_ingests_status', FileIngest.status)
 Index('idx_file_ingests_client_code', FileIngest.client_code)
@@ -195,9 +335,25 @@ Index('idx_file_ingests_thickness', FileIngest.thickness_mm)
 Index('idx_file_ingests_file_type', FileIngest.file_type)
 Index('idx_file_ingests_is_deleted', FileIngest.is_deleted)
 
+# GET /files: keyset order and the common filter pairs (newest first within each)
+Index('idx_file_ingests_created_id', FileIngest.created_at, FileIngest.id)
+Index('idx_file_ingests_client_status', FileIngest.client_code, FileIngest.status, FileIngest.created_at)
+Index('idx_file_ingests_material_thickness', FileIngest.material, FileIngest.thickness_mm, FileIngest.created_at)
+
 Index('idx_file_extractions_ingest', FileExtraction.file_ingest_id)
 Index('idx_file_extractions_type', FileExtraction.extraction_type)
 
 Index('idx_file_metadata_ingest', FileMetadata.file_ingest_id)
 Index('idx_file_metadata_key', FileMetadata.key)
 
+Index('idx_parse_cache_key', ParseCacheEntry.parser_name, ParseCacheEntry.parser_version,
+      ParseCacheEntry.file_hash, unique=True)
+Index('idx_parse_cache_last_used', ParseCacheEntry.last_used_at)
+
+Index('idx_ocr_cache_key', OCRCacheEntry.ocr_config, OCRCacheEntry.image_hash)
+Index('idx_ocr_cache_last_used', OCRCacheEntry.last_used_at)
+
+Index('idx_file_versions_key', FileVersion.client_code, FileVersion.project_code,
+      FileVersion.base_filename, unique=True)
+
+Index('idx_reextract_jobs_status', ReextractJob.status)
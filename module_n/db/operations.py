@@ -4,17 +4,26 @@ CRUD operations for file ingestion and metadata storage
 """
 
 import json
+import time
+import uuid
+import base64
 import logging
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, List, Dict, Any
-from sqlalchemy import create_engine, and_, or_
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Tuple, Callable
+from sqlalchemy import and_, or_, func, insert, update, delete, select
 from sqlalchemy.orm import sessionmaker, Session, joinedload
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
-from .models import Base, FileIngest, FileExtraction, FileMetadata
-from ..config import get_database_url
+from .engine import create_db_engine
+from .models import (
+    Base, FileIngest, FileExtraction, FileMetadata, ParseCacheEntry, OCRCacheEntry, FileVersion, ReextractJob
+)
+from ..config import get_database_url, settings
 from ..models.schemas import NormalizedMetadata
+from ..metrics import stage_timer
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -38,13 +47,12 @@ def init_db(database_url: Optional[str] = None) -> None:
     
     logger.info(f"Initializing database: {database_url}")
     
-    # Create engine
-    _engine = create_engine(
-        database_url,
-        echo=False,  # Set to True for SQL debugging
-        pool_pre_ping=True,  # Verify connections before using
-        connect_args={'check_same_thread': False} if 'sqlite' in database_url else {}
-    )
+    # Dispose the previous engine (re-initialization) so its pooled connections are closed
+    if _engine is not None:
+        _engine.dispose()
+
+    # Create engine (pool sizing and SQLite pragmas come from settings)
+    _engine = create_db_engine(database_url)
     
     # Create session factory
     _SessionFactory = sessionmaker(bind=_engine, autoflush=False, autocommit=False)
@@ -54,6 +62,17 @@ def init_db(database_url: Optional[str] = None) -> None:
     logger.info("Database tables created successfully")
 
 
+def dispose_engine_after_fork() -> None:
+    """
+    Drop pooled connections inherited from the parent process.
+
+    Called in parser worker processes so they open their own connections
+    instead of sharing the parent's sockets/file handles.
+    """
+    if _engine is not None:
+        _engine.dispose(close=False)
+
+
 def get_session() -> Session:
     """
     Get a new database session
@@ -67,6 +86,53 @@ def get_session() -> Session:
     return _SessionFactory()
 
 
+def _file_ingest_values(
+    normalized_metadata: NormalizedMetadata,
+    original_filename: str,
+    stored_filename: str,
+    file_path: str,
+    status: str = 'completed',
+    project_id: Optional[int] = None,
+    client_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """Column values of a FileIngest row for parsed metadata"""
+    detected_type = normalized_metadata.detected_type.value if normalized_metadata.detected_type else None
+
+    return {
+        'project_id': project_id,
+        'client_id': client_id,
+        'original_filename': original_filename,
+        'stored_filename': stored_filename,
+        'file_path': file_path,
+        'file_size': normalized_metadata.file_size,
+        'file_type': detected_type or 'unknown',
+        'mime_type': normalized_metadata.mime_type,
+        'status': status,
+        'processing_mode': 'AUTO',
+        'confidence_score': normalized_metadata.confidence_score,
+        'detected_type': detected_type,
+        'client_code': normalized_metadata.client_code,
+        'project_code': normalized_metadata.project_code,
+        'part_name': normalized_metadata.part_name,
+        'material': normalized_metadata.material,
+        'thickness_mm': normalized_metadata.thickness_mm,
+        'quantity': normalized_metadata.quantity,
+        'version': normalized_metadata.version,
+        'processed_at': datetime.utcnow() if status == 'completed' else None,
+    }
+
+
+def _metadata_value(value: Any) -> Tuple[str, str]:
+    """Serialize a metadata value, returning (value, data_type)"""
+    if isinstance(value, bool):
+        return str(value), 'boolean'
+    if isinstance(value, (int, float)):
+        return str(value), 'number'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str), 'json'
+    return str(value), 'string'
+
+
 def save_file_ingest(
     normalized_metadata: NormalizedMetadata,
     original_filename: str,
@@ -95,31 +161,14 @@ def save_file_ingest(
 
     try:
         # Create file ingest record
-        file_ingest = FileIngest(
-            project_id=project_id,
-            client_id=client_id,
-            original_filename=original_filename,
-            stored_filename=stored_filename,
-            file_path=file_path,
-            file_size=normalized_metadata.file_size,
-            file_type=normalized_metadata.detected_type.value if normalized_metadata.detected_type else 'unknown',
-            mime_type=normalized_metadata.mime_type,
-            status=status,
-            processing_mode='AUTO',
-            confidence_score=normalized_metadata.confidence_score,
-            detected_type=normalized_metadata.detected_type.value if normalized_metadata.detected_type else None,
-            client_code=normalized_metadata.client_code,
-            project_code=normalized_metadata.project_code,
-            part_name=normalized_metadata.part_name,
-            material=normalized_metadata.material,
-            thickness_mm=normalized_metadata.thickness_mm,
-            quantity=normalized_metadata.quantity,
-            version=normalized_metadata.version,
-            processed_at=datetime.utcnow() if status == 'completed' else None
-        )
+        file_ingest = FileIngest(**_file_ingest_values(
+            normalized_metadata, original_filename, stored_filename, file_path,
+            status, project_id, client_id
+        ))
         
         session.add(file_ingest)
         session.commit()
+        clear_file_count_cache()
         session.refresh(file_ingest)
         
         logger.info(f"Saved file ingest: {file_ingest.id} - {original_filename}")
@@ -209,20 +258,8 @@ def save_file_metadata(
             if value is None:
                 continue
             
-            # Determine data type
-            if isinstance(value, bool):
-                data_type = 'boolean'
-                value_str = str(value)
-            elif isinstance(value, (int, float)):
-                data_type = 'number'
-                value_str = str(value)
-            elif isinstance(value, (dict, list)):
-                data_type = 'json'
-                value_str = json.dumps(value, default=str)
-            else:
-                data_type = 'string'
-                value_str = str(value)
-            
+            value_str, data_type = _metadata_value(value)
+
             # Create metadata record
             metadata = FileMetadata(
                 file_ingest_id=file_ingest_id,
@@ -246,6 +283,121 @@ def save_file_metadata(
         session.close()
 
 
+@dataclass
+class IngestRecord:
+    """Everything persisted for one ingested file: ingest row, raw extraction and metadata"""
+    normalized_metadata: NormalizedMetadata
+    original_filename: str
+    stored_filename: str
+    file_path: str
+    status: str = 'completed'
+    project_id: Optional[int] = None
+    client_id: Optional[int] = None
+    extraction_type: Optional[str] = None  # No extraction row when None
+    extracted_data: Dict[str, Any] = field(default_factory=dict)
+    parser_name: Optional[str] = None
+    parser_version: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata_source: str = 'parser'
+
+
+def save_ingest_results(records: List[IngestRecord]) -> Optional[List[FileIngest]]:
+    """
+    Save ingest rows, extractions and metadata of several files in one transaction
+
+    Each table is written with a single bulk INSERT and the batch is
+    committed once, so either every file is recorded or none is.
+
+    Args:
+        records: Files to persist
+
+    Returns:
+        FileIngest objects in the order of records, or None on error
+    """
+    if not records:
+        return []
+
+    session = get_session()
+    # Returned rows stay usable after the session closes, without a refresh
+    session.expire_on_commit = False
+
+    try:
+        with stage_timer('db_ingest_insert'):
+            file_ingests = list(session.scalars(
+                insert(FileIngest).returning(FileIngest, sort_by_parameter_order=True),
+                [
+                    _file_ingest_values(
+                        record.normalized_metadata, record.original_filename, record.stored_filename,
+                        record.file_path, record.status, record.project_id, record.client_id
+                    )
+                    for record in records
+                ]
+            ))
+
+        extraction_rows = []
+        metadata_rows = []
+        for record, file_ingest in zip(records, file_ingests):
+            if record.extraction_type:
+                extraction_rows.append({
+                    'file_ingest_id': file_ingest.id,
+                    'extraction_type': record.extraction_type,
+                    'extracted_data': json.dumps(record.extracted_data, default=str),
+                    'confidence_score': record.normalized_metadata.confidence_score,
+                    'parser_name': record.parser_name,
+                    'parser_version': record.parser_version,
+                })
+
+            for key, value in record.metadata.items():
+                if value is None:
+                    continue
+                value_str, data_type = _metadata_value(value)
+                metadata_rows.append({
+                    'file_ingest_id': file_ingest.id,
+                    'key': key,
+                    'value': value_str,
+                    'data_type': data_type,
+                    'source': record.metadata_source,
+                })
+
+        if extraction_rows:
+            with stage_timer('db_extraction_insert'):
+                session.execute(insert(FileExtraction), extraction_rows)
+        if metadata_rows:
+            with stage_timer('db_metadata_insert'):
+                session.execute(insert(FileMetadata), metadata_rows)
+
+        with stage_timer('db_commit'):
+            session.commit()
+        clear_file_count_cache()
+
+        logger.info(
+            f"Saved {len(file_ingests)} file ingest(s) with {len(extraction_rows)} extraction(s) "
+            f"and {len(metadata_rows)} metadata entries"
+        )
+        return file_ingests
+
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.error(f"Error saving ingest results: {e}")
+        return None
+    finally:
+        session.close()
+
+
+def save_ingest_result(record: IngestRecord) -> Optional[FileIngest]:
+    """
+    Save the ingest row, extraction and metadata of one file in one transaction
+
+    Args:
+        record: File to persist
+
+    Returns:
+        FileIngest object or None on error
+    """
+    file_ingests = save_ingest_results([record])
+    return file_ingests[0] if file_ingests else None
+
+
 def get_file_ingest(file_id: int, include_deleted: bool = False) -> Optional[FileIngest]:
     """
     Get a file ingest record by ID
@@ -283,6 +435,41 @@ def get_file_ingest(file_id: int, include_deleted: bool = False) -> Optional[Fil
         session.close()
 
 
+def _filter_file_ingests(
+    query,
+    client_code: Optional[str] = None,
+    project_code: Optional[str] = None,
+    file_type: Optional[str] = None,
+    material: Optional[str] = None,
+    thickness_mm: Optional[float] = None,
+    status: Optional[str] = None,
+    include_deleted: bool = False
+):
+    """Apply the GET /files filters to a FileIngest query"""
+    if not include_deleted:
+        query = query.filter(FileIngest.is_deleted == False)
+
+    if client_code:
+        query = query.filter(FileIngest.client_code == client_code)
+
+    if project_code:
+        query = query.filter(FileIngest.project_code == project_code)
+
+    if file_type:
+        query = query.filter(FileIngest.file_type == file_type)
+
+    if material:
+        query = query.filter(FileIngest.material == material)
+
+    if thickness_mm is not None:
+        query = query.filter(FileIngest.thickness_mm == thickness_mm)
+
+    if status:
+        query = query.filter(FileIngest.status == status)
+
+    return query
+
+
 def get_file_ingests(
     client_code: Optional[str] = None,
     project_code: Optional[str] = None,
@@ -314,29 +501,10 @@ def get_file_ingests(
     session = get_session()
 
     try:
-        query = session.query(FileIngest)
-
-        # Apply filters
-        if not include_deleted:
-            query = query.filter(FileIngest.is_deleted == False)
-
-        if client_code:
-            query = query.filter(FileIngest.client_code == client_code)
-
-        if project_code:
-            query = query.filter(FileIngest.project_code == project_code)
-
-        if file_type:
-            query = query.filter(FileIngest.file_type == file_type)
-
-        if material:
-            query = query.filter(FileIngest.material == material)
-
-        if thickness_mm is not None:
-            query = query.filter(FileIngest.thickness_mm == thickness_mm)
-
-        if status:
-            query = query.filter(FileIngest.status == status)
+        query = _filter_file_ingests(
+            session.query(FileIngest), client_code, project_code, file_type,
+            material, thickness_mm, status, include_deleted
+        )
 
         # Order by created_at descending
         query = query.order_by(FileIngest.created_at.desc())
@@ -354,6 +522,178 @@ def get_file_ingests(
         session.close()
 
 
+# Fields GET /files can return (FileIngest.to_dict() keys, all plain columns)
+FILE_LIST_FIELDS = [
+    'id', 'original_filename', 'stored_filename', 'file_path', 'file_size', 'file_type',
+    'mime_type', 'status', 'processing_mode', 'confidence_score', 'detected_type',
+    'client_code', 'project_code', 'part_name', 'material', 'thickness_mm', 'quantity',
+    'version', 'error_message', 'retry_count', 'is_deleted', 'created_at', 'updated_at',
+    'processed_at'
+]
+
+
+def encode_file_cursor(created_at: datetime, file_id: int) -> str:
+    """Opaque keyset cursor for the row a page ended on"""
+    raw = f"{created_at.isoformat()}|{file_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_file_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor from encode_file_cursor()
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, file_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(file_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def get_file_ingest_page(
+    client_code: Optional[str] = None,
+    project_code: Optional[str] = None,
+    file_type: Optional[str] = None,
+    material: Optional[str] = None,
+    thickness_mm: Optional[float] = None,
+    status: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    fields: Optional[List[str]] = None,
+    include_deleted: bool = False
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Get one page of file ingest records, newest first
+
+    Pages are keyed on (created_at, id): the next page starts after the
+    cursor instead of skipping `offset` rows, so deep pages cost the same
+    as the first one. Only the requested columns are loaded.
+
+    Args:
+        client_code, project_code, file_type, material, thickness_mm, status: Filters
+        limit: Maximum number of records to return
+        cursor: next_cursor of the previous page (takes precedence over offset)
+        offset: Number of records to skip (legacy paging)
+        fields: Fields to return (default: all of FILE_LIST_FIELDS)
+        include_deleted: Whether to include soft-deleted records
+
+    Returns:
+        Tuple of (records as dicts, cursor of the next page or None on the last page)
+
+    Raises:
+        ValueError: If the cursor or a field name is invalid
+    """
+    fields = list(fields) if fields else list(FILE_LIST_FIELDS)
+    unknown = [name for name in fields if name not in FILE_LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    # The cursor needs created_at and id even when they are not returned
+    columns = list(dict.fromkeys(fields + ['created_at', 'id']))
+    after = decode_file_cursor(cursor) if cursor else None
+
+    session = get_session()
+
+    try:
+        query = _filter_file_ingests(
+            session.query(*[getattr(FileIngest, name) for name in columns]),
+            client_code, project_code, file_type, material, thickness_mm, status, include_deleted
+        )
+
+        if after:
+            created_at, file_id = after
+            query = query.filter(or_(
+                FileIngest.created_at < created_at,
+                and_(FileIngest.created_at == created_at, FileIngest.id < file_id)
+            ))
+        elif offset:
+            query = query.offset(offset)
+
+        # One extra row tells whether there is a next page
+        rows = query.order_by(FileIngest.created_at.desc(), FileIngest.id.desc()).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_file_cursor(rows[-1].created_at, rows[-1].id)
+
+        records = []
+        for row in rows:
+            record = {}
+            for name in fields:
+                value = getattr(row, name)
+                record[name] = value.isoformat() if isinstance(value, datetime) else value
+            records.append(record)
+
+        return records, next_cursor
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error getting file ingest page: {e}")
+        return [], None
+    finally:
+        session.close()
+
+
+# Cached totals per filter combination: {filters: (expires_at, count)}
+_count_cache: Dict[Tuple, Tuple[float, int]] = {}
+_count_cache_lock = threading.Lock()
+
+
+def clear_file_count_cache() -> None:
+    """Forget cached totals (called whenever file ingests are added, changed or deleted)"""
+    with _count_cache_lock:
+        _count_cache.clear()
+
+
+def count_file_ingests(
+    client_code: Optional[str] = None,
+    project_code: Optional[str] = None,
+    file_type: Optional[str] = None,
+    material: Optional[str] = None,
+    thickness_mm: Optional[float] = None,
+    status: Optional[str] = None,
+    include_deleted: bool = False
+) -> Optional[int]:
+    """
+    Count file ingest records matching the filters
+
+    Counts are cached per filter combination for FILES_COUNT_CACHE_TTL
+    seconds, and dropped on every write in this process.
+
+    Returns:
+        Number of matching records, or None on error
+    """
+    key = (client_code, project_code, file_type, material, thickness_mm, status, include_deleted)
+    now = time.monotonic()
+
+    with _count_cache_lock:
+        cached = _count_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    session = get_session()
+
+    try:
+        count = _filter_file_ingests(
+            session.query(func.count(FileIngest.id)), *key
+        ).scalar()
+    except SQLAlchemyError as e:
+        logger.error(f"Error counting file ingests: {e}")
+        return None
+    finally:
+        session.close()
+
+    if settings.FILES_COUNT_CACHE_TTL > 0:
+        with _count_cache_lock:
+            _count_cache[key] = (now + settings.FILES_COUNT_CACHE_TTL, count)
+
+    return count
+
+
 def update_file_ingest(
     file_id: int,
     **kwargs
@@ -386,6 +726,7 @@ def update_file_ingest(
         file_ingest.updated_at = datetime.utcnow()
 
         session.commit()
+        clear_file_count_cache()
         session.refresh(file_ingest)
 
         logger.info(f"Updated file ingest: {file_id}")
@@ -430,6 +771,7 @@ def delete_file_ingest(file_id: int, hard_delete: bool = False) -> bool:
             logger.info(f"Soft deleted file ingest: {file_id}")
 
         session.commit()
+        clear_file_count_cache()
         return True
 
     except SQLAlchemyError as e:
@@ -457,3 +799,849 @@ def re_extract_file(file_id: int) -> Optional[FileIngest]:
         error_message=None
     )
 
+
+def _version_key(version: Optional[str]) -> Tuple[int, ...]:
+    """Comparable key of a dotted parser version ('1.10.0' > '1.9.2')"""
+    key = []
+    for part in (version or '').split('.'):
+        digits = ''.join(ch for ch in part if ch.isdigit())
+        key.append(int(digits) if digits else 0)
+    return tuple(key)
+
+
+def get_stale_parser_versions(parser_versions: Dict[str, str]) -> Dict[str, List[str]]:
+    """
+    Find the stored extraction versions that are older than a threshold
+
+    Args:
+        parser_versions: File type -> version; extractions by an older
+            version of that file type's parser are stale
+
+    Returns:
+        File type -> stale parser versions present in the database
+    """
+    session = get_session()
+
+    try:
+        rows = session.query(FileIngest.file_type, FileExtraction.parser_version).join(
+            FileExtraction, FileExtraction.file_ingest_id == FileIngest.id
+        ).filter(
+            FileIngest.file_type.in_(list(parser_versions))
+        ).distinct().all()
+
+        stale = {file_type: [] for file_type in parser_versions}
+        for file_type, version in rows:
+            if version and _version_key(version) < _version_key(parser_versions[file_type]):
+                stale[file_type].append(version)
+        return stale
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error getting parser versions: {e}")
+        return {file_type: [] for file_type in parser_versions}
+    finally:
+        session.close()
+
+
+def _filter_reextract_candidates(
+    query,
+    stale_versions: Dict[str, List[str]],
+    client_code: Optional[str] = None,
+    after_id: int = 0
+):
+    """Files whose latest extraction is missing or by a stale parser version"""
+    latest_version = select(FileExtraction.parser_version).where(
+        FileExtraction.file_ingest_id == FileIngest.id
+    ).order_by(FileExtraction.id.desc()).limit(1).scalar_subquery()
+
+    query = query.filter(
+        FileIngest.is_deleted == False,
+        FileIngest.status.in_(('completed', 'pending')),
+        FileIngest.id > after_id,
+        or_(*[
+            and_(
+                FileIngest.file_type == file_type,
+                or_(latest_version.is_(None), latest_version.in_(versions))
+            )
+            for file_type, versions in stale_versions.items()
+        ])
+    )
+
+    if client_code:
+        query = query.filter(FileIngest.client_code == client_code)
+
+    return query
+
+
+def get_reextract_candidates(
+    stale_versions: Dict[str, List[str]],
+    client_code: Optional[str] = None,
+    after_id: int = 0,
+    limit: int = 50
+) -> List[FileIngest]:
+    """
+    Get the next files to re-extract, in id order (keyset pagination)
+
+    Args:
+        stale_versions: File type -> stale parser versions (see get_stale_parser_versions())
+        client_code: Only files of this client
+        after_id: Resume cursor (last file id already processed)
+        limit: Maximum number of files to return
+
+    Returns:
+        List of FileIngest objects
+    """
+    if not stale_versions:
+        return []
+
+    session = get_session()
+
+    try:
+        query = _filter_reextract_candidates(
+            session.query(FileIngest), stale_versions, client_code, after_id
+        )
+        return query.order_by(FileIngest.id).limit(limit).all()
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error getting re-extraction candidates: {e}")
+        return []
+    finally:
+        session.close()
+
+
+def count_reextract_candidates(
+    stale_versions: Dict[str, List[str]],
+    client_code: Optional[str] = None,
+    after_id: int = 0
+) -> int:
+    """
+    Count the files a re-extraction job would process
+
+    Args:
+        stale_versions: File type -> stale parser versions (see get_stale_parser_versions())
+        client_code: Only files of this client
+        after_id: Resume cursor (last file id already processed)
+
+    Returns:
+        Number of matching files
+    """
+    if not stale_versions:
+        return 0
+
+    session = get_session()
+
+    try:
+        query = _filter_reextract_candidates(
+            session.query(func.count(FileIngest.id)), stale_versions, client_code, after_id
+        )
+        return query.scalar() or 0
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error counting re-extraction candidates: {e}")
+        return 0
+    finally:
+        session.close()
+
+
+def create_reextract_job(
+    parser_versions: Dict[str, str],
+    file_type: Optional[str] = None,
+    client_code: Optional[str] = None,
+    total: int = 0
+) -> Optional[ReextractJob]:
+    """
+    Record a new re-extraction job
+
+    Args:
+        parser_versions: File type -> version threshold of the job
+        file_type: File type filter (None = all parsed types)
+        client_code: Client code filter
+        total: Number of files selected when the job was created
+
+    Returns:
+        ReextractJob object or None on error
+    """
+    session = get_session()
+    session.expire_on_commit = False
+
+    try:
+        job = ReextractJob(
+            id=uuid.uuid4().hex,
+            file_type=file_type,
+            client_code=client_code,
+            parser_versions=json.dumps(parser_versions, sort_keys=True),
+            status='pending',
+            last_file_id=0,
+            total=total,
+            processed=0,
+            succeeded=0,
+            failed=0
+        )
+        session.add(job)
+        session.commit()
+
+        logger.info(f"Created re-extraction job {job.id}: {total} file(s)")
+        return job
+
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.error(f"Error creating re-extraction job: {e}")
+        return None
+    finally:
+        session.close()
+
+
+def get_reextract_job(job_id: str) -> Optional[ReextractJob]:
+    """
+    Get a re-extraction job by ID
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        ReextractJob object or None if not found
+    """
+    session = get_session()
+
+    try:
+        return session.get(ReextractJob, job_id)
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error getting re-extraction job: {e}")
+        return None
+    finally:
+        session.close()
+
+
+def get_reextract_jobs(status: Optional[str] = None, limit: int = 50) -> List[ReextractJob]:
+    """
+    Get re-extraction jobs, newest first
+
+    Args:
+        status: Filter by status
+        limit: Maximum number of jobs to return
+
+    Returns:
+        List of ReextractJob objects
+    """
+    session = get_session()
+
+    try:
+        query = session.query(ReextractJob)
+        if status:
+            query = query.filter(ReextractJob.status == status)
+        return query.order_by(ReextractJob.created_at.desc()).limit(limit).all()
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error getting re-extraction jobs: {e}")
+        return []
+    finally:
+        session.close()
+
+
+def claim_reextract_job(job_id: str, worker_id: str, lease_seconds: int) -> bool:
+    """
+    Take over a re-extraction job (one conditional UPDATE)
+
+    A job can be claimed when it is not running, or when the worker running
+    it has not sent a heartbeat for lease_seconds (it died mid-job).
+
+    Args:
+        job_id: Job ID
+        worker_id: Claiming worker
+        lease_seconds: Heartbeat age after which a running job is considered abandoned
+
+    Returns:
+        True if this worker now owns the job
+    """
+    session = get_session()
+
+    try:
+        now = datetime.utcnow()
+        result = session.execute(
+            update(ReextractJob)
+            .where(
+                ReextractJob.id == job_id,
+                or_(
+                    ReextractJob.status.in_(('pending', 'paused', 'failed')),
+                    and_(
+                        ReextractJob.status == 'running',
+                        or_(
+                            ReextractJob.heartbeat_at.is_(None),
+                            ReextractJob.heartbeat_at < now - timedelta(seconds=lease_seconds)
+                        )
+                    )
+                )
+            )
+            .values(
+                status='running',
+                claimed_by=worker_id,
+                heartbeat_at=now,
+                started_at=func.coalesce(ReextractJob.started_at, now),
+                finished_at=None,
+                error_message=None
+            )
+        )
+        session.commit()
+        return result.rowcount == 1
+
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.error(f"Error claiming re-extraction job: {e}")
+        return False
+    finally:
+        session.close()
+
+
+def update_reextract_job(
+    job_id: str,
+    worker_id: Optional[str] = None,
+    statuses: Tuple[str, ...] = (),
+    **values
+) -> bool:
+    """
+    Update a re-extraction job
+
+    Args:
+        job_id: Job ID
+        worker_id: Only update while this worker owns the job
+        statuses: Only update while the job has one of these statuses
+        **values: Columns to update
+
+    Returns:
+        True if the job was updated
+    """
+    session = get_session()
+
+    try:
+        query = update(ReextractJob).where(ReextractJob.id == job_id)
+        if worker_id:
+            query = query.where(ReextractJob.claimed_by == worker_id)
+        if statuses:
+            query = query.where(ReextractJob.status.in_(statuses))
+
+        result = session.execute(query.values(**values))
+        session.commit()
+        return result.rowcount == 1
+
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.error(f"Error updating re-extraction job: {e}")
+        return False
+    finally:
+        session.close()
+
+
+def save_reextract_batch(
+    job_id: str,
+    worker_id: str,
+    records: Dict[int, IngestRecord],
+    last_file_id: int,
+    failed: int = 0,
+    errors: Optional[List[Dict[str, Any]]] = None
+) -> Optional[List[FileIngest]]:
+    """
+    Save one batch of re-extraction results and advance the job in one transaction
+
+    Ingest rows are updated with one executemany UPDATE, the new extractions
+    and metadata are bulk inserted (replacing the parser metadata of the
+    same keys) and the job's cursor and counts move forward in the same
+    commit, so a resumed job neither skips nor repeats a batch. Nothing is
+    written if the worker no longer owns the job (it was paused or taken over).
+
+    Args:
+        job_id: Job ID
+        worker_id: Worker that owns the job
+        records: File ingest ID -> re-extracted record
+        last_file_id: Highest file ID of the batch (new resume cursor)
+        failed: Number of files of the batch that could not be re-extracted
+        errors: Most recent per-file errors of the job
+
+    Returns:
+        Updated FileIngest objects, or None if nothing was written
+    """
+    session = get_session()
+    session.expire_on_commit = False
+
+    try:
+        now = datetime.utcnow()
+        progress = session.execute(
+            update(ReextractJob)
+            .where(
+                ReextractJob.id == job_id,
+                ReextractJob.claimed_by == worker_id,
+                ReextractJob.status == 'running'
+            )
+            .values(
+                last_file_id=last_file_id,
+                processed=ReextractJob.processed + len(records) + failed,
+                succeeded=ReextractJob.succeeded + len(records),
+                failed=ReextractJob.failed + failed,
+                errors=json.dumps(errors or [], default=str),
+                heartbeat_at=now
+            )
+        )
+        if progress.rowcount != 1:
+            session.rollback()
+            logger.info(f"Re-extraction job {job_id} is no longer owned by {worker_id}, batch discarded")
+            return None
+
+        if not records:
+            session.commit()
+            return []
+
+        file_ids = list(records)
+        session.execute(update(FileIngest), [
+            {
+                'id': file_id,
+                'file_size': record.normalized_metadata.file_size,
+                'mime_type': record.normalized_metadata.mime_type,
+                'confidence_score': record.normalized_metadata.confidence_score,
+                'detected_type': record.normalized_metadata.detected_type.value,
+                'part_name': record.normalized_metadata.part_name,
+                'material': record.normalized_metadata.material,
+                'thickness_mm': record.normalized_metadata.thickness_mm,
+                'quantity': record.normalized_metadata.quantity,
+                'status': record.status,
+                'error_message': None,
+                'processed_at': now,
+                'updated_at': now,
+            }
+            for file_id, record in records.items()
+        ])
+
+        session.execute(insert(FileExtraction), [
+            {
+                'file_ingest_id': file_id,
+                'extraction_type': record.extraction_type,
+                'extracted_data': json.dumps(record.extracted_data, default=str),
+                'confidence_score': record.normalized_metadata.confidence_score,
+                'parser_name': record.parser_name,
+                'parser_version': record.parser_version,
+            }
+            for file_id, record in records.items()
+            if record.extraction_type
+        ])
+
+        metadata_rows = []
+        for file_id, record in records.items():
+            for key, value in record.metadata.items():
+                if value is None:
+                    continue
+                value_str, data_type = _metadata_value(value)
+                metadata_rows.append({
+                    'file_ingest_id': file_id,
+                    'key': key,
+                    'value': value_str,
+                    'data_type': data_type,
+                    'source': record.metadata_source,
+                })
+
+        # Replace parser-sourced values; user overrides and other keys stay
+        session.execute(
+            delete(FileMetadata).where(
+                FileMetadata.file_ingest_id.in_(file_ids),
+                FileMetadata.key.in_(sorted({key for record in records.values() for key in record.metadata})),
+                FileMetadata.source.in_(sorted({record.metadata_source for record in records.values()}))
+            )
+        )
+        if metadata_rows:
+            session.execute(insert(FileMetadata), metadata_rows)
+
+        session.commit()
+        clear_file_count_cache()
+
+        file_ingests = session.query(FileIngest).filter(FileIngest.id.in_(file_ids)).order_by(FileIngest.id).all()
+
+        logger.info(f"Re-extraction job {job_id}: saved {len(records)} file(s), {failed} failed, cursor {last_file_id}")
+        return file_ingests
+
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.error(f"Error saving re-extraction batch: {e}")
+        return None
+    finally:
+        session.close()
+
+
+def get_parse_cache_entry(
+    file_hash: str,
+    parser_name: str,
+    parser_version: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Look up a cached parse result and mark it as recently used
+
+    Args:
+        file_hash: SHA-256 of the file content
+        parser_name: Name of the parser
+        parser_version: Version of the parser
+
+    Returns:
+        Cached content dict or None if not cached
+    """
+    session = get_session()
+
+    try:
+        entry = session.query(ParseCacheEntry).filter(
+            ParseCacheEntry.parser_name == parser_name,
+            ParseCacheEntry.parser_version == parser_version,
+            ParseCacheEntry.file_hash == file_hash
+        ).first()
+
+        if entry is None:
+            return None
+
+        entry.hit_count = (entry.hit_count or 0) + 1
+        entry.last_used_at = datetime.utcnow()
+        content = json.loads(entry.content)
+        session.commit()
+
+        return content
+
+    except (SQLAlchemyError, ValueError) as e:
+        session.rollback()
+        logger.error(f"Error reading parse cache: {e}")
+        return None
+    finally:
+        session.close()
+
+
+def save_parse_cache_entry(
+    file_hash: str,
+    parser_name: str,
+    parser_version: str,
+    content: Dict[str, Any]
+) -> Optional[int]:
+    """
+    Store a parse result in the cache
+
+    Entries written by other versions of the same parser are removed, so a
+    parser version bump invalidates its cached results.
+
+    Args:
+        file_hash: SHA-256 of the file content
+        parser_name: Name of the parser
+        parser_version: Version of the parser
+        content: Parser content (will be JSON serialized)
+
+    Returns:
+        Size of the stored content in bytes, or None on error
+    """
+    session = get_session()
+
+    try:
+        content_json = json.dumps(content, default=str)
+
+        # Drop results from other parser versions
+        session.query(ParseCacheEntry).filter(
+            ParseCacheEntry.parser_name == parser_name,
+            ParseCacheEntry.parser_version != parser_version
+        ).delete(synchronize_session=False)
+
+        entry = session.query(ParseCacheEntry).filter(
+            ParseCacheEntry.parser_name == parser_name,
+            ParseCacheEntry.parser_version == parser_version,
+            ParseCacheEntry.file_hash == file_hash
+        ).first()
+
+        if entry is None:
+            entry = ParseCacheEntry(
+                parser_name=parser_name,
+                parser_version=parser_version,
+                file_hash=file_hash
+            )
+            session.add(entry)
+
+        entry.content = content_json
+        entry.size_bytes = len(content_json.encode('utf-8'))
+        entry.last_used_at = datetime.utcnow()
+
+        session.commit()
+        return entry.size_bytes
+
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.error(f"Error saving parse cache entry: {e}")
+        return None
+    finally:
+        session.close()
+
+
+def evict_parse_cache(max_entries: int, max_bytes: int) -> Optional[Tuple[int, int, int]]:
+    """
+    Evict least recently used parse cache entries until within limits
+
+    Args:
+        max_entries: Maximum number of entries to keep (0 = unlimited)
+        max_bytes: Maximum total content size in bytes (0 = unlimited)
+
+    Returns:
+        Tuple of (entries evicted, entries left, total bytes left), or None on error
+    """
+    session = get_session()
+
+    try:
+        entry_count, total_bytes = session.query(
+            func.count(ParseCacheEntry.id),
+            func.coalesce(func.sum(ParseCacheEntry.size_bytes), 0)
+        ).one()
+
+        over_entries = max_entries and entry_count > max_entries
+        over_bytes = max_bytes and total_bytes > max_bytes
+        if not over_entries and not over_bytes:
+            return 0, entry_count, total_bytes
+
+        # Walk from least recently used until both limits are satisfied
+        evict_ids = []
+        oldest = session.query(ParseCacheEntry.id, ParseCacheEntry.size_bytes).order_by(
+            ParseCacheEntry.last_used_at.asc()
+        )
+        for entry_id, size_bytes in oldest.yield_per(500):
+            if (not max_entries or entry_count <= max_entries) and \
+                    (not max_bytes or total_bytes <= max_bytes):
+                break
+            evict_ids.append(entry_id)
+            entry_count -= 1
+            total_bytes -= size_bytes or 0
+
+        for i in range(0, len(evict_ids), 500):
+            session.query(ParseCacheEntry).filter(
+                ParseCacheEntry.id.in_(evict_ids[i:i + 500])
+            ).delete(synchronize_session=False)
+
+        session.commit()
+        logger.info(f"Evicted {len(evict_ids)} parse cache entries")
+        return len(evict_ids), entry_count, total_bytes
+
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.error(f"Error evicting parse cache: {e}")
+        return None
+    finally:
+        session.close()
+
+
+def get_parse_cache_stats() -> Dict[str, Any]:
+    """
+    Get parse cache size statistics
+
+    Returns:
+        Dict with entry count, total size and total hits
+    """
+    session = get_session()
+
+    try:
+        entry_count, total_bytes, total_hits = session.query(
+            func.count(ParseCacheEntry.id),
+            func.coalesce(func.sum(ParseCacheEntry.size_bytes), 0),
+            func.coalesce(func.sum(ParseCacheEntry.hit_count), 0)
+        ).one()
+
+        return {
+            'entries': entry_count,
+            'total_bytes': total_bytes,
+            'total_hits': total_hits
+        }
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error reading parse cache stats: {e}")
+        return {'entries': 0, 'total_bytes': 0, 'total_hits': 0}
+    finally:
+        session.close()
+
+
+def find_ocr_cache_entry(
+    image_hash: str,
+    phash: Optional[str],
+    ocr_config: str,
+    max_distance: int = 0
+) -> Optional[str]:
+    """
+    Look up cached OCR text for an image and mark it as recently used
+
+    Args:
+        image_hash: SHA-256 of the preprocessed image (64 hex digits)
+        phash: Perceptual hash of the image (64 hex digits)
+        ocr_config: OCR configuration the text was recognised with
+        max_distance: Max differing perceptual hash bits for a near-identical
+            match (0 = exact images only)
+
+    Returns:
+        Cached OCR text of the exact or closest match, or None if not cached
+    """
+    session = get_session()
+
+    try:
+        entry = session.query(OCRCacheEntry).filter(
+            OCRCacheEntry.ocr_config == ocr_config,
+            OCRCacheEntry.image_hash == image_hash
+        ).first()
+
+        if entry is None and phash and max_distance > 0:
+            # Near-identical match: compare against every hash (a few thousand ints at most)
+            target = int(phash, 16)
+            best_id, best_distance = None, max_distance + 1
+            candidates = session.query(OCRCacheEntry.id, OCRCacheEntry.phash).filter(
+                OCRCacheEntry.ocr_config == ocr_config
+            )
+            for entry_id, candidate in candidates.yield_per(1000):
+                distance = bin(target ^ int(candidate, 16)).count('1')
+                if distance < best_distance:
+                    best_id, best_distance = entry_id, distance
+            if best_id is not None:
+                entry = session.get(OCRCacheEntry, best_id)
+
+        if entry is None:
+            return None
+
+        entry.hit_count = (entry.hit_count or 0) + 1
+        entry.last_used_at = datetime.utcnow()
+        text = entry.text
+        session.commit()
+
+        return text
+
+    except (SQLAlchemyError, ValueError) as e:
+        session.rollback()
+        logger.error(f"Error reading OCR cache: {e}")
+        return None
+    finally:
+        session.close()
+
+
+def save_ocr_cache_entry(
+    image_hash: str,
+    phash: Optional[str],
+    ocr_config: str,
+    text: str,
+    max_entries: int = 0
+) -> bool:
+    """
+    Store OCR text in the cache, evicting least recently used entries
+
+    Entries recognised with another OCR configuration are removed.
+
+    Args:
+        image_hash: SHA-256 of the preprocessed image (64 hex digits)
+        phash: Perceptual hash of the image (64 hex digits)
+        ocr_config: OCR configuration the text was recognised with
+        text: Recognised text
+        max_entries: Maximum number of entries to keep (0 = unlimited)
+
+    Returns:
+        True on success, False on error
+    """
+    session = get_session()
+
+    try:
+        session.query(OCRCacheEntry).filter(
+            OCRCacheEntry.ocr_config != ocr_config
+        ).delete(synchronize_session=False)
+
+        entry = session.query(OCRCacheEntry).filter(
+            OCRCacheEntry.ocr_config == ocr_config,
+            OCRCacheEntry.image_hash == image_hash
+        ).first()
+
+        if entry is None:
+            entry = OCRCacheEntry(ocr_config=ocr_config, image_hash=image_hash)
+            session.add(entry)
+
+        entry.phash = phash or ''
+        entry.text = text
+        entry.last_used_at = datetime.utcnow()
+        session.flush()
+
+        if max_entries:
+            excess = session.query(func.count(OCRCacheEntry.id)).scalar() - max_entries
+            if excess > 0:
+                oldest_ids = [
+                    entry_id for (entry_id,) in session.query(OCRCacheEntry.id).order_by(
+                        OCRCacheEntry.last_used_at.asc()
+                    ).limit(excess)
+                ]
+                session.query(OCRCacheEntry).filter(
+                    OCRCacheEntry.id.in_(oldest_ids)
+                ).delete(synchronize_session=False)
+
+        session.commit()
+        return True
+
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.error(f"Error saving OCR cache entry: {e}")
+        return False
+    finally:
+        session.close()
+
+
+def allocate_file_version(
+    client_code: Optional[str],
+    project_code: Optional[str],
+    base_filename: str,
+    scan_existing: Optional[Callable[[], int]] = None
+) -> Optional[int]:
+    """
+    Atomically allocate the next version number for a stored filename
+
+    The registry row is incremented with a single UPDATE ... RETURNING, so
+    concurrent ingests of the same part never get the same version. The
+    first allocation for a filename is seeded from scan_existing (e.g. a
+    directory scan), so files stored before the registry existed are
+    taken into account once.
+
+    Args:
+        client_code: Client code (None = no client)
+        project_code: Project code (None = no project)
+        base_filename: Normalized filename without -vN and extension
+        scan_existing: Returns the highest version already stored (0 if none)
+
+    Returns:
+        Allocated version number, or None on error
+    """
+    key = and_(
+        FileVersion.client_code == (client_code or ''),
+        FileVersion.project_code == (project_code or ''),
+        FileVersion.base_filename == base_filename
+    )
+    increment = (
+        update(FileVersion)
+        .where(key)
+        .values(current_version=FileVersion.current_version + 1, updated_at=datetime.utcnow())
+        .returning(FileVersion.current_version)
+        .execution_options(synchronize_session=False)
+    )
+
+    session = get_session()
+
+    try:
+        version = session.execute(increment).scalar()
+        session.commit()
+        if version is not None:
+            return version
+
+        # First version of this filename: seed outside the write transaction
+        version = (scan_existing() if scan_existing else 0) + 1
+        session.add(FileVersion(
+            client_code=client_code or '',
+            project_code=project_code or '',
+            base_filename=base_filename,
+            current_version=version
+        ))
+        try:
+            session.commit()
+        except IntegrityError:
+            # Another ingest registered the filename first
+            session.rollback()
+            version = session.execute(increment).scalar()
+            session.commit()
+
+        logger.debug(f"Allocated version {version} for {base_filename}")
+        return version
+
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.error(f"Error allocating file version: {e}")
+        return None
+    finally:
+        session.close()
@@ -0,0 +1,276 @@
+"""
+Module N - Ingest Jobs
+Background batch ingestion: uploads are staged in the request, processed
+concurrently afterwards, and progress is polled or streamed per file
+"""
+
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from .config import settings
+from .models.schemas import FileIngestResponse, ProcessingStatus
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JobFile:
+    """One file of an ingest job"""
+    index: int
+    filename: str
+    status: ProcessingStatus = ProcessingStatus.PENDING
+    result: Optional[FileIngestResponse] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Progress summary (without extracted metadata)"""
+        return {
+            'index': self.index,
+            'filename': self.filename,
+            'status': self.status.value,
+            'ingest_id': self.result.ingest_id if self.result else None,
+            'normalized_filename': self.result.normalized_filename if self.result else None,
+            'error': self.result.error if self.result else None,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+@dataclass
+class IngestJob:
+    """A batch of uploaded files processed in the background"""
+    id: str
+    files: List[JobFile]
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    finished: List[JobFile] = field(default_factory=list)  # In completion order
+
+    def __post_init__(self):
+        self._changed = asyncio.Condition()
+
+    @property
+    def done(self) -> bool:
+        """True once every file has a result"""
+        return len(self.finished) == len(self.files)
+
+    @property
+    def status(self) -> ProcessingStatus:
+        """Overall job status"""
+        if self.done:
+            return ProcessingStatus.COMPLETED
+        if self.started_at:
+            return ProcessingStatus.PROCESSING
+        return ProcessingStatus.PENDING
+
+    async def _notify(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def start_file(self, job_file: JobFile):
+        """Mark a file as being processed"""
+        job_file.status = ProcessingStatus.PROCESSING
+        job_file.started_at = datetime.utcnow().isoformat()
+        await self._notify()
+
+    async def finish_file(self, job_file: JobFile, result: FileIngestResponse):
+        """Record the result of a file"""
+        job_file.result = result
+        job_file.status = ProcessingStatus.COMPLETED if result.success else ProcessingStatus.FAILED
+        job_file.finished_at = datetime.utcnow().isoformat()
+        self.finished.append(job_file)
+        if self.done:
+            self.finished_at = job_file.finished_at
+        await self._notify()
+
+    async def fail_unfinished(self, error: str):
+        """Give every file without a result a failed one (e.g. the job was cancelled)"""
+        for job_file in self.files:
+            if job_file.result is None:
+                job_file.result = FileIngestResponse(
+                    success=False,
+                    filename=job_file.filename,
+                    status=ProcessingStatus.FAILED,
+                    error=error
+                )
+                job_file.status = ProcessingStatus.FAILED
+                job_file.finished_at = datetime.utcnow().isoformat()
+                self.finished.append(job_file)
+                self.finished_at = job_file.finished_at
+        await self._notify()
+
+    async def stream_results(self) -> AsyncIterator[JobFile]:
+        """
+        Yield files as they finish (already finished files first).
+
+        Returns once every file of the job has a result.
+        """
+        sent = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.finished) > sent or self.done)
+            while sent < len(self.finished):
+                yield self.finished[sent]
+                sent += 1
+            if self.done:
+                return
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Job progress with per-file status"""
+        counts = {status.value: 0 for status in ProcessingStatus}
+        for job_file in self.files:
+            counts[job_file.status.value] += 1
+
+        return {
+            'job_id': self.id,
+            'status': self.status.value,
+            'total': len(self.files),
+            **counts,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'files': [job_file.to_dict() for job_file in self.files],
+        }
+
+
+# Coroutine function that processes one file of a job
+FileProcessor = Callable[[], Awaitable[FileIngestResponse]]
+
+# Releases what a file holds (staged upload, archive member) if its processor never runs
+FileDiscard = Callable[[], None]
+
+
+class IngestJobManager:
+    """
+    Runs ingest jobs in the background and keeps recent jobs for polling.
+
+    Files of a job are processed concurrently (at most `concurrency` at a
+    time); parsing itself is further bounded by the parser executor. Jobs
+    live in memory, so they do not survive a restart.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, max_jobs: Optional[int] = None):
+        """
+        Initialize job manager.
+
+        Args:
+            concurrency: Max files of one job processed at once (default: from settings)
+            max_jobs: Number of jobs kept for polling (default: from settings)
+        """
+        self.concurrency = max(1, concurrency or settings.INGEST_JOB_CONCURRENCY)
+        self.max_jobs = max(1, max_jobs or settings.INGEST_JOB_RETENTION)
+        self._jobs: 'OrderedDict[str, IngestJob]' = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def create_job(self, filenames: List[str]) -> IngestJob:
+        """Register a new job for the given files"""
+        job = IngestJob(
+            id=uuid.uuid4().hex,
+            files=[JobFile(index=i, filename=name) for i, name in enumerate(filenames)]
+        )
+        self._jobs[job.id] = job
+        self._evict()
+        return job
+
+    def get_job(self, job_id: str) -> Optional[IngestJob]:
+        """Get a job by ID"""
+        return self._jobs.get(job_id)
+
+    def start(
+        self,
+        job: IngestJob,
+        processors: Dict[int, FileProcessor],
+        discards: Optional[Dict[int, FileDiscard]] = None
+    ) -> asyncio.Task:
+        """
+        Process a job in the background.
+
+        Args:
+            job: Job returned by create_job()
+            processors: File processor per file index; files without one must
+                already have been finished with finish_file()
+            discards: Cleanup per file index, called for files whose processor
+                never started (the job was cancelled first)
+
+        Returns:
+            Background task running the job
+        """
+        task = asyncio.create_task(self._run(job, processors, discards or {}))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        return task
+
+    async def _run(self, job: IngestJob, processors: Dict[int, FileProcessor], discards: Dict[int, FileDiscard]):
+        job.started_at = datetime.utcnow().isoformat()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = set()
+
+        async def run_file(job_file: JobFile, process: FileProcessor):
+            async with semaphore:
+                await job.start_file(job_file)
+                try:
+                    started.add(job_file.index)
+                    result = await process()
+                except Exception as e:
+                    logger.error(f"Job {job.id}: error processing {job_file.filename}: {e}", exc_info=True)
+                    result = FileIngestResponse(
+                        success=False,
+                        filename=job_file.filename,
+                        status=ProcessingStatus.FAILED,
+                        error=str(e)
+                    )
+                await job.finish_file(job_file, result)
+
+        logger.info(f"Job {job.id} started: {len(processors)} file(s) to process")
+        try:
+            await asyncio.gather(*[
+                run_file(job.files[index], process) for index, process in processors.items()
+            ])
+        finally:
+            # Started processors release their own files; the rest were cancelled while waiting
+            for index, discard in discards.items():
+                if index not in started:
+                    try:
+                        discard()
+                    except Exception as e:
+                        logger.warning(f"Job {job.id}: could not release {job.files[index].filename}: {e}")
+            # Files that never finished end the job too, so status polls and result streams complete
+            if not job.done:
+                await job.fail_unfinished("Job cancelled")
+        logger.info(f"Job {job.id} complete: {len(job.files)} file(s)")
+
+    def _evict(self):
+        """Forget the oldest finished jobs beyond max_jobs"""
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].done:
+                del self._jobs[job_id]
+                excess -= 1
+
+    async def shutdown(self):
+        """Cancel running jobs (files not started yet are discarded, unfinished ones fail)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = {}
+
+
+# Global job manager instance
+_job_manager: Optional[IngestJobManager] = None
+
+
+def get_job_manager() -> IngestJobManager:
+    """Get global ingest job manager instance"""
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = IngestJobManager()
+    return _job_manager
@@ -3,14 +3,15 @@ Module N - Main FastAPI Application
 File Ingest & Extract System for Laser OS
 """
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
+from typing import List, Optional, Tuple
+import asyncio
+import functools
+import json
 import logging
 from pathlib import Path
-import tempfile
-import shutil
 
 from .models import (
     FileIngestResponse,
@@ -18,24 +19,52 @@ from .models import (
     ProcessingStatus,
     FileType
 )
-from .utils import validate_file, detect_file_type, generate_filename
-from .parsers import DXFParser, PDFParser, ExcelParser, LBRNParser, ImageParser
+from .utils import (
+    validate_file_content,
+    get_max_file_size,
+    detect_file_type,
+    generate_filename,
+    stage_upload,
+    StagedUpload,
+    UploadTooLargeError,
+    open_zip,
+    is_archive,
+    ZipUpload,
+    ArchiveError
+)
+from .parsers import get_parser_executor, resolve_parser_type
+from .parsers.executor import PARSER_LABELS
+from .parsers.cache import get_parse_cache, get_parser_version
 from .config import settings
 from .db import (
     init_db,
-    save_file_ingest,
-    save_file_extraction,
-    save_file_metadata,
+    IngestRecord,
+    save_ingest_result,
+    save_ingest_results,
     get_file_ingest,
-    get_file_ingests,
+    get_file_ingest_page,
+    count_file_ingests,
     update_file_ingest,
     delete_file_ingest,
-    re_extract_file
+    re_extract_file,
+    get_reextract_job,
+    get_reextract_jobs
 )
 from .storage import save_file, get_file_path, delete_file as delete_stored_file
-from .webhooks import send_webhook, WebhookEventType
+from .webhooks import (
+    WebhookEventType,
+    geometry_data,
+    get_http_client,
+    close_http_client,
+    get_webhook_dispatcher
+)
 from .webhooks.monitor import get_webhook_monitor
-from .webhooks.queue import get_webhook_queue
+from .jobs import get_job_manager
+from .reextract import get_reextract_manager
+from .metrics import TraceMiddleware, get_metrics, stage_timer
+
+# (record, response) pairs of files whose database records are saved together
+IngestBatch = List[Tuple[IngestRecord, FileIngestResponse]]
 
 # Configure logging
 logging.basicConfig(
@@ -67,6 +96,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request stage timing logs (METRICS_TRACE_REQUESTS or the X-Module-N-Trace: 1 header)
+app.add_middleware(TraceMiddleware)
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -91,6 +123,21 @@ async def startup_event():
     log_path = Path(settings.LOG_FILE).parent
     log_path.mkdir(parents=True, exist_ok=True)
 
+    # Start parser worker pool
+    get_parser_executor().start()
+
+    # Open the pooled webhook HTTP client on the app's event loop,
+    # then start delivering webhooks from the outbox
+    get_http_client()
+    get_webhook_dispatcher().start()
+
+    # Persist webhook metrics in the background
+    get_webhook_monitor().start_background_flush()
+
+    # Continue re-extraction jobs interrupted by the last shutdown
+    if settings.REEXTRACT_RESUME_ON_STARTUP:
+        await get_reextract_manager().resume_interrupted(notify_files_re_extracted)
+
     logger.info("Module N startup complete")
 
 
@@ -99,6 +146,17 @@ async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Module N shutting down...")
 
+    # Cancel background ingest and re-extraction jobs, then stop parser worker pool
+    await get_job_manager().shutdown()
+    await get_reextract_manager().shutdown()
+    get_parser_executor().shutdown()
+
+    # Stop webhook delivery (undelivered webhooks stay in the outbox), close pooled
+    # webhook connections, then write the remaining webhook metrics
+    await get_webhook_dispatcher().stop()
+    await close_http_client()
+    await get_webhook_monitor().stop_background_flush()
+
 
 @app.get("/")
 async def root():
@@ -109,9 +167,15 @@ async def root():
         "status": "running",
         "endpoints": {
             "ingest": "POST /ingest",
+            "ingest_job": "POST /ingest/jobs",
+            "job_status": "GET /jobs/{job_id}",
+            "job_results": "GET /jobs/{job_id}/results",
             "status": "GET /ingest/{ingest_id}",
             "re_extract": "POST /extract/{ingest_id}",
+            "reextract_job": "POST /reextract/jobs",
+            "reextract_job_status": "GET /reextract/jobs/{job_id}",
             "health": "GET /health",
+            "metrics": "GET /metrics",
             "docs": "GET /docs"
         }
     }
@@ -129,16 +193,428 @@ async def health_check():
     }
 
 
+async def stage_and_validate(file: UploadFile) -> Tuple[Optional[StagedUpload], Optional[FileIngestResponse]]:
+    """
+    Stream an upload to disk and validate it.
+
+    Args:
+        file: Uploaded file
+
+    Returns:
+        Tuple of (staged upload, None) or (None, failed FileIngestResponse)
+    """
+    # Stream upload to disk (hashed and size-checked while streaming)
+    try:
+        with stage_timer('temp_write'):
+            staged = await stage_upload(
+                file,
+                suffix=Path(file.filename).suffix.lower(),
+                max_size=get_max_file_size(file.filename)
+            )
+    except UploadTooLargeError as size_error:
+        logger.warning(f"Validation failed for {file.filename}: {size_error}")
+        return None, FileIngestResponse(
+            success=False,
+            filename=file.filename,
+            status=ProcessingStatus.FAILED,
+            error=str(size_error)
+        )
+
+    return validate_staged(file.filename, staged)
+
+
+def validate_staged(
+    filename: str,
+    staged: StagedUpload
+) -> Tuple[Optional[StagedUpload], Optional[FileIngestResponse]]:
+    """
+    Validate a staged file, removing it if it is rejected.
+
+    Args:
+        filename: Original filename
+        staged: Staged upload or archive member
+
+    Returns:
+        Tuple of (staged upload, None) or (None, failed FileIngestResponse)
+    """
+    with stage_timer('validate'):
+        validation_result = validate_file_content(filename, staged.head, staged.size)
+    if not validation_result['valid']:
+        logger.warning(f"Validation failed for {filename}: {validation_result['error']}")
+        staged.cleanup()
+        return None, FileIngestResponse(
+            success=False,
+            filename=filename,
+            status=ProcessingStatus.FAILED,
+            error=validation_result['error']
+        )
+
+    return staged, None
+
+
+def open_archive(
+    staged: StagedUpload
+) -> Tuple[Optional[ZipUpload], Optional[FileIngestResponse]]:
+    """
+    Open a staged ZIP upload, removing it if it is rejected.
+
+    Args:
+        staged: Validated ZIP upload
+
+    Returns:
+        Tuple of (archive, None) or (None, failed FileIngestResponse)
+    """
+    try:
+        return open_zip(staged), None
+    except ArchiveError as archive_error:
+        logger.warning(f"Archive rejected: {staged.filename}: {archive_error}")
+        staged.cleanup()
+        return None, FileIngestResponse(
+            success=False,
+            filename=staged.filename,
+            status=ProcessingStatus.FAILED,
+            error=str(archive_error)
+        )
+
+
+async def process_staged_file(
+    filename: str,
+    staged: StagedUpload,
+    client_code: Optional[str] = None,
+    project_code: Optional[str] = None,
+    mode: str = "AUTO",
+    extract_tables: Optional[bool] = None,
+    batch: Optional[IngestBatch] = None
+) -> FileIngestResponse:
+    """
+    Parse, store and record one staged upload, then remove the staged file.
+
+    Without a batch the file is recorded in its own transaction and its
+    webhook is sent right away. With a batch the database record is only
+    collected; save_ingest_batch() commits it (and sends the webhook) later.
+
+    Args:
+        filename: Original filename
+        staged: Validated upload staged on disk
+        client_code: Optional client code
+        project_code: Optional project code
+        mode: Processing mode (AUTO, dxf, pdf, excel, etc.)
+        extract_tables: PDF table extraction override
+        batch: Collects the file's record instead of saving it
+
+    Returns:
+        FileIngestResponse for the file (ingest_id is set by save_ingest_batch())
+    """
+    try:
+        # Detect file type
+        file_type = detect_file_type(filename, mode)
+        logger.info(f"Detected file type: {file_type} for {filename}")
+
+        # Process file based on type
+        metadata = None
+        normalized_filename = None
+        parser_type = resolve_parser_type(file_type)
+
+        if parser_type:
+            parser_label = PARSER_LABELS[parser_type]
+            parser_options = None
+            if parser_type == 'pdf' and extract_tables is not None:
+                parser_options = {'extract_tables': extract_tables}
+            try:
+                # Parse file in the parser pool (keeps the event loop responsive)
+                # Byte-identical re-uploads are served from the parse cache
+                metadata = await get_parser_executor().parse(
+                    parser_type, staged.path, filename, client_code, project_code,
+                    file_hash=staged.sha256, parser_options=parser_options
+                )
+
+                if metadata.file_size is None:
+                    metadata.file_size = staged.size
+
+                # Generate normalized filename
+                normalized_filename = generate_filename(metadata)
+
+                logger.info(f"{parser_label} parsed successfully. Confidence: {metadata.confidence_score:.2f}")
+                logger.info(f"Generated filename: {normalized_filename}")
+
+            except Exception as parse_error:
+                logger.error(f"{parser_label} parsing error: {str(parse_error)}", exc_info=True)
+                get_metrics().increment('module_n_ingest_files_total', parser=parser_type, status='failed')
+                return FileIngestResponse(
+                    success=False,
+                    filename=filename,
+                    status=ProcessingStatus.FAILED,
+                    error=f"{parser_label} parsing failed: {str(parse_error)}"
+                )
+
+        # Save file to storage
+        stored_filename = None
+        file_path_str = None
+
+        if metadata and normalized_filename:
+            try:
+                # Save file to storage with versioning
+                with stage_timer('storage_copy', parser_type):
+                    storage_result = await asyncio.to_thread(
+                        save_file,
+                        source_path=staged.path,
+                        normalized_filename=normalized_filename,
+                        client_code=metadata.client_code,
+                        project_code=metadata.project_code,
+                        auto_version=settings.AUTO_VERSION
+                    )
+
+                if storage_result:
+                    stored_filename, file_path_str = storage_result
+                    logger.info(f"File saved to storage: {file_path_str}")
+                else:
+                    logger.error("Failed to save file to storage")
+
+            except Exception as storage_error:
+                logger.error(f"Storage error: {storage_error}")
+
+        # Save to database: ingest row, raw extraction and metadata in one transaction
+        record = None
+        file_ingest = None
+        if metadata and stored_filename and file_path_str:
+            detected = metadata.detected_type.value
+            record = IngestRecord(
+                normalized_metadata=metadata,
+                original_filename=filename,
+                stored_filename=stored_filename,
+                file_path=file_path_str,
+                status='completed',
+                extraction_type=f"{detected}_metadata",
+                extracted_data=metadata.extracted,
+                parser_name=f"{detected}_parser",
+                parser_version=get_parser_version(parser_type),
+                metadata={
+                    'client_code': metadata.client_code,
+                    'project_code': metadata.project_code,
+                    'part_name': metadata.part_name,
+                    'material': metadata.material,
+                    'thickness_mm': metadata.thickness_mm,
+                    'quantity': metadata.quantity,
+                    'version': metadata.version,
+                    'sha256': staged.sha256
+                },
+                metadata_source=f"{detected}_parser"
+            )
+
+            if batch is None:
+                try:
+                    file_ingest = await asyncio.to_thread(save_ingest_result, record)
+                    if file_ingest:
+                        logger.info(f"Saved to database with ID: {file_ingest.id}")
+                    else:
+                        logger.error("Failed to save to database")
+                except Exception as db_error:
+                    logger.error(f"Database error: {db_error}")
+
+        # Build response
+        logger.info(f"File {filename} processed successfully")
+        response = FileIngestResponse(
+            success=True,
+            ingest_id=file_ingest.id if file_ingest else None,
+            filename=filename,
+            normalized_filename=stored_filename or normalized_filename,
+            status=ProcessingStatus.COMPLETED if metadata else ProcessingStatus.PENDING,
+            metadata=metadata,
+            sha256=staged.sha256,
+            error=None
+        )
+
+        if batch is not None:
+            if record:
+                batch.append((record, response))
+        elif file_ingest:
+            await notify_file_processed(file_ingest, metadata)
+
+        get_metrics().increment('module_n_ingest_files_total', parser=parser_type, status=response.status.value)
+        return response
+    finally:
+        # Ensure temp file cleanup
+        staged.cleanup()
+
+
+async def queue_webhooks(event_type: WebhookEventType, file_ingests, additional_data=None, file_data=None) -> None:
+    """
+    Write webhooks for Laser OS to the outbox (failures are only logged).
+
+    Delivery happens in the background dispatcher, so the caller only
+    waits for the outbox write, never for Laser OS.
+    """
+    if not settings.WEBHOOK_ENABLED:
+        return
+
+    try:
+        with stage_timer('webhook_enqueue'):
+            await get_webhook_dispatcher().enqueue(event_type, file_ingests, additional_data, file_data)
+    except Exception as webhook_error:
+        # Don't fail the whole process if webhook fails
+        logger.error(f"Webhook error: {webhook_error}")
+
+
+async def notify_file_processed(file_ingest, metadata=None) -> None:
+    """Queue the file.processed webhook of a file (with its measured geometry)"""
+    await queue_webhooks(WebhookEventType.FILE_PROCESSED, [file_ingest], file_data=[geometry_data(metadata)])
+
+
+async def save_ingest_batch(batch: IngestBatch) -> None:
+    """
+    Persist the files collected by process_staged_file() in a single commit,
+    then fill in their ingest IDs and send their webhooks.
+
+    Args:
+        batch: (record, response) pairs collected during the request
+    """
+    if not batch:
+        return
+
+    try:
+        file_ingests = await asyncio.to_thread(save_ingest_results, [record for record, _ in batch])
+    except Exception as db_error:
+        logger.error(f"Database error: {db_error}")
+        return
+
+    if file_ingests is None:
+        logger.error(f"Failed to save {len(batch)} file(s) to database")
+        return
+
+    for (_, response), file_ingest in zip(batch, file_ingests):
+        response.ingest_id = file_ingest.id
+    logger.info(f"Saved {len(file_ingests)} file(s) to database in one transaction")
+
+    # One outbox write; the dispatcher sends them as one batch
+    await queue_webhooks(
+        WebhookEventType.FILE_PROCESSED, file_ingests,
+        file_data=[geometry_data(record.normalized_metadata) for record, _ in batch]
+    )
+
+
+async def process_archive_member(
+    archive: ZipUpload,
+    info,
+    client_code: Optional[str] = None,
+    project_code: Optional[str] = None,
+    mode: str = "AUTO",
+    extract_tables: Optional[bool] = None,
+    batch: Optional[IngestBatch] = None
+) -> FileIngestResponse:
+    """
+    Stream one ZIP member to a staged file and process it like an upload.
+
+    Args:
+        archive: Open ZIP upload
+        info: Archive member (zipfile.ZipInfo)
+        client_code: Optional client code
+        project_code: Optional project code
+        mode: Processing mode (AUTO, dxf, pdf, excel, etc.)
+        extract_tables: PDF table extraction override
+        batch: Collects the member's record instead of saving it
+
+    Returns:
+        FileIngestResponse for the member
+    """
+    filename = Path(info.filename).name
+    try:
+        if is_archive(filename):
+            return FileIngestResponse(
+                success=False,
+                filename=filename,
+                status=ProcessingStatus.FAILED,
+                error=f"Nested archives are not supported: {info.filename}"
+            )
+
+        try:
+            # Decompression is blocking - keep it off the event loop
+            with stage_timer('temp_write'):
+                staged = await asyncio.to_thread(archive.stage_member, info, get_max_file_size(filename))
+        except (UploadTooLargeError, ArchiveError) as member_error:
+            logger.warning(f"Archive member rejected: {info.filename}: {member_error}")
+            return FileIngestResponse(
+                success=False,
+                filename=filename,
+                status=ProcessingStatus.FAILED,
+                error=str(member_error)
+            )
+
+        staged, failure = validate_staged(filename, staged)
+        if failure:
+            return failure
+
+        return await process_staged_file(
+            filename, staged, client_code, project_code, mode, extract_tables, batch=batch
+        )
+    finally:
+        archive.member_done()
+
+
+async def process_archive(
+    archive: ZipUpload,
+    client_code: Optional[str] = None,
+    project_code: Optional[str] = None,
+    mode: str = "AUTO",
+    extract_tables: Optional[bool] = None,
+    batch: Optional[IngestBatch] = None
+) -> List[FileIngestResponse]:
+    """
+    Process every member of a ZIP upload, ZIP_MEMBER_CONCURRENCY at a time.
+
+    At most that many members are staged on disk at once; the archive is
+    never extracted as a whole.
+
+    Args:
+        archive: Open ZIP upload
+        client_code: Optional client code
+        project_code: Optional project code
+        mode: Processing mode (AUTO, dxf, pdf, excel, etc.)
+        extract_tables: PDF table extraction override
+        batch: Collects the members' records instead of saving them
+
+    Returns:
+        FileIngestResponse per member, in archive order
+    """
+    semaphore = asyncio.Semaphore(max(1, settings.ZIP_MEMBER_CONCURRENCY))
+
+    async def run(info) -> FileIngestResponse:
+        async with semaphore:
+            try:
+                return await process_archive_member(
+                    archive, info, client_code, project_code, mode, extract_tables, batch=batch
+                )
+            except Exception as e:
+                logger.error(f"Error processing {info.filename}: {str(e)}", exc_info=True)
+                return FileIngestResponse(
+                    success=False,
+                    filename=Path(info.filename).name,
+                    status=ProcessingStatus.FAILED,
+                    error=str(e)
+                )
+
+    logger.info(f"Processing {len(archive.members)} file(s) from {archive.staged.filename}")
+    try:
+        return list(await asyncio.gather(*[run(info) for info in archive.members]))
+    finally:
+        archive.close()
+
+
 @app.post("/ingest", response_model=List[FileIngestResponse])
 async def ingest_files(
     files: List[UploadFile] = File(...),
     client_code: Optional[str] = Form(None),
     project_code: Optional[str] = Form(None),
     mode: str = Form("AUTO"),
-    override_metadata: Optional[str] = Form(None)
+    override_metadata: Optional[str] = Form(None),
+    extract_tables: Optional[bool] = Form(None)
 ):
     """
     Ingest one or more files and extract metadata.
+
+    Files are processed one after another and the response is returned when
+    all are done; use POST /ingest/jobs for large batches. ZIP archives are
+    expanded: each member gets its own result. Database records of all
+    files are saved together in a single transaction at the end.
     
     Args:
         files: List of uploaded files
@@ -146,6 +622,8 @@ async def ingest_files(
         project_code: Optional project code (e.g., "JB-2025-10-CL0001-001")
         mode: Processing mode (AUTO, dxf, pdf, excel, etc.)
         override_metadata: JSON string with metadata overrides
+        extract_tables: PDF table extraction - true = always, false = never,
+            unset = only pages with table-like layout
     
     Returns:
         List of FileIngestResponse objects
@@ -154,342 +632,182 @@ async def ingest_files(
     logger.info(f"Client code: {client_code}, Project code: {project_code}, Mode: {mode}")
     
     results = []
+    batch: IngestBatch = []
 
     for file in files:
-        temp_file_path = None
         try:
             logger.info(f"Processing file: {file.filename}")
 
-            # Validate file
-            validation_result = await validate_file(file)
-            if not validation_result['valid']:
-                logger.warning(f"Validation failed for {file.filename}: {validation_result['error']}")
-                results.append(FileIngestResponse(
-                    success=False,
-                    filename=file.filename,
-                    status=ProcessingStatus.FAILED,
-                    error=validation_result['error']
+            staged, failure = await stage_and_validate(file)
+            if failure:
+                results.append(failure)
+                continue
+
+            if is_archive(file.filename):
+                archive, failure = open_archive(staged)
+                if failure:
+                    results.append(failure)
+                    continue
+                results.extend(await process_archive(
+                    archive, client_code, project_code, mode, extract_tables, batch=batch
                 ))
                 continue
 
-            # Detect file type
-            file_type = detect_file_type(file.filename, mode)
-            logger.info(f"Detected file type: {file_type} for {file.filename}")
+            results.append(await process_staged_file(
+                file.filename, staged, client_code, project_code, mode, extract_tables, batch=batch
+            ))
 
-            # Process file based on type
-            metadata = None
-            normalized_filename = None
+        except Exception as e:
+            logger.error(f"Error processing {file.filename}: {str(e)}", exc_info=True)
+            results.append(FileIngestResponse(
+                success=False,
+                filename=file.filename,
+                status=ProcessingStatus.FAILED,
+                error=str(e)
+            ))
 
-            if file_type == "dxf":
-                try:
-                    # Save uploaded file to temporary location
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.dxf') as temp_file:
-                        temp_file_path = temp_file.name
-                        # Reset file pointer and copy content
-                        await file.seek(0)
-                        content = await file.read()
-                        temp_file.write(content)
-
-                    # Parse DXF file
-                    parser = DXFParser()
-                    metadata = parser.parse(temp_file_path, file.filename, client_code, project_code)
-
-                    # Generate normalized filename
-                    normalized_filename = generate_filename(metadata)
-
-                    logger.info(f"DXF parsed successfully. Confidence: {metadata.confidence_score:.2f}")
-                    logger.info(f"Generated filename: {normalized_filename}")
-
-                except Exception as parse_error:
-                    logger.error(f"DXF parsing error: {str(parse_error)}", exc_info=True)
-                    results.append(FileIngestResponse(
-                        success=False,
-                        filename=file.filename,
-                        status=ProcessingStatus.FAILED,
-                        error=f"DXF parsing failed: {str(parse_error)}"
-                    ))
-                    continue
-                finally:
-                    # Clean up temp file
-                    if temp_file_path and Path(temp_file_path).exists():
-                        try:
-                            Path(temp_file_path).unlink()
-                        except:
-                            pass
-
-            elif file_type == "pdf":
-                try:
-                    # Save uploaded file to temporary location
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                        temp_file_path = temp_file.name
-                        # Reset file pointer and copy content
-                        await file.seek(0)
-                        content = await file.read()
-                        temp_file.write(content)
-
-                    # Parse PDF file
-                    parser = PDFParser()
-                    metadata = parser.parse(temp_file_path, file.filename, client_code, project_code)
-
-                    # Generate normalized filename
-                    normalized_filename = generate_filename(metadata)
-
-                    logger.info(f"PDF parsed successfully. Confidence: {metadata.confidence_score:.2f}")
-                    logger.info(f"Generated filename: {normalized_filename}")
-
-                except Exception as parse_error:
-                    logger.error(f"PDF parsing error: {str(parse_error)}", exc_info=True)
-                    results.append(FileIngestResponse(
-                        success=False,
-                        filename=file.filename,
-                        status=ProcessingStatus.FAILED,
-                        error=f"PDF parsing failed: {str(parse_error)}"
-                    ))
-                    continue
-                finally:
-                    # Clean up temp file
-                    if temp_file_path and Path(temp_file_path).exists():
-                        try:
-                            Path(temp_file_path).unlink()
-                        except:
-                            pass
-
-            elif file_type in ["xlsx", "xls", "excel"]:
-                try:
-                    # Determine file extension
-                    file_ext = Path(file.filename).suffix.lower()
-                    if not file_ext:
-                        file_ext = '.xlsx' if file_type == 'xlsx' else '.xls'
-
-                    # Save uploaded file to temporary location
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
-                        temp_file_path = temp_file.name
-                        # Reset file pointer and copy content
-                        await file.seek(0)
-                        content = await file.read()
-                        temp_file.write(content)
-
-                    # Parse Excel file
-                    parser = ExcelParser()
-                    metadata = parser.parse(temp_file_path, file.filename, client_code, project_code)
-
-                    # Generate normalized filename
-                    normalized_filename = generate_filename(metadata)
-
-                    logger.info(f"Excel parsed successfully. Confidence: {metadata.confidence_score:.2f}")
-                    logger.info(f"Generated filename: {normalized_filename}")
-
-                except Exception as parse_error:
-                    logger.error(f"Excel parsing error: {str(parse_error)}", exc_info=True)
-                    results.append(FileIngestResponse(
-                        success=False,
-                        filename=file.filename,
-                        status=ProcessingStatus.FAILED,
-                        error=f"Excel parsing failed: {str(parse_error)}"
-                    ))
-                    continue
-                finally:
-                    # Clean up temp file
-                    if temp_file_path and Path(temp_file_path).exists():
-                        try:
-                            Path(temp_file_path).unlink()
-                        except:
-                            pass
-
-            elif file_type in ["lbrn2", "lbrn"]:
-                try:
-                    # Save uploaded file to temporary location
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.lbrn2') as temp_file:
-                        temp_file_path = temp_file.name
-                        await file.seek(0)
-                        content = await file.read()
-                        temp_file.write(content)
-
-                    # Parse LightBurn file
-                    parser = LBRNParser()
-                    metadata = parser.parse(temp_file_path, file.filename, client_code, project_code)
-
-                    # Generate normalized filename
-                    normalized_filename = generate_filename(metadata)
-
-                    logger.info(f"LightBurn parsed successfully. Confidence: {metadata.confidence_score:.2f}")
-                    logger.info(f"Generated filename: {normalized_filename}")
-
-                except Exception as parse_error:
-                    logger.error(f"LightBurn parsing error: {str(parse_error)}", exc_info=True)
-                    results.append(FileIngestResponse(
-                        success=False,
-                        filename=file.filename,
-                        status=ProcessingStatus.FAILED,
-                        error=f"LightBurn parsing failed: {str(parse_error)}"
-                    ))
-                    continue
-                finally:
-                    # Clean up temp file
-                    if temp_file_path and Path(temp_file_path).exists():
-                        try:
-                            Path(temp_file_path).unlink()
-                        except:
-                            pass
-
-            elif file_type in ["png", "jpg", "jpeg", "bmp", "tiff", "tif", "image"]:
-                try:
-                    # Determine file extension
-                    file_ext = Path(file.filename).suffix.lower()
-                    if not file_ext:
-                        file_ext = '.png'
-
-                    # Save uploaded file to temporary location
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
-                        temp_file_path = temp_file.name
-                        await file.seek(0)
-                        content = await file.read()
-                        temp_file.write(content)
-
-                    # Parse image file
-                    parser = ImageParser()
-                    metadata = parser.parse(temp_file_path, file.filename, client_code, project_code)
-
-                    # Generate normalized filename
-                    normalized_filename = generate_filename(metadata)
-
-                    logger.info(f"Image parsed successfully. Confidence: {metadata.confidence_score:.2f}")
-                    logger.info(f"Generated filename: {normalized_filename}")
-
-                except Exception as parse_error:
-                    logger.error(f"Image parsing error: {str(parse_error)}", exc_info=True)
-                    results.append(FileIngestResponse(
-                        success=False,
-                        filename=file.filename,
-                        status=ProcessingStatus.FAILED,
-                        error=f"Image parsing failed: {str(parse_error)}"
-                    ))
-                    continue
-                finally:
-                    # Clean up temp file
-                    if temp_file_path and Path(temp_file_path).exists():
-                        try:
-                            Path(temp_file_path).unlink()
-                        except:
-                            pass
-
-            # Save file to storage
-            stored_filename = None
-            file_path_str = None
-
-            if metadata and normalized_filename:
-                try:
-                    # Save file to storage with versioning
-                    storage_result = save_file(
-                        source_path=temp_file_path,
-                        normalized_filename=normalized_filename,
-                        client_code=metadata.client_code,
-                        project_code=metadata.project_code,
-                        auto_version=settings.AUTO_VERSION
-                    )
+    await save_ingest_batch(batch)
 
-                    if storage_result:
-                        stored_filename, file_path_str = storage_result
-                        logger.info(f"File saved to storage: {file_path_str}")
-                    else:
-                        logger.error("Failed to save file to storage")
+    logger.info(f"Ingestion complete: {len(results)} results")
+    return results
 
-                except Exception as storage_error:
-                    logger.error(f"Storage error: {storage_error}")
 
-            # Save to database
-            ingest_id = None
-            if metadata and stored_filename and file_path_str:
-                try:
-                    file_ingest = save_file_ingest(
-                        normalized_metadata=metadata,
-                        original_filename=file.filename,
-                        stored_filename=stored_filename,
-                        file_path=file_path_str,
-                        status='completed'
-                    )
+@app.post("/ingest/jobs", status_code=202)
+async def submit_ingest_job(
+    files: List[UploadFile] = File(...),
+    client_code: Optional[str] = Form(None),
+    project_code: Optional[str] = Form(None),
+    mode: str = Form("AUTO"),
+    extract_tables: Optional[bool] = Form(None)
+):
+    """
+    Submit a batch of files for background ingestion.
 
-                    if file_ingest:
-                        ingest_id = file_ingest.id
-                        logger.info(f"Saved to database with ID: {ingest_id}")
-
-                        # Save raw extraction data
-                        save_file_extraction(
-                            file_ingest_id=ingest_id,
-                            extraction_type=f"{metadata.detected_type.value}_metadata",
-                            extracted_data=metadata.extracted,
-                            confidence_score=metadata.confidence_score,
-                            parser_name=f"{metadata.detected_type.value}_parser",
-                            parser_version="1.0.0"
-                        )
-
-                        # Save metadata key-value pairs
-                        metadata_dict = {
-                            'client_code': metadata.client_code,
-                            'project_code': metadata.project_code,
-                            'part_name': metadata.part_name,
-                            'material': metadata.material,
-                            'thickness_mm': metadata.thickness_mm,
-                            'quantity': metadata.quantity,
-                            'version': metadata.version
-                        }
-                        save_file_metadata(
-                            file_ingest_id=ingest_id,
-                            metadata_dict=metadata_dict,
-                            source=f"{metadata.detected_type.value}_parser"
-                        )
-
-                        # Send webhook notification to Laser OS
-                        if settings.WEBHOOK_ENABLED and file_ingest:
-                            try:
-                                webhook_sent = await send_webhook(
-                                    event_type=WebhookEventType.FILE_PROCESSED,
-                                    file_ingest=file_ingest
-                                )
-                                if webhook_sent:
-                                    logger.info(f"Webhook sent successfully for file {ingest_id}")
-                                else:
-                                    logger.warning(f"Webhook failed for file {ingest_id}")
-                            except Exception as webhook_error:
-                                logger.error(f"Webhook error: {webhook_error}")
-                                # Don't fail the whole process if webhook fails
-                    else:
-                        logger.error("Failed to save to database")
+    Uploads are staged and validated in the request; parsing, storage and
+    webhooks happen afterwards, several files at a time. Each member of a
+    ZIP archive becomes a file of the job. Poll GET /jobs/{job_id} for
+    progress or stream GET /jobs/{job_id}/results.
 
-                except Exception as db_error:
-                    logger.error(f"Database error: {db_error}")
+    Args:
+        files: List of uploaded files
+        client_code: Optional client code (e.g., "CL-0001")
+        project_code: Optional project code (e.g., "JB-2025-10-CL0001-001")
+        mode: Processing mode (AUTO, dxf, pdf, excel, etc.)
+        extract_tables: PDF table extraction override (see POST /ingest)
 
-            # Build response
-            results.append(FileIngestResponse(
-                success=True,
-                ingest_id=ingest_id,
-                filename=file.filename,
-                normalized_filename=stored_filename or normalized_filename,
-                status=ProcessingStatus.COMPLETE if metadata else ProcessingStatus.PENDING,
-                metadata=metadata,
-                error=None
-            ))
+    Returns:
+        Job ID and URLs for status polling and result streaming
+    """
+    logger.info(f"Submitting ingest job with {len(files)} file(s)")
 
-            logger.info(f"File {file.filename} processed successfully")
+    # (filename, processor or failed result, discard) per job file; ZIP members become separate files
+    entries = []
+    options = dict(client_code=client_code, project_code=project_code, mode=mode, extract_tables=extract_tables)
 
+    for file in files:
+        staged = None
+        try:
+            staged, failure = await stage_and_validate(file)
+            if not failure and is_archive(file.filename):
+                archive, failure = open_archive(staged)
         except Exception as e:
-            logger.error(f"Error processing {file.filename}: {str(e)}", exc_info=True)
-            results.append(FileIngestResponse(
+            logger.error(f"Error staging {file.filename}: {str(e)}", exc_info=True)
+            if staged is not None:
+                staged.cleanup()
+            staged, failure = None, FileIngestResponse(
                 success=False,
                 filename=file.filename,
                 status=ProcessingStatus.FAILED,
                 error=str(e)
+            )
+
+        if failure:
+            entries.append((file.filename, failure, None))
+        elif is_archive(file.filename):
+            # Members are streamed out of the archive when their turn comes
+            entries.extend(
+                (
+                    Path(info.filename).name,
+                    functools.partial(process_archive_member, archive, info, **options),
+                    archive.member_done
+                )
+                for info in archive.members
+            )
+        else:
+            entries.append((
+                file.filename,
+                functools.partial(process_staged_file, filename=file.filename, staged=staged, **options),
+                staged.cleanup
             ))
-        finally:
-            # Ensure temp file cleanup
-            if temp_file_path and Path(temp_file_path).exists():
-                try:
-                    Path(temp_file_path).unlink()
-                except:
-                    pass
 
-    logger.info(f"Ingestion complete: {len(results)} results")
-    return results
+    manager = get_job_manager()
+    job = manager.create_job([filename for filename, _, _ in entries])
+    processors = {}
+    discards = {}
+
+    for job_file, (_, entry, discard) in zip(job.files, entries):
+        if isinstance(entry, FileIngestResponse):
+            await job.finish_file(job_file, entry)
+        else:
+            processors[job_file.index] = entry
+            discards[job_file.index] = discard
+
+    manager.start(job, processors, discards)
+
+    return {
+        "success": True,
+        "job_id": job.id,
+        "status": job.status.value,
+        "total": len(job.files),
+        "status_url": f"/jobs/{job.id}",
+        "results_url": f"/jobs/{job.id}/results"
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """
+    Get progress of an ingest job.
+
+    Args:
+        job_id: Job ID returned by POST /ingest/jobs
+
+    Returns:
+        Job status with per-file progress
+    """
+    job = get_job_manager().get_job(job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/results")
+async def stream_job_results(job_id: str):
+    """
+    Stream ingest job results as NDJSON, one line per file as it finishes.
+
+    Files that finished before the request are sent first; the response
+    ends when every file has a result.
+
+    Args:
+        job_id: Job ID returned by POST /ingest/jobs
+
+    Returns:
+        application/x-ndjson stream of FileIngestResponse objects (with "index")
+    """
+    job = get_job_manager().get_job(job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    async def lines():
+        async for job_file in job.stream_results():
+            line = {"index": job_file.index, **job_file.result.model_dump(mode="json")}
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @app.get("/files")
@@ -500,11 +818,16 @@ async def list_files(
     material: Optional[str] = None,
     thickness_mm: Optional[float] = None,
     status: Optional[str] = None,
-    limit: int = 100,
-    offset: int = 0
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
 ):
     """
-    List all ingested files with optional filters
+    List ingested files with optional filters, newest first
+
+    Pass the returned next_cursor as `cursor` to get the next page; unlike
+    `offset`, cursors cost the same however deep the page is.
 
     Args:
         client_code: Filter by client code
@@ -513,38 +836,47 @@ async def list_files(
         material: Filter by material
         thickness_mm: Filter by thickness
         status: Filter by status
-        limit: Maximum number of records
-        offset: Number of records to skip
+        limit: Maximum number of records (at most 1000)
+        offset: Number of records to skip (ignored with a cursor)
+        cursor: next_cursor from the previous page
+        fields: Comma-separated fields to return (default: all)
 
     Returns:
-        List of file ingest records
+        Page of file ingest records with the total count and next_cursor
     """
     logger.info(f"Listing files with filters: client={client_code}, project={project_code}, type={file_type}")
 
+    filters = dict(
+        client_code=client_code,
+        project_code=project_code,
+        file_type=file_type,
+        material=material,
+        thickness_mm=thickness_mm,
+        status=status
+    )
+    field_list = [name.strip() for name in fields.split(',') if name.strip()] if fields else None
+
     try:
-        file_ingests = get_file_ingests(
-            client_code=client_code,
-            project_code=project_code,
-            file_type=file_type,
-            material=material,
-            thickness_mm=thickness_mm,
-            status=status,
-            limit=limit,
-            offset=offset
+        records, next_cursor = await asyncio.to_thread(
+            get_file_ingest_page, **filters, limit=limit, cursor=cursor, offset=offset, fields=field_list
         )
-
-        return {
-            "success": True,
-            "count": len(file_ingests),
-            "limit": limit,
-            "offset": offset,
-            "files": [fi.to_dict() for fi in file_ingests]
-        }
-
+        total = await asyncio.to_thread(count_file_ingests, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing files: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    return {
+        "success": True,
+        "count": len(records),
+        "total": total,
+        "limit": limit,
+        "offset": offset if not cursor else None,
+        "next_cursor": next_cursor,
+        "files": records
+    }
+
 
 @app.get("/files/{file_id}")
 async def get_file_details(file_id: int):
@@ -681,15 +1013,8 @@ async def re_extract_endpoint(file_id: int, mode: str = "AUTO"):
         if not updated:
             raise HTTPException(status_code=500, detail="Failed to mark file for re-extraction")
 
-        # Send webhook notification
-        if settings.WEBHOOK_ENABLED:
-            try:
-                await send_webhook(
-                    event_type=WebhookEventType.FILE_RE_EXTRACTED,
-                    file_ingest=file_ingest
-                )
-            except Exception as webhook_error:
-                logger.error(f"Webhook error: {webhook_error}")
+        # Queue webhook notification
+        await queue_webhooks(WebhookEventType.FILE_RE_EXTRACTED, [file_ingest])
 
         return {
             "success": True,
@@ -735,16 +1060,8 @@ async def delete_file_endpoint(file_id: int, hard_delete: bool = False):
         if hard_delete:
             delete_stored_file(file_ingest.file_path)
 
-        # Send webhook notification
-        if settings.WEBHOOK_ENABLED:
-            try:
-                await send_webhook(
-                    event_type=WebhookEventType.FILE_DELETED,
-                    file_ingest=file_ingest,
-                    additional_data={"hard_delete": hard_delete}
-                )
-            except Exception as webhook_error:
-                logger.error(f"Webhook error: {webhook_error}")
+        # Queue webhook notification
+        await queue_webhooks(WebhookEventType.FILE_DELETED, [file_ingest], {"hard_delete": hard_delete})
 
         return {
             "success": True,
@@ -775,6 +1092,138 @@ async def re_extract(ingest_id: int, mode: str = "AUTO"):
     return await re_extract_endpoint(ingest_id, mode)
 
 
+async def notify_files_re_extracted(file_ingests, metadata) -> None:
+    """Queue the file.re_extracted webhooks of a saved re-extraction batch"""
+    await queue_webhooks(
+        WebhookEventType.FILE_RE_EXTRACTED, file_ingests,
+        file_data=[geometry_data(file_metadata) for file_metadata in metadata]
+    )
+
+
+@app.post("/reextract/jobs", status_code=202)
+async def submit_reextract_job(
+    file_type: Optional[str] = None,
+    client_code: Optional[str] = None,
+    parser_version: Optional[str] = None
+):
+    """
+    Start a bulk re-extraction job.
+
+    Selects stored files whose latest extraction was made by an older parser
+    version and runs them through the parser pool again in the background,
+    saving results (and queueing file.re_extracted webhooks) batch by batch.
+
+    Args:
+        file_type: Only files of this type (default: every parsed type)
+        client_code: Only files of this client
+        parser_version: Re-extract files extracted by a version older than
+            this (default: each parser's current version)
+
+    Returns:
+        Job ID, number of selected files and the status URL
+    """
+    manager = get_reextract_manager()
+
+    try:
+        job = await asyncio.to_thread(manager.create_job, file_type, client_code, parser_version)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not job:
+        raise HTTPException(status_code=500, detail="Failed to create re-extraction job")
+
+    await manager.start(job.id, notify_files_re_extracted)
+    logger.info(f"Re-extraction job {job.id} submitted: {job.total} file(s)")
+
+    return {
+        "success": True,
+        "job_id": job.id,
+        "total": job.total,
+        "parser_versions": json.loads(job.parser_versions),
+        "status_url": f"/reextract/jobs/{job.id}"
+    }
+
+
+@app.get("/reextract/jobs")
+async def list_reextract_jobs(status: Optional[str] = None, limit: int = Query(50, ge=1, le=500)):
+    """
+    List re-extraction jobs, newest first.
+
+    Args:
+        status: Filter by status (pending, running, paused, completed, failed)
+        limit: Maximum number of jobs to return
+
+    Returns:
+        List of jobs with their progress
+    """
+    jobs = await asyncio.to_thread(get_reextract_jobs, status, limit)
+    return {"jobs": [job.to_dict() for job in jobs]}
+
+
+@app.get("/reextract/jobs/{job_id}")
+async def get_reextract_job_status(job_id: str):
+    """
+    Get progress of a re-extraction job.
+
+    Args:
+        job_id: Job ID returned by POST /reextract/jobs
+
+    Returns:
+        Job status, cursor, counts and the most recent per-file errors
+    """
+    job = await asyncio.to_thread(get_reextract_job, job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Re-extraction job {job_id} not found")
+
+    return job.to_dict()
+
+
+@app.post("/reextract/jobs/{job_id}/pause")
+async def pause_reextract_job(job_id: str):
+    """
+    Pause a re-extraction job after its current batch.
+
+    Args:
+        job_id: Job ID returned by POST /reextract/jobs
+
+    Returns:
+        Job status
+    """
+    if not await get_reextract_manager().pause(job_id):
+        job = await asyncio.to_thread(get_reextract_job, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Re-extraction job {job_id} not found")
+        raise HTTPException(status_code=409, detail=f"Re-extraction job {job_id} is {job.status}")
+
+    return {"success": True, "job_id": job_id, "status": "paused"}
+
+
+@app.post("/reextract/jobs/{job_id}/resume", status_code=202)
+async def resume_reextract_job(job_id: str):
+    """
+    Resume a paused, failed or abandoned re-extraction job from its cursor.
+
+    Args:
+        job_id: Job ID returned by POST /reextract/jobs
+
+    Returns:
+        Job status
+    """
+    if not await get_reextract_manager().resume(job_id, notify_files_re_extracted):
+        job = await asyncio.to_thread(get_reextract_job, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Re-extraction job {job_id} not found")
+        raise HTTPException(status_code=409, detail=f"Re-extraction job {job_id} is {job.status}")
+
+    return {
+        "success": True,
+        "job_id": job_id,
+        "status": "running",
+        "status_url": f"/reextract/jobs/{job_id}"
+    }
+
+
 @app.get("/webhooks/stats")
 async def webhook_stats(hours: int = 24):
     """
@@ -807,13 +1256,40 @@ async def webhook_health():
 @app.get("/webhooks/queue/stats")
 async def webhook_queue_stats():
     """
-    Get webhook queue statistics.
+    Get webhook outbox statistics.
+
+    Returns:
+        Counts per status, age of the oldest undelivered webhook
+        (delivery lag) and whether the dispatcher is running
+    """
+    stats = await asyncio.to_thread(get_webhook_dispatcher().get_stats)
+    return JSONResponse(content=stats)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus metrics.
+
+    Per-stage, per-parser ingest latency histograms and counters
+    (module_n_stage_duration_seconds, module_n_ingest_files_total, ...)
+    in the Prometheus text exposition format.
+
+    Returns:
+        text/plain; version=0.0.4 metrics page
+    """
+    return PlainTextResponse(get_metrics().render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/parse-cache/stats")
+async def parse_cache_stats():
+    """
+    Get parse result cache statistics.
 
     Returns:
-        Queue statistics
+        Cache hit/miss counts and size
     """
-    queue = get_webhook_queue()
-    stats = queue.get_stats()
+    stats = await asyncio.to_thread(get_parse_cache().get_stats)
     return JSONResponse(content=stats)
 
 
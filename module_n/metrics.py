@@ -0,0 +1,320 @@
+"""
+Module N - Metrics
+In-process stage timing: per-stage, per-parser latency histograms and
+counters exposed in the Prometheus text format, plus optional per-request
+trace logging. No external services or client libraries are needed.
+"""
+
+import math
+import bisect
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds (Prometheus `le`)
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+STAGE_METRIC = 'module_n_stage_duration_seconds'
+
+# HELP text of the metrics Module N records
+METRIC_HELP = {
+    STAGE_METRIC: 'Time spent in each ingest stage, per parser',
+    'module_n_ingest_files_total': 'Files ingested, per parser and result',
+    'module_n_parses_total': 'Parser runs, per parser and result (parsed, cached, error)',
+    'module_n_parser_in_flight': 'Files being parsed right now, per parser',
+}
+
+# Sorted (label, value) pairs identifying one series of a metric
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**labels: Optional[str]) -> Labels:
+    return tuple(sorted((name, str(value or '')) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (not thread safe - the registry locks it)"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)  # Per bucket, not cumulative
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """Record one observation"""
+        self.count += 1
+        self.sum += value
+        index = bisect.bisect_left(self.buckets, value)  # First bucket with value <= bound
+        if index < len(self.buckets):
+            self.counts[index] += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(upper bound, observations <= bound) pairs, ending with +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        result.append((math.inf, self.count))
+        return result
+
+
+class RequestTrace:
+    """Stage timings of one HTTP request, logged as one line when it ends"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.stages: Dict[str, List[float]] = {}  # Stage -> [total seconds, count]
+
+    def add(self, stage: str, seconds: float, parser: Optional[str] = None):
+        """Add a stage timing (the registry holds its lock while calling this)"""
+        key = f"{stage}[{parser}]" if parser else stage
+        totals = self.stages.setdefault(key, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += 1
+
+    def server_timing(self) -> str:
+        """Stage totals as a Server-Timing header value"""
+        return ', '.join(
+            f"{key.replace('[', '.').rstrip(']')};dur={seconds * 1000:.1f}"
+            for key, (seconds, _) in self.stages.items()
+        )
+
+    def summary(self, status: Optional[int] = None) -> str:
+        """One-line breakdown: total time, then each stage's total and count"""
+        total_ms = (time.perf_counter() - self.started) * 1000
+        stages = ' '.join(
+            f"{key}={seconds * 1000:.1f}ms" + (f"x{count}" if count > 1 else '')
+            for key, (seconds, count) in self.stages.items()
+        )
+        return f"TRACE {self.method} {self.path} {status or '-'} total={total_ms:.1f}ms {stages}".rstrip()
+
+
+# Trace of the request being handled (copied into tasks and threads it starts)
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar('module_n_trace', default=None)
+
+
+class MetricsRegistry:
+    """
+    Histograms, counters and gauges kept in memory.
+
+    Recording is a dict lookup and a few additions under one lock, cheap
+    enough to time every ingest stage. render() produces the Prometheus
+    text exposition format for GET /metrics.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialize metrics registry.
+
+        Args:
+            enabled: Record metrics (default: from settings)
+            buckets: Histogram bucket upper bounds in seconds
+        """
+        self.enabled = settings.METRICS_ENABLED if enabled is None else enabled
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+
+    def observe(self, stage: str, seconds: float, parser: Optional[str] = None):
+        """
+        Record the duration of an ingest stage.
+
+        Args:
+            stage: Stage name (e.g. 'parse', 'storage_copy', 'db_commit')
+            seconds: Duration in seconds
+            parser: Parser type the stage ran for, if any
+        """
+        trace = _current_trace.get()
+        if not self.enabled and trace is None:
+            return
+
+        with self._lock:
+            if self.enabled:
+                series = self._histograms.setdefault(STAGE_METRIC, {})
+                labels = _labels(stage=stage, parser=parser)
+                histogram = series.get(labels)
+                if histogram is None:
+                    histogram = series[labels] = Histogram(self.buckets)
+                histogram.observe(seconds)
+            if trace is not None:
+                trace.add(stage, seconds, parser)
+
+    def increment(self, name: str, amount: float = 1, **labels: Optional[str]):
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        key = _labels(**labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels: Optional[str]):
+        """Set a gauge"""
+        if not self.enabled:
+            return
+        key = _labels(**labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    @contextmanager
+    def stage(self, stage: str, parser: Optional[str] = None) -> Iterator[None]:
+        """
+        Time the enclosed block as an ingest stage (also around awaits).
+
+        The duration is recorded even if the block raises.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, parser)
+
+    def get_stage_stats(self) -> Dict[str, Dict[str, float]]:
+        """Count, total and mean seconds per 'stage' / 'stage[parser]'"""
+        with self._lock:
+            stats = {}
+            for labels, histogram in self._histograms.get(STAGE_METRIC, {}).items():
+                values = dict(labels)
+                key = f"{values['stage']}[{values['parser']}]" if values['parser'] else values['stage']
+                stats[key] = {
+                    'count': histogram.count,
+                    'sum_seconds': histogram.sum,
+                    'mean_seconds': histogram.sum / histogram.count if histogram.count else 0.0,
+                }
+            return stats
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format (0.0.4)"""
+        lines = []
+
+        def header(name: str, metric_type: str):
+            lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                header(name, 'histogram')
+                for labels, histogram in sorted(series.items()):
+                    for bound, count in histogram.cumulative():
+                        lines.append(f"{name}_bucket{_format_labels(labels, [('le', _format_value(bound))])} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+            for name, series in sorted(self._counters.items()):
+                header(name, 'counter')
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+            for name, series in sorted(self._gauges.items()):
+                header(name, 'gauge')
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def reset(self):
+        """Forget every recorded value"""
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+            self._gauges = {}
+
+
+class TraceMiddleware:
+    """
+    ASGI middleware that traces requests.
+
+    A request is traced when METRICS_TRACE_REQUESTS is on or it carries the
+    X-Module-N-Trace: 1 header. Its stage timings are logged as one line
+    when it ends and returned in a Server-Timing response header. Untraced
+    requests pass straight through.
+    """
+
+    HEADER = b'x-module-n-trace'
+
+    def __init__(self, app):
+        self.app = app
+
+    def _wants_trace(self, scope) -> bool:
+        if settings.METRICS_TRACE_REQUESTS:
+            return True
+        return any(name == self.HEADER and value == b'1' for name, value in scope.get('headers', ()))
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self._wants_trace(scope):
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(scope['method'], scope['path'])
+        token = _current_trace.set(trace)
+        status = None
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                timing = trace.server_timing()
+                if timing:
+                    message = dict(message)
+                    message['headers'] = list(message.get('headers', [])) + [
+                        (b'server-timing', timing.encode('latin-1'))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+            logger.info(trace.summary(status))
+
+
+# Global metrics registry instance
+_metrics: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get global metrics registry instance"""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsRegistry()
+    return _metrics
+
+
+def stage_timer(stage: str, parser: Optional[str] = None):
+    """Time the enclosed block as an ingest stage in the global registry"""
+    return get_metrics().stage(stage, parser)
@@ -167,10 +167,16 @@ class DXFMetadata(BaseModel):
     layers: List[str] = Field(default_factory=list)
     entity_counts: Dict[str, int] = Field(default_factory=dict)
     bounding_box: Optional[Dict[str, float]] = None
+    cut_bounding_box: Optional[Dict[str, float]] = None  # Cut layers only (part size, without dimensions or notes)
     text_notes: List[str] = Field(default_factory=list)
     holes: List[Dict[str, Any]] = Field(default_factory=list)
+    hole_stats: Optional[Dict[str, Any]] = None  # count, min/max diameter, count per diameter
     perimeter_mm: Optional[float] = None
-    area_mm2: Optional[float] = None
+    area_mm2: Optional[float] = None  # Net part area (outer contours minus holes)
+    cut_length_mm: Optional[float] = None  # Total cut length across all cut layers
+    pierce_count: Optional[int] = None  # Closed contours (one pierce each)
+    open_contour_count: Optional[int] = None
+    open_contours: List[Dict[str, Any]] = Field(default_factory=list)  # Open contour report (start, end, gap, length)
     dxf_version: Optional[str] = None
 
 
@@ -236,6 +242,7 @@ class FileIngestResponse(BaseModel):
     normalized_filename: Optional[str] = None
     status: ProcessingStatus
     metadata: Optional[NormalizedMetadata] = None
+    sha256: Optional[str] = None
     error: Optional[str] = None
     
     class Config:
@@ -8,6 +8,12 @@ from .pdf_parser import PDFParser
 from .excel_parser import ExcelParser
 from .lbrn_parser import LBRNParser
 from .image_parser import ImageParser
+from .executor import ParserExecutor, get_parser_executor, resolve_parser_type
+from .cache import ParseCache, get_parse_cache
 
-__all__ = ['DXFParser', 'PDFParser', 'ExcelParser', 'LBRNParser', 'ImageParser']
+__all__ = [
+    'DXFParser', 'PDFParser', 'ExcelParser', 'LBRNParser', 'ImageParser',
+    'ParserExecutor', 'get_parser_executor', 'resolve_parser_type',
+    'ParseCache', 'get_parse_cache'
+]
 
@@ -0,0 +1,187 @@
+"""
+Module N - Parse Result Cache
+Reuses parser output for byte-identical files, keyed on (SHA-256, parser name, parser version)
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from ..config import settings
+from ..db.operations import (
+    get_parse_cache_entry,
+    save_parse_cache_entry,
+    evict_parse_cache,
+    get_parse_cache_stats
+)
+
+logger = logging.getLogger(__name__)
+
+# Share of each limit an eviction frees, so a full cache is not checked on every put
+EVICT_HEADROOM = 0.1
+
+
+def get_parser_name(parser_type: str) -> str:
+    """Get the parser name used in cache keys and extraction records"""
+    return f"{parser_type}_parser"
+
+
+def get_parser_version(parser_type: str) -> str:
+    """Get the current version of a parser"""
+    from .executor import get_parser_class
+    return get_parser_class(parser_type).PARSER_VERSION
+
+
+class ParseCache:
+    """
+    Persistent parse result cache.
+
+    Only the content-derived part of a parse (parser.extract_content()) is
+    cached. Filename-derived fields are rebuilt on every hit with
+    parser.build_metadata(), so the same drawing uploaded under a different
+    name or for a different client still gets the right metadata.
+
+    Entries are stored in the Module N database and evicted least recently
+    used first once the entry or size limit is exceeded. The limits are
+    checked when a running estimate of the cache size (entries and bytes
+    stored since the last check) goes over them, and every evict_interval
+    puts in case other workers filled the same database. Bumping a parser's
+    PARSER_VERSION invalidates its cached results.
+
+    get() and put() query the database; async callers run them in a thread.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        evict_interval: Optional[int] = None
+    ):
+        """
+        Initialize parse cache.
+
+        Args:
+            enabled: Enable the cache (default: from settings)
+            max_entries: Max cached results, 0 = unlimited (default: from settings)
+            max_bytes: Max total cached content size, 0 = unlimited (default: from settings)
+            evict_interval: Puts between limit checks when the estimate is within
+                the limits (default: from settings)
+        """
+        self.enabled = settings.PARSE_CACHE_ENABLED if enabled is None else enabled
+        self.max_entries = settings.PARSE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.max_bytes = settings.PARSE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.evict_interval = max(1, evict_interval or settings.PARSE_CACHE_EVICT_INTERVAL)
+
+        self.hits = 0
+        self.misses = 0
+
+        # Size estimate from the last limit check (None = not checked yet)
+        self._lock = threading.Lock()
+        self._entries: Optional[int] = None
+        self._bytes = 0
+        self._puts_since_check = 0
+
+    def get(self, file_hash: str, parser_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Get cached parser content for a file.
+
+        Args:
+            file_hash: SHA-256 of the file content
+            parser_type: Parser type ('dxf', 'pdf', 'excel', 'lbrn2', 'image')
+
+        Returns:
+            Cached content dict or None on a miss
+        """
+        if not self.enabled or not file_hash:
+            return None
+
+        content = get_parse_cache_entry(
+            file_hash, get_parser_name(parser_type), get_parser_version(parser_type)
+        )
+
+        with self._lock:
+            if content is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if content is None:
+            return None
+
+        logger.info(f"Parse cache hit: {parser_type} {file_hash[:12]}")
+        return content
+
+    def put(self, file_hash: str, parser_type: str, content: Dict[str, Any]) -> bool:
+        """
+        Store parser content for a file and enforce the cache limits.
+
+        Args:
+            file_hash: SHA-256 of the file content
+            parser_type: Parser type ('dxf', 'pdf', 'excel', 'lbrn2', 'image')
+            content: Output of parser.extract_content()
+
+        Returns:
+            True if the content was stored
+        """
+        if not self.enabled or not file_hash or content is None:
+            return False
+
+        size_bytes = save_parse_cache_entry(
+            file_hash, get_parser_name(parser_type), get_parser_version(parser_type), content
+        )
+        if size_bytes is None:
+            return False
+
+        if self._needs_check(size_bytes):
+            result = evict_parse_cache(
+                self.max_entries - int(self.max_entries * EVICT_HEADROOM),
+                self.max_bytes - int(self.max_bytes * EVICT_HEADROOM)
+            )
+            if result is not None:
+                with self._lock:
+                    _, self._entries, self._bytes = result
+
+        return True
+
+    def _needs_check(self, size_bytes: int) -> bool:
+        """Count a stored entry; True if the cache limits should be checked now"""
+        if not self.max_entries and not self.max_bytes:
+            return False
+        with self._lock:
+            self._puts_since_check += 1
+            if self._entries is not None:
+                self._entries += 1
+                self._bytes += size_bytes
+                within = (not self.max_entries or self._entries <= self.max_entries) and \
+                    (not self.max_bytes or self._bytes <= self.max_bytes)
+                if within and self._puts_since_check < self.evict_interval:
+                    return False
+            self._puts_since_check = 0
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        stats = {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 2) if lookups > 0 else 0,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes
+        }
+        if self.enabled:
+            stats.update(get_parse_cache_stats())
+        return stats
+
+
+# Global cache instance
+_global_cache: Optional[ParseCache] = None
+
+
+def get_parse_cache() -> ParseCache:
+    """Get global parse cache instance"""
+    global _global_cache
+    if _global_cache is None:
+        _global_cache = ParseCache()
+    return _global_cache
@@ -0,0 +1,890 @@
+"""
+Module N - DXF Geometry Engine
+Collects DXF modelspace geometry in a single pass and measures it with NumPy
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Entities whose text is collected as notes
+TEXT_ENTITIES = ('TEXT', 'MTEXT')
+
+# Max deviation (mm) when flattening ellipses and splines into polylines
+FLATTEN_TOLERANCE = 0.01
+
+# Max nesting depth when exploding block references
+MAX_BLOCK_DEPTH = 8
+
+# Bulges smaller than this are treated as straight segments
+BULGE_EPSILON = 1e-9
+
+# Angles (degrees) where an arc reaches its x/y extremes
+AXIS_ANGLES = np.array([0.0, 90.0, 180.0, 270.0])
+
+# Max distance (mm) between two endpoints that are joined into one contour
+JOIN_TOLERANCE = 0.01
+
+# Max number of open contours listed in the contour report
+MAX_OPEN_CONTOUR_REPORT = 20
+
+# Average grid cells a contour may cover in the containment index
+MAX_GRID_REGISTRATIONS_PER_CONTOUR = 16
+
+# Smallest containment grid cell, as a fraction of the drawing's diagonal
+MIN_GRID_CELL_FRACTION = 1.0 / 1024
+
+
+class DXFGeometry:
+    """
+    Geometry of a DXF modelspace, binned by entity type into NumPy arrays.
+
+    from_modelspace() walks the modelspace once. Entities are appended to
+    flat per-type buffers and converted to arrays at the end:
+
+    - lines: (N, 4) [x1, y1, x2, y2] - LINEs and straight polyline segments
+    - arcs: (N, 5) [cx, cy, radius, start_angle, sweep_angle] in degrees -
+      ARCs and bulged polyline segments
+    - circles: (N, 3) [cx, cy, radius]
+
+    Each array has a matching *_layers array of indexes into self.layers,
+    so layer filters are a single mask lookup instead of a string check per
+    entity. Ellipses and splines are flattened to polylines and block
+    references (INSERT) are exploded, so nested sheets are measured in full.
+    """
+
+    def __init__(self):
+        """Initialize empty geometry buffers"""
+        self.layers: List[str] = []
+        self._layer_index: Dict[str, int] = {}
+
+        self.entity_counts: Dict[str, int] = {}
+        self.text_notes: List[str] = []
+
+        # Raw buffers filled while walking the modelspace
+        self._lines: List[Tuple[float, float, float, float, int]] = []
+        self._arcs: List[Tuple[float, float, float, float, float, int]] = []
+        self._circles: List[Tuple[float, float, float, int]] = []
+        self._poly_x: List[float] = []
+        self._poly_y: List[float] = []
+        self._poly_bulge: List[float] = []
+        self._poly_offsets: List[int] = [0]
+        self._poly_closed: List[bool] = []
+        self._poly_layers: List[int] = []
+
+        # Arrays built by _finalize()
+        self.lines = np.empty((0, 4))
+        self.line_layers = np.empty(0, dtype=np.intp)
+        self.arcs = np.empty((0, 5))
+        self.arc_layers = np.empty(0, dtype=np.intp)
+        self.circles = np.empty((0, 3))
+        self.circle_layers = np.empty(0, dtype=np.intp)
+
+    @classmethod
+    def from_modelspace(cls, msp) -> 'DXFGeometry':
+        """
+        Collect geometry from a modelspace in a single traversal.
+
+        Args:
+            msp: ezdxf modelspace
+
+        Returns:
+            DXFGeometry with finalized arrays
+        """
+        geometry = cls()
+
+        for entity in msp:
+            entity_type = entity.dxftype()
+            geometry.entity_counts[entity_type] = geometry.entity_counts.get(entity_type, 0) + 1
+            geometry._add_entity(entity, entity_type)
+
+        geometry._finalize()
+        return geometry
+
+    # ------------------------------------------------------------------
+    # Collection
+    # ------------------------------------------------------------------
+
+    def _layer(self, name: str) -> int:
+        """Get the index of a layer name"""
+        index = self._layer_index.get(name)
+        if index is None:
+            index = len(self.layers)
+            self._layer_index[name] = index
+            self.layers.append(name)
+        return index
+
+    def _add_entity(self, entity, entity_type: str, depth: int = 0, block_layer: Optional[str] = None):
+        """Append one entity to the buffers for its type"""
+        try:
+            dxf = entity.dxf
+            layer_name = dxf.layer
+
+            # Entities on layer 0 inside a block take the layer of the INSERT
+            if block_layer is not None and layer_name == '0':
+                layer_name = block_layer
+
+            if entity_type == 'LINE':
+                start, end = dxf.start, dxf.end
+                self._lines.append((start.x, start.y, end.x, end.y, self._layer(layer_name)))
+
+            elif entity_type == 'LWPOLYLINE':
+                self._add_polyline(entity.get_points('xyb'), entity.is_closed, layer_name)
+
+            elif entity_type == 'ARC':
+                center = dxf.center
+                self._arcs.append((
+                    center.x, center.y, dxf.radius,
+                    dxf.start_angle, dxf.end_angle,
+                    self._layer(layer_name)
+                ))
+
+            elif entity_type == 'CIRCLE':
+                center = dxf.center
+                self._circles.append((center.x, center.y, dxf.radius, self._layer(layer_name)))
+
+            elif entity_type == 'POLYLINE':
+                if entity.is_2d_polyline or entity.is_3d_polyline:
+                    points = [
+                        (vertex.dxf.location.x, vertex.dxf.location.y, vertex.dxf.get('bulge', 0.0))
+                        for vertex in entity.vertices
+                    ]
+                    self._add_polyline(points, entity.is_closed, layer_name)
+
+            elif entity_type in ('ELLIPSE', 'SPLINE'):
+                points = [(point.x, point.y, 0.0) for point in entity.flattening(FLATTEN_TOLERANCE)]
+                self._add_polyline(points, False, layer_name)
+
+            elif entity_type == 'INSERT':
+                if depth < MAX_BLOCK_DEPTH:
+                    for child in entity.virtual_entities():
+                        self._add_entity(child, child.dxftype(), depth + 1, layer_name)
+
+            elif entity_type in TEXT_ENTITIES and depth == 0:
+                text = entity.dxf.text if hasattr(entity.dxf, 'text') else ''
+                if text and text.strip():
+                    self.text_notes.append(text.strip())
+
+        except Exception as e:
+            logger.debug(f"Skipping {entity_type} entity: {str(e)}")
+
+    def _add_polyline(self, points: Sequence[Sequence[float]], closed: bool, layer_name: str):
+        """Append polyline vertices (x, y, bulge) to the vertex buffer"""
+        points = list(points)
+        if len(points) < 2:
+            return
+
+        for x, y, bulge in points:
+            self._poly_x.append(x)
+            self._poly_y.append(y)
+            self._poly_bulge.append(bulge or 0.0)
+
+        self._poly_offsets.append(len(self._poly_x))
+        self._poly_closed.append(bool(closed))
+        self._poly_layers.append(self._layer(layer_name))
+
+    def _finalize(self):
+        """Convert the raw buffers into NumPy arrays"""
+        lines = np.asarray(self._lines, dtype=float).reshape(-1, 5)
+        arcs = np.asarray(self._arcs, dtype=float).reshape(-1, 6)
+        circles = np.asarray(self._circles, dtype=float).reshape(-1, 4)
+
+        line_parts = [lines[:, :4]]
+        line_layer_parts = [lines[:, 4].astype(np.intp)]
+
+        # ARC entities: convert end angle to a counter-clockwise sweep
+        sweep = np.mod(arcs[:, 4] - arcs[:, 3], 360.0)
+        sweep[sweep == 0.0] = 360.0
+        arc_parts = [np.column_stack([arcs[:, 0], arcs[:, 1], arcs[:, 2], np.mod(arcs[:, 3], 360.0), sweep])]
+        arc_layer_parts = [arcs[:, 5].astype(np.intp)]
+
+        if self._poly_x:
+            segments, segment_layers, bulges = self._polyline_segments()
+
+            straight = np.abs(bulges) < BULGE_EPSILON
+            line_parts.append(segments[straight])
+            line_layer_parts.append(segment_layers[straight])
+
+            if not straight.all():
+                arc_parts.append(self._bulge_to_arcs(segments[~straight], bulges[~straight]))
+                arc_layer_parts.append(segment_layers[~straight])
+
+        self.lines = np.concatenate(line_parts)
+        self.line_layers = np.concatenate(line_layer_parts)
+        self.arcs = np.concatenate(arc_parts)
+        self.arc_layers = np.concatenate(arc_layer_parts)
+        self.circles = circles[:, :3]
+        self.circle_layers = circles[:, 3].astype(np.intp)
+
+        # Raw buffers are no longer needed
+        self._lines = self._arcs = self._circles = []
+        self._poly_x = self._poly_y = self._poly_bulge = []
+        self._poly_offsets = [0]
+        self._poly_closed = self._poly_layers = []
+
+    def _polyline_segments(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Split the polyline vertex buffer into segments.
+
+        Returns:
+            Tuple of (segments (N, 4), segment layer indexes, segment bulges)
+        """
+        x = np.asarray(self._poly_x)
+        y = np.asarray(self._poly_y)
+        bulge = np.asarray(self._poly_bulge)
+        offsets = np.asarray(self._poly_offsets)
+        closed = np.asarray(self._poly_closed)
+        layers = np.asarray(self._poly_layers, dtype=np.intp)
+
+        starts, ends = offsets[:-1], offsets[1:]
+
+        # Each vertex connects to the next; the last vertex connects back to
+        # the first for closed polylines and to nothing for open ones
+        next_index = np.arange(1, len(x) + 1)
+        next_index[ends - 1] = np.where(closed, starts, -1)
+
+        first = np.nonzero(next_index >= 0)[0]
+        second = next_index[first]
+
+        segments = np.column_stack([x[first], y[first], x[second], y[second]])
+        segment_layers = np.repeat(layers, ends - starts)[first]
+
+        # Drop zero-length segments (duplicate vertices)
+        keep = (segments[:, 0] != segments[:, 2]) | (segments[:, 1] != segments[:, 3])
+        return segments[keep], segment_layers[keep], bulge[first][keep]
+
+    @staticmethod
+    def _bulge_to_arcs(segments: np.ndarray, bulges: np.ndarray) -> np.ndarray:
+        """
+        Convert bulged polyline segments into arcs.
+
+        Args:
+            segments: (N, 4) segment endpoints
+            bulges: (N,) bulge values (tan of a quarter of the included angle)
+
+        Returns:
+            (N, 5) arcs [cx, cy, radius, start_angle, sweep_angle]
+        """
+        x1, y1, x2, y2 = segments.T
+        dx, dy = x2 - x1, y2 - y1
+        chord = np.hypot(dx, dy)
+
+        theta = 4.0 * np.arctan(bulges)
+        radius = chord / (2.0 * np.abs(np.sin(theta / 2.0)))
+
+        # Centre lies on the chord normal, left of the chord for positive bulges
+        offset = chord * (1.0 - bulges * bulges) / (4.0 * bulges)
+        cx = (x1 + x2) / 2.0 - dy / chord * offset
+        cy = (y1 + y2) / 2.0 + dx / chord * offset
+
+        angle1 = np.degrees(np.arctan2(y1 - cy, x1 - cx))
+        angle2 = np.degrees(np.arctan2(y2 - cy, x2 - cx))
+
+        # Negative bulges run clockwise - store them as the equivalent CCW arc
+        start = np.mod(np.where(bulges > 0, angle1, angle2), 360.0)
+        sweep = np.degrees(np.abs(theta))
+
+        return np.column_stack([cx, cy, radius, start, sweep])
+
+    # ------------------------------------------------------------------
+    # Measurements
+    # ------------------------------------------------------------------
+
+    def layer_mask(self, patterns: Sequence[str]) -> np.ndarray:
+        """
+        Get a boolean mask over self.layers for layer-name substrings.
+
+        Args:
+            patterns: Upper-case substrings (e.g. ['OUTLINE', 'CUT'])
+
+        Returns:
+            Boolean array indexed by layer index
+        """
+        return np.array(
+            [any(pattern in name.upper() for pattern in patterns) for name in self.layers],
+            dtype=bool
+        )
+
+    def line_lengths(self) -> np.ndarray:
+        """Length of every line segment"""
+        return np.hypot(self.lines[:, 2] - self.lines[:, 0], self.lines[:, 3] - self.lines[:, 1])
+
+    def arc_lengths(self) -> np.ndarray:
+        """Length of every arc"""
+        return np.radians(self.arcs[:, 4]) * self.arcs[:, 2]
+
+    def circle_lengths(self) -> np.ndarray:
+        """Circumference of every circle"""
+        return 2.0 * np.pi * self.circles[:, 2]
+
+    def cut_length(self, layer_patterns: Optional[Sequence[str]] = None) -> float:
+        """
+        Total length of all geometry, optionally limited to matching layers.
+
+        Args:
+            layer_patterns: Layer-name substrings to include (None = all layers)
+
+        Returns:
+            Total length in drawing units
+        """
+        line_lengths = self.line_lengths()
+        arc_lengths = self.arc_lengths()
+        circle_lengths = self.circle_lengths()
+
+        if layer_patterns is not None:
+            mask = self.layer_mask(layer_patterns)
+            if not mask.any():
+                return 0.0
+            line_lengths = line_lengths[mask[self.line_layers]]
+            arc_lengths = arc_lengths[mask[self.arc_layers]]
+            circle_lengths = circle_lengths[mask[self.circle_layers]]
+
+        return float(line_lengths.sum() + arc_lengths.sum() + circle_lengths.sum())
+
+    def _arc_extreme_points(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Candidate extreme points of every arc.
+
+        Returns:
+            Tuple of (x, y) arrays of shape (N, 6): both endpoints plus the
+            four axis points (NaN where the arc does not pass the axis)
+        """
+        cx, cy, radius, start, sweep = self.arcs.T
+
+        end_angles = np.radians(np.column_stack([start, start + sweep]))
+        end_x = cx[:, None] + radius[:, None] * np.cos(end_angles)
+        end_y = cy[:, None] + radius[:, None] * np.sin(end_angles)
+
+        passes_axis = np.mod(AXIS_ANGLES[None, :] - start[:, None], 360.0) <= sweep[:, None]
+        axis_angles = np.radians(AXIS_ANGLES)
+        axis_x = np.where(passes_axis, cx[:, None] + radius[:, None] * np.cos(axis_angles), np.nan)
+        axis_y = np.where(passes_axis, cy[:, None] + radius[:, None] * np.sin(axis_angles), np.nan)
+
+        return np.hstack([end_x, axis_x]), np.hstack([end_y, axis_y])
+
+    def extents(self, exclude_layers: Optional[Sequence[str]] = None) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Exact extents of all geometry.
+
+        Args:
+            exclude_layers: Layer-name substrings to leave out (e.g. dimensions)
+
+        Returns:
+            Tuple of (min_x, min_y, max_x, max_y) or None if there is no geometry
+        """
+        lines, circles, arc_keep = self.lines, self.circles, None
+        if exclude_layers:
+            keep = ~self.layer_mask(exclude_layers)
+            lines = lines[keep[self.line_layers]] if len(lines) else lines
+            circles = circles[keep[self.circle_layers]] if len(circles) else circles
+            arc_keep = keep[self.arc_layers] if len(self.arcs) else None
+
+        min_x, min_y, max_x, max_y = [], [], [], []
+
+        if len(lines):
+            xs, ys = lines[:, [0, 2]], lines[:, [1, 3]]
+            min_x.append(xs.min())
+            max_x.append(xs.max())
+            min_y.append(ys.min())
+            max_y.append(ys.max())
+
+        if len(circles):
+            cx, cy, radius = circles.T
+            min_x.append((cx - radius).min())
+            max_x.append((cx + radius).max())
+            min_y.append((cy - radius).min())
+            max_y.append((cy + radius).max())
+
+        if len(self.arcs) and (arc_keep is None or arc_keep.any()):
+            xs, ys = self._arc_extreme_points()
+            if arc_keep is not None:
+                xs, ys = xs[arc_keep], ys[arc_keep]
+            min_x.append(np.nanmin(xs))
+            max_x.append(np.nanmax(xs))
+            min_y.append(np.nanmin(ys))
+            max_y.append(np.nanmax(ys))
+
+        if not min_x:
+            return None
+
+        return float(min(min_x)), float(min(min_y)), float(max(max_x)), float(max(max_y))
+
+    def holes(self, hole_patterns: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        List circles as potential holes.
+
+        Args:
+            hole_patterns: Layer-name substrings that mark hole layers
+
+        Returns:
+            List of hole dicts (diameter, center, layer, is_hole_layer)
+        """
+        if not len(self.circles):
+            return []
+
+        is_hole_layer = self.layer_mask(hole_patterns)[self.circle_layers]
+        diameters = np.round(self.circles[:, 2] * 2.0, 2)
+        center_x = np.round(self.circles[:, 0], 2)
+        center_y = np.round(self.circles[:, 1], 2)
+
+        return [
+            {
+                'diameter': diameter,
+                'center_x': x,
+                'center_y': y,
+                'layer': self.layers[layer],
+                'is_hole_layer': on_hole_layer
+            }
+            for diameter, x, y, layer, on_hole_layer in zip(
+                diameters.tolist(), center_x.tolist(), center_y.tolist(),
+                self.circle_layers.tolist(), is_hole_layer.tolist()
+            )
+        ]
+
+    def hole_stats(self, hole_patterns: Sequence[str]) -> Dict[str, Any]:
+        """
+        Summarize circles by diameter.
+
+        Args:
+            hole_patterns: Layer-name substrings that mark hole layers
+
+        Returns:
+            Dict with hole count, count on hole layers, min/max diameter and
+            a count per diameter
+        """
+        if not len(self.circles):
+            return {'count': 0, 'on_hole_layers': 0, 'min_diameter': None,
+                    'max_diameter': None, 'by_diameter': {}}
+
+        diameters = np.round(self.circles[:, 2] * 2.0, 2)
+        unique, counts = np.unique(diameters, return_counts=True)
+
+        return {
+            'count': int(len(diameters)),
+            'on_hole_layers': int(self.layer_mask(hole_patterns)[self.circle_layers].sum()),
+            'min_diameter': float(unique[0]),
+            'max_diameter': float(unique[-1]),
+            'by_diameter': {f"{diameter:g}": int(count) for diameter, count in zip(unique.tolist(), counts.tolist())}
+        }
+
+    # ------------------------------------------------------------------
+    # Contour assembly
+    # ------------------------------------------------------------------
+
+    def assemble_contours(
+        self,
+        exclude_layers: Optional[Sequence[str]] = None,
+        tolerance: float = JOIN_TOLERANCE
+    ) -> Dict[str, Any]:
+        """
+        Chain lines and arcs into contours and measure them.
+
+        Endpoints are snapped to a spatial hash with cell size `tolerance`,
+        ends meeting at the same node are paired, and the pairs are walked
+        into closed loops and open chains. Loop areas are exact (arc
+        segments included) and nesting depth decides whether a loop adds
+        material (outer boundary, island) or removes it (hole).
+
+        Args:
+            exclude_layers: Layer-name substrings to leave out (e.g. notes, centre lines)
+            tolerance: Max gap between endpoints that are joined
+
+        Returns:
+            Dict with closed/open contour counts, an open contour report,
+            net and outer area, total cut length and branch point count
+        """
+        if exclude_layers:
+            keep = ~self.layer_mask(exclude_layers)
+        else:
+            keep = np.ones(len(self.layers), dtype=bool)
+
+        lines = self.lines[keep[self.line_layers]] if len(self.lines) else self.lines
+        arcs = self.arcs[keep[self.arc_layers]] if len(self.arcs) else self.arcs
+        circles = self.circles[keep[self.circle_layers]] if len(self.circles) else self.circles
+
+        # Degenerate edges would only add spurious branch points
+        lines = lines[np.hypot(lines[:, 2] - lines[:, 0], lines[:, 3] - lines[:, 1]) > tolerance]
+        arcs = arcs[np.radians(arcs[:, 4]) * arcs[:, 2] > tolerance]
+        circles = circles[circles[:, 2] > tolerance]
+
+        # Edges: endpoints, length and the signed area each contributes when
+        # traversed start -> end (shoelace term plus circular segment for arcs)
+        cx, cy, radius, start, sweep = arcs.T
+        start_rad = np.radians(start)
+        end_rad = np.radians(start + sweep)
+        sweep_rad = np.radians(sweep)
+
+        edge_start = np.vstack([
+            lines[:, 0:2],
+            np.column_stack([cx + radius * np.cos(start_rad), cy + radius * np.sin(start_rad)])
+        ])
+        edge_end = np.vstack([
+            lines[:, 2:4],
+            np.column_stack([cx + radius * np.cos(end_rad), cy + radius * np.sin(end_rad)])
+        ])
+        edge_length = np.concatenate([
+            np.hypot(lines[:, 2] - lines[:, 0], lines[:, 3] - lines[:, 1]),
+            sweep_rad * radius
+        ])
+        edge_area = (edge_start[:, 0] * edge_end[:, 1] - edge_end[:, 0] * edge_start[:, 1]) / 2.0
+        edge_area[len(lines):] += radius * radius * (sweep_rad - np.sin(sweep_rad)) / 2.0
+
+        # Mid points of arcs keep containment polygons faithful to the curve
+        mid_rad = np.radians(start + sweep / 2.0)
+        edge_mid = np.full_like(edge_start, np.nan)
+        edge_mid[len(lines):] = np.column_stack([cx + radius * np.cos(mid_rad), cy + radius * np.sin(mid_rad)])
+
+        node = self._snap_endpoints(edge_start, edge_end, tolerance)
+        partner, branch_points = self._pair_endpoints(node)
+        chain_edges, chain_directions, chain_offsets, chain_closed = self._walk_chains(partner, len(edge_length))
+
+        chain_sizes = np.diff(chain_offsets)
+        chain_starts = chain_offsets[:-1]
+        chain_area = np.add.reduceat(chain_directions * edge_area[chain_edges], chain_starts) \
+            if len(chain_edges) else np.empty(0)
+        chain_length = np.add.reduceat(edge_length[chain_edges], chain_starts) \
+            if len(chain_edges) else np.empty(0)
+
+        # Closed loops become polygons: the entry point of every edge, plus
+        # the mid point of arcs so the polygon follows the curve
+        in_loop = np.repeat(chain_closed, chain_sizes)
+        loop_edges = chain_edges[in_loop]
+        forward = chain_directions[in_loop] > 0
+        entry = np.where(forward[:, None], edge_start[loop_edges], edge_end[loop_edges])
+        points = np.stack([entry, edge_mid[loop_edges]], axis=1).reshape(-1, 2)
+        loop_vertices = points[~np.isnan(points[:, 0])]
+
+        edge_vertex_counts = 1 + (chain_edges >= len(lines)).astype(np.intp)
+        chain_vertex_counts = np.add.reduceat(edge_vertex_counts, chain_starts) \
+            if len(chain_edges) else np.empty(0, dtype=np.intp)
+        loop_offsets = np.concatenate([[0], np.cumsum(chain_vertex_counts[chain_closed])]).astype(np.intp)
+
+        # Circles are closed contours on their own
+        areas = np.concatenate([np.abs(chain_area[chain_closed]), np.pi * circles[:, 2] ** 2])
+        depth = self._nesting_depth(loop_vertices, loop_offsets, circles, areas)
+
+        cut_length = float(edge_length.sum() + (2.0 * np.pi * circles[:, 2]).sum())
+        net_area = float(np.where(depth % 2 == 0, areas, -areas).sum())
+        outer_area = float(areas[depth == 0].sum())
+
+        open_chains = np.nonzero(~chain_closed)[0]
+        open_report = []
+        for chain in open_chains[:MAX_OPEN_CONTOUR_REPORT].tolist():
+            first = chain_offsets[chain]
+            last = chain_offsets[chain + 1] - 1
+            first_edge, last_edge = chain_edges[first], chain_edges[last]
+            chain_start = edge_start[first_edge] if chain_directions[first] > 0 else edge_end[first_edge]
+            chain_end = edge_end[last_edge] if chain_directions[last] > 0 else edge_start[last_edge]
+            open_report.append({
+                'start': [round(float(chain_start[0]), 3), round(float(chain_start[1]), 3)],
+                'end': [round(float(chain_end[0]), 3), round(float(chain_end[1]), 3)],
+                'gap': round(float(np.hypot(*(chain_end - chain_start))), 3),
+                'length': round(float(chain_length[chain]), 3),
+                'segments': int(chain_sizes[chain])
+            })
+
+        return {
+            'closed_contours': len(areas),
+            'open_contours': len(open_chains),
+            'open_contour_report': open_report,
+            'net_area': net_area,
+            'outer_area': outer_area,
+            'cut_length': cut_length,
+            'branch_points': branch_points
+        }
+
+    @staticmethod
+    def _snap_endpoints(edge_start: np.ndarray, edge_end: np.ndarray, tolerance: float) -> np.ndarray:
+        """
+        Assign a node id to every edge end via a spatial hash.
+
+        Ends are numbered 2 * edge (start) and 2 * edge + 1 (end). Points that
+        fall into the same hash cell share a node. Dangling ends that landed
+        just across a cell boundary are merged with a dangling end in a
+        neighbouring cell if they are within tolerance.
+
+        Returns:
+            Node id per edge end
+        """
+        points = np.empty((2 * len(edge_start), 2))
+        points[0::2] = edge_start
+        points[1::2] = edge_end
+
+        if not len(points):
+            return np.empty(0, dtype=np.intp)
+
+        cells = np.round(points / tolerance).astype(np.int64)
+        _, node = np.unique(cells, axis=0, return_inverse=True)
+        node = node.reshape(-1)
+
+        degree = np.bincount(node)
+        dangling = np.nonzero(degree[node] == 1)[0]
+        if len(dangling) > 1:
+            by_cell = {}
+            for end in dangling.tolist():
+                by_cell[(int(cells[end, 0]), int(cells[end, 1]))] = end
+
+            for end in dangling.tolist():
+                if degree[node[end]] != 1:
+                    continue
+                cell_x, cell_y = int(cells[end, 0]), int(cells[end, 1])
+                for offset_x in (-1, 0, 1):
+                    for offset_y in (-1, 0, 1):
+                        other = by_cell.get((cell_x + offset_x, cell_y + offset_y))
+                        if other is None or other == end or degree[node[other]] != 1:
+                            continue
+                        if np.hypot(*(points[end] - points[other])) <= tolerance:
+                            degree[node[other]] = 2
+                            degree[node[end]] = 0
+                            node[end] = node[other]
+                            break
+                    else:
+                        continue
+                    break
+
+        return node
+
+    @staticmethod
+    def _pair_endpoints(node: np.ndarray) -> Tuple[np.ndarray, int]:
+        """
+        Pair edge ends that meet at the same node.
+
+        Nodes with two ends (the normal case) pair them; nodes where more
+        edges meet are paired in order, and a leftover end stays unpaired.
+
+        Returns:
+            Tuple of (partner end per edge end, -1 if unpaired; number of branch points)
+        """
+        partner = np.full(len(node), -1, dtype=np.intp)
+        if not len(node):
+            return partner, 0
+
+        order = np.argsort(node, kind='stable')
+        sorted_node = node[order]
+        index = np.arange(len(order))
+
+        group_start = np.ones(len(order), dtype=bool)
+        group_start[1:] = sorted_node[1:] != sorted_node[:-1]
+        rank = index - np.maximum.accumulate(np.where(group_start, index, 0))
+
+        pair_first = index[:-1][(rank[:-1] % 2 == 0) & (sorted_node[1:] == sorted_node[:-1])]
+        partner[order[pair_first]] = order[pair_first + 1]
+        partner[order[pair_first + 1]] = order[pair_first]
+
+        branch_points = int((np.bincount(node) > 2).sum())
+        return partner, branch_points
+
+    @staticmethod
+    def _walk_chains(partner: np.ndarray, edge_count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Walk paired edge ends into chains.
+
+        Returns:
+            Tuple of flat arrays: edges in walk order, direction per edge
+            (1 = start -> end, -1 = reversed), chain offsets into the edge
+            array, and whether each chain is closed
+        """
+        partner = partner.tolist()
+        visited = [False] * edge_count
+        edges, directions, offsets, closed_flags = [], [], [0], []
+
+        for first in range(edge_count):
+            if visited[first]:
+                continue
+            visited[first] = True
+
+            # Walk forward, leaving through the end of the first edge
+            chain_edges, chain_directions = [first], [1]
+            closed = False
+            end = 2 * first + 1
+            while True:
+                entry = partner[end]
+                if entry < 0:
+                    break
+                if entry == 2 * first:
+                    closed = True
+                    break
+                edge = entry // 2
+                if visited[edge]:
+                    break
+                visited[edge] = True
+                chain_edges.append(edge)
+                chain_directions.append(1 if entry % 2 == 0 else -1)
+                end = entry ^ 1
+
+            # Open chain - extend backwards from the start of the first edge
+            if not closed:
+                back_edges, back_directions = [], []
+                end = 2 * first
+                while True:
+                    entry = partner[end]
+                    if entry < 0:
+                        break
+                    edge = entry // 2
+                    if visited[edge]:
+                        break
+                    visited[edge] = True
+                    back_edges.append(edge)
+                    back_directions.append(1 if entry % 2 == 1 else -1)
+                    end = entry ^ 1
+                chain_edges = back_edges[::-1] + chain_edges
+                chain_directions = back_directions[::-1] + chain_directions
+
+            edges.extend(chain_edges)
+            directions.extend(chain_directions)
+            offsets.append(len(edges))
+            closed_flags.append(closed)
+
+        return (
+            np.asarray(edges, dtype=np.intp),
+            np.asarray(directions, dtype=float),
+            np.asarray(offsets, dtype=np.intp),
+            np.asarray(closed_flags, dtype=bool)
+        )
+
+    @staticmethod
+    def _nesting_depth(
+        loop_vertices: np.ndarray,
+        loop_offsets: np.ndarray,
+        circles: np.ndarray,
+        areas: np.ndarray
+    ) -> np.ndarray:
+        """
+        Count how many contours enclose each contour.
+
+        Contours are the closed loops (flat vertex buffer + offsets) followed
+        by the circles. Candidate containers come from a grid index, then a
+        ray-casting test on one point of the inner contour confirms them -
+        vectorized over every (candidate, container edge) pair.
+
+        Returns:
+            Nesting depth per contour (0 = outer boundary, 1 = hole, ...)
+        """
+        count = len(areas)
+        depth = np.zeros(count, dtype=np.intp)
+        if count < 2:
+            return depth
+
+        loop_count = len(loop_offsets) - 1
+        loop_starts = loop_offsets[:-1]
+        loop_sizes = np.diff(loop_offsets)
+
+        bounds = np.empty((count, 4))
+        test_points = np.empty((count, 2))
+
+        if loop_count:
+            bounds[:loop_count, 0] = np.minimum.reduceat(loop_vertices[:, 0], loop_starts)
+            bounds[:loop_count, 1] = np.minimum.reduceat(loop_vertices[:, 1], loop_starts)
+            bounds[:loop_count, 2] = np.maximum.reduceat(loop_vertices[:, 0], loop_starts)
+            bounds[:loop_count, 3] = np.maximum.reduceat(loop_vertices[:, 1], loop_starts)
+            test_points[:loop_count] = loop_vertices[loop_starts]
+
+        if len(circles):
+            cx, cy, radius = circles.T
+            bounds[loop_count:] = np.column_stack([cx - radius, cy - radius, cx + radius, cy + radius])
+            test_points[loop_count:] = np.column_stack([cx + radius, cy])
+
+        inner, outer = DXFGeometry._containment_candidates(bounds, test_points, areas)
+        if not len(inner):
+            return depth
+
+        contained = np.zeros(len(inner), dtype=bool)
+
+        # Circle containers: distance test
+        in_circle = np.nonzero(outer >= loop_count)[0]
+        if len(in_circle):
+            circle = circles[outer[in_circle] - loop_count]
+            point = test_points[inner[in_circle]]
+            contained[in_circle] = np.hypot(point[:, 0] - circle[:, 0], point[:, 1] - circle[:, 1]) < circle[:, 2]
+
+        # Loop containers: ray casting against every edge of the container
+        in_loop = np.nonzero(outer < loop_count)[0]
+        if len(in_loop):
+            container = outer[in_loop]
+            edge_counts = loop_sizes[container]
+            pair = np.repeat(np.arange(len(in_loop)), edge_counts)
+            local = np.arange(edge_counts.sum()) - np.repeat(np.cumsum(edge_counts) - edge_counts, edge_counts)
+            first_vertex = np.repeat(loop_starts[container], edge_counts)
+
+            x1, y1 = loop_vertices[first_vertex + local].T
+            x2, y2 = loop_vertices[first_vertex + (local + 1) % np.repeat(edge_counts, edge_counts)].T
+            px, py = test_points[inner[in_loop]][pair].T
+
+            crosses = (y1 > py) != (y2 > py)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_cross = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+            hits = crosses & (px < x_cross)
+
+            contained[in_loop] = np.bincount(pair, weights=hits, minlength=len(in_loop)) % 2 == 1
+
+        np.add.at(depth, inner[contained], 1)
+        return depth
+
+    @staticmethod
+    def _containment_candidates(
+        bounds: np.ndarray,
+        test_points: np.ndarray,
+        areas: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find (inner, outer) contour pairs that may be nested.
+
+        Every contour is registered in the grid cells its bounding box
+        covers; a contour is a candidate container for the contours whose
+        test point falls in one of those cells. Pairs are then filtered to a
+        larger container whose bounding box encloses the inner one.
+
+        Returns:
+            Tuple of (inner indexes, outer indexes)
+        """
+        count = len(areas)
+        extent = np.maximum(bounds[:, 2] - bounds[:, 0], bounds[:, 3] - bounds[:, 1])
+        origin = bounds[:, :2].min(axis=0)
+        diagonal = float(np.hypot(*(bounds[:, 2:].max(axis=0) - origin)))
+        cell = max(float(np.median(extent)), diagonal * MIN_GRID_CELL_FRACTION, 1e-9)
+
+        # Grow the cells until large contours don't cover too many of them
+        while True:
+            cell_min = np.floor((bounds[:, :2] - origin) / cell).astype(np.int64)
+            cell_max = np.floor((bounds[:, 2:] - origin) / cell).astype(np.int64)
+            span = cell_max - cell_min + 1
+            cells_per_contour = span[:, 0] * span[:, 1]
+            if cells_per_contour.sum() <= MAX_GRID_REGISTRATIONS_PER_CONTOUR * count:
+                break
+            cell *= 2.0
+
+        grid_width = int(cell_max[:, 0].max()) + 1
+
+        # Register each contour in the cells it covers
+        contour = np.repeat(np.arange(count), cells_per_contour)
+        local = np.arange(cells_per_contour.sum()) - np.repeat(np.cumsum(cells_per_contour) - cells_per_contour, cells_per_contour)
+        span_x = np.repeat(span[:, 0], cells_per_contour)
+        cell_x = np.repeat(cell_min[:, 0], cells_per_contour) + local % span_x
+        cell_y = np.repeat(cell_min[:, 1], cells_per_contour) + local // span_x
+        cell_id = cell_y * grid_width + cell_x
+
+        order = np.argsort(cell_id, kind='stable')
+        cell_id, contour = cell_id[order], contour[order]
+
+        # Look up the cell of every test point
+        point_cell = np.floor((test_points - origin) / cell).astype(np.int64)
+        point_id = point_cell[:, 1] * grid_width + point_cell[:, 0]
+        low = np.searchsorted(cell_id, point_id, side='left')
+        high = np.searchsorted(cell_id, point_id, side='right')
+        matches = high - low
+
+        inner = np.repeat(np.arange(count), matches)
+        local = np.arange(matches.sum()) - np.repeat(np.cumsum(matches) - matches, matches)
+        outer = contour[np.repeat(low, matches) + local]
+
+        keep = (
+            (areas[inner] < areas[outer]) &
+            (bounds[inner, 0] >= bounds[outer, 0]) &
+            (bounds[inner, 1] >= bounds[outer, 1]) &
+            (bounds[inner, 2] <= bounds[outer, 2]) &
+            (bounds[inner, 3] <= bounds[outer, 3])
+        )
+        return inner[keep], outer[keep]
@@ -4,7 +4,6 @@ Extracts metadata from DXF files using ezdxf
 """
 
 import ezdxf
-from ezdxf.math import Vec3
 import re
 import logging
 from typing import Dict, Any, List, Optional, Tuple
@@ -18,6 +17,7 @@ from ..models.schemas import (
     MATERIAL_MAP,
     MATERIAL_CODE_MAP
 )
+from .dxf_geometry import DXFGeometry
 
 logger = logging.getLogger(__name__)
 
@@ -25,11 +25,17 @@ logger = logging.getLogger(__name__)
 class DXFParser:
     """Parser for DXF files using ezdxf library."""
     
+    # Bump when extraction output changes (invalidates cached parse results)
+    PARSER_VERSION = "1.2.2"
+    
     # Common layer name patterns for detecting features
     OUTLINE_LAYERS = ['OUTLINE', 'CUT', 'PERIMETER', 'BORDER', 'EDGE']
     HOLE_LAYERS = ['HOLES', 'HOLE', 'DRILL', 'BORE']
     TEXT_LAYERS = ['NOTES', 'TEXT', 'ANNOTATION', 'LABEL']
     
+    # Layers that are never cut (left out of contour assembly and cut length)
+    NON_CUT_LAYERS = TEXT_LAYERS + ['CENTER', 'DIM', 'DEFPOINTS']
+    
     # Material detection patterns in layer names or text
     # Order matters - more specific patterns first to avoid false matches
     MATERIAL_PATTERNS = {
@@ -62,35 +68,8 @@ class DXFParser:
         logger.info(f"Parsing DXF file: {filename}")
         
         try:
-            # Read DXF file
-            doc = ezdxf.readfile(file_path)
-            msp = doc.modelspace()
-            
-            # Extract DXF-specific metadata
-            dxf_meta = self._extract_dxf_metadata(doc, msp)
-            
-            # Parse filename for metadata hints
-            filename_meta = self._parse_filename(filename)
-            
-            # Enhance metadata from DXF content
-            enhanced_meta = self._enhance_from_dxf(filename_meta, dxf_meta)
-            
-            # Set client and project codes if provided
-            if client_code:
-                enhanced_meta.client_code = client_code
-            if project_code:
-                enhanced_meta.project_code = project_code
-            
-            # Add DXF metadata to extracted field
-            enhanced_meta.extracted = dxf_meta.model_dump()
-            enhanced_meta.detected_type = FileType.DXF
-            enhanced_meta.source_file = filename
-            
-            # Calculate confidence score
-            enhanced_meta.confidence_score = self._calculate_confidence(enhanced_meta, dxf_meta)
-            
-            logger.info(f"DXF parsing complete. Confidence: {enhanced_meta.confidence_score:.2f}")
-            return enhanced_meta
+            content = self.extract_content(file_path)
+            return self.build_metadata(content, file_path, filename, client_code, project_code)
             
         except ezdxf.DXFStructureError as e:
             logger.error(f"DXF structure error: {str(e)}")
@@ -99,6 +78,67 @@ class DXFParser:
             logger.error(f"DXF parsing error: {str(e)}", exc_info=True)
             raise ValueError(f"Failed to parse DXF: {str(e)}")
     
+    def extract_content(self, file_path: str) -> Dict[str, Any]:
+        """
+        Extract content-derived metadata from a DXF file.
+        
+        This is the expensive part of parsing and depends only on the file
+        bytes, so the result can be cached by content hash.
+        
+        Args:
+            file_path: Full path to DXF file
+        
+        Returns:
+            DXFMetadata as a JSON-serializable dict
+        """
+        # Read DXF file
+        doc = ezdxf.readfile(file_path)
+        msp = doc.modelspace()
+        
+        # Extract DXF-specific metadata
+        return self._extract_dxf_metadata(doc, msp).model_dump()
+    
+    def build_metadata(self, content: Dict[str, Any], file_path: str, filename: str,
+                       client_code: Optional[str] = None,
+                       project_code: Optional[str] = None) -> NormalizedMetadata:
+        """
+        Combine extracted DXF content with filename-derived metadata.
+        
+        Args:
+            content: Result of extract_content()
+            file_path: Full path to DXF file
+            filename: Original filename
+            client_code: Optional client code
+            project_code: Optional project code
+        
+        Returns:
+            NormalizedMetadata object with extracted data
+        """
+        dxf_meta = DXFMetadata(**content)
+        
+        # Parse filename for metadata hints
+        filename_meta = self._parse_filename(filename)
+        
+        # Enhance metadata from DXF content
+        enhanced_meta = self._enhance_from_dxf(filename_meta, dxf_meta)
+        
+        # Set client and project codes if provided
+        if client_code:
+            enhanced_meta.client_code = client_code
+        if project_code:
+            enhanced_meta.project_code = project_code
+        
+        # Add DXF metadata to extracted field
+        enhanced_meta.extracted = dxf_meta.model_dump()
+        enhanced_meta.detected_type = FileType.DXF
+        enhanced_meta.source_file = filename
+        
+        # Calculate confidence score
+        enhanced_meta.confidence_score = self._calculate_confidence(enhanced_meta, dxf_meta)
+        
+        logger.info(f"DXF parsing complete. Confidence: {enhanced_meta.confidence_score:.2f}")
+        return enhanced_meta
+    
     def _extract_dxf_metadata(self, doc, msp) -> DXFMetadata:
         """Extract DXF-specific metadata from document."""
         metadata = DXFMetadata()
@@ -111,82 +151,51 @@ class DXFParser:
             metadata.layers = [layer.dxf.name for layer in doc.layers]
             logger.debug(f"Found {len(metadata.layers)} layers: {metadata.layers}")
             
-            # Count entities by type
-            entity_counts = {}
-            text_notes = []
-            holes = []
+            # Collect all geometry in a single modelspace traversal
+            geometry = DXFGeometry.from_modelspace(msp)
             
-            for entity in msp:
-                entity_type = entity.dxftype()
-                entity_counts[entity_type] = entity_counts.get(entity_type, 0) + 1
-                
-                # Extract text notes
-                if entity_type in ['TEXT', 'MTEXT']:
-                    try:
-                        text = entity.dxf.text if hasattr(entity.dxf, 'text') else ''
-                        if text and text.strip():
-                            text_notes.append(text.strip())
-                    except:
-                        pass
-                
-                # Detect holes (circles on hole layers)
-                if entity_type == 'CIRCLE':
-                    try:
-                        layer_name = entity.dxf.layer.upper() if hasattr(entity.dxf, 'layer') else ''
-                        is_hole_layer = any(hole_layer in layer_name for hole_layer in self.HOLE_LAYERS)
-                        
-                        radius = entity.dxf.radius
-                        diameter = radius * 2
-                        center = entity.dxf.center
-                        
-                        holes.append({
-                            'diameter': round(diameter, 2),
-                            'center_x': round(center.x, 2),
-                            'center_y': round(center.y, 2),
-                            'layer': entity.dxf.layer,
-                            'is_hole_layer': is_hole_layer
-                        })
-                    except:
-                        pass
-            
-            metadata.entity_counts = entity_counts
-            metadata.text_notes = text_notes
-            metadata.holes = holes
+            metadata.entity_counts = geometry.entity_counts
+            metadata.text_notes = geometry.text_notes
+            metadata.holes = geometry.holes(self.HOLE_LAYERS)
+            metadata.hole_stats = geometry.hole_stats(self.HOLE_LAYERS)
             
-            logger.debug(f"Entity counts: {entity_counts}")
-            logger.debug(f"Found {len(text_notes)} text notes")
-            logger.debug(f"Found {len(holes)} circles (potential holes)")
+            logger.debug(f"Entity counts: {geometry.entity_counts}")
+            logger.debug(f"Found {len(metadata.text_notes)} text notes")
+            logger.debug(f"Found {len(metadata.holes)} circles (potential holes)")
             
             # Calculate bounding box and dimensions
-            try:
-                extents = msp.extents()
-                if extents:
-                    min_x, min_y = extents.extmin.x, extents.extmin.y
-                    max_x, max_y = extents.extmax.x, extents.extmax.y
-                    
-                    metadata.bounding_box = {
-                        'min_x': round(min_x, 2),
-                        'min_y': round(min_y, 2),
-                        'max_x': round(max_x, 2),
-                        'max_y': round(max_y, 2),
-                        'width': round(max_x - min_x, 2),
-                        'height': round(max_y - min_y, 2)
-                    }
-                    
-                    logger.debug(f"Bounding box: {metadata.bounding_box['width']}mm x {metadata.bounding_box['height']}mm")
-            except Exception as e:
-                logger.warning(f"Could not calculate bounding box: {str(e)}")
+            metadata.bounding_box = self._box_dict(geometry.extents())
+            if metadata.bounding_box:
+                logger.debug(f"Bounding box: {metadata.bounding_box['width']}mm x {metadata.bounding_box['height']}mm")
+            
+            # Part size: cut geometry only, without dimensions or notes around it
+            metadata.cut_bounding_box = self._box_dict(geometry.extents(exclude_layers=self.NON_CUT_LAYERS))
             
             # Calculate perimeter (from outline layers)
-            perimeter = self._calculate_perimeter(msp)
+            perimeter = geometry.cut_length(self.OUTLINE_LAYERS)
             if perimeter > 0:
                 metadata.perimeter_mm = round(perimeter, 2)
                 logger.debug(f"Perimeter: {metadata.perimeter_mm}mm")
             
-            # Calculate approximate area
-            if metadata.bounding_box:
+            # Assemble contours for true area, cut length and pierce count
+            contours = geometry.assemble_contours(exclude_layers=self.NON_CUT_LAYERS)
+            metadata.cut_length_mm = round(contours['cut_length'], 2)
+            metadata.pierce_count = contours['closed_contours']
+            metadata.open_contour_count = contours['open_contours']
+            metadata.open_contours = contours['open_contour_report']
+            
+            logger.debug(
+                f"Contours: {contours['closed_contours']} closed, {contours['open_contours']} open, "
+                f"cut length {metadata.cut_length_mm}mm"
+            )
+            
+            # Net area (outer minus holes), falling back to the part's bounding
+            # box when the drawing has no closed contours
+            if contours['closed_contours']:
+                metadata.area_mm2 = round(contours['net_area'], 2)
+            elif metadata.cut_bounding_box:
                 metadata.area_mm2 = round(
-                    metadata.bounding_box['width'] * metadata.bounding_box['height'], 2
+                    metadata.cut_bounding_box['width'] * metadata.cut_bounding_box['height'], 2
                 )
             
         except Exception as e:
@@ -194,57 +203,21 @@ class DXFParser:
         
         return metadata
     
-    def _calculate_perimeter(self, msp) -> float:
-        """Calculate perimeter from outline entities."""
-        perimeter = 0.0
-        
-        try:
-            for entity in msp:
-                layer_name = entity.dxf.layer.upper() if hasattr(entity.dxf, 'layer') else ''
-                is_outline = any(outline in layer_name for outline in self.OUTLINE_LAYERS)
-                
-                if not is_outline:
-                    continue
-                
-                entity_type = entity.dxftype()
-                
-                if entity_type == 'LINE':
-                    start = Vec3(entity.dxf.start)
-                    end = Vec3(entity.dxf.end)
-                    perimeter += start.distance(end)
-                
-                elif entity_type == 'CIRCLE':
-                    radius = entity.dxf.radius
-                    perimeter += 2 * 3.14159 * radius
-                
-                elif entity_type == 'ARC':
-                    radius = entity.dxf.radius
-                    start_angle = entity.dxf.start_angle
-                    end_angle = entity.dxf.end_angle
-                    angle_diff = abs(end_angle - start_angle)
-                    perimeter += (angle_diff / 360.0) * 2 * 3.14159 * radius
-                
-                elif entity_type in ['LWPOLYLINE', 'POLYLINE']:
-                    try:
-                        points = list(entity.get_points())
-                        for i in range(len(points) - 1):
-                            p1 = Vec3(points[i][:2])
-                            p2 = Vec3(points[i+1][:2])
-                            perimeter += p1.distance(p2)
-                        
-                        # Close the polyline if needed
-                        if entity.is_closed:
-                            p1 = Vec3(points[-1][:2])
-                            p2 = Vec3(points[0][:2])
-                            perimeter += p1.distance(p2)
-                    except:
-                        pass
-        
-        except Exception as e:
-            logger.warning(f"Error calculating perimeter: {str(e)}")
-
-        return perimeter
-
+    @staticmethod
+    def _box_dict(extents: Optional[Tuple[float, float, float, float]]) -> Optional[Dict[str, float]]:
+        """Bounding box dict of DXFGeometry.extents(), or None without geometry"""
+        if not extents:
+            return None
+        min_x, min_y, max_x, max_y = extents
+        return {
+            'min_x': round(min_x, 2),
+            'min_y': round(min_y, 2),
+            'max_x': round(max_x, 2),
+            'max_y': round(max_y, 2),
+            'width': round(max_x - min_x, 2),
+            'height': round(max_y - min_y, 2)
+        }
+    
     def _parse_filename(self, filename: str) -> NormalizedMetadata:
         """
         Parse filename to extract metadata hints.
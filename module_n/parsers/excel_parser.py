@@ -1,14 +1,16 @@
 """
 Module N - Excel Parser
-Extracts metadata from Excel files (.xlsx and .xls) using pandas
+Extracts metadata from Excel files (.xlsx with openpyxl in read-only mode, .xls with pandas)
 """
 
 import pandas as pd
 import re
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+import zipfile
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 from decimal import Decimal
+from openpyxl import load_workbook
 
 from ..models.schemas import (
     ExcelMetadata,
@@ -22,7 +24,10 @@ logger = logging.getLogger(__name__)
 
 
 class ExcelParser:
-    """Parser for Excel files (.xlsx and .xls) using pandas."""
+    """Parser for Excel files (.xlsx and .xls) using openpyxl and pandas."""
+    
+    # Bump when extraction output changes (invalidates cached parse results)
+    PARSER_VERSION = "1.1.0"
     
     # Material detection patterns (reuse from DXF/PDF parsers)
     MATERIAL_PATTERNS = {
@@ -86,80 +91,237 @@ class ExcelParser:
             NormalizedMetadata object with extracted data
         """
         try:
-            # Read Excel file
-            excel_file = pd.ExcelFile(file_path)
-            
-            # Extract Excel-specific metadata
-            excel_meta = self._extract_excel_metadata(excel_file, file_path)
-            
-            # Parse filename for metadata
-            filename_meta = self._parse_filename(filename)
-            
-            # Enhance metadata from Excel content
-            enhanced_meta = self._enhance_from_excel(excel_meta, filename_meta)
-            
-            # Override with provided codes
-            if client_code:
-                enhanced_meta.client_code = client_code
-            if project_code:
-                enhanced_meta.project_code = project_code
-            
-            # Add Excel metadata to extracted field
-            enhanced_meta.extracted = {
-                'sheet_names': excel_meta.get('sheet_names', []),
-                'sheet_count': excel_meta.get('sheet_count', 0),
-                'row_count': excel_meta.get('row_count', 0),
-                'column_count': excel_meta.get('column_count', 0),
-                'headers': excel_meta.get('headers', []),
-                'data_rows': excel_meta.get('data_rows', []),
-                'detected_schema': excel_meta.get('detected_schema', 'unknown'),
-                'column_mapping': excel_meta.get('column_mapping', {}),
-            }
-            
-            # Calculate confidence score
-            enhanced_meta.confidence_score = self._calculate_confidence(enhanced_meta)
-            
-            # Set file type
-            enhanced_meta.detected_type = FileType.EXCEL
-            enhanced_meta.source_file = filename
+            content = self.extract_content(file_path)
+            return self.build_metadata(content, file_path, filename, client_code, project_code)
             
-            # Get file size
-            enhanced_meta.file_size = Path(file_path).stat().st_size
-            enhanced_meta.mime_type = self._get_mime_type(filename)
+        except Exception as e:
+            logger.error(f"Failed to parse Excel {filename}: {str(e)}")
+            raise ValueError(f"Failed to parse Excel: {str(e)}")
+    
+    def extract_content(self, file_path: str) -> Dict[str, Any]:
+        """
+        Extract content-derived metadata from an Excel file.
+        
+        This is the expensive part of parsing and depends only on the file
+        bytes, so the result can be cached by content hash.
+        
+        Args:
+            file_path: Path to the Excel file
             
+        Returns:
+            Dict of Excel metadata (sheets, headers, data rows, schema)
+        """
+        if zipfile.is_zipfile(file_path):
+            # .xlsx: stream rows straight from the sheet XML, never loading whole sheets
+            workbook = load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                sheets = (
+                    (name,) + self._open_xlsx_sheet(workbook[name])
+                    for name in workbook.sheetnames
+                )
+                return self._extract_excel_metadata(workbook.sheetnames, sheets)
+            finally:
+                workbook.close()
+        
+        # Legacy .xls: xlrd has no streaming API, so the workbook is read by pandas
+        excel_file = pd.ExcelFile(file_path)
+        try:
+            sheets = (
+                (name, self._iter_xls_rows(excel_file, name), None)
+                for name in excel_file.sheet_names
+            )
+            return self._extract_excel_metadata(excel_file.sheet_names, sheets)
+        finally:
             excel_file.close()
+    
+    def build_metadata(self, content: Dict[str, Any], file_path: str, filename: str,
+                       client_code: Optional[str] = None,
+                       project_code: Optional[str] = None) -> NormalizedMetadata:
+        """
+        Combine extracted Excel content with filename-derived metadata.
+        
+        Args:
+            content: Result of extract_content()
+            file_path: Path to the Excel file
+            filename: Original filename
+            client_code: Optional client code override
+            project_code: Optional project code override
             
-            logger.info(f"Excel parsed successfully: {filename} (confidence: {enhanced_meta.confidence_score:.2f})")
-            return enhanced_meta
+        Returns:
+            NormalizedMetadata object with extracted data
+        """
+        excel_meta = content
+        
+        # Parse filename for metadata
+        filename_meta = self._parse_filename(filename)
+        
+        # Enhance metadata from Excel content
+        enhanced_meta = self._enhance_from_excel(excel_meta, filename_meta)
+        
+        # Override with provided codes
+        if client_code:
+            enhanced_meta.client_code = client_code
+        if project_code:
+            enhanced_meta.project_code = project_code
+        
+        # Add Excel metadata to extracted field
+        enhanced_meta.extracted = {
+            'sheet_names': excel_meta.get('sheet_names', []),
+            'sheet_count': excel_meta.get('sheet_count', 0),
+            'row_count': excel_meta.get('row_count', 0),
+            'column_count': excel_meta.get('column_count', 0),
+            'headers': excel_meta.get('headers', []),
+            'data_rows': excel_meta.get('data_rows', []),
+            'detected_schema': excel_meta.get('detected_schema', 'unknown'),
+            'column_mapping': excel_meta.get('column_mapping', {}),
+        }
+        
+        # Calculate confidence score
+        enhanced_meta.confidence_score = self._calculate_confidence(enhanced_meta)
+        
+        # Set file type
+        enhanced_meta.detected_type = FileType.EXCEL
+        enhanced_meta.source_file = filename
+        
+        # Get file size
+        enhanced_meta.file_size = Path(file_path).stat().st_size
+        enhanced_meta.mime_type = self._get_mime_type(filename)
+        
+        logger.info(f"Excel parsed successfully: {filename} (confidence: {enhanced_meta.confidence_score:.2f})")
+        return enhanced_meta
+    
+    @staticmethod
+    def _open_xlsx_sheet(worksheet) -> Tuple[Iterator[tuple], Optional[int]]:
+        """
+        Open a read-only worksheet for streaming.
+        
+        Returns:
+            Tuple of (row value iterator, last row from the sheet dimension or None)
+        """
+        # Chart sheets have no cells
+        if not hasattr(worksheet, 'iter_rows'):
+            return iter(()), None
+        
+        # Some writers store a wrong dimension; keep it only as a row count hint
+        max_row = worksheet.max_row
+        worksheet.reset_dimensions()
+        return worksheet.iter_rows(values_only=True), max_row
+    
+    @staticmethod
+    def _iter_xls_rows(excel_file: pd.ExcelFile, sheet_name: str) -> Iterator[tuple]:
+        """Yield cell values row by row from a legacy .xls sheet."""
+        df = excel_file.parse(sheet_name, header=None)
+        for row in df.itertuples(index=False, name=None):
+            yield tuple(None if pd.isna(value) else value for value in row)
+    
+    def _read_sheet_sample(self, rows: Iterable[tuple],
+                           max_row: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Read the header row and the first MAX_DATA_ROWS data rows of a sheet.
+        
+        Blank rows are skipped. When the sheet has more rows than the sample,
+        the row count comes from the sheet dimension (max_row) if it is
+        plausible; otherwise the remaining rows are counted without being kept.
+        
+        Args:
+            rows: Iterator of row value tuples
+            max_row: Last used row number from the sheet dimension, if known
             
-        except Exception as e:
-            logger.error(f"Failed to parse Excel {filename}: {str(e)}")
-            raise ValueError(f"Failed to parse Excel: {str(e)}")
+        Returns:
+            Dict with headers, data_rows, row_count and column_count,
+            or None if the sheet has no data rows
+        """
+        rows = iter(rows)
+        
+        # Header: first non-blank row
+        header_row = None
+        header_number = 0
+        for header_number, row in enumerate(rows, start=1):
+            if any(value is not None for value in row):
+                header_row = row
+                break
+        if header_row is None:
+            return None
+        
+        sample = []
+        for row in rows:
+            if any(value is not None for value in row):
+                sample.append(row)
+                if len(sample) == self.MAX_DATA_ROWS:
+                    break
+        if not sample:
+            return None
+        
+        if len(sample) < self.MAX_DATA_ROWS:
+            row_count = len(sample)
+        elif max_row and max_row - header_number > len(sample):
+            row_count = max_row - header_number
+        else:
+            row_count = len(sample) + sum(1 for row in rows if any(value is not None for value in row))
+        
+        # Trailing empty columns are dropped; columns without a header are named like pandas does
+        column_count = max(
+            max((i + 1 for i, value in enumerate(row) if value is not None), default=0)
+            for row in [header_row] + sample
+        )
+        headers = []
+        seen = {}
+        for i in range(column_count):
+            value = header_row[i] if i < len(header_row) else None
+            header = f"Unnamed: {i}" if value is None else str(value)
+            if header in seen:
+                seen[header] += 1
+                header = f"{header}.{seen[header]}"
+            else:
+                seen[header] = 0
+            headers.append(header)
+        
+        data_rows = [
+            {
+                header: None if i >= len(row) or row[i] is None else str(row[i])
+                for i, header in enumerate(headers)
+            }
+            for row in sample
+        ]
+        
+        return {
+            'headers': headers,
+            'data_rows': data_rows,
+            'row_count': row_count,
+            'column_count': column_count,
+        }
     
-    def _extract_excel_metadata(self, excel_file: pd.ExcelFile, file_path: str) -> Dict[str, Any]:
-        """Extract Excel-specific metadata from workbook."""
+    def _extract_excel_metadata(self, sheet_names: List[str],
+                                sheets: Iterable[Tuple[str, Iterable[tuple], Optional[int]]]) -> Dict[str, Any]:
+        """
+        Extract Excel-specific metadata from workbook.
+        
+        Args:
+            sheet_names: Names of all sheets in the workbook
+            sheets: Lazily opened (sheet name, row iterator, max row) tuples
+            
+        Returns:
+            Dict of Excel metadata
+        """
         metadata = {}
         
         try:
-            # Get sheet names
-            sheet_names = excel_file.sheet_names
-            metadata['sheet_names'] = sheet_names
+            metadata['sheet_names'] = list(sheet_names)
             metadata['sheet_count'] = len(sheet_names)
             
             # Read first sheet (or first non-empty sheet)
-            df = None
-            for sheet_name in sheet_names:
+            sheet = None
+            for sheet_name, rows, max_row in sheets:
                 try:
-                    temp_df = excel_file.parse(sheet_name)
-                    if not temp_df.empty:
-                        df = temp_df
-                        metadata['active_sheet'] = sheet_name
-                        break
+                    sheet = self._read_sheet_sample(rows, max_row)
                 except Exception as e:
                     logger.warning(f"Could not read sheet '{sheet_name}': {str(e)}")
                     continue
+                if sheet is not None:
+                    metadata['active_sheet'] = sheet_name
+                    break
             
-            if df is None or df.empty:
+            if sheet is None:
                 logger.warning("No readable data found in Excel file")
                 metadata['row_count'] = 0
                 metadata['column_count'] = 0
@@ -168,27 +330,11 @@ class ExcelParser:
                 metadata['detected_schema'] = 'empty'
                 return metadata
             
-            # Get dimensions
-            metadata['row_count'] = len(df)
-            metadata['column_count'] = len(df.columns)
-            
-            # Get headers (column names)
-            headers = [str(col) for col in df.columns]
+            headers = sheet['headers']
+            data_rows = sheet['data_rows']
+            metadata['row_count'] = sheet['row_count']
+            metadata['column_count'] = sheet['column_count']
             metadata['headers'] = headers
-            
-            # Extract data rows (limited for performance)
-            data_rows = []
-            for idx, row in df.head(self.MAX_DATA_ROWS).iterrows():
-                row_dict = {}
-                for col in df.columns:
-                    value = row[col]
-                    # Convert to string, handle NaN
-                    if pd.isna(value):
-                        row_dict[str(col)] = None
-                    else:
-                        row_dict[str(col)] = str(value)
-                data_rows.append(row_dict)
-            
             metadata['data_rows'] = data_rows
             
             # Detect schema/structure
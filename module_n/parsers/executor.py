@@ -0,0 +1,493 @@
+"""
+Module N - Parser Executor
+Runs file parsers in a bounded process pool so parsing never blocks the event loop
+"""
+
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import settings
+from ..metrics import get_metrics
+from ..models.schemas import NormalizedMetadata
+from .cache import ParseCache, get_parse_cache
+
+logger = logging.getLogger(__name__)
+
+
+# File type aliases accepted by detect_file_type() / the ingest mode parameter
+PARSER_TYPE_ALIASES = {
+    'dxf': 'dxf',
+    'pdf': 'pdf',
+    'excel': 'excel',
+    'xlsx': 'excel',
+    'xls': 'excel',
+    'lbrn2': 'lbrn2',
+    'lbrn': 'lbrn2',
+    'image': 'image',
+    'png': 'image',
+    'jpg': 'image',
+    'jpeg': 'image',
+    'bmp': 'image',
+    'tiff': 'image',
+    'tif': 'image',
+    'gif': 'image',
+}
+
+# Parser types that run in the dedicated OCR pool instead of the general pool
+OCR_PARSER_TYPES = {'image'}
+
+# Human readable parser labels (used in error messages)
+PARSER_LABELS = {
+    'dxf': 'DXF',
+    'pdf': 'PDF',
+    'excel': 'Excel',
+    'lbrn2': 'LightBurn',
+    'image': 'Image',
+}
+
+def resolve_parser_type(file_type: str) -> Optional[str]:
+    """
+    Map a detected file type (or processing mode) to a parser type.
+
+    Args:
+        file_type: File type from detect_file_type() or the ingest mode
+
+    Returns:
+        Parser type ('dxf', 'pdf', 'excel', 'lbrn2', 'image') or None if unsupported
+    """
+    if not file_type:
+        return None
+    return PARSER_TYPE_ALIASES.get(file_type.lower())
+
+
+def get_parser_class(parser_type: str):
+    """
+    Get the parser class for a parser type.
+
+    Imported lazily so worker processes only pay for the imports they use.
+    """
+    if parser_type == 'dxf':
+        from .dxf_parser import DXFParser
+        return DXFParser
+    if parser_type == 'pdf':
+        from .pdf_parser import PDFParser
+        return PDFParser
+    if parser_type == 'excel':
+        from .excel_parser import ExcelParser
+        return ExcelParser
+    if parser_type == 'lbrn2':
+        from .lbrn_parser import LBRNParser
+        return LBRNParser
+    if parser_type == 'image':
+        from .image_parser import ImageParser
+        return ImageParser
+    raise ValueError(f"No parser available for file type: {parser_type}")
+
+
+def run_parser(
+    parser_type: str,
+    file_path: str,
+    filename: str,
+    client_code: Optional[str] = None,
+    project_code: Optional[str] = None,
+    parser_options: Optional[Dict[str, Any]] = None
+) -> NormalizedMetadata:
+    """
+    Run a parser synchronously.
+
+    This is the function submitted to the worker pool, so it must stay a
+    module-level function (picklable) and only take/return picklable values.
+
+    Args:
+        parser_type: Parser type ('dxf', 'pdf', 'excel', 'lbrn2', 'image')
+        file_path: Path to the file on disk
+        filename: Original filename
+        client_code: Optional client code
+        project_code: Optional project code
+        parser_options: Optional parser constructor arguments (e.g. extract_tables for PDFs)
+
+    Returns:
+        NormalizedMetadata object with extracted data
+    """
+    parser = get_parser_class(parser_type)(**(parser_options or {}))
+    return parser.parse(file_path, filename, client_code, project_code)
+
+
+def run_extraction(
+    parser_type: str,
+    file_path: str,
+    filename: str,
+    client_code: Optional[str] = None,
+    project_code: Optional[str] = None,
+    parser_options: Optional[Dict[str, Any]] = None
+) -> Tuple[NormalizedMetadata, Dict[str, Any]]:
+    """
+    Run a parser synchronously and also return its cacheable content.
+
+    Same contract as run_parser(), used when the result will be stored in
+    the parse cache.
+
+    Returns:
+        Tuple of (NormalizedMetadata, output of parser.extract_content())
+    """
+    parser = get_parser_class(parser_type)(**(parser_options or {}))
+    try:
+        content = parser.extract_content(file_path)
+        metadata = parser.build_metadata(content, file_path, filename, client_code, project_code)
+    except Exception as e:
+        logger.error(f"Failed to parse {PARSER_LABELS[parser_type]} {filename}: {str(e)}")
+        raise ValueError(f"Failed to parse {PARSER_LABELS[parser_type]}: {str(e)}")
+    return metadata, content
+
+
+def run_build_metadata(
+    parser_type: str,
+    content: Dict[str, Any],
+    file_path: str,
+    filename: str,
+    client_code: Optional[str] = None,
+    project_code: Optional[str] = None,
+    parser_options: Optional[Dict[str, Any]] = None
+) -> NormalizedMetadata:
+    """
+    Build metadata from content extracted in stages (see run_extraction()).
+
+    Returns:
+        NormalizedMetadata object with extracted data
+    """
+    parser = get_parser_class(parser_type)(**(parser_options or {}))
+    try:
+        return parser.build_metadata(content, file_path, filename, client_code, project_code)
+    except Exception as e:
+        logger.error(f"Failed to parse {PARSER_LABELS[parser_type]} {filename}: {str(e)}")
+        raise ValueError(f"Failed to parse {PARSER_LABELS[parser_type]}: {str(e)}")
+
+
+def run_page_ranges(file_path: str, max_ranges: int):
+    """Page ranges a PDF is read in (see pdf_parser.get_page_ranges)"""
+    from .pdf_parser import get_page_ranges
+    return get_page_ranges(file_path, max_ranges)
+
+
+def run_page_read(file_path: str, start: int, stop: int):
+    """Read one page range of a PDF (see pdf_parser.read_pages)"""
+    from .pdf_parser import read_pages
+    return read_pages(file_path, start, stop)
+
+
+def run_document_content(file_path: str, table_pages, parser_options: Optional[Dict[str, Any]] = None):
+    """Document info and tables of a PDF read in page ranges (see PDFParser.extract_document_content)"""
+    from .pdf_parser import PDFParser
+    return PDFParser(**(parser_options or {})).extract_document_content(file_path, table_pages)
+
+
+def init_worker():
+    """Worker process initializer: don't reuse database connections from the parent"""
+    from ..db.operations import dispose_engine_after_fork
+    dispose_engine_after_fork()
+
+
+class ParserExecutor:
+    """
+    Parser execution engine.
+
+    Parsing is CPU bound (ezdxf, PyMuPDF, pandas, Tesseract), so it runs in a
+    ProcessPoolExecutor. A semaphore per parser type bounds how many files of
+    each type are parsed at once, so e.g. OCR jobs cannot starve DXF uploads.
+    Image parsing (Tesseract OCR) additionally runs in its own small pool of
+    OCR_WORKERS processes, so slow OCR never occupies general parser workers.
+
+    Long PDFs are read in page ranges spread over the same pool and put
+    together here, so no worker ever starts a pool of its own.
+
+    When the caller passes the file's SHA-256, results are looked up in (and
+    stored to) the parse cache, so re-uploaded files skip the worker pool.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        ocr_workers: Optional[int] = None,
+        concurrency_limits: Optional[Dict[str, int]] = None,
+        use_processes: Optional[bool] = None,
+        cache: Optional[ParseCache] = None
+    ):
+        """
+        Initialize parser executor.
+
+        Args:
+            max_workers: Number of worker processes (default: from settings, 0 = CPU count)
+            ocr_workers: Number of OCR worker processes (default: from settings)
+            concurrency_limits: Max concurrent parses per parser type (default: from settings)
+            use_processes: Use a process pool (True) or thread pool (False) (default: from settings)
+            cache: Parse result cache (default: global parse cache)
+        """
+        if max_workers is None:
+            max_workers = settings.PARSER_POOL_WORKERS
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.ocr_workers = max(1, settings.OCR_WORKERS if ocr_workers is None else ocr_workers)
+
+        self.concurrency_limits = dict(concurrency_limits or settings.PARSER_CONCURRENCY_LIMITS)
+        self.use_processes = settings.PARSER_POOL_ENABLED if use_processes is None else use_processes
+
+        self._cache = cache
+        self._pool: Optional[Executor] = None
+        self._ocr_pool: Optional[Executor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+
+    @property
+    def cache(self) -> ParseCache:
+        """Parse result cache used by this executor"""
+        if self._cache is None:
+            self._cache = get_parse_cache()
+        return self._cache
+
+    def _create_pool(self, ocr: bool = False) -> Executor:
+        """Create the underlying worker pool (or the OCR pool)"""
+        workers = self.ocr_workers if ocr else self.max_workers
+        if self.use_processes:
+            return ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+        prefix = "module-n-ocr" if ocr else "module-n-parser"
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix=prefix)
+
+    def start(self):
+        """Start the worker pools"""
+        if self._pool is None:
+            self._pool = self._create_pool()
+            self._ocr_pool = self._create_pool(ocr=True)
+            logger.info(
+                f"Parser executor started ({'processes' if self.use_processes else 'threads'}: "
+                f"{self.max_workers}, OCR: {self.ocr_workers}, limits: {self.concurrency_limits})"
+            )
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the worker pools"""
+        if self._pool is not None:
+            for pool in (self._pool, self._ocr_pool):
+                if pool is not None:
+                    pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+            self._ocr_pool = None
+            logger.info("Parser executor stopped")
+        self._semaphores = {}
+
+    def _pool_for(self, parser_type: str) -> Executor:
+        """Worker pool that runs a parser type"""
+        return self._ocr_pool if parser_type in OCR_PARSER_TYPES else self._pool
+
+    def _restart_pool(self, broken_pool: Executor, parser_type: Optional[str] = None):
+        """
+        Replace a broken worker pool (keeps the concurrency semaphores).
+
+        Every parse in flight on a broken pool fails together; only the first
+        one replaces it, so the others don't shut down the new pool that
+        later parses already use.
+        """
+        if parser_type in OCR_PARSER_TYPES:
+            if self._ocr_pool is not broken_pool:
+                return
+            self._ocr_pool = self._create_pool(ocr=True)
+        else:
+            if self._pool is not broken_pool:
+                return
+            self._pool = self._create_pool()
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _get_semaphore(self, parser_type: str) -> asyncio.Semaphore:
+        """Get (or lazily create) the concurrency semaphore for a parser type"""
+        semaphore = self._semaphores.get(parser_type)
+        if semaphore is None:
+            limit = self.concurrency_limits.get(parser_type) or self.max_workers
+            semaphore = asyncio.Semaphore(max(1, limit))
+            self._semaphores[parser_type] = semaphore
+        return semaphore
+
+    async def parse(
+        self,
+        parser_type: str,
+        file_path: str,
+        filename: str,
+        client_code: Optional[str] = None,
+        project_code: Optional[str] = None,
+        file_hash: Optional[str] = None,
+        parser_options: Optional[Dict[str, Any]] = None
+    ) -> NormalizedMetadata:
+        """
+        Parse a file in the worker pool without blocking the event loop.
+
+        Args:
+            parser_type: Parser type ('dxf', 'pdf', 'excel', 'lbrn2', 'image')
+            file_path: Path to the file on disk
+            filename: Original filename
+            client_code: Optional client code
+            project_code: Optional project code
+            file_hash: Optional SHA-256 of the file (enables the parse cache)
+            parser_options: Optional parser constructor arguments (e.g. extract_tables for PDFs)
+
+        Returns:
+            NormalizedMetadata object with extracted data
+
+        Raises:
+            ValueError: If the parser fails or the file type is not supported
+        """
+        metrics = get_metrics()
+        use_cache = bool(file_hash) and self.cache.enabled
+
+        if use_cache:
+            with metrics.stage('parse_cache', parser_type):
+                metadata = await asyncio.to_thread(
+                    self._parse_cached,
+                    parser_type, file_hash, file_path, filename, client_code, project_code, parser_options
+                )
+            if metadata is not None:
+                metrics.increment('module_n_parses_total', parser=parser_type, result='cached')
+                return metadata
+
+        if self._pool is None:
+            self.start()
+
+        loop = asyncio.get_running_loop()
+        waiting = time.perf_counter()
+
+        async with self._get_semaphore(parser_type):
+            metrics.observe('parse_wait', time.perf_counter() - waiting, parser_type)
+            self._in_flight[parser_type] = self._in_flight.get(parser_type, 0) + 1
+            metrics.set_gauge('module_n_parser_in_flight', self._in_flight[parser_type], parser=parser_type)
+            pool = self._pool_for(parser_type)
+            result = 'error'
+            started = time.perf_counter()
+            try:
+                content = None
+                if parser_type == 'pdf':
+                    content = await self._extract_pdf_content(pool, file_path, parser_options)
+
+                if content is not None:
+                    metadata = await asyncio.to_thread(
+                        run_build_metadata,
+                        parser_type, content, file_path, filename, client_code, project_code, parser_options
+                    )
+                elif use_cache:
+                    metadata, content = await loop.run_in_executor(
+                        pool, run_extraction,
+                        parser_type, file_path, filename, client_code, project_code, parser_options
+                    )
+                else:
+                    metadata = await loop.run_in_executor(
+                        pool, run_parser,
+                        parser_type, file_path, filename, client_code, project_code, parser_options
+                    )
+                result = 'parsed'
+            except BrokenProcessPool:
+                # A worker died (e.g. segfault in a native library) - replace the pool
+                logger.error(f"Parser pool broken while parsing {filename}, restarting pool")
+                self._restart_pool(pool, parser_type)
+                raise ValueError("Parser worker crashed")
+            finally:
+                self._in_flight[parser_type] -= 1
+                metrics.observe('parse', time.perf_counter() - started, parser_type)
+                metrics.increment('module_n_parses_total', parser=parser_type, result=result)
+                metrics.set_gauge('module_n_parser_in_flight', self._in_flight[parser_type], parser=parser_type)
+
+        if use_cache:
+            await asyncio.to_thread(self.cache.put, file_hash, parser_type, content)
+        return metadata
+
+    async def _extract_pdf_content(
+        self,
+        pool: Executor,
+        file_path: str,
+        parser_options: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Extract a long PDF's content with its pages read in parallel page ranges.
+
+        The pages come back from the workers once and are combined here;
+        only the table pass goes to another worker, without the page text.
+
+        Returns the PDF parser's content, or None for PDFs below
+        settings.PDF_PARALLEL_MIN_PAGES (parsed in a single worker call).
+        """
+        from .pdf_parser import page_content
+
+        loop = asyncio.get_running_loop()
+        max_ranges = min(settings.PDF_PAGE_WORKERS or self.max_workers, self.max_workers)
+        if max_ranges <= 1:
+            return None
+
+        try:
+            ranges = await loop.run_in_executor(pool, run_page_ranges, file_path, max_ranges)
+            if not ranges:
+                return None
+            chunks = await asyncio.gather(*[
+                loop.run_in_executor(pool, run_page_read, file_path, start, stop) for start, stop in ranges
+            ])
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            # Unreadable here - the parser reads the document itself and reports the error
+            logger.warning(f"Parallel PDF read failed, reading serially: {str(e)}")
+            return None
+
+        content = page_content([page for chunk in chunks for page in chunk])
+        document = await loop.run_in_executor(
+            pool, run_document_content, file_path, content['table_pages'], parser_options
+        )
+        return {**document, **content}
+
+    def _parse_cached(
+        self,
+        parser_type: str,
+        file_hash: str,
+        file_path: str,
+        filename: str,
+        client_code: Optional[str],
+        project_code: Optional[str],
+        parser_options: Optional[Dict[str, Any]]
+    ) -> Optional[NormalizedMetadata]:
+        """Build metadata from cached parser content, or None on a cache miss (blocking)"""
+        content = self.cache.get(file_hash, parser_type)
+        if content is None:
+            return None
+
+        parser_class = get_parser_class(parser_type)
+        satisfies = getattr(parser_class, 'content_satisfies', None)
+        if satisfies is not None and not satisfies(content, **(parser_options or {})):
+            # e.g. cached PDF text pass, but tables were requested this time
+            return None
+
+        try:
+            # Re-apply filename-derived fields to the cached content
+            parser = parser_class(**(parser_options or {}))
+            return parser.build_metadata(content, file_path, filename, client_code, project_code)
+        except Exception as e:
+            logger.warning(f"Cached parse result unusable for {filename}, re-parsing: {str(e)}")
+            return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get executor statistics"""
+        return {
+            "running": self._pool is not None,
+            "mode": "process" if self.use_processes else "thread",
+            "max_workers": self.max_workers,
+            "ocr_workers": self.ocr_workers,
+            "concurrency_limits": self.concurrency_limits,
+            "in_flight": dict(self._in_flight)
+        }
+
+
+# Global executor instance
+_global_executor: Optional[ParserExecutor] = None
+
+
+def get_parser_executor() -> ParserExecutor:
+    """Get global parser executor instance"""
+    global _global_executor
+    if _global_executor is None:
+        _global_executor = ParserExecutor()
+    return _global_executor
@@ -7,7 +7,7 @@ import re
 import logging
 from typing import Dict, Any, List, Optional
 from pathlib import Path
-from PIL import Image, ImageEnhance
+from PIL import Image
 import io
 
 from ..models.schemas import (
@@ -16,21 +16,17 @@ from ..models.schemas import (
     MATERIAL_MAP,
     MATERIAL_CODE_MAP
 )
+from .ocr import recognize_text
 
 logger = logging.getLogger(__name__)
 
-# Try to import pytesseract, but handle gracefully if not available
-try:
-    import pytesseract
-    TESSERACT_AVAILABLE = True
-except ImportError:
-    TESSERACT_AVAILABLE = False
-    logger.warning("pytesseract not available - OCR functionality will be disabled")
-
 
 class ImageParser:
     """Parser for image files (PNG, JPG, BMP, TIFF) using Pillow and optional Tesseract OCR."""
     
+    # Bump when extraction output changes (invalidates cached parse results)
+    PARSER_VERSION = "1.1.0"
+    
     # Material detection patterns (reuse from other parsers)
     MATERIAL_PATTERNS = {
         'Galvanized Steel': ['galv', 'galvanized'],
@@ -76,56 +72,92 @@ class ImageParser:
             NormalizedMetadata object with extracted data
         """
         try:
-            # Open image
-            img = Image.open(file_path)
-            
-            # Extract image-specific metadata
-            image_meta = self._extract_image_metadata(img, file_path)
-            
-            # Parse filename for metadata
-            filename_meta = self._parse_filename(filename)
-            
-            # Enhance metadata from image content (OCR)
-            enhanced_meta = self._enhance_from_image(image_meta, filename_meta, img)
-            
-            # Override with provided codes
-            if client_code:
-                enhanced_meta.client_code = client_code
-            if project_code:
-                enhanced_meta.project_code = project_code
-            
-            # Add image metadata to extracted field
-            enhanced_meta.extracted = {
-                'width': image_meta.get('width', 0),
-                'height': image_meta.get('height', 0),
-                'format': image_meta.get('format', 'Unknown'),
-                'mode': image_meta.get('mode', 'Unknown'),
-                'dpi': image_meta.get('dpi', (0, 0)),
-                'exif': image_meta.get('exif', {}),
-                'ocr_text': image_meta.get('ocr_text', ''),
-                'ocr_available': image_meta.get('ocr_available', False),
-            }
-            
-            # Calculate confidence score
-            enhanced_meta.confidence_score = self._calculate_confidence(enhanced_meta)
-            
-            # Set file type
-            enhanced_meta.detected_type = FileType.IMAGE
-            enhanced_meta.source_file = filename
-            
-            # Get file size
-            enhanced_meta.file_size = Path(file_path).stat().st_size
-            enhanced_meta.mime_type = self._get_mime_type(filename, image_meta.get('format'))
-            
-            img.close()
-            
-            logger.info(f"Image parsed successfully: {filename} (confidence: {enhanced_meta.confidence_score:.2f})")
-            return enhanced_meta
+            content = self.extract_content(file_path)
+            return self.build_metadata(content, file_path, filename, client_code, project_code)
             
         except Exception as e:
             logger.error(f"Failed to parse image {filename}: {str(e)}")
             raise ValueError(f"Failed to parse image: {str(e)}")
     
+    def extract_content(self, file_path: str) -> Dict[str, Any]:
+        """
+        Extract content-derived metadata from an image file.
+        
+        This is the expensive part of parsing and depends only on the file
+        bytes, so the result can be cached by content hash.
+        
+        Args:
+            file_path: Path to the image file
+            
+        Returns:
+            Dict of image metadata (dimensions, EXIF, OCR text)
+        """
+        # Open image
+        img = Image.open(file_path)
+        try:
+            # Extract image-specific metadata (including OCR)
+            return self._extract_image_metadata(img, file_path)
+        finally:
+            img.close()
+    
+    def build_metadata(self, content: Dict[str, Any], file_path: str, filename: str,
+                       client_code: Optional[str] = None,
+                       project_code: Optional[str] = None) -> NormalizedMetadata:
+        """
+        Combine extracted image content with filename-derived metadata.
+        
+        Args:
+            content: Result of extract_content()
+            file_path: Path to the image file
+            filename: Original filename
+            client_code: Optional client code override
+            project_code: Optional project code override
+            
+        Returns:
+            NormalizedMetadata object with extracted data
+        """
+        image_meta = content
+        
+        # Parse filename for metadata
+        filename_meta = self._parse_filename(filename)
+        
+        # Enhance metadata from image content (OCR)
+        enhanced_meta = self._enhance_from_image(image_meta, filename_meta)
+        
+        # Override with provided codes
+        if client_code:
+            enhanced_meta.client_code = client_code
+        if project_code:
+            enhanced_meta.project_code = project_code
+        
+        # Add image metadata to extracted field
+        enhanced_meta.extracted = {
+            'width': image_meta.get('width', 0),
+            'height': image_meta.get('height', 0),
+            'format': image_meta.get('format', 'Unknown'),
+            'mode': image_meta.get('mode', 'Unknown'),
+            'dpi': image_meta.get('dpi', (0, 0)),
+            'exif': image_meta.get('exif', {}),
+            'ocr_text': image_meta.get('ocr_text', ''),
+            'ocr_available': image_meta.get('ocr_available', False),
+            'ocr_cache_hit': image_meta.get('ocr_cache_hit', False),
+            'ocr_timed_out': image_meta.get('ocr_timed_out', False),
+        }
+        
+        # Calculate confidence score
+        enhanced_meta.confidence_score = self._calculate_confidence(enhanced_meta)
+        
+        # Set file type
+        enhanced_meta.detected_type = FileType.IMAGE
+        enhanced_meta.source_file = filename
+        
+        # Get file size
+        enhanced_meta.file_size = Path(file_path).stat().st_size
+        enhanced_meta.mime_type = self._get_mime_type(filename, image_meta.get('format'))
+        
+        logger.info(f"Image parsed successfully: {filename} (confidence: {enhanced_meta.confidence_score:.2f})")
+        return enhanced_meta
+    
     def _extract_image_metadata(self, img: Image.Image, file_path: str) -> Dict[str, Any]:
         """Extract image-specific metadata."""
         metadata = {}
@@ -153,50 +185,24 @@ class ImageParser:
                 pass
             metadata['exif'] = exif_data
             
-            # Perform OCR if Tesseract is available
-            ocr_text = ''
-            ocr_available = False
-            
-            if TESSERACT_AVAILABLE:
-                try:
-                    # Preprocess image for better OCR
-                    processed_img = self._preprocess_for_ocr(img)
-                    ocr_text = pytesseract.image_to_string(processed_img)
-                    ocr_available = True
-                    logger.info(f"OCR extracted {len(ocr_text)} characters")
-                except Exception as ocr_error:
-                    logger.warning(f"OCR failed: {str(ocr_error)}")
-                    ocr_text = ''
+            # Perform OCR if Tesseract is available (downscaled, time limited, cached)
+            try:
+                ocr = recognize_text(img)
+            except Exception as ocr_error:
+                logger.warning(f"OCR failed: {str(ocr_error)}")
+                ocr = {'text': '', 'available': False, 'cache_hit': False, 'timed_out': False}
             
-            metadata['ocr_text'] = ocr_text
-            metadata['ocr_available'] = ocr_available
-            metadata['all_text'] = ocr_text
+            metadata['ocr_text'] = ocr['text']
+            metadata['ocr_available'] = ocr['available']
+            metadata['ocr_cache_hit'] = ocr['cache_hit']
+            metadata['ocr_timed_out'] = ocr['timed_out']
+            metadata['all_text'] = ocr['text']
             
         except Exception as e:
             logger.warning(f"Error extracting image metadata: {str(e)}")
         
         return metadata
     
-    def _preprocess_for_ocr(self, img: Image.Image) -> Image.Image:
-        """Preprocess image for better OCR results."""
-        try:
-            # Convert to grayscale
-            if img.mode != 'L':
-                img = img.convert('L')
-            
-            # Enhance contrast
-            enhancer = ImageEnhance.Contrast(img)
-            img = enhancer.enhance(2.0)
-            
-            # Enhance sharpness
-            enhancer = ImageEnhance.Sharpness(img)
-            img = enhancer.enhance(2.0)
-            
-            return img
-        except Exception as e:
-            logger.warning(f"Image preprocessing failed: {str(e)}")
-            return img
-    
     def _parse_filename(self, filename: str) -> NormalizedMetadata:
         """Parse metadata from filename."""
         # Remove extension
@@ -250,8 +256,7 @@ class ImageParser:
         )
     
     def _enhance_from_image(self, image_meta: Dict[str, Any],
-                            filename_meta: NormalizedMetadata,
-                            img: Image.Image) -> NormalizedMetadata:
+                            filename_meta: NormalizedMetadata) -> NormalizedMetadata:
         """Enhance metadata using image content (OCR)."""
         # Start with filename metadata
         enhanced = filename_meta
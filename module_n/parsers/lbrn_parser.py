@@ -1,9 +1,10 @@
 """
 Module N - LightBurn Parser
-Extracts metadata from LightBurn (.lbrn2) files using XML parsing
+Extracts metadata from LightBurn (.lbrn2) files using streaming XML parsing
 """
 
 import xml.etree.ElementTree as ET
+import math
 import re
 import logging
 from typing import Dict, Any, List, Optional, Tuple
@@ -19,10 +20,169 @@ from ..models.schemas import (
 
 logger = logging.getLogger(__name__)
 
+Point = Tuple[float, float]
+Matrix = Tuple[float, float, float, float, float, float]
+
+# XForm "a b c d e f": x' = a*x + c*y + e, y' = b*x + d*y + f
+IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+# VertList: "V<x> <y>" followed by optional c0x/c0y/c1x/c1y bezier control points
+_NUMBER = r'-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?'
+VERTEX_PATTERN = re.compile(rf'V({_NUMBER})\s+({_NUMBER})((?:c[01][xy]{_NUMBER})*)')
+CONTROL_PATTERN = re.compile(rf'c([01])([xy])({_NUMBER})')
+
+# PrimList: "B<start> <end>" marks a bezier segment (lines need no control points)
+BEZIER_PATTERN = re.compile(r'B(\d+)\s+(\d+)')
+
+
+class _BoundingBox:
+    """Running axis-aligned bounding box."""
+    
+    def __init__(self):
+        self.min_x = math.inf
+        self.min_y = math.inf
+        self.max_x = -math.inf
+        self.max_y = -math.inf
+    
+    def add_box(self, min_x: float, min_y: float, max_x: float, max_y: float) -> None:
+        self.min_x = min(self.min_x, min_x)
+        self.min_y = min(self.min_y, min_y)
+        self.max_x = max(self.max_x, max_x)
+        self.max_y = max(self.max_y, max_y)
+    
+    def add_points(self, points: List[Point]) -> None:
+        if points:
+            xs = [x for x, _ in points]
+            ys = [y for _, y in points]
+            self.add_box(min(xs), min(ys), max(xs), max(ys))
+    
+    def to_dict(self) -> Dict[str, float]:
+        if self.min_x > self.max_x:
+            return {'width': 0.0, 'height': 0.0, 'min_x': 0.0, 'min_y': 0.0, 'max_x': 0.0, 'max_y': 0.0}
+        return {
+            'width': round(self.max_x - self.min_x, 4),
+            'height': round(self.max_y - self.min_y, 4),
+            'min_x': round(self.min_x, 4),
+            'min_y': round(self.min_y, 4),
+            'max_x': round(self.max_x, 4),
+            'max_y': round(self.max_y, 4),
+        }
+
+
+def _parse_xform(text: Optional[str]) -> Matrix:
+    """Parse an XForm affine matrix (identity if missing or malformed)."""
+    try:
+        values = tuple(float(value) for value in (text or '').split())
+    except ValueError:
+        return IDENTITY
+    return values if len(values) == 6 else IDENTITY
+
+
+def _multiply(m: Matrix, n: Matrix) -> Matrix:
+    """Compose two affine matrices (n is applied first)."""
+    a, b, c, d, e, f = m
+    a2, b2, c2, d2, e2, f2 = n
+    return (
+        a * a2 + c * b2, b * a2 + d * b2,
+        a * c2 + c * d2, b * c2 + d * d2,
+        a * e2 + c * f2 + e, b * e2 + d * f2 + f,
+    )
+
+
+def _transform(m: Matrix, points: List[Point]) -> List[Point]:
+    """Transform points by an affine matrix."""
+    a, b, c, d, e, f = m
+    return [(a * x + c * y + e, b * x + d * y + f) for x, y in points]
+
+
+def _path_hull(vert_text: str, prim_text: str) -> List[Point]:
+    """
+    Convex hull of a LightBurn path outline in local coordinates.
+    
+    Contains every vertex plus the points where bezier segments reach their
+    local x/y extremes, so the transformed hull gives the exact bounding box
+    for straight segments under any transform and for curves under
+    axis-aligned transforms (scale, mirror, 90 degree rotations).
+    """
+    vertices = []
+    controls = []
+    for match in VERTEX_PATTERN.finditer(vert_text):
+        vertices.append((float(match.group(1)), float(match.group(2))))
+        values = {f'{n}{axis}': float(value) for n, axis, value in CONTROL_PATTERN.findall(match.group(3))}
+        controls.append((
+            (values['0x'], values['0y']) if '0x' in values and '0y' in values else None,
+            (values['1x'], values['1y']) if '1x' in values and '1y' in values else None,
+        ))
+    
+    points = list(vertices)
+    for start, end in BEZIER_PATTERN.findall(prim_text or ''):
+        start, end = int(start), int(end)
+        if start >= len(vertices) or end >= len(vertices):
+            continue
+        p0, p3 = vertices[start], vertices[end]
+        p1 = controls[start][0] or p0
+        p2 = controls[end][1] or p3
+        points.extend(_bezier_extrema(p0, p1, p2, p3))
+    
+    return _convex_hull(points)
+
+
+def _bezier_extrema(p0: Point, p1: Point, p2: Point, p3: Point) -> List[Point]:
+    """Points where a cubic bezier reaches a local x or y extreme."""
+    roots = []
+    for axis in (0, 1):
+        # Derivative coefficients of the cubic along this axis: a*t^2 + b*t + c
+        a = 3 * (-p0[axis] + 3 * p1[axis] - 3 * p2[axis] + p3[axis])
+        b = 6 * (p0[axis] - 2 * p1[axis] + p2[axis])
+        c = 3 * (p1[axis] - p0[axis])
+        if abs(a) < 1e-12:
+            if abs(b) > 1e-12:
+                roots.append(-c / b)
+            continue
+        discriminant = b * b - 4 * a * c
+        if discriminant >= 0:
+            sqrt_d = math.sqrt(discriminant)
+            roots.extend(((-b + sqrt_d) / (2 * a), (-b - sqrt_d) / (2 * a)))
+    
+    points = []
+    for t in roots:
+        if 0 < t < 1:
+            u = 1 - t
+            points.append((
+                u ** 3 * p0[0] + 3 * u * u * t * p1[0] + 3 * u * t * t * p2[0] + t ** 3 * p3[0],
+                u ** 3 * p0[1] + 3 * u * u * t * p1[1] + 3 * u * t * t * p2[1] + t ** 3 * p3[1],
+            ))
+    return points
+
+
+def _convex_hull(points: List[Point]) -> List[Point]:
+    """Convex hull (monotone chain); keeps shared outlines small."""
+    points = sorted(set(points))
+    if len(points) <= 2:
+        return points
+    
+    def cross(o: Point, a: Point, b: Point) -> float:
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+    
+    lower: List[Point] = []
+    for point in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], point) <= 0:
+            lower.pop()
+        lower.append(point)
+    upper: List[Point] = []
+    for point in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], point) <= 0:
+            upper.pop()
+        upper.append(point)
+    return lower[:-1] + upper[:-1]
+
 
 class LBRNParser:
     """Parser for LightBurn files (.lbrn2) using XML parsing."""
     
+    # Bump when extraction output changes (invalidates cached parse results)
+    PARSER_VERSION = "1.1.0"
+    
     # Material detection patterns (reuse from other parsers)
     MATERIAL_PATTERNS = {
         'Galvanized Steel': ['galv', 'galvanized'],
@@ -68,51 +228,8 @@ class LBRNParser:
             NormalizedMetadata object with extracted data
         """
         try:
-            # Parse XML file
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            
-            # Extract LightBurn-specific metadata
-            lbrn_meta = self._extract_lbrn_metadata(root)
-            
-            # Parse filename for metadata
-            filename_meta = self._parse_filename(filename)
-            
-            # Enhance metadata from LightBurn content
-            enhanced_meta = self._enhance_from_lbrn(lbrn_meta, filename_meta)
-            
-            # Override with provided codes
-            if client_code:
-                enhanced_meta.client_code = client_code
-            if project_code:
-                enhanced_meta.project_code = project_code
-            
-            # Add LightBurn metadata to extracted field
-            enhanced_meta.extracted = {
-                'app_version': lbrn_meta.get('app_version', 'Unknown'),
-                'device_name': lbrn_meta.get('device_name', 'Unknown'),
-                'material_height': lbrn_meta.get('material_height', 0),
-                'cut_settings': lbrn_meta.get('cut_settings', []),
-                'layer_count': lbrn_meta.get('layer_count', 0),
-                'shape_count': lbrn_meta.get('shape_count', 0),
-                'shape_types': lbrn_meta.get('shape_types', {}),
-                'bounding_box': lbrn_meta.get('bounding_box', {}),
-                'text_elements': lbrn_meta.get('text_elements', []),
-            }
-            
-            # Calculate confidence score
-            enhanced_meta.confidence_score = self._calculate_confidence(enhanced_meta)
-            
-            # Set file type
-            enhanced_meta.detected_type = FileType.LBRN2
-            enhanced_meta.source_file = filename
-            
-            # Get file size
-            enhanced_meta.file_size = Path(file_path).stat().st_size
-            enhanced_meta.mime_type = 'application/xml'
-            
-            logger.info(f"LightBurn parsed successfully: {filename} (confidence: {enhanced_meta.confidence_score:.2f})")
-            return enhanced_meta
+            content = self.extract_content(file_path)
+            return self.build_metadata(content, file_path, filename, client_code, project_code)
             
         except ET.ParseError as e:
             logger.error(f"Failed to parse LightBurn XML {filename}: {str(e)}")
@@ -121,103 +238,230 @@ class LBRNParser:
             logger.error(f"Failed to parse LightBurn {filename}: {str(e)}")
             raise ValueError(f"Failed to parse LightBurn: {str(e)}")
     
-    def _extract_lbrn_metadata(self, root: ET.Element) -> Dict[str, Any]:
-        """Extract LightBurn-specific metadata from XML root."""
-        metadata = {}
+    def extract_content(self, file_path: str) -> Dict[str, Any]:
+        """
+        Extract content-derived metadata from a LightBurn file.
         
-        try:
-            # Get root attributes
-            metadata['app_version'] = root.get('AppVersion', 'Unknown')
-            metadata['device_name'] = root.get('DeviceName', 'Unknown')
-            metadata['material_height'] = float(root.get('MaterialHeight', 0))
+        This is the expensive part of parsing and depends only on the file
+        bytes, so the result can be cached by content hash.
+        
+        Args:
+            file_path: Path to the LightBurn file
             
-            # Extract cut settings
-            cut_settings = []
-            for cut_setting in root.findall('.//CutSetting'):
-                setting = {
-                    'type': cut_setting.get('type', 'Unknown'),
-                    'name': cut_setting.find('name').get('Value') if cut_setting.find('name') is not None else 'Unknown',
-                    'max_power': float(cut_setting.find('maxPower').get('Value', 0)) if cut_setting.find('maxPower') is not None else 0,
-                    'speed': float(cut_setting.find('speed').get('Value', 0)) if cut_setting.find('speed') is not None else 0,
-                }
-                cut_settings.append(setting)
-            metadata['cut_settings'] = cut_settings
-            metadata['layer_count'] = len(cut_settings)
+        Returns:
+            Dict of LightBurn metadata (cut settings, shapes, bounding box)
+        """
+        return self._extract_lbrn_metadata(file_path)
+    
+    def build_metadata(self, content: Dict[str, Any], file_path: str, filename: str,
+                       client_code: Optional[str] = None,
+                       project_code: Optional[str] = None) -> NormalizedMetadata:
+        """
+        Combine extracted LightBurn content with filename-derived metadata.
+        
+        Args:
+            content: Result of extract_content()
+            file_path: Path to the LightBurn file
+            filename: Original filename
+            client_code: Optional client code override
+            project_code: Optional project code override
             
-            # Count shapes and types
-            shapes = root.findall('.//Shape')
-            metadata['shape_count'] = len(shapes)
+        Returns:
+            NormalizedMetadata object with extracted data
+        """
+        lbrn_meta = content
+        
+        # Parse filename for metadata
+        filename_meta = self._parse_filename(filename)
+        
+        # Enhance metadata from LightBurn content
+        enhanced_meta = self._enhance_from_lbrn(lbrn_meta, filename_meta)
+        
+        # Override with provided codes
+        if client_code:
+            enhanced_meta.client_code = client_code
+        if project_code:
+            enhanced_meta.project_code = project_code
+        
+        # Add LightBurn metadata to extracted field
+        enhanced_meta.extracted = {
+            'app_version': lbrn_meta.get('app_version', 'Unknown'),
+            'device_name': lbrn_meta.get('device_name', 'Unknown'),
+            'material_height': lbrn_meta.get('material_height', 0),
+            'cut_settings': lbrn_meta.get('cut_settings', []),
+            'layer_count': lbrn_meta.get('layer_count', 0),
+            'shape_count': lbrn_meta.get('shape_count', 0),
+            'shape_types': lbrn_meta.get('shape_types', {}),
+            'bounding_box': lbrn_meta.get('bounding_box', {}),
+            'text_elements': lbrn_meta.get('text_elements', []),
+        }
+        
+        # Calculate confidence score
+        enhanced_meta.confidence_score = self._calculate_confidence(enhanced_meta)
+        
+        # Set file type
+        enhanced_meta.detected_type = FileType.LBRN2
+        enhanced_meta.source_file = filename
+        
+        # Get file size
+        enhanced_meta.file_size = Path(file_path).stat().st_size
+        enhanced_meta.mime_type = 'application/xml'
+        
+        logger.info(f"LightBurn parsed successfully: {filename} (confidence: {enhanced_meta.confidence_score:.2f})")
+        return enhanced_meta
+    
+    def _extract_lbrn_metadata(self, file_path: str) -> Dict[str, Any]:
+        """
+        Extract LightBurn-specific metadata in a single streaming pass.
+        
+        The file is read with iterparse; each CutSetting and Shape is
+        processed when its end tag arrives and then cleared, so memory stays
+        bounded by the nesting depth rather than the file size. Shapes are
+        transformed by their XForm (composed with enclosing groups) into an
+        exact bounding box.
+        """
+        metadata = {
+            'app_version': 'Unknown',
+            'device_name': 'Unknown',
+            'material_height': 0.0,
+        }
+        cut_settings = []
+        shape_types: Dict[str, int] = {}
+        text_elements = []
+        bbox = _BoundingBox()
+        
+        # Vertex/primitive lists that later shapes reference by VertID/PrimID,
+        # kept as convex hulls (the hull has the same extremes under any transform)
+        shared_hulls: Dict[Tuple[str, str], List[Point]] = {}
+        
+        # Open <Shape> elements: [element, parent matrix, own matrix]
+        shape_stack: List[list] = []
+        depth = 0
+        root = None
+        
+        for event, elem in ET.iterparse(file_path, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if root is None:
+                    root = elem
+                    metadata['app_version'] = elem.get('AppVersion', 'Unknown')
+                    metadata['device_name'] = elem.get('DeviceName', 'Unknown')
+                    try:
+                        metadata['material_height'] = float(elem.get('MaterialHeight', 0))
+                    except ValueError:
+                        pass
+                elif elem.tag == 'Shape':
+                    parent = shape_stack[-1][2] if shape_stack else IDENTITY
+                    shape_stack.append([elem, parent, parent])
+                continue
             
-            shape_types = {}
-            for shape in shapes:
-                shape_type = shape.get('Type', 'Unknown')
-                shape_types[shape_type] = shape_types.get(shape_type, 0) + 1
-            metadata['shape_types'] = shape_types
+            depth -= 1
+            tag = elem.tag
             
-            # Extract text elements
-            text_elements = []
-            for text_shape in root.findall('.//Shape[@Type="Text"]'):
-                text_elem = text_shape.find('.//Text')
-                if text_elem is not None:
-                    text_elements.append(text_elem.text or '')
-            metadata['text_elements'] = text_elements
+            if tag == 'XForm' and shape_stack and shape_stack[-1][0].find('XForm') is elem:
+                frame = shape_stack[-1]
+                frame[2] = _multiply(frame[1], _parse_xform(elem.text))
             
-            # Calculate bounding box (simplified - would need full shape parsing for accuracy)
-            # For now, extract from XForm elements if available
-            metadata['bounding_box'] = self._calculate_bounding_box(root)
+            elif tag == 'CutSetting':
+                cut_settings.append(self._read_cut_setting(elem))
+                elem.clear()
             
-            # Collect all text for pattern matching
-            all_text = []
-            all_text.extend(text_elements)
-            all_text.append(metadata['device_name'])
-            metadata['all_text'] = ' '.join(all_text)
+            elif tag == 'Shape' and shape_stack:
+                shape, _, matrix = shape_stack.pop()
+                shape_type = shape.get('Type', 'Unknown')
+                shape_types[shape_type] = shape_types.get(shape_type, 0) + 1
+                
+                if shape_type == 'Text':
+                    text_node = shape.find('Text')
+                    text = shape.get('Str') or (text_node.text if text_node is not None else None)
+                    if text is not None:
+                        text_elements.append(text)
+                
+                if shape_type != 'Group':
+                    self._add_shape_extents(shape, shape_type, matrix, bbox, shared_hulls)
+                
+                # Group children are already processed; drop them with the group
+                shape.clear()
             
-        except Exception as e:
-            logger.warning(f"Error extracting LightBurn metadata: {str(e)}")
+            # Drop finished top-level elements from the root
+            if depth == 1 and root is not None:
+                root.clear()
+        
+        metadata['cut_settings'] = cut_settings
+        metadata['layer_count'] = len(cut_settings)
+        metadata['shape_count'] = sum(shape_types.values())
+        metadata['shape_types'] = shape_types
+        metadata['text_elements'] = text_elements
+        metadata['bounding_box'] = bbox.to_dict()
+        
+        # Collect all text for pattern matching
+        all_text = []
+        all_text.extend(text_elements)
+        all_text.append(metadata['device_name'])
+        metadata['all_text'] = ' '.join(all_text)
         
         return metadata
     
-    def _calculate_bounding_box(self, root: ET.Element) -> Dict[str, float]:
-        """Calculate approximate bounding box from shapes."""
-        # This is a simplified version - full implementation would parse all shape coordinates
-        bbox = {
-            'width': 0.0,
-            'height': 0.0,
-            'min_x': 0.0,
-            'min_y': 0.0,
-            'max_x': 0.0,
-            'max_y': 0.0
-        }
+    @staticmethod
+    def _read_cut_setting(cut_setting: ET.Element) -> Dict[str, Any]:
+        """Read type, name, power and speed of a CutSetting element."""
+        def value(tag: str, default: Any) -> Any:
+            node = cut_setting.find(tag)
+            return node.get('Value', default) if node is not None else default
         
         try:
-            # Look for XForm elements and extract coordinates
-            xforms = root.findall('.//XForm')
-            if xforms:
-                x_coords = []
-                y_coords = []
-                
-                for xform in xforms[:10]:  # Sample first 10 for performance
-                    text = xform.text or ''
-                    parts = text.split()
-                    if len(parts) >= 6:
-                        try:
-                            x_coords.append(float(parts[4]))
-                            y_coords.append(float(parts[5]))
-                        except (ValueError, IndexError):
-                            continue
-                
-                if x_coords and y_coords:
-                    bbox['min_x'] = min(x_coords)
-                    bbox['max_x'] = max(x_coords)
-                    bbox['min_y'] = min(y_coords)
-                    bbox['max_y'] = max(y_coords)
-                    bbox['width'] = bbox['max_x'] - bbox['min_x']
-                    bbox['height'] = bbox['max_y'] - bbox['min_y']
+            max_power = float(value('maxPower', 0))
+            speed = float(value('speed', 0))
+        except ValueError:
+            max_power, speed = 0.0, 0.0
         
-        except Exception as e:
-            logger.warning(f"Error calculating bounding box: {str(e)}")
+        return {
+            'type': cut_setting.get('type', 'Unknown'),
+            'name': value('name', 'Unknown'),
+            'max_power': max_power,
+            'speed': speed,
+        }
+    
+    @staticmethod
+    def _add_shape_extents(shape: ET.Element, shape_type: str, matrix: Matrix,
+                           bbox: '_BoundingBox', shared_hulls: Dict[Tuple[str, str], List[Point]]) -> None:
+        """Add the transformed outline of one shape to the bounding box."""
+        a, b, c, d, e, f = matrix
+        
+        try:
+            if shape_type == 'Rect':
+                w = float(shape.get('W', 0)) / 2.0
+                h = float(shape.get('H', 0)) / 2.0
+                bbox.add_points(_transform(matrix, [(-w, -h), (w, -h), (w, h), (-w, h)]))
+                return
+            
+            if shape_type in ('Ellipse', 'Circle'):
+                rx = float(shape.get('Rx', shape.get('R', 0)))
+                ry = float(shape.get('Ry', shape.get('R', rx)))
+                # Extremes of an affinely transformed ellipse
+                half_w = math.hypot(a * rx, c * ry)
+                half_h = math.hypot(b * rx, d * ry)
+                bbox.add_box(e - half_w, f - half_h, e + half_w, f + half_h)
+                return
+            
+            if shape_type == 'Path':
+                key = (shape.get('VertID'), shape.get('PrimID'))
+                vert_list = shape.find('VertList')
+                if vert_list is not None and vert_list.text:
+                    prim_list = shape.find('PrimList')
+                    hull = _path_hull(vert_list.text, prim_list.text if prim_list is not None else '')
+                    if key[0] is not None:
+                        shared_hulls[key] = hull
+                else:
+                    hull = shared_hulls.get(key)
+                if hull:
+                    bbox.add_points(_transform(matrix, hull))
+                    return
+        except ValueError as e:
+            logger.debug(f"Skipping malformed {shape_type} shape: {e}")
         
-        return bbox
+        # Shapes without readable geometry (text, bitmaps) contribute their origin
+        bbox.add_points([(e, f)])
     
     def _parse_filename(self, filename: str) -> NormalizedMetadata:
         """Parse metadata from filename."""
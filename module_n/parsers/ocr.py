@@ -0,0 +1,210 @@
+"""
+Module N - OCR
+Tesseract text recognition for the image parser: DPI-aware downscaling,
+a per-image timeout and a cache of recognised text
+"""
+
+import math
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from PIL import Image, ImageEnhance
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Try to import pytesseract, but handle gracefully if not available
+try:
+    import pytesseract
+    TESSERACT_AVAILABLE = True
+except ImportError:
+    pytesseract = None
+    TESSERACT_AVAILABLE = False
+    logger.warning("pytesseract not available - OCR functionality will be disabled")
+
+# Bump when preprocessing changes (invalidates cached OCR text)
+OCR_PREPROCESS_VERSION = 1
+
+# Side of the grid the difference hash is computed on (16 x 16 = 256 bits)
+HASH_SIZE = 16
+
+
+@lru_cache(maxsize=1)
+def tesseract_installed() -> bool:
+    """Check (once per process) that the tesseract binary can be run"""
+    if not TESSERACT_AVAILABLE:
+        return False
+    try:
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception as e:
+        logger.warning(f"Tesseract not installed - OCR functionality will be disabled: {str(e)}")
+        return False
+
+
+def ocr_scale(width: int, height: int, dpi: Optional[tuple] = None) -> float:
+    """
+    Scale factor (<= 1) to apply before OCR.
+
+    Scans above OCR_TARGET_DPI are reduced to it (more resolution only slows
+    Tesseract down), and anything still above OCR_MAX_PIXELS is reduced to fit.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        dpi: Image resolution (x, y) if known
+
+    Returns:
+        Scale factor for both axes
+    """
+    scale = 1.0
+
+    resolution = max(dpi or (0, 0))
+    if settings.OCR_TARGET_DPI and resolution > settings.OCR_TARGET_DPI:
+        scale = settings.OCR_TARGET_DPI / float(resolution)
+
+    pixels = width * height * scale * scale
+    if settings.OCR_MAX_PIXELS and pixels > settings.OCR_MAX_PIXELS:
+        scale *= math.sqrt(settings.OCR_MAX_PIXELS / pixels)
+
+    return min(scale, 1.0)
+
+
+def prepare_for_ocr(img: Image.Image) -> tuple:
+    """
+    Downscale and enhance an image for OCR.
+
+    JPEGs are decoded at reduced size (DCT scaling) when the image is still
+    unloaded, so large photos never get decoded at full resolution.
+
+    Args:
+        img: Opened PIL image
+
+    Returns:
+        Tuple of (grayscale image, scale factor applied)
+    """
+    width, height = img.size
+    scale = ocr_scale(width, height, img.info.get('dpi'))
+    target = (max(1, round(width * scale)), max(1, round(height * scale)))
+
+    if scale < 1.0 and img.format == 'JPEG':
+        img.draft('L', target)
+
+    if img.mode != 'L':
+        img = img.convert('L')
+
+    if img.size != target:
+        img = img.resize(target, Image.LANCZOS)
+
+    try:
+        img = ImageEnhance.Contrast(img).enhance(2.0)
+        img = ImageEnhance.Sharpness(img).enhance(2.0)
+    except Exception as e:
+        logger.warning(f"Image preprocessing failed: {str(e)}")
+
+    return img, scale
+
+
+def image_hash(img: Image.Image) -> str:
+    """
+    SHA-256 of an image's mode, size and pixels (64 hex digits).
+
+    The exact cache key: only images that reach Tesseract pixel for pixel
+    identical (e.g. the same drawing saved as PNG and BMP) share it.
+    """
+    digest = hashlib.sha256(f"{img.mode}|{img.size[0]}x{img.size[1]}|".encode())
+    digest.update(img.tobytes())
+    return digest.hexdigest()
+
+
+def perceptual_hash(img: Image.Image) -> str:
+    """
+    Difference hash of an image (256 bits, as 64 hex digits).
+
+    Re-encoded, rescaled or slightly re-exposed copies of the same picture
+    differ in only a few bits. Only used for near-identical matches, which
+    are off unless OCR_CACHE_MAX_DISTANCE is set.
+    """
+    small = img.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS)
+    pixels = small.tobytes()
+
+    bits = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+
+    return f"{bits:0{HASH_SIZE * HASH_SIZE // 4}x}"
+
+
+def get_ocr_config() -> str:
+    """Cache key part describing how OCR text is produced"""
+    return f"{settings.TESSERACT_LANGUAGES}|{settings.TESSERACT_CONFIG}|p{OCR_PREPROCESS_VERSION}"
+
+
+def recognize_text(img: Image.Image) -> Dict[str, Any]:
+    """
+    Run OCR on an image, using the OCR cache when enabled.
+
+    Tesseract is killed after OCR_TIMEOUT_SECONDS; timed out images are not
+    cached so they are retried on the next upload.
+
+    Args:
+        img: Opened PIL image
+
+    Returns:
+        Dict with text, available, cache_hit, timed_out, image_hash and scale
+    """
+    result = {
+        'text': '',
+        'available': False,
+        'cache_hit': False,
+        'timed_out': False,
+        'image_hash': None,
+        'scale': 1.0,
+    }
+
+    if not tesseract_installed():
+        return result
+
+    # Imported here so workers only touch the database when OCR actually runs
+    from ..db.operations import find_ocr_cache_entry, save_ocr_cache_entry
+
+    prepared, result['scale'] = prepare_for_ocr(img)
+    ocr_config = get_ocr_config()
+
+    phash = None
+    if settings.OCR_CACHE_ENABLED:
+        result['image_hash'] = image_hash(prepared)
+        phash = perceptual_hash(prepared)
+        cached = find_ocr_cache_entry(result['image_hash'], phash, ocr_config, settings.OCR_CACHE_MAX_DISTANCE)
+        if cached is not None:
+            result.update(text=cached, available=True, cache_hit=True)
+            logger.info(f"OCR cache hit ({result['image_hash'][:12]})")
+            return result
+
+    try:
+        text = pytesseract.image_to_string(
+            prepared,
+            lang=settings.TESSERACT_LANGUAGES,
+            config=settings.TESSERACT_CONFIG,
+            timeout=settings.OCR_TIMEOUT_SECONDS
+        )
+    except RuntimeError as e:
+        # pytesseract kills the process and raises RuntimeError on timeout
+        if 'timeout' not in str(e).lower():
+            raise
+        logger.warning(f"OCR timed out after {settings.OCR_TIMEOUT_SECONDS}s")
+        result['timed_out'] = True
+        return result
+
+    result.update(text=text, available=True)
+    logger.info(f"OCR extracted {len(text)} characters (scale {result['scale']:.2f})")
+
+    if result['image_hash']:
+        save_ocr_cache_entry(result['image_hash'], phash, ocr_config, text, settings.OCR_CACHE_MAX_ENTRIES)
+
+    return result
@@ -11,6 +11,7 @@ from pathlib import Path
 from decimal import Decimal
 from datetime import datetime
 
+from ..config import settings
 from ..models.schemas import (
     PDFMetadata,
     NormalizedMetadata,
@@ -21,10 +22,159 @@ from ..models.schemas import (
 
 logger = logging.getLogger(__name__)
 
+# Ruling lines on a page that suggest a lattice (bordered) table
+TABLE_MIN_HORIZONTAL_RULES = 4
+TABLE_MIN_VERTICAL_RULES = 4
+
+# Table extraction modes, from least to most extraction work
+TABLE_MODES = ('never', 'auto', 'always')
+
+
+def table_mode(extract_tables: Optional[bool]) -> str:
+    """Table extraction mode of an extract_tables option (see PDFParser)"""
+    if extract_tables is None:
+        mode = settings.PDF_TABLE_EXTRACTION.lower()
+        return mode if mode in TABLE_MODES else 'auto'
+    return 'always' if extract_tables else 'never'
+
+
+def get_page_ranges(file_path: str, max_ranges: int) -> List[Tuple[int, int]]:
+    """
+    Split the pages of a PDF file that are read into parallel page ranges.
+
+    Returns no ranges for documents below settings.PDF_PARALLEL_MIN_PAGES.
+    Module-level so it can run in a worker process.
+
+    Args:
+        file_path: Path to the PDF file
+        max_ranges: Max number of ranges (the workers available to read them)
+    """
+    doc = fitz.open(file_path)
+    try:
+        page_limit = len(doc)
+    finally:
+        doc.close()
+    if settings.PDF_MAX_PAGES > 0:
+        page_limit = min(page_limit, settings.PDF_MAX_PAGES)
+    if page_limit < settings.PDF_PARALLEL_MIN_PAGES:
+        return []
+
+    workers = min(max_ranges, page_limit // max(1, settings.PDF_PARALLEL_MIN_PAGES // 2))
+    if workers <= 1:
+        return []
+    chunk = -(-page_limit // workers)
+    return [(start, min(start + chunk, page_limit)) for start in range(0, page_limit, chunk)]
+
+
+def read_pages(file_path: str, start: int, stop: int) -> List[Dict[str, Any]]:
+    """
+    Read pages [start, stop) of a PDF file.
+
+    Module-level so it can run in a worker process.
+    """
+    doc = fitz.open(file_path)
+    try:
+        return _read_page_range(doc, start, stop)
+    finally:
+        doc.close()
+
+
+def page_content(pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Content fields of read pages: text, image count and table-like pages"""
+    return {
+        'text_content': '\n'.join(page['text'] for page in pages if page['text'].strip()),
+        'images_count': sum(page['images'] for page in pages),
+        'table_pages': [page['number'] for page in pages if page['table_like']],
+    }
+
+
+def _document_info(doc: fitz.Document) -> Dict[str, Any]:
+    """Document info and the number of pages read (up to settings.PDF_MAX_PAGES)"""
+    page_limit = len(doc)
+    if settings.PDF_MAX_PAGES > 0:
+        page_limit = min(page_limit, settings.PDF_MAX_PAGES)
+    return {
+        'page_count': len(doc),
+        'pdf_version': doc.metadata.get('format', 'Unknown'),
+        'metadata': {
+            'title': doc.metadata.get('title', ''),
+            'author': doc.metadata.get('author', ''),
+            'subject': doc.metadata.get('subject', ''),
+            'creator': doc.metadata.get('creator', ''),
+            'producer': doc.metadata.get('producer', ''),
+            'creation_date': doc.metadata.get('creationDate', ''),
+            'mod_date': doc.metadata.get('modDate', ''),
+        },
+        'pages_parsed': page_limit,
+        'truncated': page_limit < len(doc),
+    }
+
+
+def _read_page_range(doc: fitz.Document, start: int, stop: int) -> List[Dict[str, Any]]:
+    """Text, image count and table-like layout of pages [start, stop)"""
+    pages = []
+    for page_num in range(start, stop):
+        page = doc[page_num]
+        pages.append({
+            'number': page_num + 1,
+            'text': page.get_text(),
+            'images': len(page.get_images()),
+            'table_like': _looks_like_table(page),
+        })
+    return pages
+
+
+def _looks_like_table(page: fitz.Page) -> bool:
+    """
+    Cheap check for a ruled table: enough horizontal and vertical rules.
+
+    Camelot's lattice flavor only finds tables drawn with lines, so pages
+    without them are never worth sending to it. Rectangles only count when
+    they are drawn as rules (thin) or as cells (sharing an edge with
+    another rectangle); borders, title blocks and parts on a drawing are
+    standalone rectangles.
+    """
+    horizontal = 0
+    vertical = 0
+    cells = []
+    for drawing in page.get_drawings():
+        for item in drawing['items']:
+            if item[0] == 'l':
+                p1, p2 = item[1], item[2]
+                if abs(p1.y - p2.y) < 1 and abs(p1.x - p2.x) > 5:
+                    horizontal += 1
+                elif abs(p1.x - p2.x) < 1 and abs(p1.y - p2.y) > 5:
+                    vertical += 1
+            elif item[0] == 're':
+                rect = item[1]
+                if rect.height < 1 and rect.width > 5:
+                    horizontal += 1
+                elif rect.width < 1 and rect.height > 5:
+                    vertical += 1
+                elif rect.width >= 1 and rect.height >= 1:
+                    cells.append(tuple(round(v) for v in (rect.x0, rect.y0, rect.x1, rect.y1)))
+        if horizontal >= TABLE_MIN_HORIZONTAL_RULES and vertical >= TABLE_MIN_VERTICAL_RULES:
+            return True
+
+    # Cell borders are often drawn as rectangles: count those next to another cell
+    left_edges = {(x0, y0, y1) for x0, y0, x1, y1 in cells}
+    right_edges = {(x1, y0, y1) for x0, y0, x1, y1 in cells}
+    top_edges = {(y0, x0, x1) for x0, y0, x1, y1 in cells}
+    bottom_edges = {(y1, x0, x1) for x0, y0, x1, y1 in cells}
+    for x0, y0, x1, y1 in cells:
+        if ((x1, y0, y1) in left_edges or (x0, y0, y1) in right_edges
+                or (y1, x0, x1) in top_edges or (y0, x0, x1) in bottom_edges):
+            horizontal += 1
+            vertical += 1
+    return horizontal >= TABLE_MIN_HORIZONTAL_RULES and vertical >= TABLE_MIN_VERTICAL_RULES
+
 
 class PDFParser:
     """Parser for PDF files using PyMuPDF (fitz) and Camelot."""
     
+    # Bump when extraction output changes (invalidates cached parse results)
+    PARSER_VERSION = "1.1.1"
+    
     # Material detection patterns (reuse from DXF parser)
     MATERIAL_PATTERNS = {
         'Galvanized Steel': ['galv', 'galvanized'],
@@ -55,6 +205,32 @@ class PDFParser:
         re.IGNORECASE
     )
     
+    def __init__(self, extract_tables: Optional[bool] = None):
+        """
+        Initialize PDF parser.
+        
+        Args:
+            extract_tables: True = always run table extraction, False = never,
+                None = only on pages whose layout looks like a table
+                (default: from settings.PDF_TABLE_EXTRACTION)
+        """
+        self.table_mode = table_mode(extract_tables)
+    
+    @classmethod
+    def content_satisfies(cls, content: Dict[str, Any], extract_tables: Optional[bool] = None,
+                          **options: Any) -> bool:
+        """
+        Check whether cached content covers a request.
+        
+        Content from a pass that did less table extraction than requested
+        (e.g. 'never' for an 'auto' or 'always' request) cannot serve it.
+        """
+        cached = content.get('table_mode')
+        if cached not in TABLE_MODES:
+            # Entries cached before the mode was recorded
+            cached = 'always' if content.get('tables_extracted') else 'never'
+        return TABLE_MODES.index(cached) >= TABLE_MODES.index(table_mode(extract_tables))
+    
     def parse(self, file_path: str, filename: str, client_code: Optional[str] = None,
               project_code: Optional[str] = None) -> NormalizedMetadata:
         """
@@ -70,109 +246,161 @@ class PDFParser:
             NormalizedMetadata object with extracted data
         """
         try:
-            # Open PDF document
-            doc = fitz.open(file_path)
-            
-            # Extract PDF-specific metadata
-            pdf_meta = self._extract_pdf_metadata(doc, file_path)
-            
-            # Parse filename for metadata
-            filename_meta = self._parse_filename(filename)
-            
-            # Enhance metadata from PDF content
-            enhanced_meta = self._enhance_from_pdf(pdf_meta, filename_meta)
+            content = self.extract_content(file_path)
+            return self.build_metadata(content, file_path, filename, client_code, project_code)
             
-            # Override with provided codes
-            if client_code:
-                enhanced_meta.client_code = client_code
-            if project_code:
-                enhanced_meta.project_code = project_code
-            
-            # Add PDF metadata to extracted field
-            enhanced_meta.extracted = {
-                'page_count': pdf_meta.get('page_count', 0),
-                'text_content': pdf_meta.get('text_content', ''),
-                'tables': pdf_meta.get('tables', []),
-                'images_count': pdf_meta.get('images_count', 0),
-                'pdf_metadata': pdf_meta.get('metadata', {}),
-                'pdf_version': pdf_meta.get('pdf_version'),
-            }
-            
-            # Calculate confidence score
-            enhanced_meta.confidence_score = self._calculate_confidence(enhanced_meta)
-            
-            # Set file type
-            enhanced_meta.detected_type = FileType.PDF
-            enhanced_meta.source_file = filename
-            
-            # Get file size
-            enhanced_meta.file_size = Path(file_path).stat().st_size
-            enhanced_meta.mime_type = 'application/pdf'
+        except Exception as e:
+            logger.error(f"Failed to parse PDF {filename}: {str(e)}")
+            raise ValueError(f"Failed to parse PDF: {str(e)}")
+    
+    def extract_content(self, file_path: str) -> Dict[str, Any]:
+        """
+        Extract content-derived metadata from a PDF file.
+        
+        This is the expensive part of parsing and depends only on the file
+        bytes, so the result can be cached by content hash.
+        
+        Args:
+            file_path: Path to the PDF file
             
+        Returns:
+            Dict of PDF metadata (text, tables, document info)
+        """
+        # Open PDF document
+        doc = fitz.open(file_path)
+        try:
+            # Extract PDF-specific metadata
+            return self._extract_pdf_metadata(doc, file_path)
+        finally:
             doc.close()
+    
+    def extract_document_content(self, file_path: str, table_pages: List[int]) -> Dict[str, Any]:
+        """
+        Extract everything but the page content from a PDF file.
+        
+        Used when the pages were read separately (the parser executor reads
+        long PDFs in parallel page ranges); merged with page_content() of
+        those pages it gives the same result as extract_content().
+        
+        Args:
+            file_path: Path to the PDF file
+            table_pages: Table-like pages found while reading the pages
             
-            logger.info(f"PDF parsed successfully: {filename} (confidence: {enhanced_meta.confidence_score:.2f})")
-            return enhanced_meta
-            
+        Returns:
+            Dict of document info and tables
+        """
+        metadata = {}
+        doc = fitz.open(file_path)
+        try:
+            metadata.update(_document_info(doc))
+            metadata.update(self._extract_table_content(file_path, metadata['pages_parsed'], table_pages))
         except Exception as e:
-            logger.error(f"Failed to parse PDF {filename}: {str(e)}")
-            raise ValueError(f"Failed to parse PDF: {str(e)}")
+            logger.warning(f"Error extracting PDF metadata: {str(e)}")
+        finally:
+            doc.close()
+        return metadata
+    
+    def build_metadata(self, content: Dict[str, Any], file_path: str, filename: str,
+                       client_code: Optional[str] = None,
+                       project_code: Optional[str] = None) -> NormalizedMetadata:
+        """
+        Combine extracted PDF content with filename-derived metadata.
+        
+        Args:
+            content: Result of extract_content()
+            file_path: Path to the PDF file
+            filename: Original filename
+            client_code: Optional client code override
+            project_code: Optional project code override
+            
+        Returns:
+            NormalizedMetadata object with extracted data
+        """
+        pdf_meta = content
+        
+        # Parse filename for metadata
+        filename_meta = self._parse_filename(filename)
+        
+        # Enhance metadata from PDF content
+        enhanced_meta = self._enhance_from_pdf(pdf_meta, filename_meta)
+        
+        # Override with provided codes
+        if client_code:
+            enhanced_meta.client_code = client_code
+        if project_code:
+            enhanced_meta.project_code = project_code
+        
+        # Add PDF metadata to extracted field
+        enhanced_meta.extracted = {
+            'page_count': pdf_meta.get('page_count', 0),
+            'text_content': pdf_meta.get('text_content', ''),
+            'tables': pdf_meta.get('tables', []),
+            'images_count': pdf_meta.get('images_count', 0),
+            'pdf_metadata': pdf_meta.get('metadata', {}),
+            'pdf_version': pdf_meta.get('pdf_version'),
+            'pages_parsed': pdf_meta.get('pages_parsed', pdf_meta.get('page_count', 0)),
+            'truncated': pdf_meta.get('truncated', False),
+            'table_pages': pdf_meta.get('table_pages', []),
+        }
+        
+        # Calculate confidence score
+        enhanced_meta.confidence_score = self._calculate_confidence(enhanced_meta)
+        
+        # Set file type
+        enhanced_meta.detected_type = FileType.PDF
+        enhanced_meta.source_file = filename
+        
+        # Get file size
+        enhanced_meta.file_size = Path(file_path).stat().st_size
+        enhanced_meta.mime_type = 'application/pdf'
+        
+        logger.info(f"PDF parsed successfully: {filename} (confidence: {enhanced_meta.confidence_score:.2f})")
+        return enhanced_meta
     
     def _extract_pdf_metadata(self, doc: fitz.Document, file_path: str) -> Dict[str, Any]:
-        """Extract PDF-specific metadata from document."""
+        """
+        Extract PDF-specific metadata from document in stages.
+        
+        1. Document info, then text, image count and table-like layout per
+           page (up to settings.PDF_MAX_PAGES).
+        2. Table extraction (Camelot), only on pages flagged in stage 1 - or
+           on every read page when table extraction was explicitly requested.
+        """
         metadata = {}
         
         try:
-            # Basic document info
-            metadata['page_count'] = len(doc)
-            metadata['pdf_version'] = doc.metadata.get('format', 'Unknown')
-            
-            # Document metadata
-            metadata['metadata'] = {
-                'title': doc.metadata.get('title', ''),
-                'author': doc.metadata.get('author', ''),
-                'subject': doc.metadata.get('subject', ''),
-                'creator': doc.metadata.get('creator', ''),
-                'producer': doc.metadata.get('producer', ''),
-                'creation_date': doc.metadata.get('creationDate', ''),
-                'mod_date': doc.metadata.get('modDate', ''),
-            }
+            metadata.update(_document_info(doc))
             
-            # Extract text from all pages
-            text_content = []
-            images_count = 0
+            # Stage 1: text, images and table-like layout
+            metadata.update(page_content(_read_page_range(doc, 0, metadata['pages_parsed'])))
             
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                
-                # Extract text
-                page_text = page.get_text()
-                if page_text.strip():
-                    text_content.append(page_text)
-                
-                # Count images
-                images_count += len(page.get_images())
-            
-            metadata['text_content'] = '\n'.join(text_content)
-            metadata['images_count'] = images_count
-            
-            # Try to extract tables using Camelot (if available)
-            metadata['tables'] = self._extract_tables(file_path)
+            # Stage 2: tables, only where they are likely (or requested)
+            metadata.update(self._extract_table_content(file_path, metadata['pages_parsed'], metadata['table_pages']))
             
         except Exception as e:
             logger.warning(f"Error extracting PDF metadata: {str(e)}")
         
         return metadata
     
-    def _extract_tables(self, file_path: str) -> List[Dict[str, Any]]:
-        """Extract tables from PDF using Camelot."""
+    def _extract_table_content(self, file_path: str, page_limit: int, table_pages: List[int]) -> Dict[str, Any]:
+        """Tables of the pages the table mode selects (see _extract_pdf_metadata)"""
+        if self.table_mode == 'always':
+            table_pages = list(range(1, page_limit + 1))
+        elif self.table_mode != 'auto':
+            table_pages = []
+        return {
+            'tables': self._extract_tables(file_path, table_pages) if table_pages else [],
+            'table_mode': self.table_mode,
+        }
+    
+    def _extract_tables(self, file_path: str, pages: List[int]) -> List[Dict[str, Any]]:
+        """Extract tables from the given (1-based) pages using Camelot."""
         tables = []
         
         try:
             import camelot
             
-            # Extract tables from all pages
-            table_list = camelot.read_pdf(file_path, pages='all', flavor='lattice')
+            table_list = camelot.read_pdf(file_path, pages=','.join(str(page) for page in pages), flavor='lattice')
             
             for i, table in enumerate(table_list):
                 tables.append({
@@ -184,7 +412,7 @@ class PDFParser:
                     'accuracy': table.accuracy,
                 })
             
-            logger.info(f"Extracted {len(tables)} tables from PDF")
+            logger.info(f"Extracted {len(tables)} tables from {len(pages)} PDF page(s)")
             
         except ImportError:
             logger.warning("Camelot not available for table extraction")
@@ -0,0 +1,394 @@
+"""
+Module N - Bulk Re-extraction
+Background jobs that run stored files through the parser pool again after a
+parser upgrade, committing results in batches and resuming where they stopped
+"""
+
+import os
+import json
+import uuid
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .config import settings
+from .db import (
+    FileIngest,
+    ReextractJob,
+    IngestRecord,
+    get_stale_parser_versions,
+    get_reextract_candidates,
+    count_reextract_candidates,
+    create_reextract_job,
+    get_reextract_job,
+    get_reextract_jobs,
+    claim_reextract_job,
+    update_reextract_job,
+    save_reextract_batch
+)
+from .models.schemas import NormalizedMetadata
+from .parsers.executor import PARSER_LABELS, ParserExecutor, get_parser_executor, resolve_parser_type
+from .parsers.cache import get_parser_version
+from .storage import get_file_path
+
+logger = logging.getLogger(__name__)
+
+# Per-file errors kept on a job for the status endpoint
+MAX_JOB_ERRORS = 20
+
+# Coroutine function called with the files of every saved batch and their parsed
+# metadata, in the same order (e.g. to queue webhooks)
+BatchCallback = Callable[[List[FileIngest], List[NormalizedMetadata]], Awaitable[None]]
+
+
+def build_reextract_record(
+    file_ingest: FileIngest,
+    metadata: NormalizedMetadata,
+    parser_type: str
+) -> IngestRecord:
+    """
+    Build the record saved for a re-extracted file.
+
+    Same extraction and metadata as a fresh ingest; the stored file, its
+    name and the ingest row's identity are left as they are.
+    """
+    detected = metadata.detected_type.value
+    return IngestRecord(
+        normalized_metadata=metadata,
+        original_filename=file_ingest.original_filename,
+        stored_filename=file_ingest.stored_filename,
+        file_path=file_ingest.file_path,
+        status='completed',
+        extraction_type=f"{detected}_metadata",
+        extracted_data=metadata.extracted,
+        parser_name=f"{detected}_parser",
+        parser_version=get_parser_version(parser_type),
+        metadata={
+            'client_code': metadata.client_code,
+            'project_code': metadata.project_code,
+            'part_name': metadata.part_name,
+            'material': metadata.material,
+            'thickness_mm': metadata.thickness_mm,
+            'quantity': metadata.quantity,
+            'version': metadata.version
+        },
+        metadata_source=f"{detected}_parser"
+    )
+
+
+class ReextractJobManager:
+    """
+    Runs bulk re-extraction jobs in the background.
+
+    A job selects files by file type, client code and parser version (files
+    whose latest extraction is older than the threshold) and walks them in
+    id order, batch_size files at a time. Each batch is parsed with at most
+    `concurrency` files in the parser pool at once, so live uploads keep
+    their parser slots, and is committed together with the job's cursor.
+
+    Jobs are stored in the database. The worker running a job heartbeats
+    with every batch and every lease_seconds / 3 while a batch is parsing;
+    a job whose worker stopped (shutdown, crash) is picked up again from
+    its cursor by resume_interrupted() or resume().
+    """
+
+    def __init__(
+        self,
+        executor: Optional[ParserExecutor] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        batch_delay: Optional[float] = None,
+        lease_seconds: Optional[int] = None
+    ):
+        """
+        Initialize re-extraction job manager.
+
+        Args:
+            executor: Parser executor (default: global parser executor)
+            batch_size: Files parsed and committed per batch (default: from settings)
+            concurrency: Files of a job parsed at once (default: from settings)
+            batch_delay: Seconds to wait between batches (default: from settings)
+            lease_seconds: Heartbeat age after which a running job is resumable (default: from settings)
+        """
+        self._executor = executor
+        self.batch_size = max(1, batch_size or settings.REEXTRACT_BATCH_SIZE)
+        self.concurrency = max(1, concurrency or settings.REEXTRACT_CONCURRENCY)
+        self.batch_delay = settings.REEXTRACT_BATCH_DELAY if batch_delay is None else batch_delay
+        self.lease_seconds = lease_seconds or settings.REEXTRACT_LEASE_SECONDS
+        self.heartbeat_interval = self.lease_seconds / 3
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def executor(self) -> ParserExecutor:
+        """Parser executor the files are parsed in"""
+        if self._executor is None:
+            self._executor = get_parser_executor()
+        return self._executor
+
+    def create_job(
+        self,
+        file_type: Optional[str] = None,
+        client_code: Optional[str] = None,
+        parser_version: Optional[str] = None
+    ) -> Optional[ReextractJob]:
+        """
+        Record a re-extraction job (blocking, run it in a thread).
+
+        Args:
+            file_type: Only files of this type (default: every parsed type)
+            client_code: Only files of this client
+            parser_version: Select files extracted by an older parser version
+                (default: each parser's current version)
+
+        Returns:
+            ReextractJob object or None on error
+
+        Raises:
+            ValueError: If the file type has no parser
+        """
+        if file_type:
+            parser_type = resolve_parser_type(file_type)
+            if not parser_type:
+                raise ValueError(f"No parser available for file type: {file_type}")
+            parser_types = [parser_type]
+        else:
+            parser_type = None
+            parser_types = list(PARSER_LABELS)
+
+        # Parser types are also the file_type values stored for parsed files
+        thresholds = {name: parser_version or get_parser_version(name) for name in parser_types}
+        total = count_reextract_candidates(get_stale_parser_versions(thresholds), client_code)
+        return create_reextract_job(thresholds, parser_type, client_code, total)
+
+    def is_running(self, job_id: str) -> bool:
+        """True if this worker is running the job"""
+        return job_id in self._tasks
+
+    async def start(self, job_id: str, on_batch: Optional[BatchCallback] = None) -> bool:
+        """
+        Claim a job and run it in the background.
+
+        Args:
+            job_id: Job ID
+            on_batch: Called with the updated files and parsed metadata of every saved batch
+
+        Returns:
+            True if the job was started, False if it is finished or already running
+        """
+        if self.is_running(job_id):
+            return False
+
+        claimed = await asyncio.to_thread(claim_reextract_job, job_id, self.worker_id, self.lease_seconds)
+        if not claimed:
+            return False
+
+        task = asyncio.create_task(self._run(job_id, on_batch))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return True
+
+    async def resume(self, job_id: str, on_batch: Optional[BatchCallback] = None) -> bool:
+        """Continue a paused, failed or abandoned job from its cursor"""
+        return await self.start(job_id, on_batch)
+
+    async def pause(self, job_id: str) -> bool:
+        """
+        Pause a job.
+
+        The worker running it stops before its next batch; a batch that is
+        being parsed at that moment is discarded and redone on resume.
+
+        Returns:
+            True if the job was pending or running
+        """
+        return await asyncio.to_thread(
+            update_reextract_job, job_id,
+            statuses=('pending', 'running'), status='paused', claimed_by=None
+        )
+
+    async def resume_interrupted(self, on_batch: Optional[BatchCallback] = None) -> List[str]:
+        """
+        Resume jobs whose worker stopped without finishing them.
+
+        Jobs released by a clean shutdown are resumed right away, jobs of a
+        crashed worker once their lease has expired.
+
+        Returns:
+            IDs of the jobs started by this worker
+        """
+        jobs = await asyncio.to_thread(get_reextract_jobs, 'running')
+        jobs += await asyncio.to_thread(get_reextract_jobs, 'pending')
+
+        started = []
+        for job in jobs:
+            if await self.start(job.id, on_batch):
+                started.append(job.id)
+        if started:
+            logger.info(f"Resumed {len(started)} re-extraction job(s): {started}")
+        return started
+
+    async def _extract_file(
+        self,
+        file_ingest: FileIngest,
+        semaphore: asyncio.Semaphore
+    ) -> Tuple[Optional[IngestRecord], Optional[str]]:
+        """Parse one stored file, returning (record, None) or (None, error)"""
+        parser_type = resolve_parser_type(file_ingest.file_type)
+        if not parser_type:
+            return None, f"No parser available for file type: {file_ingest.file_type}"
+
+        file_path = get_file_path(file_ingest.file_path)
+        if not file_path:
+            return None, f"File not found in storage: {file_ingest.file_path}"
+
+        async with semaphore:
+            try:
+                metadata = await self.executor.parse(
+                    parser_type, str(file_path), file_ingest.original_filename,
+                    file_ingest.client_code, file_ingest.project_code
+                )
+            except Exception as parse_error:
+                return None, f"{PARSER_LABELS[parser_type]} parsing failed: {str(parse_error)}"
+
+        if metadata.file_size is None:
+            metadata.file_size = file_path.stat().st_size
+
+        return build_reextract_record(file_ingest, metadata, parser_type), None
+
+    def _owns(self, job: Optional[ReextractJob]) -> bool:
+        """True if this worker still runs the job"""
+        return job is not None and job.status == 'running' and job.claimed_by == self.worker_id
+
+    async def _heartbeat(self, job_id: str, stop: asyncio.Event):
+        """Keep the job's lease alive until stop is set or the job is no longer ours"""
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), self.heartbeat_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            owned = await asyncio.to_thread(
+                update_reextract_job, job_id,
+                worker_id=self.worker_id, statuses=('running',), heartbeat_at=datetime.utcnow()
+            )
+            if not owned:
+                return
+
+    async def _run(self, job_id: str, on_batch: Optional[BatchCallback]):
+        job = await asyncio.to_thread(get_reextract_job, job_id)
+        stale_versions = await asyncio.to_thread(get_stale_parser_versions, json.loads(job.parser_versions))
+        cursor = job.last_file_id
+        errors = deque(json.loads(job.errors) if job.errors else [], maxlen=MAX_JOB_ERRORS)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        logger.info(f"Re-extraction job {job_id} running from file {cursor} ({job.processed}/{job.total} done)")
+
+        try:
+            while True:
+                # Stop before parsing when the job was paused or taken over
+                current = await asyncio.to_thread(get_reextract_job, job_id)
+                if not self._owns(current):
+                    logger.info(f"Re-extraction job {job_id} stopped ({current.status if current else 'deleted'})")
+                    return
+
+                files = await asyncio.to_thread(
+                    get_reextract_candidates, stale_versions, job.client_code, cursor, self.batch_size
+                )
+                if not files:
+                    await asyncio.to_thread(
+                        update_reextract_job, job_id,
+                        worker_id=self.worker_id, statuses=('running',),
+                        status='completed', claimed_by=None, finished_at=datetime.utcnow()
+                    )
+                    logger.info(f"Re-extraction job {job_id} complete")
+                    return
+
+                # A batch can take longer than the lease; heartbeat while it parses.
+                # The heartbeat is stopped, not cancelled, so no write lands after
+                # the job was released.
+                stop_heartbeat = asyncio.Event()
+                heartbeat = asyncio.create_task(self._heartbeat(job_id, stop_heartbeat))
+                try:
+                    results = await asyncio.gather(*[
+                        self._extract_file(file_ingest, semaphore) for file_ingest in files
+                    ])
+                finally:
+                    stop_heartbeat.set()
+                    await heartbeat
+
+                records = {}
+                for file_ingest, (record, error) in zip(files, results):
+                    if record is not None:
+                        records[file_ingest.id] = record
+                    else:
+                        logger.warning(f"Re-extraction job {job_id}: file {file_ingest.id} failed: {error}")
+                        errors.append({
+                            'file_id': file_ingest.id,
+                            'filename': file_ingest.original_filename,
+                            'error': error
+                        })
+
+                saved = await asyncio.to_thread(
+                    save_reextract_batch, job_id, self.worker_id, records,
+                    files[-1].id, len(files) - len(records), list(errors)
+                )
+                if saved is None:
+                    if self._owns(await asyncio.to_thread(get_reextract_job, job_id)):
+                        raise RuntimeError("Failed to save re-extraction batch")
+                    continue  # Paused or taken over mid-batch; the check above stops the loop
+
+                cursor = files[-1].id
+
+                if on_batch and saved:
+                    try:
+                        await on_batch(saved, [records[f.id].normalized_metadata for f in saved])
+                    except Exception as callback_error:
+                        logger.error(f"Re-extraction job {job_id}: batch callback failed: {callback_error}")
+
+                if self.batch_delay:
+                    await asyncio.sleep(self.batch_delay)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Re-extraction job {job_id} failed: {e}", exc_info=True)
+            await asyncio.to_thread(
+                update_reextract_job, job_id,
+                worker_id=self.worker_id, statuses=('running',),
+                status='failed', claimed_by=None, error_message=str(e)
+            )
+
+    async def shutdown(self):
+        """
+        Stop running jobs and release them.
+
+        The batch in progress is discarded; the jobs stay 'running' without
+        a heartbeat, so the next startup resumes them from their cursor.
+        """
+        job_ids = list(self._tasks)
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = {}
+
+        for job_id in job_ids:
+            await asyncio.to_thread(
+                update_reextract_job, job_id,
+                worker_id=self.worker_id, statuses=('running',), heartbeat_at=None
+            )
+
+
+# Global re-extraction job manager instance
+_reextract_manager: Optional[ReextractJobManager] = None
+
+
+def get_reextract_manager() -> ReextractJobManager:
+    """Get global re-extraction job manager instance"""
+    global _reextract_manager
+    if _reextract_manager is None:
+        _reextract_manager = ReextractJobManager()
+    return _reextract_manager
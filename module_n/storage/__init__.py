@@ -6,6 +6,7 @@ from .file_storage import (
     delete_file,
     file_exists,
     get_next_version,
+    allocate_version,
     ensure_directory
 )
 
@@ -15,6 +16,7 @@ __all__ = [
     'delete_file',
     'file_exists',
     'get_next_version',
+    'allocate_version',
     'ensure_directory'
 ]
 
@@ -11,6 +11,7 @@ from typing import Optional, Tuple
 import re
 
 from ..config import get_upload_folder
+from ..db.operations import allocate_file_version
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -60,7 +61,10 @@ def get_storage_path(client_code: Optional[str] = None, project_code: Optional[s
 
 def get_next_version(directory: Path, base_filename: str) -> int:
     """
-    Get the next version number for a file
+    Get the next version number for a file by scanning its directory
+
+    save_file() uses the version registry (allocate_version) instead; the
+    scan only seeds it.
     
     Args:
         directory: Directory to check for existing files
@@ -87,6 +91,47 @@ def get_next_version(directory: Path, base_filename: str) -> int:
     return max_version + 1
 
 
+def allocate_version(
+    directory: Path,
+    base_filename: str,
+    extension: str,
+    client_code: Optional[str] = None,
+    project_code: Optional[str] = None
+) -> int:
+    """
+    Allocate the next version number for a file from the version registry
+
+    The folder is only scanned the first time a filename is seen (to pick
+    up files stored before the registry) or if the registry is unavailable.
+
+    Args:
+        directory: Storage directory of the file
+        base_filename: Base filename without version
+        extension: File extension (e.g., '.dxf')
+        client_code: Client code used for the storage directory
+        project_code: Project code used for the storage directory
+
+    Returns:
+        Version number whose filename is not taken yet
+    """
+    # Same scoping as get_storage_path(): the project only has a folder under a client
+    if not client_code:
+        project_code = None
+
+    while True:
+        version = allocate_file_version(
+            client_code, project_code, base_filename,
+            scan_existing=lambda: get_next_version(directory, base_filename) - 1
+        )
+        if version is None:
+            logger.warning(f"Version registry unavailable, scanning {directory}")
+            return get_next_version(directory, base_filename)
+
+        # Registry behind the folder (files copied in by hand) - skip taken versions
+        if not (directory / f"{base_filename}-v{version}{extension}").exists():
+            return version
+
+
 def save_file(
     source_path: str,
     normalized_filename: str,
@@ -131,7 +176,9 @@ def save_file(
                 base_name_no_version = base_name
             
             # Get next version
-            next_version = get_next_version(storage_dir, base_name_no_version)
+            next_version = allocate_version(
+                storage_dir, base_name_no_version, extension, client_code, project_code
+            )
             
             # Create versioned filename
             stored_filename = f"{base_name_no_version}-v{next_version}{extension}"
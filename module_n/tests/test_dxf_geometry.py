@@ -0,0 +1,195 @@
+"""
+Module N - DXF Geometry Engine Tests
+Tests for single-pass, vectorized DXF measurements
+"""
+
+import math
+import pytest
+import ezdxf
+import numpy as np
+
+from ..parsers.dxf_geometry import DXFGeometry
+
+
+def make_plate():
+    """Create a 100x50 plate with rounded ends, a hole and a block reference"""
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+
+    # Slot outline: two straight edges joined by semicircular bulges (r=25)
+    msp.add_lwpolyline(
+        [(0, 0, 0), (100, 0, 1), (100, 50, 0), (0, 50, 1)],
+        format='xyb', close=True, dxfattribs={'layer': 'CUT'}
+    )
+    msp.add_circle((50, 25), 5, dxfattribs={'layer': 'HOLES'})
+    msp.add_text("PLATE 3mm", dxfattribs={'layer': 'NOTES'})
+
+    # Block with a hole on layer 0 inherits the INSERT layer
+    block = doc.blocks.new('BOLT_HOLE')
+    block.add_circle((0, 0), 3)
+    msp.add_blockref('BOLT_HOLE', (10, 25), dxfattribs={'layer': 'HOLES'})
+
+    return msp
+
+
+def test_entity_counts_and_text():
+    """Test entity counts and notes come from the single traversal"""
+    geometry = DXFGeometry.from_modelspace(make_plate())
+
+    assert geometry.entity_counts == {'LWPOLYLINE': 1, 'CIRCLE': 1, 'TEXT': 1, 'INSERT': 1}
+    assert geometry.text_notes == ["PLATE 3mm"]
+
+
+def test_bulges_become_arcs():
+    """Test bulged polyline segments are measured as arcs"""
+    geometry = DXFGeometry.from_modelspace(make_plate())
+
+    assert len(geometry.lines) == 2
+    assert len(geometry.arcs) == 2
+    assert geometry.cut_length(['CUT']) == pytest.approx(200 + 2 * math.pi * 25)
+
+
+def test_extents_include_arc_extremes():
+    """Test extents follow arcs past their endpoints"""
+    geometry = DXFGeometry.from_modelspace(make_plate())
+
+    assert geometry.extents() == pytest.approx((-25.0, 0.0, 125.0, 50.0))
+
+
+def test_extents_without_excluded_layers():
+    """Test cut extents leave out dimensions and notes around the part"""
+    msp = make_plate()
+    msp.add_line((-40, -20), (140, -20), dxfattribs={'layer': 'DIM'})
+    msp.add_arc((50, 25), 80, 0, 90, dxfattribs={'layer': 'DIM'})
+
+    geometry = DXFGeometry.from_modelspace(msp)
+
+    assert geometry.extents()[0] == pytest.approx(-40.0)
+    assert geometry.extents(exclude_layers=['DIM']) == pytest.approx((-25.0, 0.0, 125.0, 50.0))
+
+
+def test_arc_crossing_zero_degrees():
+    """Test arcs that wrap through 0 degrees use the short sweep"""
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    msp.add_arc((0, 0), 10, 350, 10)
+
+    geometry = DXFGeometry.from_modelspace(msp)
+
+    assert geometry.cut_length() == pytest.approx(math.radians(20) * 10)
+    min_x, min_y, max_x, max_y = geometry.extents()
+    assert max_x == pytest.approx(10.0)
+    assert max_y == pytest.approx(10 * math.sin(math.radians(10)))
+
+
+def test_holes_include_block_references():
+    """Test circles inside blocks are listed as holes"""
+    geometry = DXFGeometry.from_modelspace(make_plate())
+    holes = geometry.holes(['HOLE'])
+
+    assert len(holes) == 2
+    assert all(hole['is_hole_layer'] for hole in holes)
+    assert {hole['diameter'] for hole in holes} == {10.0, 6.0}
+
+    stats = geometry.hole_stats(['HOLE'])
+    assert stats['count'] == 2
+    assert stats['by_diameter'] == {'6': 1, '10': 1}
+
+
+def test_empty_modelspace():
+    """Test a drawing without geometry has no extents"""
+    geometry = DXFGeometry.from_modelspace(ezdxf.new().modelspace())
+
+    assert geometry.extents() is None
+    assert geometry.cut_length() == 0.0
+    assert geometry.holes(['HOLE']) == []
+
+
+def test_contours_net_area_with_island():
+    """Test holes subtract area and islands inside holes add it back"""
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    msp.add_lwpolyline([(0, 0), (100, 0), (100, 100), (0, 100)], close=True)
+    msp.add_lwpolyline([(10, 10), (90, 10), (90, 90), (10, 90)], close=True)
+    msp.add_circle((50, 50), 10)
+
+    contours = DXFGeometry.from_modelspace(msp).assemble_contours()
+
+    assert contours['closed_contours'] == 3
+    assert contours['net_area'] == pytest.approx(100 * 100 - 80 * 80 + math.pi * 10 ** 2)
+    assert contours['outer_area'] == pytest.approx(100 * 100)
+
+
+def test_contours_chain_loose_lines_and_arcs():
+    """Test separate LINE/ARC entities drawn in any direction form one loop"""
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    msp.add_line((0, 0), (50, 0))
+    msp.add_arc((50, 10), 10, 270, 90)
+    msp.add_line((0, 20), (50, 20.004))  # reversed, with a small gap
+    msp.add_arc((0, 10), 10, 90, 270)
+
+    contours = DXFGeometry.from_modelspace(msp).assemble_contours()
+
+    assert contours['closed_contours'] == 1
+    assert contours['open_contours'] == 0
+    assert contours['net_area'] == pytest.approx(50 * 20 + math.pi * 10 ** 2, rel=1e-4)
+    assert contours['cut_length'] == pytest.approx(100 + 2 * math.pi * 10, rel=1e-4)
+
+
+def test_contours_report_open_chains():
+    """Test open contours are counted and reported"""
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    msp.add_line((0, 0), (10, 0))
+    msp.add_line((10, 0), (10, 10))
+    msp.add_line((0, 0), (0, 0))  # degenerate, ignored
+
+    contours = DXFGeometry.from_modelspace(msp).assemble_contours()
+
+    assert contours['closed_contours'] == 0
+    assert contours['open_contours'] == 1
+    report = contours['open_contour_report'][0]
+    assert report['segments'] == 2
+    assert report['length'] == pytest.approx(20.0)
+    assert report['gap'] == pytest.approx(math.hypot(10, 10), abs=1e-3)
+
+
+def test_contours_exclude_layers():
+    """Test excluded layers do not count as cut geometry"""
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    msp.add_circle((0, 0), 10, dxfattribs={'layer': 'CUT'})
+    msp.add_line((-20, 0), (20, 0), dxfattribs={'layer': 'CENTERLINES'})
+
+    contours = DXFGeometry.from_modelspace(msp).assemble_contours(exclude_layers=['CENTER'])
+
+    assert contours['closed_contours'] == 1
+    assert contours['open_contours'] == 0
+    assert contours['cut_length'] == pytest.approx(2 * math.pi * 10)
+
+
+def test_contours_ignore_zero_radius_circles():
+    """Test degenerate circles neither crash the containment index nor count as pierces"""
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    for center, radius in [((0, 0), 0), ((5, 5), 0), ((1, 1), 0), ((100, 100), 3)]:
+        msp.add_circle(center, radius)
+
+    contours = DXFGeometry.from_modelspace(msp).assemble_contours()
+
+    assert contours['closed_contours'] == 1
+    assert contours['net_area'] == pytest.approx(math.pi * 3 ** 2)
+    assert contours['cut_length'] == pytest.approx(2 * math.pi * 3)
+
+
+def test_containment_index_with_tiny_contours():
+    """Test mostly point-sized contours next to a large one keep the grid bounded"""
+    bounds = np.array([[0, 0, 0, 0], [5, 5, 5, 5], [1, 1, 1, 1], [0, 0, 200, 200]], dtype=float)
+    test_points = bounds[:, :2].copy()
+    areas = np.array([1e-12, 1e-12, 1e-12, 200.0 * 200.0])
+
+    inner, outer = DXFGeometry._containment_candidates(bounds, test_points, areas)
+
+    assert sorted(inner.tolist()) == [0, 1, 2]
+    assert set(outer.tolist()) == {3}
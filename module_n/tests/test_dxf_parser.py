@@ -210,6 +210,21 @@ class TestDXFParser:
             assert perimeter > 3500
             assert perimeter < 4500
     
+    def test_contour_area_and_pierce_count(self):
+        """Test true area, cut length and pierce count from contours"""
+        if not Path(SAMPLE_DXF_1).exists():
+            pytest.skip(f"Sample DXF file not found: {SAMPLE_DXF_1}")
+        
+        parser = DXFParser()
+        metadata = parser.parse(SAMPLE_DXF_1, "baffle_rect_800x1200_t6_4cornerHoles.dxf")
+        
+        # 800x1200 plate with four 22mm holes
+        hole_area = 4 * 3.141592653589793 * 11 ** 2
+        assert metadata.extracted['area_mm2'] == pytest.approx(800 * 1200 - hole_area, abs=0.01)
+        assert metadata.extracted['pierce_count'] == 5
+        assert metadata.extracted['open_contour_count'] == 0
+        assert metadata.extracted['cut_length_mm'] == pytest.approx(4000 + 4 * 2 * 3.141592653589793 * 11, abs=0.01)
+    
     def test_entity_counting(self):
         """Test entity type counting"""
         if not Path(SAMPLE_DXF_1).exists():
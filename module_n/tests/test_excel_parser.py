@@ -6,6 +6,8 @@ Comprehensive tests for Excel parsing functionality
 import pytest
 import pandas as pd
 import tempfile
+import tracemalloc
+from openpyxl import Workbook
 from pathlib import Path
 from module_n.parsers import ExcelParser
 from module_n.models.schemas import FileType, NormalizedMetadata
@@ -342,6 +344,56 @@ class TestExcelParser:
             Path(temp_path).unlink()
 
 
+class TestExcelStreaming:
+    """Test suite for streaming (read-only) sheet reading"""
+    
+    def make_parts_list(self, path, rows, write_only=False):
+        """Write a parts list with a cover sheet, a blank row and `rows` parts"""
+        # Write-only workbooks have no sheet dimension, so the row count must be counted
+        workbook = Workbook(write_only=write_only)
+        if not write_only:
+            workbook.remove(workbook.active)
+        workbook.create_sheet("Cover")
+        sheet = workbook.create_sheet("Parts")
+        sheet.append([None])
+        sheet.append(["Part Name", "Qty", None, "Qty"])
+        for i in range(rows):
+            sheet.append([f"Bracket {i % 50}", i % 50 + 1, None, "MS"])
+        workbook.save(path)
+        return path
+    
+    @pytest.mark.parametrize("write_only", [False, True])
+    def test_large_parts_list(self, tmp_path, write_only):
+        """Only the sample rows are kept; the row count covers the whole sheet"""
+        path = self.make_parts_list(tmp_path / "parts.xlsx", 20000, write_only)
+        
+        content = ExcelParser().extract_content(str(path))
+        
+        assert content['active_sheet'] == "Parts"
+        assert content['row_count'] == 20000
+        assert content['column_count'] == 4
+        assert content['headers'] == ["Part Name", "Qty", "Unnamed: 2", "Qty.1"]
+        assert len(content['data_rows']) == ExcelParser.MAX_DATA_ROWS
+        assert content['data_rows'][0] == {"Part Name": "Bracket 0", "Qty": "1", "Unnamed: 2": None, "Qty.1": "MS"}
+        assert content['detected_schema'] == 'parts_list'
+    
+    def test_memory_does_not_grow_with_rows(self, tmp_path):
+        """Parsing a 10x larger sheet does not use more memory"""
+        def peak_memory(rows):
+            path = self.make_parts_list(tmp_path / f"parts-{rows}.xlsx", rows)
+            tracemalloc.start()
+            try:
+                ExcelParser().extract_content(str(path))
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        
+        small = peak_memory(2000)
+        large = peak_memory(20000)
+        
+        assert large < small * 1.5
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
@@ -0,0 +1,162 @@
+"""
+Module N - File Listing Tests
+Tests for GET /files keyset pagination, field selection and cached totals
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+import httpx
+from sqlalchemy import text
+
+from module_n import main
+from module_n.config import settings
+from module_n.db import operations, FileIngest
+from module_n.db.operations import (
+    init_db,
+    save_ingest_results,
+    delete_file_ingest,
+    get_file_ingest_page,
+    count_file_ingests,
+    decode_file_cursor,
+    IngestRecord
+)
+from module_n.models.schemas import NormalizedMetadata, FileType
+
+
+@pytest.fixture
+def files_db(tmp_path):
+    """
+    Database with 25 files; the first 5 share a created_at.
+
+    A file database: the endpoint queries it from worker threads.
+    """
+    init_db(f"sqlite:///{tmp_path / 'module_n.db'}")
+    operations.clear_file_count_cache()
+
+    records = [
+        IngestRecord(
+            normalized_metadata=NormalizedMetadata(
+                source_file=f"part{i}.dxf",
+                detected_type=FileType.DXF,
+                client_code="CL0001" if i % 2 == 0 else "CL0002",
+                material="Mild Steel",
+                thickness_mm=3.0 if i < 10 else 5.0
+            ),
+            original_filename=f"part{i}.dxf",
+            stored_filename=f"part{i}-v1.dxf",
+            file_path=f"CL0001/part{i}-v1.dxf"
+        )
+        for i in range(25)
+    ]
+    file_ingests = save_ingest_results(records)
+
+    # Spread creation times; ties are broken by id
+    start = datetime(2025, 1, 1)
+    session = operations.get_session()
+    for i, file_ingest in enumerate(file_ingests):
+        created_at = start if i < 5 else start + timedelta(minutes=i)
+        session.query(FileIngest).filter_by(id=file_ingest.id).update({"created_at": created_at})
+    session.commit()
+    session.close()
+
+    yield [f.id for f in file_ingests]
+    operations.clear_file_count_cache()
+    init_db("sqlite:///:memory:")  # Don't leave the global engine on the temp file
+
+
+def test_cursor_pages_cover_every_file_once(files_db):
+    """Walking the cursor visits each file exactly once, newest first"""
+    seen = []
+    cursor = None
+    while True:
+        records, cursor = get_file_ingest_page(limit=7, cursor=cursor, fields=["id"])
+        seen.extend(r["id"] for r in records)
+        if cursor is None:
+            break
+
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+    # Newest first; the five files with the same created_at come last, by id descending
+    assert seen[:3] == files_db[24:21:-1]
+    assert seen[-5:] == files_db[4::-1]
+
+
+def test_cursor_respects_filters(files_db):
+    records, cursor = get_file_ingest_page(client_code="CL0001", limit=10, fields=["id", "client_code"])
+    more, last = get_file_ingest_page(client_code="CL0001", limit=10, cursor=cursor, fields=["id", "client_code"])
+
+    assert len(records) == 10 and len(more) == 3
+    assert last is None
+    assert {r["client_code"] for r in records + more} == {"CL0001"}
+
+
+def test_field_selection(files_db):
+    records, _ = get_file_ingest_page(limit=1, fields=["stored_filename", "created_at"])
+
+    assert records == [{"stored_filename": "part24-v1.dxf", "created_at": "2025-01-01T00:24:00"}]
+
+    with pytest.raises(ValueError):
+        get_file_ingest_page(fields=["password"])
+    with pytest.raises(ValueError):
+        decode_file_cursor("not-a-cursor")
+
+
+def test_count_cached_until_write(files_db, monkeypatch):
+    """Totals are cached per filter combination and dropped on writes"""
+    monkeypatch.setattr(settings, "FILES_COUNT_CACHE_TTL", 60)
+    queries = []
+    real_get_session = operations.get_session
+
+    def counting_session():
+        queries.append(1)
+        return real_get_session()
+
+    monkeypatch.setattr(operations, "get_session", counting_session)
+
+    assert count_file_ingests(thickness_mm=5.0) == 15
+    assert count_file_ingests(thickness_mm=5.0) == 15
+    assert count_file_ingests(client_code="CL0002") == 12
+    assert len(queries) == 2
+
+    delete_file_ingest(files_db[24])
+    assert count_file_ingests(thickness_mm=5.0) == 14
+
+
+def test_composite_indexes_used(files_db):
+    """The common filter pairs are served from their composite indexes"""
+    session = operations.get_session()
+    try:
+        plans = {
+            index: " ".join(row[-1] for row in session.execute(text(
+                f"EXPLAIN QUERY PLAN SELECT id FROM file_ingests WHERE {where} ORDER BY created_at DESC"
+            )))
+            for index, where in [
+                ("idx_file_ingests_client_status", "client_code = 'CL0001' AND status = 'completed'"),
+                ("idx_file_ingests_material_thickness", "material = 'Mild Steel' AND thickness_mm = 5.0"),
+            ]
+        }
+    finally:
+        session.close()
+
+    for index, plan in plans.items():
+        assert index in plan
+
+
+@pytest.mark.asyncio
+async def test_list_files_endpoint(files_db):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = (await client.get("/files", params={"limit": 20, "fields": "id,stored_filename"})).json()
+        second = (await client.get("/files", params={"limit": 20, "cursor": first["next_cursor"]})).json()
+        bad = await client.get("/files", params={"fields": "id,secret"})
+        too_many = await client.get("/files", params={"limit": 100000})
+
+    assert first["total"] == 25
+    assert first["count"] == 20
+    assert set(first["files"][0]) == {"id", "stored_filename"}
+    assert second["count"] == 5
+    assert second["next_cursor"] is None
+    assert "original_filename" in second["files"][0]
+    assert bad.status_code == 400
+    assert too_many.status_code == 422
@@ -6,8 +6,10 @@ Comprehensive tests for Image parsing functionality
 import pytest
 import tempfile
 from pathlib import Path
-from PIL import Image
+from PIL import Image, ImageDraw
 from module_n.parsers import ImageParser
+from module_n.parsers import ocr
+from module_n.db.operations import init_db
 from module_n.models.schemas import FileType, NormalizedMetadata
 
 
@@ -285,6 +287,117 @@ class TestImageParser:
             Path(temp_path).unlink()
 
 
+def make_drawing(path, size=(400, 300), dpi=(72, 72), shade=0):
+    """Save a simple line drawing (the same picture at any size)"""
+    img = Image.new('RGB', (400, 300), color='white')
+    draw = ImageDraw.Draw(img)
+    draw.line([(360, 60), (40, 60), (40, 200), (360, 200)], fill=(shade, shade, shade), width=3)
+    img.resize(size).save(path, dpi=dpi)
+    return path
+
+
+class TestOCR:
+    """Test suite for the OCR tier (downscaling, timeout, cache)"""
+    
+    @pytest.fixture
+    def tesseract(self, monkeypatch):
+        """Fake Tesseract that records the image sizes it was given"""
+        calls = []
+        
+        def image_to_string(image, lang=None, config='', timeout=0, **kwargs):
+            calls.append(image.size)
+            return "MILD STEEL 3mm QTY 12"
+        
+        init_db("sqlite:///:memory:")
+        monkeypatch.setattr(ocr, 'tesseract_installed', lambda: True)
+        monkeypatch.setattr(ocr.pytesseract, 'image_to_string', image_to_string)
+        return calls
+    
+    def test_ocr_scale(self, monkeypatch):
+        """High DPI scans go to the target DPI, huge images to the pixel cap"""
+        monkeypatch.setattr(ocr.settings, 'OCR_TARGET_DPI', 300)
+        monkeypatch.setattr(ocr.settings, 'OCR_MAX_PIXELS', 4000000)
+        
+        assert ocr.ocr_scale(2400, 3300, (600, 600)) == pytest.approx(0.5)
+        assert ocr.ocr_scale(4000, 4000) == pytest.approx(0.5)
+        assert ocr.ocr_scale(800, 600, (72, 72)) == 1.0
+    
+    def test_jpeg_downscaled_before_ocr(self, tesseract, tmp_path, monkeypatch):
+        """Large scans are reduced before they reach Tesseract"""
+        monkeypatch.setattr(ocr.settings, 'OCR_CACHE_ENABLED', False)
+        path = make_drawing(tmp_path / 'scan.jpg', size=(2400, 1800), dpi=(600, 600))
+        
+        metadata = ImageParser().parse(str(path), "scan.jpg")
+        
+        assert tesseract == [(1200, 900)]
+        assert metadata.extracted['width'] == 2400
+        assert metadata.material == 'Mild Steel'
+        assert metadata.thickness_mm == 3.0
+    
+    def test_identical_image_uses_cache(self, tesseract, tmp_path):
+        """The same picture saved in another format is not OCR'd again"""
+        first = make_drawing(tmp_path / 'sketch.png')
+        copy = make_drawing(tmp_path / 'sketch-copy.bmp')
+        
+        parser = ImageParser()
+        original = parser.parse(str(first), "sketch.png")
+        duplicate = parser.parse(str(copy), "sketch-copy.bmp")
+        
+        assert len(tesseract) == 1
+        assert original.extracted['ocr_cache_hit'] is False
+        assert duplicate.extracted['ocr_cache_hit'] is True
+        assert duplicate.extracted['ocr_text'] == "MILD STEEL 3mm QTY 12"
+    
+    def test_different_drawings_do_not_share_text(self, tesseract, tmp_path):
+        """Two different sketches each get their own OCR text"""
+        first = make_drawing(tmp_path / 'bracket.png')
+        second = tmp_path / 'plate.png'
+        img = Image.new('RGB', (400, 300), color='white')
+        draw = ImageDraw.Draw(img)
+        draw.line([(360, 60), (40, 60), (40, 200), (360, 200)], fill=(0, 0, 0), width=3)
+        draw.line([(200, 60), (200, 200)], fill=(0, 0, 0), width=3)
+        img.save(second)
+        
+        parser = ImageParser()
+        parser.parse(str(first), "bracket.png")
+        other = parser.parse(str(second), "plate.png")
+        
+        assert len(tesseract) == 2
+        assert other.extracted['ocr_cache_hit'] is False
+    
+    def test_near_duplicate_only_with_max_distance(self, tesseract, tmp_path, monkeypatch):
+        """Re-saved, resized copies reuse OCR text only when near matches are enabled"""
+        first = make_drawing(tmp_path / 'sketch.png')
+        copy = make_drawing(tmp_path / 'sketch-copy.jpg', size=(800, 600), shade=20)
+        other_copy = make_drawing(tmp_path / 'sketch-small.jpg', size=(600, 450), shade=10)
+        
+        parser = ImageParser()
+        parser.parse(str(first), "sketch.png")
+        assert parser.parse(str(copy), "sketch-copy.jpg").extracted['ocr_cache_hit'] is False
+        
+        monkeypatch.setattr(ocr.settings, 'OCR_CACHE_MAX_DISTANCE', 16)
+        assert parser.parse(str(other_copy), "sketch-small.jpg").extracted['ocr_cache_hit'] is True
+        assert len(tesseract) == 2
+    
+    def test_timeout_is_not_cached(self, tesseract, tmp_path, monkeypatch):
+        """A timed out image is reported and retried next time"""
+        def slow_image_to_string(image, **kwargs):
+            tesseract.append(image.size)
+            raise RuntimeError('Tesseract process timeout')
+        
+        path = make_drawing(tmp_path / 'slow.png', size=(300, 300))
+        monkeypatch.setattr(ocr.pytesseract, 'image_to_string', slow_image_to_string)
+        
+        parser = ImageParser()
+        first = parser.parse(str(path), "slow.png")
+        second = parser.parse(str(path), "slow.png")
+        
+        assert first.extracted['ocr_timed_out'] is True
+        assert first.extracted['ocr_available'] is False
+        assert second.extracted['ocr_cache_hit'] is False
+        assert len(tesseract) == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
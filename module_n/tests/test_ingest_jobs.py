@@ -0,0 +1,392 @@
+"""
+Module N - Ingest Job Tests
+Tests for background batch ingestion, status polling and NDJSON results
+"""
+
+import io
+import os
+import json
+import asyncio
+import functools
+import zipfile
+import pytest
+import httpx
+
+from module_n import main
+from module_n.jobs import IngestJobManager
+from module_n.models.schemas import FileIngestResponse, ProcessingStatus
+
+
+@pytest.fixture
+def file_db(tmp_path):
+    """Database on a temp file (saves run in worker threads, which can't share :memory:)"""
+    from module_n.db import init_db
+
+    init_db(f"sqlite:///{tmp_path / 'module_n.db'}")
+    yield
+    init_db("sqlite:///:memory:")  # Don't leave the global engine on the temp file
+
+
+def make_result(filename, success=True):
+    """FileIngestResponse for a processed file"""
+    return FileIngestResponse(
+        success=success,
+        filename=filename,
+        status=ProcessingStatus.COMPLETED if success else ProcessingStatus.FAILED,
+        error=None if success else "parsing failed"
+    )
+
+
+@pytest.mark.asyncio
+async def test_files_processed_concurrently():
+    """Files run in parallel up to the concurrency limit"""
+    manager = IngestJobManager(concurrency=2)
+    job = manager.create_job(["a.dxf", "b.dxf", "c.dxf", "d.dxf"])
+    running = 0
+    peak = 0
+
+    def processor(filename):
+        async def process():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return make_result(filename)
+        return process
+
+    await manager.start(job, {f.index: processor(f.filename) for f in job.files})
+
+    assert peak == 2
+    assert job.done
+    assert job.to_dict()["completed"] == 4
+    assert job.to_dict()["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_results_stream_in_completion_order():
+    """Finished files are streamed as they finish; errors become failed results"""
+    manager = IngestJobManager(concurrency=4)
+    job = manager.create_job(["slow.pdf", "fast.dxf", "broken.xlsx"])
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return make_result("slow.pdf")
+
+    async def fast():
+        return make_result("fast.dxf")
+
+    async def broken():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("worker crashed")
+
+    manager.start(job, {0: slow, 1: fast, 2: broken})
+    streamed = [job_file.filename async for job_file in job.stream_results()]
+
+    assert streamed == ["fast.dxf", "broken.xlsx", "slow.pdf"]
+    assert job.files[2].status == ProcessingStatus.FAILED
+    assert job.files[2].to_dict()["error"] == "worker crashed"
+
+
+@pytest.mark.asyncio
+async def test_shutdown_discards_files_not_started():
+    """Files still waiting when the job is cancelled release their staged data"""
+    manager = IngestJobManager(concurrency=1)
+    job = manager.create_job(["a.dxf", "b.dxf", "c.dxf"])
+    running = asyncio.Event()
+    discarded = []
+
+    async def blocked():
+        running.set()
+        await asyncio.sleep(60)
+
+    manager.start(
+        job,
+        {i: blocked for i in range(3)},
+        {i: functools.partial(discarded.append, i) for i in range(3)}
+    )
+    await running.wait()
+    await manager.shutdown()
+
+    assert discarded == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_shutdown_ends_result_stream():
+    """Cancelled jobs fail their unfinished files, so result streams don't hang"""
+    manager = IngestJobManager(concurrency=1)
+    job = manager.create_job(["a.dxf", "b.dxf"])
+    running = asyncio.Event()
+
+    async def blocked():
+        running.set()
+        await asyncio.sleep(60)
+
+    async def collect():
+        return [job_file async for job_file in job.stream_results()]
+
+    manager.start(job, {0: blocked, 1: blocked})
+    stream = asyncio.create_task(collect())
+    await running.wait()
+    await manager.shutdown()
+    streamed = await asyncio.wait_for(stream, timeout=5)
+
+    assert sorted(job_file.index for job_file in streamed) == [0, 1]
+    assert all(job_file.result.error == "Job cancelled" for job_file in streamed)
+    assert job.done
+    assert job.to_dict()["failed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_evicted():
+    """Only the newest finished jobs are kept"""
+    manager = IngestJobManager(max_jobs=2)
+    jobs = [manager.create_job([]) for _ in range(3)]
+
+    assert manager.get_job(jobs[0].id) is None
+    assert manager.get_job(jobs[2].id) is jobs[2]
+
+
+@pytest.mark.asyncio
+async def test_job_endpoints(monkeypatch):
+    """Submit returns immediately; status and NDJSON results follow"""
+    release = asyncio.Event()
+
+    async def fake_process(filename, staged, **kwargs):
+        await release.wait()
+        staged.cleanup()
+        return make_result(filename)
+
+    monkeypatch.setattr(main, "process_staged_file", fake_process)
+    manager = IngestJobManager()
+    monkeypatch.setattr(main, "get_job_manager", lambda: manager)
+
+    files = [
+        ("files", ("part-1.dxf", b"0\nSECTION\n2\nENTITIES\n0\nENDSEC\n0\nEOF\n", "application/dxf")),
+        ("files", ("part-2.dxf", b"0\nSECTION\n2\nENTITIES\n0\nENDSEC\n0\nEOF\n", "application/dxf")),
+        ("files", ("notes.exe", b"MZ", "application/octet-stream")),
+    ]
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/ingest/jobs", files=files)
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        status = (await client.get(f"/jobs/{job_id}")).json()
+        assert status["total"] == 3
+        assert status["failed"] == 1  # Rejected during validation
+        assert status["status"] != "completed"
+
+        release.set()
+        response = await client.get(f"/jobs/{job_id}/results")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert lines[0]["index"] == 2 and lines[0]["success"] is False
+        assert sorted(line["filename"] for line in lines[1:]) == ["part-1.dxf", "part-2.dxf"]
+
+        status = (await client.get(f"/jobs/{job_id}")).json()
+        assert status["status"] == "completed"
+        assert [f["status"] for f in status["files"]] == ["completed", "completed", "failed"]
+
+        assert (await client.get("/jobs/unknown")).status_code == 404
+
+
+DXF_CONTENT = b"0\nSECTION\n2\nENTITIES\n0\nENDSEC\n0\nEOF\n"
+
+
+def make_zip(members):
+    """ZIP archive bytes built from {name: content}"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_ingest_zip_members(monkeypatch):
+    """Each ZIP member is validated and processed concurrently with its own result"""
+    running = 0
+    peak = 0
+    seen = {}
+
+    async def fake_process(filename, staged, *args, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        seen[filename] = staged.sha256
+        await asyncio.sleep(0.01)
+        running -= 1
+        staged.cleanup()
+        return make_result(filename)
+
+    monkeypatch.setattr(main, "process_staged_file", fake_process)
+    monkeypatch.setattr(main.settings, "ZIP_MEMBER_CONCURRENCY", 2)
+
+    archive = make_zip({
+        "parts/part-1.dxf": DXF_CONTENT,
+        "parts/part-2.dxf": DXF_CONTENT + b"\n",
+        "parts/part-3.dxf": DXF_CONTENT + b"\n\n",
+        "parts/readme.exe": b"MZ",
+        "nested.zip": make_zip({"a.dxf": DXF_CONTENT}),
+    })
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/ingest", files=[("files", ("drawings.zip", archive, "application/zip"))])
+
+    results = response.json()
+    assert [r["filename"] for r in results] == ["part-1.dxf", "part-2.dxf", "part-3.dxf", "readme.exe", "nested.zip"]
+    assert [r["success"] for r in results] == [True, True, True, False, False]
+    assert "Nested archives" in results[4]["error"]
+    assert peak == 2
+    assert len(set(seen.values())) == 3
+
+
+@pytest.mark.asyncio
+async def test_zip_job_expands_members(monkeypatch):
+    """A ZIP submitted as a job becomes one job file per member"""
+    async def fake_process(filename, staged, *args, **kwargs):
+        staged.cleanup()
+        return make_result(filename)
+
+    monkeypatch.setattr(main, "process_staged_file", fake_process)
+    manager = IngestJobManager()
+    monkeypatch.setattr(main, "get_job_manager", lambda: manager)
+
+    archive = make_zip({"part-1.dxf": DXF_CONTENT, "part-2.dxf": DXF_CONTENT})
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/ingest/jobs", files=[("files", ("drawings.zip", archive, "application/zip"))])
+        job_id = response.json()["job_id"]
+
+        assert response.json()["total"] == 2
+        results = (await client.get(f"/jobs/{job_id}/results")).text.splitlines()
+
+    assert sorted(json.loads(line)["filename"] for line in results) == ["part-1.dxf", "part-2.dxf"]
+
+
+@pytest.mark.asyncio
+async def test_job_removes_staged_archive_on_unexpected_error(monkeypatch):
+    """An archive that fails to open for any reason does not leave its upload behind"""
+    staged_paths = []
+    stage_and_validate = main.stage_and_validate
+
+    async def tracking_stage(file):
+        staged, failure = await stage_and_validate(file)
+        staged_paths.append(staged.path)
+        return staged, failure
+
+    def broken_open(staged):
+        raise OSError("disk error")
+
+    monkeypatch.setattr(main, "stage_and_validate", tracking_stage)
+    monkeypatch.setattr(main, "open_archive", broken_open)
+    manager = IngestJobManager()
+    monkeypatch.setattr(main, "get_job_manager", lambda: manager)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/ingest/jobs", files=[("files", ("drawings.zip", make_zip({"a.dxf": DXF_CONTENT}), "application/zip"))]
+        )
+        status = (await client.get(f"/jobs/{response.json()['job_id']}")).json()
+
+    assert status["files"][0]["error"] == "disk error"
+    assert len(staged_paths) == 1 and not os.path.exists(staged_paths[0])
+
+
+@pytest.mark.asyncio
+async def test_ingest_saves_batch_in_one_transaction(monkeypatch, file_db):
+    """/ingest collects every file's record and saves them with one call"""
+    from module_n.db import IngestRecord
+    from module_n.models.schemas import NormalizedMetadata, FileType
+
+    saved = []
+    real_save = main.save_ingest_results
+
+    def save_ingest_results(records):
+        saved.append(len(records))
+        return real_save(records)
+
+    async def fake_process(filename, staged, *args, batch=None, **kwargs):
+        staged.cleanup()
+        result = make_result(filename)
+        record = IngestRecord(
+            normalized_metadata=NormalizedMetadata(source_file=filename, detected_type=FileType.DXF),
+            original_filename=filename,
+            stored_filename=filename,
+            file_path=f"CL0001/{filename}",
+            metadata={'sha256': staged.sha256}
+        )
+        batch.append((record, result))
+        return result
+
+    monkeypatch.setattr(main, "process_staged_file", fake_process)
+    monkeypatch.setattr(main, "save_ingest_results", save_ingest_results)
+    monkeypatch.setattr(main.settings, "WEBHOOK_ENABLED", False)
+
+    files = [
+        ("files", ("part-1.dxf", DXF_CONTENT, "application/dxf")),
+        ("files", ("drawings.zip", make_zip({"part-2.dxf": DXF_CONTENT, "part-3.dxf": DXF_CONTENT}), "application/zip")),
+    ]
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        results = (await client.post("/ingest", files=files)).json()
+
+    assert saved == [3]
+    assert [r["filename"] for r in results] == ["part-1.dxf", "part-2.dxf", "part-3.dxf"]
+    assert all(r["ingest_id"] for r in results)
+    assert len(set(r["ingest_id"] for r in results)) == 3
+
+
+@pytest.mark.asyncio
+async def test_ingest_queues_webhooks_without_waiting(monkeypatch, tmp_path, file_db):
+    """/ingest writes its file.processed webhooks to the outbox in one call and returns"""
+    from module_n.db import IngestRecord
+    from module_n.models.schemas import NormalizedMetadata, FileType
+    from module_n.webhooks import WebhookDispatcher, WebhookQueue
+
+    queue = WebhookQueue(queue_file=str(tmp_path / "outbox.db"))
+    dispatcher = WebhookDispatcher(queue=queue)
+    writes = []
+    real_add_many = queue.add_many
+
+    def add_many(items, *args, **kwargs):
+        writes.append([ingest_id for _, ingest_id, _ in items])
+        return real_add_many(items, *args, **kwargs)
+
+    async def fake_process(filename, staged, *args, batch=None, **kwargs):
+        staged.cleanup()
+        result = make_result(filename)
+        record = IngestRecord(
+            normalized_metadata=NormalizedMetadata(source_file=filename, detected_type=FileType.DXF),
+            original_filename=filename,
+            stored_filename=filename,
+            file_path=f"CL0001/{filename}",
+            metadata={'sha256': staged.sha256}
+        )
+        batch.append((record, result))
+        return result
+
+    monkeypatch.setattr(queue, "add_many", add_many)
+    monkeypatch.setattr(main, "process_staged_file", fake_process)
+    monkeypatch.setattr(main, "get_webhook_dispatcher", lambda: dispatcher)
+    monkeypatch.setattr(main.settings, "WEBHOOK_ENABLED", True)
+
+    files = [
+        ("files", ("part-1.dxf", DXF_CONTENT, "application/dxf")),
+        ("files", ("part-2.dxf", DXF_CONTENT, "application/dxf")),
+    ]
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        results = (await client.post("/ingest", files=files)).json()
+
+    assert writes == [[r["ingest_id"] for r in results]]
+    assert queue.get_stats()["pending"] == 2
+    queue.close()
@@ -3,16 +3,21 @@ Module N - Integration Tests
 Comprehensive tests for the complete flow: upload → parse → save to DB → retrieve
 """
 
+import json
 import pytest
 import tempfile
 import shutil
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 from module_n.db.models import Base, FileIngest, FileExtraction, FileMetadata
+from module_n.db import operations
 from module_n.db.operations import (
     init_db,
+    IngestRecord,
+    save_ingest_result,
+    save_ingest_results,
     save_file_ingest,
     save_file_extraction,
     save_file_metadata,
@@ -272,6 +277,91 @@ class TestDatabaseOperations:
         retrieved = get_file_ingest(file_ingest.id, include_deleted=True)
         assert retrieved is None
 
+class TestIngestUnitOfWork:
+    """Test saving ingest rows, extractions and metadata in one transaction"""
+
+    @staticmethod
+    def make_record(i, **overrides):
+        values = dict(
+            normalized_metadata=NormalizedMetadata(
+                source_file=f"part{i}.dxf",
+                detected_type=FileType.DXF,
+                client_code="CL0001",
+                material="Mild Steel",
+                thickness_mm=5.0,
+                confidence_score=0.9
+            ),
+            original_filename=f"part{i}.dxf",
+            stored_filename=f"part{i}-v1.dxf",
+            file_path=f"CL0001/part{i}-v1.dxf",
+            extraction_type="dxf_metadata",
+            extracted_data={"entities": i},
+            parser_name="dxf_parser",
+            parser_version="1.0.0",
+            metadata={'material': 'Mild Steel', 'thickness_mm': 5.0, 'sha256': f"{i:064x}", 'part_name': None},
+            metadata_source="dxf_parser"
+        )
+        values.update(overrides)
+        return IngestRecord(**values)
+
+    @staticmethod
+    def count_commits():
+        commits = []
+        event.listen(operations._engine, "commit", lambda conn: commits.append(conn))
+        return commits
+
+    def test_save_ingest_result(self, test_db):
+        """Ingest row, extraction and metadata are written with one commit"""
+        commits = self.count_commits()
+
+        file_ingest = save_ingest_result(self.make_record(1))
+
+        assert len(commits) == 1
+        # Usable after the session is closed, without a refresh
+        assert file_ingest.id is not None
+        assert file_ingest.created_at is not None
+        assert file_ingest.processing_mode == 'AUTO'
+
+        retrieved = get_file_ingest(file_ingest.id)
+        assert [json.loads(e.extracted_data) for e in retrieved.extractions] == [{"entities": 1}]
+        values = {m.key: (m.value, m.data_type) for m in retrieved.file_metadata}
+        assert values == {
+            'material': ('Mild Steel', 'string'),
+            'thickness_mm': ('5.0', 'number'),
+            'sha256': (f"{1:064x}", 'string'),
+        }
+
+    def test_save_ingest_results_batch(self, test_db):
+        """A whole batch is persisted with a single commit, in order"""
+        commits = self.count_commits()
+        records = [self.make_record(i) for i in range(20)]
+        records.append(self.make_record(20, extraction_type=None, metadata={}))
+
+        file_ingests = save_ingest_results(records)
+
+        assert len(commits) == 1
+        assert [f.original_filename for f in file_ingests] == [f"part{i}.dxf" for i in range(21)]
+        assert len(set(f.id for f in file_ingests)) == 21
+
+        session = operations.get_session()
+        try:
+            assert session.query(FileExtraction).count() == 20
+            assert session.query(FileMetadata).count() == 60
+            first = session.query(FileExtraction).filter_by(file_ingest_id=file_ingests[3].id).one()
+            assert json.loads(first.extracted_data) == {"entities": 3}
+        finally:
+            session.close()
+
+    def test_failed_batch_is_rolled_back(self, test_db):
+        """Nothing is saved when any row of the batch fails"""
+        records = [self.make_record(1), self.make_record(2, original_filename=None)]
+
+        assert save_ingest_results(records) is None
+        assert get_file_ingests() == []
+
+    def test_empty_batch(self, test_db):
+        assert save_ingest_results([]) == []
+
 
 class TestFileStorage:
     """Test file storage operations"""
@@ -304,7 +394,7 @@ class TestFileStorage:
         finally:
             storage_module.get_upload_folder = original_get_upload_folder
     
-    def test_auto_versioning(self, test_storage, tmp_path):
+    def test_auto_versioning(self, test_db, test_storage, tmp_path):
         """Test automatic version incrementing"""
         # Create test files
         test_file1 = tmp_path / "test1.txt"
@@ -345,6 +435,68 @@ class TestFileStorage:
         finally:
             storage_module.get_upload_folder = original_get_upload_folder
 
+    def test_version_registry_seeded_from_folder(self, test_db, test_storage, tmp_path, monkeypatch):
+        """Existing files seed the registry once; later versions need no folder scan"""
+        import module_n.storage.file_storage as storage_module
+        monkeypatch.setattr(storage_module, "get_upload_folder", lambda: test_storage)
+
+        project_dir = test_storage / "CL0001" / "JB-2025-10-CL0001-001"
+        project_dir.mkdir(parents=True)
+        (project_dir / "Bracket-v1.dxf").write_text("old")
+        (project_dir / "Bracket-v3.dxf").write_text("old")
+
+        scans = []
+        real_scan = storage_module.get_next_version
+        monkeypatch.setattr(
+            storage_module, "get_next_version",
+            lambda directory, base: scans.append(base) or real_scan(directory, base)
+        )
+
+        source = tmp_path / "upload.dxf"
+        source.write_text("new")
+        stored = [
+            save_file(str(source), "Bracket-v1.dxf", "CL0001", "JB-2025-10-CL0001-001")[0]
+            for _ in range(3)
+        ]
+
+        assert stored == ["Bracket-v4.dxf", "Bracket-v5.dxf", "Bracket-v6.dxf"]
+        assert scans == ["Bracket"]
+
+    def test_version_registry_skips_taken_files(self, test_db, test_storage, tmp_path, monkeypatch):
+        """A file copied into the folder behind the registry's back is not overwritten"""
+        import module_n.storage.file_storage as storage_module
+        monkeypatch.setattr(storage_module, "get_upload_folder", lambda: test_storage)
+
+        source = tmp_path / "upload.dxf"
+        source.write_text("new")
+        assert save_file(str(source), "Plate.dxf", "CL0002")[0] == "Plate-v1.dxf"
+
+        (test_storage / "CL0002" / "Plate-v2.dxf").write_text("copied in")
+
+        assert save_file(str(source), "Plate.dxf", "CL0002")[0] == "Plate-v3.dxf"
+        assert (test_storage / "CL0002" / "Plate-v2.dxf").read_text() == "copied in"
+
+    def test_concurrent_version_allocation(self, tmp_path):
+        """Concurrent ingests of the same part never get the same version"""
+        import threading
+        from module_n.db.operations import allocate_file_version
+
+        init_db(f"sqlite:///{tmp_path / 'versions.db'}")
+        versions = []
+
+        def allocate():
+            for _ in range(10):
+                versions.append(allocate_file_version("CL0001", None, "Bracket"))
+
+        threads = [threading.Thread(target=allocate) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        init_db(TEST_DB_URL)
+        assert sorted(versions) == list(range(1, 41))
+
 
 class TestCompleteFlow:
     """Test complete flow: parse → save → retrieve"""
@@ -271,6 +271,79 @@ class TestLBRNParser:
         assert metadata.project_code == "TEST-2025-01-CL9999-999"
 
 
+GEOMETRY_LBRN = """<?xml version="1.0" encoding="UTF-8"?>
+<LightBurnProject AppVersion="1.4.00" DeviceName="Fiber" FormatVersion="1" MaterialHeight="2">
+    <CutSetting type="Cut">
+        <index Value="0"/>
+        <name Value="C00"/>
+    </CutSetting>
+    <Shape Type="Rect" CutIndex="0" W="100" H="40" Cr="0">
+        <XForm>0 1 -1 0 300 300</XForm>
+    </Shape>
+    <Shape Type="Group">
+        <XForm>1 0 0 1 1000 0</XForm>
+        <Children>
+            <Shape Type="Ellipse" CutIndex="0" Rx="10" Ry="5">
+                <XForm>1 0 0 1 0 0</XForm>
+            </Shape>
+            <Shape Type="Path" CutIndex="0" VertID="0" PrimID="0">
+                <XForm>1 0 0 1 0 0</XForm>
+                <VertList>V0 0c0x0c0y30V100 0c1x100c1y30</VertList>
+                <PrimList>B0 1</PrimList>
+            </Shape>
+        </Children>
+    </Shape>
+    <Shape Type="Path" CutIndex="0" VertID="0" PrimID="0">
+        <XForm>1 0 0 -1 500 -100</XForm>
+    </Shape>
+</LightBurnProject>
+"""
+
+
+class TestLBRNGeometry:
+    """Test the streaming pass and exact bounding box"""
+
+    def parse(self, tmp_path, content):
+        file_path = tmp_path / "geometry.lbrn2"
+        file_path.write_text(content)
+        return LBRNParser().extract_content(str(file_path))
+
+    def test_exact_bounding_box(self, tmp_path):
+        """Test rotated rectangles, group transforms, ellipses and bezier bulges"""
+        content = self.parse(tmp_path, GEOMETRY_LBRN)
+        bbox = content['bounding_box']
+
+        # Rect rotated 90 degrees: 40 wide, 100 tall around (300, 300)
+        assert bbox['min_x'] == pytest.approx(280)
+        # Bezier bulge peaks at 0.75 * 30 = 22.5 inside the group at x=1000
+        assert bbox['max_x'] == pytest.approx(1100)
+        assert bbox['max_y'] == pytest.approx(350)
+        # Mirrored reuse of the shared path drops to -100 - 22.5
+        assert bbox['min_y'] == pytest.approx(-122.5)
+        assert bbox['width'] == pytest.approx(820)
+
+    def test_counts_include_group_children(self, tmp_path):
+        """Test nested shapes are counted and cut settings are read"""
+        content = self.parse(tmp_path, GEOMETRY_LBRN)
+
+        assert content['shape_count'] == 5
+        assert content['shape_types'] == {'Rect': 1, 'Group': 1, 'Ellipse': 1, 'Path': 2}
+        assert content['cut_settings'] == [{'type': 'Cut', 'name': 'C00', 'max_power': 0.0, 'speed': 0.0}]
+        assert content['material_height'] == 2.0
+
+    def test_large_project(self, tmp_path):
+        """Test every shape counts towards the bounding box, not a sample"""
+        shapes = "".join(
+            f'<Shape Type="Rect" CutIndex="0" W="10" H="10"><XForm>1 0 0 1 {i * 20} 0</XForm></Shape>'
+            for i in range(5000)
+        )
+        content = self.parse(tmp_path, f'<LightBurnProject AppVersion="1.4.00">{shapes}</LightBurnProject>')
+
+        assert content['shape_count'] == 5000
+        assert content['bounding_box']['min_x'] == pytest.approx(-5)
+        assert content['bounding_box']['max_x'] == pytest.approx(4999 * 20 + 5)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
@@ -0,0 +1,130 @@
+"""
+Module N - Metrics Tests
+Tests for stage histograms, the Prometheus text output, request tracing and /metrics
+"""
+
+import logging
+from pathlib import Path
+
+import pytest
+import httpx
+
+from module_n import main, metrics
+from module_n.metrics import MetricsRegistry, STAGE_METRIC
+from module_n.parsers import ParserExecutor
+from module_n.parsers.cache import ParseCache
+
+
+SAMPLE_LBRN = "module_n/tests/fixtures/test_lightburn.lbrn2"
+DXF_CONTENT = b"0\nSECTION\n2\nENTITIES\n0\nENDSEC\n0\nEOF\n"
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Fresh global metrics registry"""
+    registry = MetricsRegistry(enabled=True, buckets=(0.01, 0.1, 1.0))
+    monkeypatch.setattr(metrics, "_metrics", registry)
+    return registry
+
+
+def test_histogram_rendered_in_prometheus_format(registry):
+    """Buckets are cumulative and end with +Inf; sum and count follow"""
+    for seconds in (0.005, 0.05, 0.05, 5.0):
+        registry.observe("parse", seconds, parser="dxf")
+    registry.increment("module_n_ingest_files_total", parser="dxf", status="completed")
+    registry.set_gauge("module_n_parser_in_flight", 2, parser="dxf")
+
+    text = registry.render()
+
+    assert f"# TYPE {STAGE_METRIC} histogram" in text
+    assert f'{STAGE_METRIC}_bucket{{parser="dxf",stage="parse",le="0.01"}} 1' in text
+    assert f'{STAGE_METRIC}_bucket{{parser="dxf",stage="parse",le="0.1"}} 3' in text
+    assert f'{STAGE_METRIC}_bucket{{parser="dxf",stage="parse",le="1"}} 3' in text
+    assert f'{STAGE_METRIC}_bucket{{parser="dxf",stage="parse",le="+Inf"}} 4' in text
+    assert f'{STAGE_METRIC}_sum{{parser="dxf",stage="parse"}} 5.105' in text
+    assert f'{STAGE_METRIC}_count{{parser="dxf",stage="parse"}} 4' in text
+    assert "# TYPE module_n_ingest_files_total counter" in text
+    assert 'module_n_ingest_files_total{parser="dxf",status="completed"} 1' in text
+    assert 'module_n_parser_in_flight{parser="dxf"} 2' in text
+    assert text.endswith("\n")
+
+
+def test_stage_timer_records_failures_and_escapes_labels(registry):
+    """Stages that raise are still timed; label values are escaped"""
+    with pytest.raises(ValueError):
+        with registry.stage('parse', parser='a"b'):
+            raise ValueError("boom")
+
+    assert registry.get_stage_stats()['parse[a"b]']['count'] == 1
+    assert 'parser="a\\"b"' in registry.render()
+
+
+def test_disabled_registry_records_nothing():
+    """With METRICS_ENABLED off nothing is kept"""
+    registry = MetricsRegistry(enabled=False)
+    with registry.stage("validate"):
+        pass
+    registry.increment("module_n_ingest_files_total", status="completed")
+
+    assert registry.render() == ""
+
+
+@pytest.mark.asyncio
+async def test_executor_records_parse_stages(registry):
+    """Queue wait and parse time are recorded per parser"""
+    if not Path(SAMPLE_LBRN).exists():
+        pytest.skip(f"Sample LightBurn file not found: {SAMPLE_LBRN}")
+
+    executor = ParserExecutor(max_workers=1, use_processes=False, cache=ParseCache(enabled=False))
+    try:
+        await executor.parse("lbrn2", SAMPLE_LBRN, "test_lightburn.lbrn2")
+    finally:
+        executor.shutdown()
+
+    stats = registry.get_stage_stats()
+    assert stats["parse_wait[lbrn2]"]["count"] == 1
+    assert stats["parse[lbrn2]"]["count"] == 1
+    assert 'module_n_parses_total{parser="lbrn2",result="parsed"} 1' in registry.render()
+
+
+@pytest.mark.asyncio
+async def test_traced_ingest_and_metrics_endpoint(registry, monkeypatch, tmp_path, caplog):
+    """A traced /ingest logs its stage breakdown; /metrics exposes every stage"""
+    from module_n.db import init_db
+
+    init_db(f"sqlite:///{tmp_path / 'module_n.db'}")
+    executor = ParserExecutor(max_workers=1, use_processes=False, cache=ParseCache(enabled=False))
+    monkeypatch.setattr(main, "get_parser_executor", lambda: executor)
+    monkeypatch.setattr(main.settings, "UPLOAD_FOLDER", str(tmp_path / "uploads"))
+    monkeypatch.setattr(main.settings, "WEBHOOK_ENABLED", False)
+
+    transport = httpx.ASGITransport(app=main.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            with caplog.at_level(logging.INFO, logger="module_n.metrics"):
+                response = await client.post(
+                    "/ingest",
+                    files=[("files", ("CL0001-part.dxf", DXF_CONTENT, "application/dxf"))],
+                    headers={"X-Module-N-Trace": "1"}
+                )
+            untraced = await client.get("/health")
+            page = await client.get("/metrics")
+    finally:
+        executor.shutdown()
+        init_db("sqlite:///:memory:")  # Don't leave the global engine on the temp file
+
+    assert response.status_code == 200
+    assert response.json()[0]["success"]
+    assert "parse.dxf;dur=" in response.headers["server-timing"]
+    assert "server-timing" not in untraced.headers
+
+    traces = [record.message for record in caplog.records if record.message.startswith("TRACE")]
+    assert len(traces) == 1
+    assert traces[0].startswith("TRACE POST /ingest 200 total=")
+    assert "parse[dxf]=" in traces[0] and "db_commit=" in traces[0]
+
+    assert page.headers["content-type"].startswith("text/plain; version=0.0.4")
+    for stage in ("temp_write", "validate", "parse_wait", "parse", "storage_copy",
+                  "db_ingest_insert", "db_extraction_insert", "db_metadata_insert", "db_commit"):
+        assert f'stage="{stage}"' in page.text
+    assert 'module_n_ingest_files_total{parser="dxf",status="completed"} 1' in page.text
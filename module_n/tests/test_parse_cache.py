@@ -0,0 +1,186 @@
+"""
+Module N - Parse Cache Tests
+Tests for reusing parse results of byte-identical files
+"""
+
+import hashlib
+import pytest
+from pathlib import Path
+
+from module_n.db.operations import init_db, get_parse_cache_stats
+from module_n.parsers import ParserExecutor, ParseCache, LBRNParser
+
+
+# Sample LightBurn file (test fixture)
+SAMPLE_LBRN = "module_n/tests/fixtures/test_lightburn.lbrn2"
+
+
+@pytest.fixture(scope="function")
+def test_db(tmp_path):
+    """
+    Create a test database for each test.
+
+    A file database: the executor reads and writes the cache from worker threads.
+    """
+    init_db(f"sqlite:///{tmp_path / 'module_n.db'}")
+    yield
+    init_db("sqlite:///:memory:")  # Don't leave the global engine on the temp file
+
+
+def test_cache_round_trip(test_db):
+    """Test stored content is returned for the same hash and parser"""
+    cache = ParseCache(enabled=True, max_entries=0, max_bytes=0)
+    content = {"shape_count": 3, "bounding_box": {"width": 10.0}}
+
+    assert cache.get("a" * 64, "lbrn2") is None
+    assert cache.put("a" * 64, "lbrn2", content) is True
+    assert cache.get("a" * 64, "lbrn2") == content
+    assert cache.get("a" * 64, "dxf") is None
+
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_cache_invalidated_by_parser_version(test_db, monkeypatch):
+    """Test bumping a parser version invalidates its cached results"""
+    cache = ParseCache(enabled=True, max_entries=0, max_bytes=0)
+    cache.put("b" * 64, "lbrn2", {"shape_count": 1})
+
+    monkeypatch.setattr(LBRNParser, "PARSER_VERSION", "99.0.0")
+    assert cache.get("b" * 64, "lbrn2") is None
+
+    # Storing under the new version removes the stale entry
+    cache.put("c" * 64, "lbrn2", {"shape_count": 2})
+    assert get_parse_cache_stats()["entries"] == 1
+
+
+def test_cache_evicts_least_recently_used(test_db):
+    """Test eviction keeps the most recently used entries"""
+    cache = ParseCache(enabled=True, max_entries=2, max_bytes=0, evict_interval=100)
+
+    cache.put("1" * 64, "lbrn2", {"n": 1})
+    cache.put("2" * 64, "lbrn2", {"n": 2})
+    cache.get("1" * 64, "lbrn2")
+    cache.put("3" * 64, "lbrn2", {"n": 3})
+
+    assert get_parse_cache_stats()["entries"] == 2
+    assert cache.get("1" * 64, "lbrn2") == {"n": 1}
+    assert cache.get("2" * 64, "lbrn2") is None
+    assert cache.get("3" * 64, "lbrn2") == {"n": 3}
+
+
+def test_cache_limits_checked_only_when_needed(test_db, monkeypatch):
+    """Test puts within the estimated limits skip the eviction query"""
+    from module_n.parsers import cache as cache_module
+
+    checks = []
+    evict = cache_module.evict_parse_cache
+    monkeypatch.setattr(cache_module, "evict_parse_cache", lambda *args: checks.append(args) or evict(*args))
+    cache = ParseCache(enabled=True, max_entries=10, max_bytes=0, evict_interval=100)
+
+    for n in range(11):
+        cache.put(f"{n:064d}", "lbrn2", {"n": n})
+    assert len(checks) == 2  # First put (no estimate yet), then the 11th entry went over max_entries
+    assert get_parse_cache_stats()["entries"] == 9  # Evicted with headroom
+
+    cache.put("f" * 64, "lbrn2", {"n": 11})
+    assert len(checks) == 2
+
+    cache = ParseCache(enabled=True, max_entries=100, max_bytes=0, evict_interval=3)
+    for n in range(4):
+        cache.put(f"{n:064d}", "lbrn2", {"n": n})
+    assert len(checks) == 4  # First put, then every evict_interval puts
+
+
+def test_cache_disabled(test_db):
+    """Test a disabled cache never stores or returns results"""
+    cache = ParseCache(enabled=False)
+
+    assert cache.put("d" * 64, "lbrn2", {"n": 1}) is False
+    assert cache.get("d" * 64, "lbrn2") is None
+
+
+@pytest.mark.asyncio
+async def test_executor_reapplies_filename_fields_on_hit(test_db):
+    """Test cached results still pick up the new filename and codes"""
+    if not Path(SAMPLE_LBRN).exists():
+        pytest.skip(f"Sample LightBurn file not found: {SAMPLE_LBRN}")
+
+    file_hash = hashlib.sha256(Path(SAMPLE_LBRN).read_bytes()).hexdigest()
+    cache = ParseCache(enabled=True, max_entries=0, max_bytes=0)
+    executor = ParserExecutor(max_workers=1, use_processes=False, cache=cache)
+    try:
+        first = await executor.parse(
+            "lbrn2", SAMPLE_LBRN, "0001-Full Gas Box-Galv-1mm-x1.lbrn2", "CL0001",
+            file_hash=file_hash
+        )
+        second = await executor.parse(
+            "lbrn2", SAMPLE_LBRN, "0002-Side Plate-Galv-3mm-x4.lbrn2", "CL0002",
+            file_hash=file_hash
+        )
+
+        assert cache.misses == 1
+        assert cache.hits == 1
+
+        assert first.client_code == "CL0001"
+        assert second.client_code == "CL0002"
+        assert second.part_name == "Side Plate"
+        assert second.thickness_mm == 3.0
+        assert second.quantity == 4
+        assert second.source_file == "0002-Side Plate-Galv-3mm-x4.lbrn2"
+        assert second.extracted == first.extracted
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_reparses_when_cached_pdf_lacks_tables(test_db, tmp_path, monkeypatch):
+    """Test a cached text-only PDF pass does not serve an explicit table request"""
+    from module_n.parsers import PDFParser
+    from module_n.tests.test_pdf_parser import make_pdf
+
+    monkeypatch.setattr(PDFParser, "_extract_tables", lambda self, file_path, pages: [])
+    pdf_path = make_pdf(tmp_path / "doc.pdf", 2)
+    file_hash = hashlib.sha256(Path(pdf_path).read_bytes()).hexdigest()
+    cache = ParseCache(enabled=True, max_entries=0, max_bytes=0)
+    executor = ParserExecutor(max_workers=1, use_processes=False, cache=cache)
+    try:
+        await executor.parse("pdf", pdf_path, "doc.pdf", file_hash=file_hash)
+        await executor.parse("pdf", pdf_path, "doc.pdf", file_hash=file_hash,
+                             parser_options={"extract_tables": True})
+        await executor.parse("pdf", pdf_path, "doc.pdf", file_hash=file_hash)
+
+        # Second call re-parses despite its cache hit; the table pass replaces the entry
+        assert cache.hits == 2
+        assert cache.get(file_hash, "pdf")["table_mode"] == "always"
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_reparses_default_request_after_table_free_pass(test_db, tmp_path, monkeypatch):
+    """Test a cached extract_tables=False pass does not serve a default (auto) request"""
+    from module_n.parsers import PDFParser
+    from module_n.tests.test_pdf_parser import make_pdf
+
+    calls = []
+    monkeypatch.setattr(PDFParser, "_extract_tables", lambda self, file_path, pages: calls.append(pages) or [])
+    pdf_path = make_pdf(tmp_path / "doc.pdf", 2, table_pages=(2,))
+    file_hash = hashlib.sha256(Path(pdf_path).read_bytes()).hexdigest()
+    cache = ParseCache(enabled=True, max_entries=0, max_bytes=0)
+    executor = ParserExecutor(max_workers=1, use_processes=False, cache=cache)
+    try:
+        await executor.parse("pdf", pdf_path, "doc.pdf", file_hash=file_hash,
+                             parser_options={"extract_tables": False})
+        assert calls == []
+
+        await executor.parse("pdf", pdf_path, "doc.pdf", file_hash=file_hash)
+        assert calls == [[2]]
+        assert cache.get(file_hash, "pdf")["table_mode"] == "auto"
+
+        # The auto pass now serves a table-free request from the cache
+        await executor.parse("pdf", pdf_path, "doc.pdf", file_hash=file_hash,
+                             parser_options={"extract_tables": False})
+        assert calls == [[2]]
+    finally:
+        executor.shutdown()
@@ -0,0 +1,94 @@
+"""
+Module N - Parser Executor Tests
+Tests for running parsers in the bounded worker pool
+"""
+
+import pytest
+import asyncio
+from pathlib import Path
+
+from module_n.parsers import ParserExecutor, resolve_parser_type
+from module_n.models.schemas import FileType
+
+
+# Sample LightBurn file (test fixture)
+SAMPLE_LBRN = "module_n/tests/fixtures/test_lightburn.lbrn2"
+
+
+def test_resolve_parser_type_aliases():
+    """Test file type aliases map to the right parser"""
+    assert resolve_parser_type("dxf") == "dxf"
+    assert resolve_parser_type("xlsx") == "excel"
+    assert resolve_parser_type("excel") == "excel"
+    assert resolve_parser_type("lbrn") == "lbrn2"
+    assert resolve_parser_type("JPEG") == "image"
+    assert resolve_parser_type("word") is None
+    assert resolve_parser_type("") is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_processes", [False, True])
+async def test_executor_parses_file(use_processes):
+    """Test parsing a file through the executor (thread and process pools)"""
+    if not Path(SAMPLE_LBRN).exists():
+        pytest.skip(f"Sample LightBurn file not found: {SAMPLE_LBRN}")
+
+    executor = ParserExecutor(max_workers=2, use_processes=use_processes)
+    try:
+        metadata = await executor.parse("lbrn2", SAMPLE_LBRN, "test_lightburn.lbrn2", "CL0001")
+
+        assert metadata.detected_type == FileType.LBRN2
+        assert metadata.client_code == "CL0001"
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_concurrency_limit():
+    """Test per-type concurrency limit is respected"""
+    if not Path(SAMPLE_LBRN).exists():
+        pytest.skip(f"Sample LightBurn file not found: {SAMPLE_LBRN}")
+
+    executor = ParserExecutor(max_workers=4, concurrency_limits={"lbrn2": 1}, use_processes=False)
+    try:
+        results = await asyncio.gather(*[
+            executor.parse("lbrn2", SAMPLE_LBRN, "test_lightburn.lbrn2")
+            for _ in range(3)
+        ])
+
+        assert len(results) == 3
+        assert executor.get_stats()["in_flight"]["lbrn2"] == 0
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_unsupported_type():
+    """Test unsupported parser types raise ValueError"""
+    executor = ParserExecutor(max_workers=1, use_processes=False)
+    try:
+        with pytest.raises(ValueError):
+            await executor.parse("word", "missing.docx", "missing.docx")
+    finally:
+        executor.shutdown()
+
+
+def test_broken_pool_replaced_once():
+    """Parses failing on the same broken pool don't shut down its replacement"""
+    executor = ParserExecutor(max_workers=1, use_processes=False)
+    executor.start()
+    try:
+        broken = executor._pool
+        executor._restart_pool(broken, "dxf")
+        replacement = executor._pool
+        executor._restart_pool(broken, "dxf")  # A second parse that hit the same pool
+
+        assert executor._pool is replacement and replacement is not broken
+        assert replacement.submit(sum, [1, 2]).result() == 3
+
+        ocr_pool = executor._ocr_pool
+        executor._restart_pool(ocr_pool, "image")
+        executor._restart_pool(ocr_pool, "image")
+        assert executor._ocr_pool.submit(sum, [1]).result() == 1
+    finally:
+        executor.shutdown()
@@ -7,6 +7,7 @@ import pytest
 import tempfile
 from pathlib import Path
 from module_n.parsers import PDFParser
+from module_n.parsers.pdf_parser import _looks_like_table
 from module_n.models.schemas import FileType, NormalizedMetadata
 
 
@@ -264,6 +265,173 @@ class TestPDFParser:
         assert metadata.project_code == "TEST-2025-01-CL9999-999"
 
 
+def make_pdf(path, pages, table_pages=()):
+    """Create a PDF with one line of text per page and ruled grids on table_pages"""
+    import fitz
+
+    doc = fitz.open()
+    for number in range(1, pages + 1):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {number} Mild Steel 3mm")
+        if number in table_pages:
+            for i in range(5):
+                page.draw_line((72, 100 + 20 * i), (372, 100 + 20 * i))
+                page.draw_line((72 + 75 * i, 100), (72 + 75 * i, 180))
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+class TestTableDetection:
+    """Test the table-like layout check"""
+
+    def make_page(self, rects=(), lines=()):
+        import fitz
+
+        doc = fitz.open()
+        page = doc.new_page(width=842, height=595)
+        for rect in rects:
+            page.draw_rect(rect)
+        for p1, p2 in lines:
+            page.draw_line(p1, p2)
+        return doc, page
+
+    def test_drawing_page_is_not_a_table(self):
+        """Test a border, title block and rectangular parts are not taken for a table"""
+        doc, page = self.make_page(
+            rects=[
+                (10, 10, 832, 585),    # border
+                (592, 485, 822, 575),  # title block
+                (40, 40, 240, 140),    # parts
+                (280, 40, 380, 240),
+                (40, 200, 140, 300),
+                (420, 60, 560, 160),
+                (300, 300, 500, 420),
+            ],
+            lines=[((592, 515), (822, 515)), ((592, 545), (822, 545)), ((707, 485), (707, 575))]
+        )
+
+        assert not _looks_like_table(page)
+        doc.close()
+
+    def test_grid_of_cell_rectangles(self):
+        """Test tables drawn as adjacent cell rectangles are found"""
+        doc, page = self.make_page(
+            rects=[(72 + 100 * col, 100 + 20 * row, 172 + 100 * col, 120 + 20 * row)
+                   for row in range(3) for col in range(3)]
+        )
+
+        assert _looks_like_table(page)
+        doc.close()
+
+    def test_thin_rectangles_are_rules(self):
+        """Test rules drawn as filled thin rectangles count like lines"""
+        doc, page = self.make_page(
+            rects=[(72, 100 + 20 * i, 372, 100.5 + 20 * i) for i in range(5)]
+            + [(72 + 75 * i, 100, 72.5 + 75 * i, 180) for i in range(5)]
+        )
+
+        assert _looks_like_table(page)
+        doc.close()
+
+
+class TestPDFStages:
+    """Test the staged extraction pipeline"""
+
+    @pytest.fixture
+    def table_calls(self, monkeypatch):
+        """Record table extraction calls instead of running Camelot"""
+        calls = []
+        monkeypatch.setattr(PDFParser, '_extract_tables', lambda self, file_path, pages: calls.append(pages) or [])
+        return calls
+
+    def test_tables_only_on_table_like_pages(self, tmp_path, table_calls):
+        """Test the text pass flags ruled pages and only those go to table extraction"""
+        content = PDFParser().extract_content(make_pdf(tmp_path / "doc.pdf", 3, table_pages=(2,)))
+
+        assert content['table_pages'] == [2]
+        assert table_calls == [[2]]
+        assert content['table_mode'] == 'auto'
+
+    def test_no_table_pass_for_plain_text(self, tmp_path, table_calls):
+        """Test PDFs without table-like layout skip table extraction"""
+        content = PDFParser().extract_content(make_pdf(tmp_path / "doc.pdf", 3))
+
+        assert content['table_pages'] == []
+        assert table_calls == []
+        assert "Page 3" in content['text_content']
+
+    def test_explicit_table_request(self, tmp_path, table_calls):
+        """Test extract_tables=True runs on every page and satisfies later requests"""
+        content = PDFParser(extract_tables=True).extract_content(make_pdf(tmp_path / "doc.pdf", 2))
+
+        assert table_calls == [[1, 2]]
+        assert content['table_mode'] == 'always'
+        assert PDFParser.content_satisfies(content, extract_tables=True)
+        assert PDFParser.content_satisfies(content)
+        assert PDFParser.content_satisfies(content, extract_tables=False)
+
+    def test_cached_mode_must_cover_request(self):
+        """Test content only serves requests needing no more table extraction than it did"""
+        assert not PDFParser.content_satisfies({'table_mode': 'never'})
+        assert not PDFParser.content_satisfies({'table_mode': 'auto'}, extract_tables=True)
+        assert PDFParser.content_satisfies({'table_mode': 'auto'})
+        assert PDFParser.content_satisfies({'table_mode': 'never'}, extract_tables=False)
+        # Entries cached before the mode was recorded
+        assert not PDFParser.content_satisfies({'tables_extracted': False})
+        assert PDFParser.content_satisfies({'tables_extracted': True}, extract_tables=True)
+
+    def test_page_cap(self, tmp_path, table_calls, monkeypatch):
+        """Test pages beyond PDF_MAX_PAGES are not read"""
+        from module_n.config import settings
+        monkeypatch.setattr(settings, 'PDF_MAX_PAGES', 2)
+
+        content = PDFParser().extract_content(make_pdf(tmp_path / "doc.pdf", 5, table_pages=(4,)))
+
+        assert content['page_count'] == 5
+        assert content['pages_parsed'] == 2
+        assert content['truncated'] is True
+        assert "Page 3" not in content['text_content']
+        assert table_calls == []
+
+    def test_page_ranges(self, tmp_path, monkeypatch):
+        """Test long PDFs are split into at most max_ranges page ranges"""
+        from module_n.config import settings
+        from module_n.parsers.pdf_parser import get_page_ranges
+        monkeypatch.setattr(settings, 'PDF_PARALLEL_MIN_PAGES', 4)
+
+        assert get_page_ranges(make_pdf(tmp_path / "doc.pdf", 12), 3) == [(0, 4), (4, 8), (8, 12)]
+        assert get_page_ranges(make_pdf(tmp_path / "short.pdf", 3), 3) == []
+
+    @pytest.mark.asyncio
+    async def test_parallel_page_ranges(self, tmp_path, table_calls, monkeypatch):
+        """Test long PDFs read in page ranges by the executor's pool keep page order"""
+        from module_n.config import settings
+        from module_n.parsers import pdf_parser
+        from module_n.parsers.cache import ParseCache
+        from module_n.parsers.executor import ParserExecutor
+        monkeypatch.setattr(settings, 'PDF_PARALLEL_MIN_PAGES', 4)
+        monkeypatch.setattr(settings, 'PDF_PAGE_WORKERS', 3)
+        reads = []
+        read_pages = pdf_parser.read_pages
+        monkeypatch.setattr(pdf_parser, 'read_pages', lambda *args: reads.append(args[1:]) or read_pages(*args))
+
+        pdf_path = make_pdf(tmp_path / "doc.pdf", 12, table_pages=(7, 11))
+
+        executor = ParserExecutor(max_workers=4, use_processes=False, cache=ParseCache(enabled=False))
+        try:
+            metadata = await executor.parse('pdf', pdf_path, "doc.pdf")
+        finally:
+            executor.shutdown()
+
+        assert sorted(reads) == [(0, 4), (4, 8), (8, 12)]
+        numbers = [int(line.split()[1]) for line in metadata.extracted['text_content'].splitlines() if line.startswith("Page")]
+        assert numbers == list(range(1, 13))
+        assert metadata.extracted['table_pages'] == [7, 11]
+        assert table_calls == [[7, 11]]
+        # Same result as reading the whole document in one parser call
+        assert metadata.extracted == PDFParser().parse(pdf_path, "doc.pdf").extracted
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
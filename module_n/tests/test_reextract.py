@@ -0,0 +1,287 @@
+"""
+Module N - Bulk Re-extraction Tests
+Tests for re-extraction job selection, batched saves, pause/resume and the API
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+import httpx
+
+from module_n import main
+from module_n.db import (
+    FileExtraction,
+    FileMetadata,
+    get_session,
+    get_file_ingest,
+    get_reextract_job,
+    claim_reextract_job,
+    update_reextract_job
+)
+from module_n.db.operations import init_db, save_ingest_results, IngestRecord
+from module_n.models.schemas import NormalizedMetadata, FileType
+from module_n.parsers.cache import get_parser_version
+from module_n.reextract import ReextractJobManager
+
+
+class FakeExecutor:
+    """Parser executor stand-in that records calls and peak concurrency"""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.parsed = []
+        self.running = 0
+        self.peak = 0
+
+    async def parse(self, parser_type, file_path, filename, client_code=None, project_code=None, **kwargs):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(0.01)
+            self.parsed.append(filename)
+            if filename in self.fail:
+                raise ValueError("corrupt drawing")
+            return NormalizedMetadata(
+                source_file=filename,
+                detected_type=FileType(parser_type),
+                client_code=client_code,
+                project_code=project_code,
+                material="Stainless Steel",
+                thickness_mm=2.0,
+                confidence_score=0.9,
+                extracted={'parser': 'upgraded'}
+            )
+        finally:
+            self.running -= 1
+
+
+@pytest.fixture
+def stored_files(tmp_path):
+    """
+    In-memory database with stored files:
+    6 DXF files of CL0001 extracted by 1.0.0, one current DXF, one old PDF
+    and one old DXF of CL0002. Returns the file IDs by filename.
+    """
+    # A file database: jobs read and write it from worker threads
+    init_db(f"sqlite:///{tmp_path / 'module_n.db'}")
+
+    files = [(f"part{i}.dxf", FileType.DXF, "CL0001", "1.0.0") for i in range(6)]
+    files += [
+        ("current.dxf", FileType.DXF, "CL0001", get_parser_version('dxf')),
+        ("quote.pdf", FileType.PDF, "CL0001", "1.0.0"),
+        ("other.dxf", FileType.DXF, "CL0002", "1.0.0"),
+    ]
+
+    records = []
+    for filename, file_type, client_code, version in files:
+        path = tmp_path / filename
+        path.write_bytes(b"drawing")
+        records.append(IngestRecord(
+            normalized_metadata=NormalizedMetadata(
+                source_file=filename,
+                detected_type=file_type,
+                client_code=client_code,
+                material="Mild Steel",
+                thickness_mm=3.0
+            ),
+            original_filename=filename,
+            stored_filename=filename,
+            file_path=str(path),
+            extraction_type=f"{file_type.value}_metadata",
+            parser_name=f"{file_type.value}_parser",
+            parser_version=version,
+            metadata={'material': "Mild Steel", 'sha256': 'abc'},
+            metadata_source=f"{file_type.value}_parser"
+        ))
+
+    file_ingests = save_ingest_results(records)
+    yield {file_ingest.original_filename: file_ingest.id for file_ingest in file_ingests}
+    init_db("sqlite:///:memory:")  # Don't leave the global engine on the temp file
+
+
+async def run_job(manager, job_id, on_batch=None):
+    """Start a job and wait for it to stop"""
+    assert await manager.start(job_id, on_batch)
+    await manager._tasks[job_id]
+
+
+def test_job_selects_stale_files(stored_files):
+    """Jobs select files extracted by an older parser version, filtered by type and client"""
+    manager = ReextractJobManager(executor=FakeExecutor())
+
+    assert manager.create_job().total == 8
+    assert manager.create_job(file_type="dxf").total == 7
+    assert manager.create_job(file_type="dxf", client_code="CL0001").total == 6
+    assert manager.create_job(file_type="pdf", parser_version="0.9.0").total == 0
+    assert manager.create_job(file_type="dxf", parser_version="1.10.0").total == 8  # Not a string comparison
+
+    with pytest.raises(ValueError):
+        manager.create_job(file_type="exe")
+
+
+@pytest.mark.asyncio
+async def test_job_reextracts_in_batches(stored_files):
+    """Files are parsed with bounded concurrency and saved batch by batch"""
+    executor = FakeExecutor(fail={"part3.dxf"})
+    manager = ReextractJobManager(executor=executor, batch_size=4, concurrency=2, batch_delay=0)
+    job = manager.create_job(file_type="dxf", client_code="CL0001")
+    batches = []
+
+    async def on_batch(file_ingests, metadata):
+        assert [m.source_file for m in metadata] == [f.original_filename for f in file_ingests]
+        batches.append([file_ingest.id for file_ingest in file_ingests])
+
+    await run_job(manager, job.id, on_batch)
+
+    job = get_reextract_job(job.id)
+    assert job.status == "completed"
+    assert (job.processed, job.succeeded, job.failed) == (6, 5, 1)
+    assert job.last_file_id == stored_files["part5.dxf"]
+    assert json.loads(job.errors)[0]["filename"] == "part3.dxf"
+    assert executor.peak == 2
+    assert len(batches) == 2 and sum(len(batch) for batch in batches) == 5
+
+    file_ingest = get_file_ingest(stored_files["part0.dxf"])
+    assert file_ingest.material == "Stainless Steel"
+    assert file_ingest.thickness_mm == 2.0
+    assert file_ingest.stored_filename == "part0.dxf"
+
+    session = get_session()
+    try:
+        versions = [
+            extraction.parser_version for extraction in session.query(FileExtraction)
+            .filter(FileExtraction.file_ingest_id == file_ingest.id).order_by(FileExtraction.id)
+        ]
+        metadata = {
+            row.key: row.value for row in session.query(FileMetadata)
+            .filter(FileMetadata.file_ingest_id == file_ingest.id)
+        }
+        materials = session.query(FileMetadata).filter(
+            FileMetadata.file_ingest_id == file_ingest.id, FileMetadata.key == 'material'
+        ).count()
+    finally:
+        session.close()
+
+    assert versions == ["1.0.0", get_parser_version('dxf')]
+    assert metadata['material'] == "Stainless Steel"
+    assert metadata['sha256'] == 'abc'  # Keys the parser did not produce are kept
+    assert materials == 1
+
+    # The failed file is still stale; a new job only picks up that one
+    assert manager.create_job(file_type="dxf", client_code="CL0001").total == 1
+
+
+@pytest.mark.asyncio
+async def test_paused_job_resumes_from_cursor(stored_files):
+    """A paused job continues after its last saved batch without re-parsing files"""
+    executor = FakeExecutor()
+    manager = ReextractJobManager(executor=executor, batch_size=2, concurrency=1, batch_delay=0)
+    job = manager.create_job(file_type="dxf", client_code="CL0001")
+
+    async def pause_after_first_batch(file_ingests, metadata):
+        await manager.pause(job.id)
+
+    await run_job(manager, job.id, pause_after_first_batch)
+
+    paused = get_reextract_job(job.id)
+    assert paused.status == "paused"
+    assert paused.processed == 2
+    assert paused.last_file_id == stored_files["part1.dxf"]
+
+    # A fresh worker (e.g. after a restart) resumes where the job stopped
+    other = ReextractJobManager(executor=executor, batch_size=2, concurrency=1, batch_delay=0)
+    assert await other.resume(job.id)
+    await other._tasks[job.id]
+
+    finished = get_reextract_job(job.id)
+    assert finished.status == "completed"
+    assert finished.processed == 6
+    assert sorted(executor.parsed) == sorted(f"part{i}.dxf" for i in range(6))
+
+
+@pytest.mark.asyncio
+async def test_shutdown_releases_job_for_next_startup(stored_files):
+    """Jobs stopped by a shutdown are resumed by the next worker right away"""
+    manager = ReextractJobManager(executor=FakeExecutor(), batch_size=2, concurrency=1, batch_delay=0.05)
+    job = manager.create_job(file_type="dxf", client_code="CL0001")
+    assert await manager.start(job.id)
+
+    while get_reextract_job(job.id).processed == 0:
+        await asyncio.sleep(0.01)
+    await manager.shutdown()
+
+    stopped = get_reextract_job(job.id)
+    assert stopped.status == "running"
+    assert stopped.heartbeat_at is None
+
+    other = ReextractJobManager(executor=FakeExecutor(), batch_size=2, batch_delay=0)
+    assert await other.resume_interrupted() == [job.id]
+    await other._tasks[job.id]
+
+    finished = get_reextract_job(job.id)
+    assert finished.status == "completed"
+    assert finished.processed == 6
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_while_batch_parses(stored_files):
+    """A batch parsing longer than the lease keeps the job's heartbeat fresh"""
+    heartbeats = set()
+
+    class SlowExecutor(FakeExecutor):
+        async def parse(self, *args, **kwargs):
+            await asyncio.sleep(0.05)
+            heartbeats.add(get_reextract_job(job.id).heartbeat_at)
+            return await super().parse(*args, **kwargs)
+
+    manager = ReextractJobManager(executor=SlowExecutor(), batch_size=6, concurrency=1, batch_delay=0)
+    manager.heartbeat_interval = 0.02
+    job = manager.create_job(file_type="dxf", client_code="CL0001")
+    await run_job(manager, job.id)
+
+    assert get_reextract_job(job.id).status == "completed"
+    assert len(heartbeats) > 2  # Claim's heartbeat plus ones written mid-batch
+
+
+def test_running_job_claimed_after_lease_expires(stored_files):
+    """Only one worker owns a running job until its heartbeat is stale"""
+    manager = ReextractJobManager(executor=FakeExecutor())
+    job = manager.create_job(file_type="dxf")
+
+    assert claim_reextract_job(job.id, "worker-a", lease_seconds=300)
+    assert not claim_reextract_job(job.id, "worker-b", lease_seconds=300)
+
+    update_reextract_job(job.id, heartbeat_at=datetime.utcnow() - timedelta(seconds=600))
+    assert claim_reextract_job(job.id, "worker-b", lease_seconds=300)
+    assert get_reextract_job(job.id).claimed_by == "worker-b"
+
+
+@pytest.mark.asyncio
+async def test_reextract_endpoints(stored_files, monkeypatch):
+    """Submit starts a background job; status, listing and errors are exposed"""
+    manager = ReextractJobManager(executor=FakeExecutor(), batch_size=3, batch_delay=0)
+    monkeypatch.setattr(main, "get_reextract_manager", lambda: manager)
+    monkeypatch.setattr(main.settings, "WEBHOOK_ENABLED", False)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/reextract/jobs", params={"file_type": "dxf"})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        assert response.json()["total"] == 7
+
+        await manager._tasks[job_id]
+
+        status = (await client.get(f"/reextract/jobs/{job_id}")).json()
+        assert status["status"] == "completed"
+        assert status["succeeded"] == 7
+
+        jobs = (await client.get("/reextract/jobs", params={"status": "completed"})).json()["jobs"]
+        assert [job["job_id"] for job in jobs] == [job_id]
+
+        assert (await client.post(f"/reextract/jobs/{job_id}/resume")).status_code == 409
+        assert (await client.post(f"/reextract/jobs/{job_id}/pause")).status_code == 409
+        assert (await client.get("/reextract/jobs/missing")).status_code == 404
+        assert (await client.post("/reextract/jobs", params={"file_type": "exe"})).status_code == 400
@@ -0,0 +1,135 @@
+"""
+Module N - Upload Staging Tests
+Tests for streaming uploads to disk
+"""
+
+import io
+import hashlib
+import zipfile
+import pytest
+from pathlib import Path
+from fastapi import UploadFile
+
+from ..utils.upload import stage_upload, UploadTooLargeError, HEAD_BYTES
+from ..utils.validation import validate_file_content, get_max_file_size
+from ..utils.archive import open_zip, ArchiveError
+
+
+def make_upload(content: bytes, filename: str = "test.dxf") -> UploadFile:
+    """Create an UploadFile backed by an in-memory buffer"""
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+
+@pytest.mark.asyncio
+async def test_stage_upload_streams_in_chunks():
+    """Test upload is written to disk with correct size and digest"""
+    content = b"0\nSECTION\n" + b"x" * 100_000
+    staged = await stage_upload(make_upload(content), suffix=".dxf", chunk_size=4096)
+
+    try:
+        assert Path(staged.path).read_bytes() == content
+        assert staged.size == len(content)
+        assert staged.sha256 == hashlib.sha256(content).hexdigest()
+        assert staged.head == content[:HEAD_BYTES]
+        assert staged.path.endswith(".dxf")
+    finally:
+        staged.cleanup()
+
+    assert not Path(staged.path).exists()
+
+
+@pytest.mark.asyncio
+async def test_stage_upload_rejects_oversized_file():
+    """Test upload is aborted and removed once it exceeds the limit"""
+    content = b"x" * 10_000
+
+    with pytest.raises(UploadTooLargeError):
+        await stage_upload(make_upload(content), max_size=5_000, chunk_size=1024)
+
+
+def test_validate_file_content_checks_header():
+    """Test validation only needs the leading bytes"""
+    assert validate_file_content("part.dxf", b"0\nSECTION\n", 100)['valid'] is True
+    assert validate_file_content("part.dxf", b"not a dxf", 100)['valid'] is False
+    assert validate_file_content("part.exe", b"MZ", 100)['valid'] is False
+
+
+def test_validate_file_content_checks_size():
+    """Test size limit is enforced from the reported size"""
+    max_size = get_max_file_size("part.dxf")
+    result = validate_file_content("part.dxf", b"0\nSECTION\n", max_size + 1)
+
+    assert result['valid'] is False
+    assert 'too large' in result['error']
+
+
+DXF_CONTENT = b"0\nSECTION\n2\nENTITIES\n0\nENDSEC\n0\nEOF\n"
+
+
+async def stage_zip(members, tmp_path):
+    """Stage a ZIP upload built from {name: content}"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return await stage_upload(make_upload(buffer.getvalue(), "drawings.zip"), suffix=".zip")
+
+
+@pytest.mark.asyncio
+async def test_zip_members_streamed_one_at_a_time(tmp_path):
+    """Test members are staged individually with their own digest"""
+    staged = await stage_zip({
+        "job/part-1.dxf": DXF_CONTENT,
+        "job/": b"",
+        "__MACOSX/job/._part-1.dxf": b"junk",
+        ".DS_Store": b"junk",
+    }, tmp_path)
+    assert validate_file_content("drawings.zip", staged.head, staged.size)['valid'] is True
+
+    upload = open_zip(staged)
+    try:
+        assert [info.filename for info in upload.members] == ["job/part-1.dxf"]
+
+        member = upload.stage_member(upload.members[0], chunk_size=8)
+        assert member.filename == "part-1.dxf"
+        assert Path(member.path).read_bytes() == DXF_CONTENT
+        assert member.sha256 == hashlib.sha256(DXF_CONTENT).hexdigest()
+        member.cleanup()
+
+        with pytest.raises(UploadTooLargeError):
+            upload.stage_member(upload.members[0], max_size=10)
+    finally:
+        upload.member_done()
+
+    # Archive is removed once every member is released
+    assert not Path(staged.path).exists()
+
+
+@pytest.mark.asyncio
+async def test_zip_limits(tmp_path):
+    """Test member count and uncompressed size limits are checked up front"""
+    staged = await stage_zip({f"part-{i}.dxf": DXF_CONTENT for i in range(5)}, tmp_path)
+    try:
+        with pytest.raises(ArchiveError, match="too many files"):
+            open_zip(staged, max_members=4)
+
+        # Highly compressible content: small archive, large uncompressed size
+        with pytest.raises(ArchiveError, match="too large"):
+            open_zip(staged, max_uncompressed_size=len(DXF_CONTENT) * 4)
+
+        upload = open_zip(staged, max_members=5)
+        assert len(upload.members) == 5
+        upload.archive.close()
+    finally:
+        staged.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_invalid_zip(tmp_path):
+    """Test a corrupt archive is rejected"""
+    staged = await stage_upload(make_upload(b"PK\x03\x04 not really a zip", "broken.zip"), suffix=".zip")
+    try:
+        with pytest.raises(ArchiveError, match="Invalid ZIP"):
+            open_zip(staged)
+    finally:
+        staged.cleanup()
@@ -46,7 +46,7 @@ async def test_send_webhook_success(mock_file_ingest):
         mock_response.status_code = 200
         mock_response.text = '{"success": true}'
         
-        mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
+        mock_client.return_value.post = AsyncMock(return_value=mock_response)
         
         # Send webhook
         result = await send_webhook(
@@ -66,7 +66,7 @@ async def test_send_webhook_failure(mock_file_ingest):
         mock_response.status_code = 500
         mock_response.text = 'Internal Server Error'
         
-        mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
+        mock_client.return_value.post = AsyncMock(return_value=mock_response)
         
         # Send webhook
         result = await send_webhook(
@@ -82,7 +82,7 @@ async def test_send_webhook_timeout(mock_file_ingest):
     """Test webhook sending with timeout"""
     with patch('httpx.AsyncClient') as mock_client:
         # Mock timeout exception
-        mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+        mock_client.return_value.post = AsyncMock(
             side_effect=httpx.TimeoutException("Request timeout")
         )
         
@@ -100,7 +100,7 @@ async def test_send_webhook_request_error(mock_file_ingest):
     """Test webhook sending with request error"""
     with patch('httpx.AsyncClient') as mock_client:
         # Mock request exception
-        mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+        mock_client.return_value.post = AsyncMock(
             side_effect=httpx.RequestError("Connection failed")
         )
         
@@ -141,7 +141,7 @@ async def test_send_webhook_with_additional_data(mock_file_ingest):
         mock_response.text = '{"success": true}'
         
         mock_post = AsyncMock(return_value=mock_response)
-        mock_client.return_value.__aenter__.return_value.post = mock_post
+        mock_client.return_value.post = mock_post
         
         # Send webhook with additional data
         additional_data = {"hard_delete": True, "reason": "test"}
@@ -190,7 +190,7 @@ async def test_webhook_payload_structure(mock_file_ingest):
         mock_response.status_code = 200
         
         mock_post = AsyncMock(return_value=mock_response)
-        mock_client.return_value.__aenter__.return_value.post = mock_post
+        mock_client.return_value.post = mock_post
         
         # Send webhook
         await send_webhook(
@@ -226,7 +226,7 @@ async def test_webhook_headers(mock_file_ingest):
         mock_response.status_code = 200
         
         mock_post = AsyncMock(return_value=mock_response)
-        mock_client.return_value.__aenter__.return_value.post = mock_post
+        mock_client.return_value.post = mock_post
         
         # Send webhook
         await send_webhook(
@@ -249,7 +249,7 @@ async def test_webhook_url_and_timeout(mock_file_ingest):
         mock_response.status_code = 200
         
         mock_post = AsyncMock(return_value=mock_response)
-        mock_client.return_value.__aenter__.return_value.post = mock_post
+        mock_client.return_value.post = mock_post
         
         # Send webhook
         await send_webhook(
@@ -262,7 +262,9 @@ async def test_webhook_url_and_timeout(mock_file_ingest):
         url = call_args.args[0]
         assert url == settings.LASER_OS_WEBHOOK_URL
         
-        # Verify timeout was set on client
+        # Verify timeout and pool limits were set on client
         client_call_args = mock_client.call_args
-        assert client_call_args.kwargs['timeout'] == settings.LASER_OS_TIMEOUT
+        assert client_call_args.kwargs['timeout'].read == settings.LASER_OS_TIMEOUT
+        assert client_call_args.kwargs['timeout'].connect == settings.WEBHOOK_HTTP_CONNECT_TIMEOUT
+        assert client_call_args.kwargs['limits'].max_keepalive_connections == settings.WEBHOOK_HTTP_MAX_KEEPALIVE
 
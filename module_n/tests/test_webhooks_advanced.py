@@ -10,6 +10,7 @@ import asyncio
 from unittest.mock import AsyncMock, patch, MagicMock
 from datetime import datetime
 from pathlib import Path
+from sqlalchemy import event
 
 from module_n.webhooks import (
     send_webhook_with_retry,
@@ -18,9 +19,17 @@ from module_n.webhooks import (
     should_send_event,
     WebhookQueue,
     QueuedWebhookStatus,
-    WebhookMonitor
+    WebhookMonitor,
+    WebhookMetric,
+    get_http_client,
+    close_http_client,
+    build_webhook_event,
+    geometry_data,
+    send_webhook_batch,
+    WebhookDispatcher
 )
 from module_n.db.models import FileIngest
+from module_n.models.schemas import NormalizedMetadata, FileType
 from module_n.config import settings
 
 
@@ -65,7 +74,7 @@ async def test_retry_on_server_error(mock_file_ingest):
         mock_response_success.status_code = 200
         
         mock_post = AsyncMock(side_effect=[mock_response_fail, mock_response_success])
-        mock_client.return_value.__aenter__.return_value.post = mock_post
+        mock_client.return_value.post = mock_post
         
         # Send webhook with retry
         result = await send_webhook_with_retry(
@@ -88,7 +97,7 @@ async def test_no_retry_on_client_error(mock_file_ingest):
         mock_response.text = 'Bad Request'
         
         mock_post = AsyncMock(return_value=mock_response)
-        mock_client.return_value.__aenter__.return_value.post = mock_post
+        mock_client.return_value.post = mock_post
         
         # Send webhook
         result = await send_webhook_with_retry(
@@ -101,6 +110,30 @@ async def test_no_retry_on_client_error(mock_file_ingest):
         assert mock_post.call_count == 1  # Should not retry
 
 
+@pytest.mark.asyncio
+async def test_delivery_recorded_in_monitor(mock_file_ingest, tmp_path):
+    """Each delivery is recorded once with its final outcome"""
+    monitor = WebhookMonitor(metrics_file=str(tmp_path / "metrics.jsonl"))
+    
+    with patch('httpx.AsyncClient') as mock_client, \
+         patch('module_n.webhooks.notifier.get_webhook_monitor', return_value=monitor):
+        mock_response = MagicMock()
+        mock_response.status_code = 400
+        mock_response.text = 'Bad Request'
+        mock_client.return_value.post = AsyncMock(return_value=mock_response)
+        
+        await send_webhook_with_retry(
+            event_type=WebhookEventType.FILE_PROCESSED,
+            file_ingest=mock_file_ingest
+        )
+    
+    assert len(monitor.metrics) == 1
+    metric = monitor.metrics[0]
+    assert (metric.event_type, metric.ingest_id, metric.success) == ("file.processed", 123, False)
+    assert metric.status_code == 400
+    assert metric.attempts == 1
+
+
 @pytest.mark.asyncio
 async def test_exponential_backoff(mock_file_ingest):
     """Test exponential backoff delay between retries"""
@@ -113,7 +146,7 @@ async def test_exponential_backoff(mock_file_ingest):
         mock_response.text = 'Internal Server Error'
         
         mock_post = AsyncMock(return_value=mock_response)
-        mock_client.return_value.__aenter__.return_value.post = mock_post
+        mock_client.return_value.post = mock_post
         
         # Send webhook (will fail all retries)
         original_attempts = settings.WEBHOOK_RETRY_ATTEMPTS
@@ -211,9 +244,9 @@ def test_should_send_event_filtered():
 # QUEUE TESTS
 # ============================================================================
 
-def test_webhook_queue_add():
+def test_webhook_queue_add(tmp_path):
     """Test adding webhook to queue"""
-    queue = WebhookQueue(queue_file="data/test_webhook_queue.json")
+    queue = WebhookQueue(queue_file=str(tmp_path / "webhook_queue.db"))
     
     webhook_id = queue.add(
         event_type="file.processed",
@@ -227,13 +260,12 @@ def test_webhook_queue_add():
     assert queue.queue[0].event_type == "file.processed"
     assert queue.queue[0].ingest_id == 123
     
-    # Cleanup
-    Path("data/test_webhook_queue.json").unlink(missing_ok=True)
+    queue.close()
 
 
-def test_webhook_queue_get_pending():
+def test_webhook_queue_get_pending(tmp_path):
     """Test getting pending webhooks from queue"""
-    queue = WebhookQueue(queue_file="data/test_webhook_queue.json")
+    queue = WebhookQueue(queue_file=str(tmp_path / "webhook_queue.db"))
     
     # Add some webhooks
     queue.add("file.processed", 123, {"test": "data1"})
@@ -243,13 +275,12 @@ def test_webhook_queue_get_pending():
     
     assert len(pending) == 2
     
-    # Cleanup
-    Path("data/test_webhook_queue.json").unlink(missing_ok=True)
+    queue.close()
 
 
-def test_webhook_queue_update_status():
+def test_webhook_queue_update_status(tmp_path):
     """Test updating webhook status in queue"""
-    queue = WebhookQueue(queue_file="data/test_webhook_queue.json")
+    queue = WebhookQueue(queue_file=str(tmp_path / "webhook_queue.db"))
     
     webhook_id = queue.add("file.processed", 123, {"test": "data"})
     
@@ -258,13 +289,12 @@ def test_webhook_queue_update_status():
     assert queue.queue[0].status == QueuedWebhookStatus.COMPLETED
     assert queue.queue[0].attempts == 1
     
-    # Cleanup
-    Path("data/test_webhook_queue.json").unlink(missing_ok=True)
+    queue.close()
 
 
-def test_webhook_queue_stats():
+def test_webhook_queue_stats(tmp_path):
     """Test getting queue statistics"""
-    queue = WebhookQueue(queue_file="data/test_webhook_queue.json")
+    queue = WebhookQueue(queue_file=str(tmp_path / "webhook_queue.db"))
     
     # Add webhooks with different statuses
     id1 = queue.add("file.processed", 123, {"test": "data1"})
@@ -279,17 +309,333 @@ def test_webhook_queue_stats():
     assert stats["completed"] == 1
     assert stats["failed"] == 1
     
-    # Cleanup
-    Path("data/test_webhook_queue.json").unlink(missing_ok=True)
+    queue.close()
+
+
+def test_webhook_queue_claim_lease(tmp_path):
+    """Claimed webhooks are leased to one worker until the lease expires"""
+    queue = WebhookQueue(queue_file=str(tmp_path / "webhook_queue.db"))
+    ids = [queue.add("file.processed", i, {"n": i}) for i in range(5)]
+    
+    first = queue.claim(limit=3, worker_id="worker-1")
+    second = queue.claim(limit=3, worker_id="worker-2")
+    
+    assert len(first) == 3
+    assert len(second) == 2
+    assert {w.id for w in first} | {w.id for w in second} == set(ids)
+    assert queue.claim(worker_id="worker-3") == []
+    assert queue.get_stats()["processing"] == 5
+    
+    queue.update_status(first[0].id, QueuedWebhookStatus.PENDING, "timeout")
+    for webhook in second:
+        queue.update_status(webhook.id, QueuedWebhookStatus.COMPLETED)
+    
+    stats = queue.get_stats()
+    assert stats["completed"] == 2 and stats["pending"] == 1 and stats["processing"] == 2
+    
+    queue.close()
+
+
+def test_webhook_queue_expired_lease_reclaimed(tmp_path):
+    """A webhook whose worker died is picked up by another worker"""
+    queue = WebhookQueue(queue_file=str(tmp_path / "webhook_queue.db"))
+    webhook_id = queue.add("file.processed", 1, {})
+    
+    assert [w.id for w in queue.claim(lease_seconds=-1, worker_id="crashed")] == [webhook_id]
+    assert [w.id for w in queue.claim(worker_id="worker-2")] == [webhook_id]
+    
+    queue.close()
+
+
+def test_webhook_queue_persistence_and_legacy_import(tmp_path):
+    """Entries survive a restart; the old JSON queue is imported once"""
+    legacy = tmp_path / "webhook_queue.json"
+    legacy.write_text(json.dumps([{
+        "id": "file.processed_7_1700000000.0",
+        "event_type": "file.processed",
+        "ingest_id": 7,
+        "payload": {"a": 1},
+        "status": "pending",
+        "attempts": 1,
+        "max_attempts": 3,
+        "created_at": "2025-01-01T00:00:00",
+        "last_attempt_at": None,
+        "next_retry_at": None,
+        "error_message": None
+    }]))
+    
+    queue = WebhookQueue(queue_file=str(tmp_path / "webhook_queue.db"))
+    queue.add("file.deleted", 8, {"b": 2})
+    queue.close()
+    
+    reopened = WebhookQueue(queue_file=str(tmp_path / "webhook_queue.db"))
+    entries = reopened.queue
+    
+    assert [(w.ingest_id, w.attempts, w.payload) for w in entries] == [(7, 1, {"a": 1}), (8, 0, {"b": 2})]
+    assert not legacy.exists()
+    assert (tmp_path / "webhook_queue.json.imported").exists()
+    
+    reopened.close()
+
+
+def test_webhook_queue_exhausted_marked_failed(tmp_path):
+    queue = WebhookQueue(queue_file=str(tmp_path / "webhook_queue.db"))
+    webhook_id = queue.add("file.processed", 1, {}, max_attempts=1)
+    queue.update_status(webhook_id, QueuedWebhookStatus.PENDING, "down")
+    
+    assert queue.get_pending() == []
+    assert queue.get_stats()["failed"] == 1
+    
+    queue.close()
+
+
+def test_webhook_queue_mark_failed_in_one_update(tmp_path):
+    """Failed deliveries are rescheduled with backoff, or failed after their last attempt"""
+    queue = WebhookQueue(queue_file=str(tmp_path / "webhook_queue.db"))
+    retry_id = queue.add("file.processed", 1, {})
+    last_id = queue.add("file.processed", 2, {}, max_attempts=1)
+    statements = []
+    event.listen(queue._engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    
+    claimed = queue.claim(worker_id="worker-1")
+    statements.clear()
+    queue.mark_failed([(webhook, f"down {webhook.ingest_id}") for webhook in claimed])
+    
+    assert len([sql for sql in statements if sql.startswith("UPDATE")]) == 1
+    entries = {webhook.id: webhook for webhook in queue.queue}
+    assert entries[retry_id].status == QueuedWebhookStatus.PENDING
+    assert entries[retry_id].error_message == "down 1"
+    assert entries[retry_id].attempts == 1
+    assert entries[retry_id].next_retry_at > entries[retry_id].last_attempt_at
+    assert entries[last_id].status == QueuedWebhookStatus.FAILED
+    assert entries[last_id].error_message == "Max retry attempts reached"
+    assert queue.get_pending() == []  # Backed off
+    
+    queue.close()
+
+
+# ============================================================================
+# HTTP CLIENT TESTS
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_http_client_is_reused():
+    """Webhooks share one pooled client until it is closed"""
+    client = get_http_client()
+    
+    assert get_http_client() is client
+    
+    await close_http_client()
+    assert client.is_closed
+    assert get_http_client() is not client
+    await close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_webhooks_sent_through_shared_client(mock_file_ingest):
+    """Consecutive webhooks go through the shared client without closing it"""
+    requests = []
+    
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"success": True})
+    
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch('module_n.webhooks.notifier.get_http_client', return_value=client):
+        for _ in range(3):
+            assert await send_webhook_with_retry(WebhookEventType.FILE_PROCESSED, mock_file_ingest) is True
+    
+    assert len(requests) == 3
+    assert not client.is_closed
+    await client.aclose()
+
+
+def test_http_client_per_event_loop():
+    """A client created on another event loop is not reused"""
+    first = asyncio.run(_get_client())
+    second = asyncio.run(_get_client())
+    
+    assert first is not second
+    asyncio.run(close_http_client())
+
+
+async def _get_client():
+    return get_http_client()
+
+
+# ============================================================================
+# BATCHING TESTS
+# ============================================================================
+
+def make_batch_client(received):
+    """Shared-client stand-in recording the batches it receives"""
+    def handler(request):
+        received.append(request)
+        return httpx.Response(200, json={"success": True})
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_send_webhook_batch_signed(mock_file_ingest):
+    """A batch is one POST whose signature covers the exact body"""
+    received = []
+    events = [build_webhook_event(WebhookEventType.FILE_PROCESSED, mock_file_ingest) for _ in range(3)]
+    original_secret = settings.WEBHOOK_SECRET
+    settings.WEBHOOK_SECRET = "batch-secret"
+    
+    try:
+        with patch('module_n.webhooks.notifier.get_http_client', return_value=make_batch_client(received)):
+            assert await send_webhook_batch(events) is True
+    finally:
+        settings.WEBHOOK_SECRET = original_secret
+    
+    assert len(received) == 1
+    request = received[0]
+    assert str(request.url) == settings.LASER_OS_WEBHOOK_BATCH_URL
+    payload = json.loads(request.content)
+    assert payload["event_type"] == "batch"
+    assert payload["count"] == 3
+    assert payload["events"][0]["file_data"]["stored_filename"] == mock_file_ingest.stored_filename
+    expected = generate_webhook_signature(request.content.decode(), "batch-secret")
+    assert request.headers["X-Webhook-Signature"] == f"sha256={expected}"
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_enqueue_does_not_send(mock_file_ingest, tmp_path):
+    """enqueue() only writes the outbox; nothing is sent to Laser OS"""
+    queue = WebhookQueue(queue_file=str(tmp_path / "outbox.db"))
+    dispatcher = WebhookDispatcher(queue=queue)
+    
+    with patch('module_n.webhooks.notifier.get_http_client') as mock_client:
+        assert await dispatcher.enqueue(WebhookEventType.FILE_PROCESSED, [mock_file_ingest] * 3) == 3
+    
+    mock_client.assert_not_called()
+    stats = dispatcher.get_stats()
+    assert stats["pending"] == 3
+    assert stats["oldest_pending_seconds"] is not None
+    assert queue.queue[0].payload["file_data"]["stored_filename"] == mock_file_ingest.stored_filename
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_enqueue_adds_file_geometry(mock_file_ingest, tmp_path):
+    """Each event carries the measured geometry of its own file"""
+    queue = WebhookQueue(queue_file=str(tmp_path / "outbox.db"))
+    dispatcher = WebhookDispatcher(queue=queue)
+    measured = NormalizedMetadata(
+        source_file="plate.dxf",
+        detected_type=FileType.DXF,
+        extracted={
+            'cut_length_mm': 662.83, 'pierce_count': 2, 'area_mm2': 19685.84,
+            'bounding_box': {'width': 200.0, 'height': 100.0}
+        }
+    )
+    unmeasured = NormalizedMetadata(source_file="quote.pdf", detected_type=FileType.PDF, extracted={'pages': 1})
+
+    await dispatcher.enqueue(
+        WebhookEventType.FILE_PROCESSED, [mock_file_ingest] * 2,
+        file_data=[geometry_data(measured), geometry_data(unmeasured)]
+    )
+
+    geometries = [entry.payload["file_data"].get("geometry") for entry in queue.queue]
+    assert sorted(geometries, key=bool) == [None, {
+        'cut_length_mm': 662.83, 'pierce_count': 2, 'width_mm': 200.0, 'height_mm': 100.0, 'area_mm2': 19685.84
+    }]
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_delivers_outbox_as_batch(mock_file_ingest, tmp_path):
+    """Queued file.processed events are delivered as one batch and completed"""
+    received = []
+    queue = WebhookQueue(queue_file=str(tmp_path / "outbox.db"))
+    dispatcher = WebhookDispatcher(queue=queue, window_ms=10, poll_interval=60)
+    
+    with patch('module_n.webhooks.notifier.get_http_client', return_value=make_batch_client(received)):
+        # Queued before the dispatcher runs, so the batch does not depend on write timing
+        for _ in range(4):
+            await dispatcher.enqueue(WebhookEventType.FILE_PROCESSED, [mock_file_ingest])
+        dispatcher.start()
+        
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if queue.get_stats()["completed"] == 4:
+                break
+        await dispatcher.stop()
+    
+    assert len(received) == 1
+    assert json.loads(received[0].content)["count"] == 4
+    assert queue.get_stats()["completed"] == 4
+    assert dispatcher.get_stats()["oldest_pending_seconds"] is None
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_retries_failed_delivery(mock_file_ingest, tmp_path):
+    """A failed delivery stays in the outbox for a later retry"""
+    queue = WebhookQueue(queue_file=str(tmp_path / "outbox.db"))
+    dispatcher = WebhookDispatcher(queue=queue)
+    
+    def handler(request):
+        return httpx.Response(503)
+    
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch('module_n.webhooks.notifier.get_http_client', return_value=client):
+        await dispatcher.enqueue(WebhookEventType.FILE_DELETED, [mock_file_ingest], {"hard_delete": True})
+        assert await dispatcher.drain() == 1
+    
+    (webhook,) = queue.queue
+    assert webhook.status == QueuedWebhookStatus.PENDING
+    assert webhook.attempts == 1
+    assert webhook.payload["file_data"]["hard_delete"] is True
+    assert queue.get_pending() == []  # Backed off
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_delivery_lag_recorded(mock_file_ingest, tmp_path):
+    """Delivered webhooks record their lag since enqueue"""
+    queue = WebhookQueue(queue_file=str(tmp_path / "outbox.db"))
+    monitor = WebhookMonitor(metrics_file=str(tmp_path / "metrics.jsonl"))
+    dispatcher = WebhookDispatcher(queue=queue)
+    
+    with patch('module_n.webhooks.notifier.get_http_client', return_value=make_batch_client([])), \
+         patch('module_n.webhooks.notifier.get_webhook_monitor', return_value=monitor):
+        await dispatcher.enqueue(WebhookEventType.FILE_RE_EXTRACTED, [mock_file_ingest])
+        await asyncio.sleep(0.05)
+        await dispatcher.drain()
+    
+    stats = monitor.get_stats(hours=1)
+    assert stats["successful"] == 1
+    assert stats["max_lag_ms"] >= 50
+    assert stats["avg_lag_ms"] == stats["max_lag_ms"]
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_respects_event_filter(mock_file_ingest, tmp_path):
+    """Filtered event types are not queued"""
+    queue = WebhookQueue(queue_file=str(tmp_path / "outbox.db"))
+    dispatcher = WebhookDispatcher(queue=queue)
+    original_events = settings.WEBHOOK_ENABLED_EVENTS
+    settings.WEBHOOK_ENABLED_EVENTS = ["file.deleted"]
+    
+    try:
+        assert await dispatcher.enqueue(WebhookEventType.FILE_PROCESSED, [mock_file_ingest]) == 0
+    finally:
+        settings.WEBHOOK_ENABLED_EVENTS = original_events
+    
+    assert queue.get_stats()["total"] == 0
+    queue.close()
 
 
 # ============================================================================
 # MONITORING TESTS
 # ============================================================================
 
-def test_webhook_monitor_record():
+def test_webhook_monitor_record(tmp_path):
     """Test recording webhook metrics"""
-    monitor = WebhookMonitor(metrics_file="data/test_webhook_metrics.json")
+    monitor = WebhookMonitor(metrics_file=str(tmp_path / "metrics.jsonl"))
     
     monitor.record(
         event_type="file.processed",
@@ -304,13 +650,13 @@ def test_webhook_monitor_record():
     assert monitor.metrics[0].event_type == "file.processed"
     assert monitor.metrics[0].success is True
     
-    # Cleanup
-    Path("data/test_webhook_metrics.json").unlink(missing_ok=True)
+    # Recording does not touch the disk
+    assert not (tmp_path / "metrics.jsonl").exists()
 
 
-def test_webhook_monitor_stats():
+def test_webhook_monitor_stats(tmp_path):
     """Test getting webhook statistics"""
-    monitor = WebhookMonitor(metrics_file="data/test_webhook_metrics.json")
+    monitor = WebhookMonitor(metrics_file=str(tmp_path / "metrics.jsonl"))
     
     # Record some metrics
     monitor.record("file.processed", 123, True, 1, 100.0, 200)
@@ -323,14 +669,14 @@ def test_webhook_monitor_stats():
     assert stats["successful"] == 2
     assert stats["failed"] == 1
     assert stats["success_rate"] == 66.67
-    
-    # Cleanup
-    Path("data/test_webhook_metrics.json").unlink(missing_ok=True)
+    assert stats["by_event_type"]["file.deleted"] == {"total": 1, "successful": 0, "failed": 1}
+    assert stats["by_status_code"] == {"200": 2, "500": 1}
+    assert monitor.get_stats(hours=1)["total"] == 3
 
 
-def test_webhook_monitor_health_status():
+def test_webhook_monitor_health_status(tmp_path):
     """Test getting webhook health status"""
-    monitor = WebhookMonitor(metrics_file="data/test_webhook_metrics.json")
+    monitor = WebhookMonitor(metrics_file=str(tmp_path / "metrics.jsonl"))
     
     # Record successful metrics
     for i in range(10):
@@ -340,7 +686,96 @@ def test_webhook_monitor_health_status():
     
     assert health["status"] == "healthy"
     assert health["last_hour"]["success_rate"] == 100.0
+
+
+def test_webhook_monitor_ring_buffer(tmp_path):
+    """Only the newest max_metrics metrics are kept in memory; rollups keep counting"""
+    monitor = WebhookMonitor(metrics_file=str(tmp_path / "metrics.jsonl"), max_metrics=5)
+    
+    for i in range(8):
+        monitor.record("file.processed", i, i != 7, 1, 100.0, 200 if i != 7 else 500)
+    
+    assert len(monitor.metrics) == 5
+    assert [m.ingest_id for m in monitor.metrics] == [3, 4, 5, 6, 7]
+    assert monitor.get_stats(hours=24)["total"] == 8
+    assert [f["ingest_id"] for f in monitor.get_recent_failures()] == [7]
+
+
+def test_webhook_monitor_latency_percentiles(tmp_path):
+    """Percentiles come from the rollup histograms (within one bucket, ~20%)"""
+    monitor = WebhookMonitor(metrics_file=str(tmp_path / "metrics.jsonl"))
+    
+    for i in range(1, 101):
+        monitor.record("file.processed", i, True, 1, float(i * 10), 200)
     
-    # Cleanup
-    Path("data/test_webhook_metrics.json").unlink(missing_ok=True)
+    stats = monitor.get_stats(hours=1)
+    
+    assert 500 <= stats["p50_duration_ms"] <= 600
+    assert 950 <= stats["p95_duration_ms"] <= 1000
+    assert stats["p99_duration_ms"] <= 1000
+    assert stats["avg_duration_ms"] == 505.0
+
+
+def test_webhook_monitor_flush_and_reload(tmp_path):
+    """flush() appends new metrics as JSON Lines; a new monitor rebuilds its stats"""
+    metrics_file = tmp_path / "metrics.jsonl"
+    monitor = WebhookMonitor(metrics_file=str(metrics_file))
+    
+    monitor.record("file.processed", 1, True, 1, 100.0, 200)
+    monitor.record("file.processed", 2, False, 3, 200.0, 500)
+    assert monitor.flush() == 2
+    monitor.record("file.deleted", 3, True, 1, 50.0, 200)
+    assert monitor.flush() == 1
+    assert monitor.flush() == 0
+    
+    assert len(metrics_file.read_text().splitlines()) == 3
+    
+    reloaded = WebhookMonitor(metrics_file=str(metrics_file))
+    assert len(reloaded.metrics) == 3
+    assert reloaded.get_stats(hours=24)["failed"] == 1
+    assert reloaded.get_recent_failures()[0]["ingest_id"] == 2
+
+
+def test_webhook_monitor_compacts_file(tmp_path):
+    """The file is rewritten from the ring buffer once it holds twice the buffer size"""
+    metrics_file = tmp_path / "metrics.jsonl"
+    monitor = WebhookMonitor(metrics_file=str(metrics_file), max_metrics=3)
+    
+    for i in range(7):
+        monitor.record("file.processed", i, True, 1, 100.0, 200)
+        monitor.flush()
+    
+    lines = metrics_file.read_text().splitlines()
+    assert len(lines) <= 6
+    assert json.loads(lines[-1])["ingest_id"] == 6
+
+
+def test_webhook_monitor_reads_legacy_json(tmp_path):
+    """An old JSON array metrics file is loaded"""
+    metrics_file = tmp_path / "metrics.json"
+    metric = WebhookMetric(datetime.utcnow().isoformat(), "file.processed", 1, True, 1, 100.0, 200)
+    metrics_file.write_text(json.dumps([metric.to_dict()], indent=2))
+    
+    monitor = WebhookMonitor(metrics_file=str(metrics_file))
+    
+    assert monitor.get_stats(hours=1)["total"] == 1
+    monitor.record("file.processed", 2, True, 1, 100.0, 200)
+    monitor.flush()
+    assert [json.loads(line)["ingest_id"] for line in metrics_file.read_text().splitlines()] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_webhook_monitor_background_flush(tmp_path):
+    """The flush task persists metrics; stopping it writes the rest"""
+    metrics_file = tmp_path / "metrics.jsonl"
+    monitor = WebhookMonitor(metrics_file=str(metrics_file))
+    
+    monitor.start_background_flush(interval=0.01)
+    monitor.record("file.processed", 1, True, 1, 100.0, 200)
+    await asyncio.sleep(0.1)
+    assert len(metrics_file.read_text().splitlines()) == 1
+    
+    monitor.record("file.processed", 2, True, 1, 100.0, 200)
+    await monitor.stop_background_flush()
+    assert len(metrics_file.read_text().splitlines()) == 2
 
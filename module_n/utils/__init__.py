@@ -1,6 +1,14 @@
 """Module N - Utility Functions"""
 
-from .validation import validate_file, detect_file_type, sanitize_filename
+from .validation import (
+    validate_file,
+    validate_file_content,
+    get_max_file_size,
+    detect_file_type,
+    sanitize_filename
+)
+from .upload import stage_upload, StagedUpload, UploadTooLargeError
+from .archive import open_zip, is_archive, ZipUpload, ArchiveError
 from .filename_generator import (
     generate_filename,
     handle_filename_collision,
@@ -10,11 +18,20 @@ from .filename_generator import (
 
 __all__ = [
     'validate_file',
+    'validate_file_content',
+    'get_max_file_size',
     'detect_file_type',
     'sanitize_filename',
     'generate_filename',
     'handle_filename_collision',
     'parse_filename_metadata',
-    'extract_client_project_from_filename'
+    'extract_client_project_from_filename',
+    'stage_upload',
+    'StagedUpload',
+    'UploadTooLargeError',
+    'open_zip',
+    'is_archive',
+    'ZipUpload',
+    'ArchiveError'
 ]
 
@@ -0,0 +1,180 @@
+"""
+Module N - Archive Uploads
+Reads ZIP uploads member by member, staging one member at a time instead of extracting the archive
+"""
+
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+import zipfile
+from pathlib import Path
+from typing import List, Optional
+
+from ..config import settings
+from .upload import HEAD_BYTES, StagedUpload, UploadTooLargeError
+
+logger = logging.getLogger(__name__)
+
+# Extensions handled as archives
+ARCHIVE_EXTENSIONS = {'.zip'}
+
+
+class ArchiveError(ValueError):
+    """Raised when an archive is unreadable or exceeds the archive limits"""
+
+
+def is_archive(filename: str) -> bool:
+    """Check whether a filename is an archive upload"""
+    return Path(filename).suffix.lower() in ARCHIVE_EXTENSIONS
+
+
+def _is_ignored(info: zipfile.ZipInfo) -> bool:
+    """Directories and OS metadata (__MACOSX/, .DS_Store, ...) are not ingested"""
+    if info.is_dir():
+        return True
+    parts = Path(info.filename).parts
+    return parts[0] == '__MACOSX' or Path(info.filename).name.startswith('.')
+
+
+class ZipUpload:
+    """
+    A staged ZIP upload whose members are streamed out one at a time.
+
+    The archive is closed (and the staged ZIP removed) once every member
+    has been released with member_done(), or when close() is called.
+    """
+
+    def __init__(self, staged: StagedUpload, archive: zipfile.ZipFile, members: List[zipfile.ZipInfo]):
+        self.staged = staged
+        self.archive = archive
+        self.members = members
+        self._pending = len(members)
+        self._lock = threading.Lock()
+
+    def stage_member(self, info: zipfile.ZipInfo, max_size: Optional[int] = None,
+                     chunk_size: Optional[int] = None) -> StagedUpload:
+        """
+        Stream one member to a temporary file while hashing it.
+
+        Blocking (decompression) - run it in a thread from async code.
+
+        Args:
+            info: Member to stage (from self.members)
+            max_size: Maximum allowed uncompressed size in bytes (None = no limit)
+            chunk_size: Chunk size in bytes (default: settings.UPLOAD_CHUNK_SIZE)
+
+        Returns:
+            StagedUpload for the member (filename without the archive folders)
+
+        Raises:
+            UploadTooLargeError: If the member exceeds max_size
+            ArchiveError: If the member is encrypted or corrupt
+        """
+        filename = Path(info.filename).name
+        if max_size is not None and info.file_size > max_size:
+            raise UploadTooLargeError(filename, max_size)
+        if info.flag_bits & 0x1:
+            raise ArchiveError(f"Encrypted archive member: {info.filename}")
+
+        chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+        hasher = hashlib.sha256()
+        size = 0
+        head = b''
+
+        fd, temp_path = tempfile.mkstemp(suffix=Path(filename).suffix.lower())
+        try:
+            # ZipExtFile never yields more than the declared size and checks the CRC at the end
+            with os.fdopen(fd, 'wb') as temp_file, self.archive.open(info) as member:
+                while True:
+                    chunk = member.read(chunk_size)
+                    if not chunk:
+                        break
+
+                    size += len(chunk)
+                    if len(head) < HEAD_BYTES:
+                        head += chunk[:HEAD_BYTES - len(head)]
+
+                    hasher.update(chunk)
+                    temp_file.write(chunk)
+        except zipfile.BadZipFile as e:
+            Path(temp_path).unlink(missing_ok=True)
+            raise ArchiveError(f"Corrupt archive member {info.filename}: {e}")
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+        logger.debug(f"Staged archive member {info.filename}: {size:,} bytes -> {temp_path}")
+
+        return StagedUpload(
+            path=temp_path,
+            filename=filename,
+            size=size,
+            sha256=hasher.hexdigest(),
+            head=head
+        )
+
+    def member_done(self):
+        """Release one member; the archive is closed after the last one"""
+        with self._lock:
+            self._pending -= 1
+            last = self._pending <= 0
+        if last:
+            self.close()
+
+    def close(self):
+        """Close the archive and remove the staged ZIP"""
+        self.archive.close()
+        self.staged.cleanup()
+
+
+def open_zip(staged: StagedUpload, max_members: Optional[int] = None,
+             max_uncompressed_size: Optional[int] = None) -> ZipUpload:
+    """
+    Open a staged ZIP upload and check it against the archive limits.
+
+    Only the central directory is read; members are decompressed later,
+    one at a time, by ZipUpload.stage_member().
+
+    Args:
+        staged: Staged ZIP upload
+        max_members: Maximum number of files (default: settings.ZIP_MAX_MEMBERS)
+        max_uncompressed_size: Maximum total uncompressed size in bytes
+            (default: settings.ZIP_MAX_UNCOMPRESSED_SIZE)
+
+    Returns:
+        ZipUpload with the members to ingest
+
+    Raises:
+        ArchiveError: If the archive is invalid, empty or exceeds a limit
+    """
+    max_members = settings.ZIP_MAX_MEMBERS if max_members is None else max_members
+    if max_uncompressed_size is None:
+        max_uncompressed_size = settings.ZIP_MAX_UNCOMPRESSED_SIZE
+
+    try:
+        archive = zipfile.ZipFile(staged.path)
+    except (zipfile.BadZipFile, OSError) as e:
+        raise ArchiveError(f"Invalid ZIP archive: {e}")
+
+    members = [info for info in archive.infolist() if not _is_ignored(info)]
+    total_size = sum(info.file_size for info in members)
+
+    error = None
+    if not members:
+        error = "ZIP archive contains no files"
+    elif max_members and len(members) > max_members:
+        error = f"ZIP archive has too many files: {len(members)} (max: {max_members})"
+    elif max_uncompressed_size and total_size > max_uncompressed_size:
+        error = (
+            f"ZIP archive too large when uncompressed: {total_size:,} bytes "
+            f"(max: {max_uncompressed_size:,} bytes)"
+        )
+
+    if error:
+        archive.close()
+        raise ArchiveError(error)
+
+    logger.info(f"Opened ZIP {staged.filename}: {len(members)} file(s), {total_size:,} bytes uncompressed")
+    return ZipUpload(staged, archive, members)
@@ -0,0 +1,113 @@
+"""
+Module N - Upload Staging
+Streams uploaded files to disk in fixed-size chunks while hashing and size-checking them
+"""
+
+import os
+import hashlib
+import logging
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from fastapi import UploadFile
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Number of leading bytes kept in memory for MIME/header validation
+HEAD_BYTES = 8192
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds its size limit while streaming"""
+
+    def __init__(self, filename: str, max_size: int):
+        self.filename = filename
+        self.max_size = max_size
+        super().__init__(
+            f'File too large: more than {max_size:,} bytes (max: {max_size:,} bytes = {max_size // 1024 // 1024} MB)'
+        )
+
+
+@dataclass
+class StagedUpload:
+    """Upload that has been streamed to a temporary file"""
+    path: str
+    filename: str
+    size: int
+    sha256: str
+    head: bytes
+
+    def cleanup(self):
+        """Remove the temporary file"""
+        try:
+            Path(self.path).unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not remove staged upload {self.path}: {e}")
+
+
+async def stage_upload(
+    file: UploadFile,
+    suffix: str = '',
+    max_size: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> StagedUpload:
+    """
+    Stream an uploaded file to a temporary file on disk.
+
+    The file is read in fixed-size chunks, so peak memory per upload is one
+    chunk regardless of file size. The SHA-256 digest and size are computed
+    while streaming, and the upload is aborted as soon as it exceeds max_size.
+
+    Args:
+        file: FastAPI UploadFile object
+        suffix: Suffix for the temporary file (e.g. '.dxf')
+        max_size: Maximum allowed size in bytes (None = no limit)
+        chunk_size: Chunk size in bytes (default: settings.UPLOAD_CHUNK_SIZE)
+
+    Returns:
+        StagedUpload with path, size, SHA-256 digest and leading bytes
+
+    Raises:
+        UploadTooLargeError: If the upload exceeds max_size
+    """
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    hasher = hashlib.sha256()
+    size = 0
+    head = b''
+
+    await file.seek(0)
+
+    fd, temp_path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise UploadTooLargeError(file.filename, max_size)
+
+                if len(head) < HEAD_BYTES:
+                    head += chunk[:HEAD_BYTES - len(head)]
+
+                hasher.update(chunk)
+                temp_file.write(chunk)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+    logger.debug(f"Staged upload {file.filename}: {size:,} bytes -> {temp_path}")
+
+    return StagedUpload(
+        path=temp_path,
+        filename=file.filename,
+        size=size,
+        sha256=hasher.hexdigest(),
+        head=head
+    )
@@ -9,11 +9,14 @@ try:
 except ImportError:
     MAGIC_AVAILABLE = False
 
+import os
 from pathlib import Path
 from typing import Dict, Any, Optional
 from fastapi import UploadFile
 import logging
 
+from .upload import HEAD_BYTES
+
 logger = logging.getLogger(__name__)
 
 # Maximum file sizes (bytes)
@@ -25,6 +28,7 @@ MAX_FILE_SIZES = {
     'image': 10 * 1024 * 1024,    # 10 MB
     'text': 5 * 1024 * 1024,      # 5 MB
     'word': 10 * 1024 * 1024,     # 10 MB
+    'archive': 200 * 1024 * 1024, # 200 MB (members are checked against their own limits)
     'default': 50 * 1024 * 1024   # 50 MB
 }
 
@@ -40,7 +44,8 @@ ALLOWED_MIME_TYPES = {
     'image/gif',
     'text/plain',
     'application/msword',
-    'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'application/zip'
 }
 
 # Allowed extensions
@@ -51,114 +56,176 @@ ALLOWED_EXTENSIONS = {
     '.xlsx', '.xls', '.XLSX', '.XLS',
     '.jpg', '.jpeg', '.png', '.gif', '.JPG', '.JPEG', '.PNG', '.GIF',
     '.txt', '.TXT',
-    '.doc', '.docx', '.DOC', '.DOCX'
+    '.doc', '.docx', '.DOC', '.DOCX',
+    '.zip', '.ZIP'
 }
 
 
-async def validate_file(file: UploadFile) -> Dict[str, Any]:
+def get_size_category(filename: str) -> str:
     """
-    Validate uploaded file.
-    
+    Get the size-limit category for a filename.
+
+    Args:
+        filename: Name of the file
+
+    Returns:
+        Key into MAX_FILE_SIZES
+    """
+    file_type = Path(filename).suffix.lower().replace('.', '')
+    if file_type in ['xlsx', 'xls']:
+        file_type = 'excel'
+    elif file_type in ['jpg', 'jpeg', 'png', 'gif']:
+        file_type = 'image'
+    elif file_type in ['doc', 'docx']:
+        file_type = 'word'
+    elif file_type == 'zip':
+        file_type = 'archive'
+    return file_type
+
+
+def get_max_file_size(filename: str) -> int:
+    """
+    Get the maximum allowed size in bytes for a filename.
+
+    Args:
+        filename: Name of the file
+
+    Returns:
+        Maximum file size in bytes
+    """
+    return MAX_FILE_SIZES.get(get_size_category(filename), MAX_FILE_SIZES['default'])
+
+
+def validate_file_content(filename: str, head: bytes, file_size: int) -> Dict[str, Any]:
+    """
+    Validate a file from its leading bytes and total size.
+
+    Only the first few KB are needed, so callers never have to hold the
+    whole upload in memory.
+
     Checks:
     - File extension
     - File size
     - MIME type
     - Content verification
-    
+
     Args:
-        file: FastAPI UploadFile object
-    
+        filename: Original filename
+        head: Leading bytes of the file
+        file_size: Total file size in bytes
+
     Returns:
         Dict with 'valid' (bool) and 'error' (str) keys
     """
     # Check extension
-    ext = Path(file.filename).suffix
+    ext = Path(filename).suffix
     if ext not in ALLOWED_EXTENSIONS:
-        logger.warning(f"Invalid file extension: {ext} for file {file.filename}")
+        logger.warning(f"Invalid file extension: {ext} for file {filename}")
         return {
             'valid': False,
             'error': f'File extension not allowed: {ext}. Allowed: {", ".join(sorted(set([e.lower() for e in ALLOWED_EXTENSIONS])))}'
         }
-    
-    # Read file content
-    content = await file.read()
-    file_size = len(content)
-    
-    # Reset file pointer
-    await file.seek(0)
-    
+
     # Check file size
-    file_type = ext.lower().replace('.', '')
-    if file_type in ['xlsx', 'xls']:
-        file_type = 'excel'
-    elif file_type in ['jpg', 'jpeg', 'png', 'gif']:
-        file_type = 'image'
-    elif file_type in ['doc', 'docx']:
-        file_type = 'word'
-    
-    max_size = MAX_FILE_SIZES.get(file_type, MAX_FILE_SIZES['default'])
-    
+    max_size = get_max_file_size(filename)
+
     if file_size > max_size:
-        logger.warning(f"File too large: {file_size} bytes (max: {max_size}) for {file.filename}")
+        logger.warning(f"File too large: {file_size} bytes (max: {max_size}) for {filename}")
         return {
             'valid': False,
             'error': f'File too large: {file_size:,} bytes (max: {max_size:,} bytes = {max_size // 1024 // 1024} MB)'
         }
-    
+
     # Check MIME type (if python-magic is available)
     try:
         if MAGIC_AVAILABLE:
-            mime = magic.from_buffer(content, mime=True)
-            logger.info(f"Detected MIME type: {mime} for {file.filename}")
+            mime = magic.from_buffer(head, mime=True)
+            logger.info(f"Detected MIME type: {mime} for {filename}")
         else:
             mime = 'application/octet-stream'  # Default if magic not available
             logger.warning("python-magic not available, skipping MIME type detection")
-        
+
         if mime not in ALLOWED_MIME_TYPES:
             # Allow some exceptions for DXF/LBRN2
             if ext.lower() not in ['.dxf', '.lbrn2']:
-                logger.warning(f"Invalid MIME type: {mime} for {file.filename}")
+                logger.warning(f"Invalid MIME type: {mime} for {filename}")
                 return {
                     'valid': False,
                     'error': f'MIME type not allowed: {mime}'
                 }
     except Exception as e:
-        logger.error(f"MIME type detection failed for {file.filename}: {str(e)}")
+        logger.error(f"MIME type detection failed for {filename}: {str(e)}")
         # Continue without MIME validation if magic fails
         pass
-    
+
     # Additional content validation
     if ext.lower() == '.dxf':
         # Check for DXF header
-        if not content.startswith(b'0\r\nSECTION') and not content.startswith(b'0\nSECTION'):
-            logger.warning(f"Invalid DXF file format for {file.filename}")
+        if not head.startswith(b'0\r\nSECTION') and not head.startswith(b'0\nSECTION'):
+            logger.warning(f"Invalid DXF file format for {filename}")
             return {
                 'valid': False,
                 'error': 'Invalid DXF file format (missing SECTION header)'
             }
-    
+
     elif ext.lower() == '.lbrn2':
         # Check for XML header
-        if not content.startswith(b'<?xml') and not content.startswith(b'<LightBurnProject'):
-            logger.warning(f"Invalid LBRN2 file format for {file.filename}")
+        if not head.startswith(b'<?xml') and not head.startswith(b'<LightBurnProject'):
+            logger.warning(f"Invalid LBRN2 file format for {filename}")
             return {
                 'valid': False,
                 'error': 'Invalid LBRN2 file format (not XML)'
             }
-    
+
     elif ext.lower() == '.pdf':
         # Check for PDF header
-        if not content.startswith(b'%PDF'):
-            logger.warning(f"Invalid PDF file format for {file.filename}")
+        if not head.startswith(b'%PDF'):
+            logger.warning(f"Invalid PDF file format for {filename}")
             return {
                 'valid': False,
                 'error': 'Invalid PDF file format (missing %PDF header)'
             }
-    
-    logger.info(f"File validation passed for {file.filename} ({file_size:,} bytes)")
+
+    elif ext.lower() == '.zip':
+        # Check for ZIP local file header (or an empty archive)
+        if not head.startswith(b'PK\x03\x04') and not head.startswith(b'PK\x05\x06'):
+            logger.warning(f"Invalid ZIP file format for {filename}")
+            return {
+                'valid': False,
+                'error': 'Invalid ZIP file format (missing PK header)'
+            }
+
+    logger.info(f"File validation passed for {filename} ({file_size:,} bytes)")
     return {'valid': True, 'error': None}
 
 
+async def validate_file(file: UploadFile) -> Dict[str, Any]:
+    """
+    Validate uploaded file.
+
+    Only the leading bytes are read; the size is taken from the spooled
+    upload, so the file is never loaded into memory.
+
+    Args:
+        file: FastAPI UploadFile object
+
+    Returns:
+        Dict with 'valid' (bool) and 'error' (str) keys
+    """
+    # Determine size without reading the content
+    file.file.seek(0, os.SEEK_END)
+    file_size = file.file.tell()
+
+    # Read leading bytes for MIME/header checks
+    await file.seek(0)
+    head = await file.read(HEAD_BYTES)
+
+    # Reset file pointer
+    await file.seek(0)
+
+    return validate_file_content(file.filename, head, file_size)
+
+
 def detect_file_type(filename: str, mode: str = "AUTO") -> str:
     """
     Detect file type from filename extension.
@@ -9,12 +9,19 @@ from .notifier import (
     WebhookEvent,
     WebhookEventType,
     generate_webhook_signature,
-    should_send_event
+    should_send_event,
+    get_http_client,
+    close_http_client,
+    build_webhook_event,
+    geometry_data,
+    send_webhook_batch,
+    send_webhook_event
 )
 from .queue import (
     WebhookQueue,
     QueuedWebhook,
     QueuedWebhookStatus,
+    WebhookQueueEntry,
     get_webhook_queue
 )
 from .monitor import (
@@ -22,6 +29,10 @@ from .monitor import (
     WebhookMetric,
     get_webhook_monitor
 )
+from .dispatcher import (
+    WebhookDispatcher,
+    get_webhook_dispatcher
+)
 
 __all__ = [
     'send_webhook',
@@ -30,12 +41,21 @@ __all__ = [
     'WebhookEventType',
     'generate_webhook_signature',
     'should_send_event',
+    'get_http_client',
+    'close_http_client',
+    'build_webhook_event',
+    'geometry_data',
+    'send_webhook_batch',
+    'send_webhook_event',
     'WebhookQueue',
     'QueuedWebhook',
     'QueuedWebhookStatus',
+    'WebhookQueueEntry',
     'get_webhook_queue',
     'WebhookMonitor',
     'WebhookMetric',
-    'get_webhook_monitor'
+    'get_webhook_monitor',
+    'WebhookDispatcher',
+    'get_webhook_dispatcher'
 ]
 
@@ -0,0 +1,156 @@
+"""
+Module N - Webhook Dispatcher
+Delivers webhooks in the background from the durable outbox (webhook queue),
+so requests only wait for the outbox write, never for Laser OS
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from module_n.config import settings
+from module_n.db.models import FileIngest
+from module_n.webhooks.notifier import WebhookEventType, build_webhook_event, should_send_event
+from module_n.webhooks.queue import WebhookQueue, get_webhook_queue
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookDispatcher:
+    """
+    Background webhook delivery from the outbox.
+
+    enqueue() builds the events and writes them to the outbox in one
+    transaction, then wakes the dispatcher. The dispatcher waits
+    `window_ms` so events arriving close together (files of an ingest job)
+    are claimed and sent as one batch, then drains the outbox. Failed
+    deliveries stay in the outbox with exponential backoff; the outbox is
+    also polled every `poll_interval` seconds for retries and for events
+    left over from a previous run.
+
+    Delivery lag (event creation to delivery) is recorded with every
+    delivery in the webhook monitor.
+    """
+
+    def __init__(
+        self,
+        queue: Optional[WebhookQueue] = None,
+        window_ms: Optional[int] = None,
+        poll_interval: Optional[float] = None
+    ):
+        """
+        Initialize webhook dispatcher.
+
+        Args:
+            queue: Outbox (default: global webhook queue)
+            window_ms: Coalescing window in milliseconds (default: settings.WEBHOOK_BATCH_WINDOW_MS)
+            poll_interval: Seconds between outbox polls (default: settings.WEBHOOK_DISPATCH_POLL_INTERVAL)
+        """
+        self.queue = queue or get_webhook_queue()
+        self.window_ms = settings.WEBHOOK_BATCH_WINDOW_MS if window_ms is None else window_ms
+        self.poll_interval = poll_interval or settings.WEBHOOK_DISPATCH_POLL_INTERVAL
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def enqueue(
+        self,
+        event_type: WebhookEventType,
+        file_ingests: List[FileIngest],
+        additional_data: Optional[Dict[str, Any]] = None,
+        file_data: Optional[List[Dict[str, Any]]] = None
+    ) -> int:
+        """
+        Write webhook events to the outbox and wake the dispatcher.
+
+        Args:
+            event_type: Type of webhook event
+            file_ingests: FileIngest records (one event each)
+            additional_data: Optional additional data to include
+            file_data: Optional data of each file, in the order of file_ingests
+
+        Returns:
+            Number of events queued (0 if the event type is filtered out)
+        """
+        if not file_ingests or not should_send_event(event_type):
+            return 0
+
+        file_data = file_data or [None] * len(file_ingests)
+        events = [
+            build_webhook_event(event_type, f, additional_data, data)
+            for f, data in zip(file_ingests, file_data)
+        ]
+        await asyncio.to_thread(
+            self.queue.add_many,
+            [(event.event_type, event.ingest_id, event.model_dump()) for event in events]
+        )
+
+        self._wake.set()
+        logger.debug(f"Queued {len(events)} {event_type.value} webhook(s)")
+        return len(events)
+
+    async def drain(self) -> int:
+        """
+        Deliver ready webhooks until the outbox has none left.
+
+        Returns:
+            Number of webhooks processed
+        """
+        total = 0
+        while True:
+            claimed = await self.queue.process_queue()
+            if not claimed:
+                return total
+            total += claimed
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+                # Let events arriving close together join the same batch
+                await asyncio.sleep(self.window_ms / 1000.0)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            try:
+                await self.drain()
+            except Exception as e:
+                logger.error(f"Error dispatching webhooks: {e}")
+
+    def start(self):
+        """Start background delivery (call from the running event loop)"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Started webhook dispatcher (window: {self.window_ms}ms, poll: {self.poll_interval}s)")
+
+    async def stop(self):
+        """Stop background delivery; undelivered webhooks stay in the outbox"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Outbox counts per status, age of the oldest undelivered webhook and dispatcher state"""
+        stats = self.queue.get_stats()
+        oldest = self.queue.get_oldest_pending_age()
+        stats["oldest_pending_seconds"] = round(oldest, 3) if oldest is not None else None
+        stats["dispatcher_running"] = bool(self._task and not self._task.done())
+        return stats
+
+
+# Global dispatcher instance (one per event loop, like the HTTP client)
+_dispatcher: Optional[WebhookDispatcher] = None
+_dispatcher_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_webhook_dispatcher() -> WebhookDispatcher:
+    """Get global webhook dispatcher instance"""
+    global _dispatcher, _dispatcher_loop
+
+    loop = asyncio.get_running_loop()
+    if _dispatcher is None or _dispatcher_loop is not loop:
+        _dispatcher = WebhookDispatcher()
+        _dispatcher_loop = loop
+    return _dispatcher
@@ -3,16 +3,35 @@ Module N - Webhook Monitoring
 Tracks webhook metrics, success/failure rates, and provides monitoring endpoints
 """
 
-import logging
+import math
+import time
 import json
+import asyncio
+import logging
+import threading
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from dataclasses import dataclass, asdict
-from collections import defaultdict
+from collections import defaultdict, deque
+
+from module_n.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Latency histogram: bucket i holds durations up to LATENCY_BASE_MS * LATENCY_GROWTH**i
+# (~20% resolution from 0.5 ms to ~15 minutes)
+LATENCY_BASE_MS = 0.5
+LATENCY_GROWTH = 1.2
+LATENCY_BUCKETS = 80
+
+# Rollup retention: per-minute buckets for 2 hours, per-hour buckets for 30 days
+MINUTE_BUCKETS = 120
+HOUR_BUCKETS = 24 * 30
+
+# Failures kept for get_recent_failures()/health
+MAX_RECENT_FAILURES = 100
+
 
 @dataclass
 class WebhookMetric:
@@ -25,71 +44,250 @@ class WebhookMetric:
     duration_ms: float
     status_code: Optional[int] = None
     error_message: Optional[str] = None
-    
+    lag_ms: Optional[float] = None  # Time from event creation (outbox enqueue) to delivery
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
         return asdict(self)
-    
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'WebhookMetric':
         """Create from dictionary"""
         return cls(**data)
 
 
+def _epoch(timestamp: str) -> float:
+    """Unix time of a metric timestamp (naive ISO string in UTC)"""
+    return datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _percentile(histogram: List[int], count: int, maximum: float, p: float) -> float:
+    """Percentile of a latency histogram (bucket upper bound, capped at the maximum)"""
+    if not count:
+        return 0.0
+    rank = math.ceil(count * p / 100.0)
+    seen = 0
+    for index, bucket_count in enumerate(histogram):
+        seen += bucket_count
+        if seen >= rank:
+            return min(LATENCY_BASE_MS * LATENCY_GROWTH ** index, maximum)
+    return maximum
+
+
+def _latency_bucket(duration_ms: float) -> int:
+    """Histogram bucket index for a duration"""
+    if duration_ms <= LATENCY_BASE_MS:
+        return 0
+    index = math.ceil(math.log(duration_ms / LATENCY_BASE_MS, LATENCY_GROWTH))
+    return min(index, LATENCY_BUCKETS - 1)
+
+
+class MetricRollup:
+    """Pre-aggregated metrics of one time bucket (or of several merged buckets)"""
+
+    def __init__(self):
+        self.total = 0
+        self.successful = 0
+        self.total_duration_ms = 0.0
+        self.total_attempts = 0
+        self.max_duration_ms = 0.0
+        self.latency = [0] * LATENCY_BUCKETS
+        self.lag_count = 0
+        self.total_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.lag = [0] * LATENCY_BUCKETS
+        self.by_event_type = defaultdict(lambda: {"total": 0, "successful": 0, "failed": 0})
+        self.by_status_code = defaultdict(int)
+
+    def add(self, metric: WebhookMetric):
+        """Count one metric"""
+        self.total += 1
+        self.successful += 1 if metric.success else 0
+        self.total_duration_ms += metric.duration_ms
+        self.total_attempts += metric.attempts
+        self.max_duration_ms = max(self.max_duration_ms, metric.duration_ms)
+        self.latency[_latency_bucket(metric.duration_ms)] += 1
+
+        if metric.lag_ms is not None:
+            self.lag_count += 1
+            self.total_lag_ms += metric.lag_ms
+            self.max_lag_ms = max(self.max_lag_ms, metric.lag_ms)
+            self.lag[_latency_bucket(metric.lag_ms)] += 1
+
+        by_event = self.by_event_type[metric.event_type]
+        by_event["total"] += 1
+        by_event["successful" if metric.success else "failed"] += 1
+
+        if metric.status_code:
+            self.by_status_code[str(metric.status_code)] += 1
+
+    def merge(self, other: 'MetricRollup'):
+        """Add another rollup's counts to this one"""
+        self.total += other.total
+        self.successful += other.successful
+        self.total_duration_ms += other.total_duration_ms
+        self.total_attempts += other.total_attempts
+        self.max_duration_ms = max(self.max_duration_ms, other.max_duration_ms)
+        self.latency = [a + b for a, b in zip(self.latency, other.latency)]
+        self.lag_count += other.lag_count
+        self.total_lag_ms += other.total_lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, other.max_lag_ms)
+        self.lag = [a + b for a, b in zip(self.lag, other.lag)]
+
+        for event_type, counts in other.by_event_type.items():
+            for key, value in counts.items():
+                self.by_event_type[event_type][key] += value
+
+        for status_code, count in other.by_status_code.items():
+            self.by_status_code[status_code] += count
+
+    def percentile(self, p: float) -> float:
+        """Latency percentile (bucket upper bound, capped at the slowest webhook)"""
+        return _percentile(self.latency, self.total, self.max_duration_ms, p)
+
+    def to_stats(self, hours: int) -> Dict[str, Any]:
+        """Statistics in the get_stats() format"""
+        failed = self.total - self.successful
+        total = self.total or 1
+
+        return {
+            "period_hours": hours,
+            "total": self.total,
+            "successful": self.successful,
+            "failed": failed,
+            "success_rate": round(self.successful / total * 100, 2) if self.total else 0.0,
+            "avg_duration_ms": round(self.total_duration_ms / total, 2),
+            "avg_attempts": round(self.total_attempts / total, 2),
+            "p50_duration_ms": round(self.percentile(50), 2),
+            "p95_duration_ms": round(self.percentile(95), 2),
+            "p99_duration_ms": round(self.percentile(99), 2),
+            "avg_lag_ms": round(self.total_lag_ms / self.lag_count, 2) if self.lag_count else 0.0,
+            "p95_lag_ms": round(_percentile(self.lag, self.lag_count, self.max_lag_ms, 95), 2),
+            "max_lag_ms": round(self.max_lag_ms, 2),
+            "by_event_type": {key: dict(value) for key, value in self.by_event_type.items()},
+            "by_status_code": dict(self.by_status_code)
+        }
+
+
 class WebhookMonitor:
     """
     Webhook monitoring system.
     Tracks metrics and provides statistics.
+
+    record() only touches memory: the metric goes into a fixed-size ring
+    buffer and its minute and hour rollups. Statistics are merged from the
+    rollups, so their cost does not depend on the number of webhooks.
+    New metrics are appended to the metrics file (JSON Lines) in batches
+    by flush(), which the background flush task calls periodically.
     """
-    
-    def __init__(self, metrics_file: Optional[str] = None, max_metrics: int = 10000):
+
+    def __init__(self, metrics_file: Optional[str] = None, max_metrics: Optional[int] = None):
         """
         Initialize webhook monitor.
-        
+
         Args:
-            metrics_file: Path to metrics file (default: data/webhook_metrics.json)
-            max_metrics: Maximum number of metrics to keep in memory
+            metrics_file: Path to metrics file (default: settings.WEBHOOK_METRICS_FILE)
+            max_metrics: Size of the in-memory ring buffer (default: settings.WEBHOOK_METRICS_MAX)
         """
-        if metrics_file:
-            self.metrics_file = Path(metrics_file)
-        else:
-            self.metrics_file = Path("data/webhook_metrics.json")
-        
+        self.metrics_file = Path(metrics_file or settings.WEBHOOK_METRICS_FILE)
+
         # Ensure directory exists
         self.metrics_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        self.max_metrics = max_metrics
-        self.metrics: List[WebhookMetric] = []
+
+        self.max_metrics = max_metrics or settings.WEBHOOK_METRICS_MAX
+        self.metrics: deque = deque(maxlen=self.max_metrics)
+        self._failures: deque = deque(maxlen=MAX_RECENT_FAILURES)
+        self._minutes: Dict[int, MetricRollup] = {}
+        self._hours: Dict[int, MetricRollup] = {}
+
+        self._unflushed: List[WebhookMetric] = []
+        self._file_lines = 0
+        self._lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
         self._load_metrics()
-    
+
     def _load_metrics(self):
-        """Load metrics from file"""
-        if self.metrics_file.exists():
-            try:
-                with open(self.metrics_file, 'r') as f:
-                    data = json.load(f)
-                    self.metrics = [WebhookMetric.from_dict(item) for item in data]
-                logger.info(f"Loaded {len(self.metrics)} webhook metrics")
-            except Exception as e:
-                logger.error(f"Error loading webhook metrics: {e}")
-                self.metrics = []
-        else:
-            self.metrics = []
-    
-    def _save_metrics(self):
-        """Save metrics to file"""
+        """Load the most recent metrics from file and rebuild the rollups"""
+        if not self.metrics_file.exists():
+            return
+
         try:
-            # Keep only the most recent metrics
-            if len(self.metrics) > self.max_metrics:
-                self.metrics = self.metrics[-self.max_metrics:]
-            
-            with open(self.metrics_file, 'w') as f:
-                data = [item.to_dict() for item in self.metrics]
-                json.dump(data, f, indent=2)
-            logger.debug(f"Saved {len(self.metrics)} webhook metrics")
+            with open(self.metrics_file, 'r') as f:
+                content = f.read()
+
+            if content.lstrip().startswith('['):
+                # Old format: one JSON array rewritten on every webhook
+                items = json.loads(content)
+                self._file_lines = self.max_metrics * 2  # Rewrite as JSON Lines on the next flush
+            else:
+                lines = content.splitlines()
+                self._file_lines = len(lines)
+                items = [json.loads(line) for line in lines[-self.max_metrics:] if line.strip()]
+
+            for item in items:
+                self._add(WebhookMetric.from_dict(item))
+            logger.info(f"Loaded {len(self.metrics)} webhook metrics")
+        except Exception as e:
+            logger.error(f"Error loading webhook metrics: {e}")
+
+    def _add(self, metric: WebhookMetric):
+        """Add a metric to the ring buffer and rollups (caller holds the lock or owns the monitor)"""
+        self.metrics.append(metric)
+        if not metric.success:
+            self._failures.append(metric)
+
+        epoch = _epoch(metric.timestamp)
+        minute = int(epoch // 60)
+        hour = int(epoch // 3600)
+
+        self._minutes.setdefault(minute, MetricRollup()).add(metric)
+        self._hours.setdefault(hour, MetricRollup()).add(metric)
+
+        # Drop expired buckets (at most a few per new bucket)
+        if len(self._minutes) > MINUTE_BUCKETS:
+            for key in sorted(self._minutes)[:-MINUTE_BUCKETS]:
+                del self._minutes[key]
+        if len(self._hours) > HOUR_BUCKETS:
+            for key in sorted(self._hours)[:-HOUR_BUCKETS]:
+                del self._hours[key]
+
+    def flush(self) -> int:
+        """
+        Append unflushed metrics to the metrics file.
+
+        The file is rewritten from the ring buffer only when it has grown to
+        twice the buffer size.
+
+        Returns:
+            Number of metrics written
+        """
+        with self._lock:
+            batch, self._unflushed = self._unflushed, []
+            compact = self._file_lines + len(batch) > 2 * self.max_metrics
+            if compact:
+                batch = list(self.metrics)
+
+        if not batch:
+            return 0
+
+        try:
+            lines = ''.join(json.dumps(item.to_dict()) + '\n' for item in batch)
+            if compact:
+                temp_file = self.metrics_file.with_suffix(self.metrics_file.suffix + '.tmp')
+                temp_file.write_text(lines)
+                temp_file.replace(self.metrics_file)
+                self._file_lines = len(batch)
+            else:
+                with open(self.metrics_file, 'a') as f:
+                    f.write(lines)
+                self._file_lines += len(batch)
+            logger.debug(f"Flushed {len(batch)} webhook metrics")
+            return len(batch)
         except Exception as e:
             logger.error(f"Error saving webhook metrics: {e}")
-    
+            return 0
+
     def record(
         self,
         event_type: str,
@@ -98,11 +296,12 @@ class WebhookMonitor:
         attempts: int,
         duration_ms: float,
         status_code: Optional[int] = None,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        lag_ms: Optional[float] = None
     ):
         """
-        Record webhook metric.
-        
+        Record webhook metric (in memory; persisted by the next flush).
+
         Args:
             event_type: Type of webhook event
             ingest_id: File ingest ID
@@ -111,6 +310,7 @@ class WebhookMonitor:
             duration_ms: Duration in milliseconds
             status_code: HTTP status code
             error_message: Optional error message
+            lag_ms: Delivery lag in milliseconds (event creation to delivery)
         """
         metric = WebhookMetric(
             timestamp=datetime.utcnow().isoformat(),
@@ -120,136 +320,109 @@ class WebhookMonitor:
             attempts=attempts,
             duration_ms=duration_ms,
             status_code=status_code,
-            error_message=error_message
+            error_message=error_message,
+            lag_ms=lag_ms
         )
-        
-        self.metrics.append(metric)
-        self._save_metrics()
-        
+
+        with self._lock:
+            self._add(metric)
+            self._unflushed.append(metric)
+
         logger.debug(f"Recorded webhook metric: {event_type} for file {ingest_id} (success={success})")
-    
+
     def get_stats(self, hours: int = 24) -> Dict[str, Any]:
         """
         Get webhook statistics for the last N hours.
-        
+
+        Merged from per-minute rollups for windows up to two hours and from
+        per-hour rollups beyond that (window edges are bucket-aligned).
+
         Args:
             hours: Number of hours to look back
-            
+
         Returns:
             Dictionary with statistics
         """
-        cutoff = datetime.utcnow() - timedelta(hours=hours)
-        recent_metrics = [
-            m for m in self.metrics
-            if datetime.fromisoformat(m.timestamp) > cutoff
-        ]
-        
-        if not recent_metrics:
-            return {
-                "period_hours": hours,
-                "total": 0,
-                "successful": 0,
-                "failed": 0,
-                "success_rate": 0.0,
-                "avg_duration_ms": 0.0,
-                "avg_attempts": 0.0,
-                "by_event_type": {},
-                "by_status_code": {}
-            }
-        
-        # Calculate statistics
-        total = len(recent_metrics)
-        successful = sum(1 for m in recent_metrics if m.success)
-        failed = total - successful
-        success_rate = (successful / total * 100) if total > 0 else 0.0
-        avg_duration = sum(m.duration_ms for m in recent_metrics) / total
-        avg_attempts = sum(m.attempts for m in recent_metrics) / total
-        
-        # Group by event type
-        by_event_type = defaultdict(lambda: {"total": 0, "successful": 0, "failed": 0})
-        for m in recent_metrics:
-            by_event_type[m.event_type]["total"] += 1
-            if m.success:
-                by_event_type[m.event_type]["successful"] += 1
+        now = time.time()
+        rollup = MetricRollup()
+
+        with self._lock:
+            if hours * 60 <= MINUTE_BUCKETS:
+                first = int((now - hours * 3600) // 60) + 1
+                buckets = [b for key, b in self._minutes.items() if key >= first]
             else:
-                by_event_type[m.event_type]["failed"] += 1
-        
-        # Group by status code
-        by_status_code = defaultdict(int)
-        for m in recent_metrics:
-            if m.status_code:
-                by_status_code[str(m.status_code)] += 1
-        
-        return {
-            "period_hours": hours,
-            "total": total,
-            "successful": successful,
-            "failed": failed,
-            "success_rate": round(success_rate, 2),
-            "avg_duration_ms": round(avg_duration, 2),
-            "avg_attempts": round(avg_attempts, 2),
-            "by_event_type": dict(by_event_type),
-            "by_status_code": dict(by_status_code)
-        }
-    
+                first = int((now - hours * 3600) // 3600) + 1
+                buckets = [b for key, b in self._hours.items() if key >= first]
+
+            for bucket in buckets:
+                rollup.merge(bucket)
+
+        return rollup.to_stats(hours)
+
     def get_recent_failures(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get recent failed webhooks.
-        
+
         Args:
             limit: Maximum number of failures to return
-            
+
         Returns:
             List of failed webhook metrics
         """
-        failures = [m for m in reversed(self.metrics) if not m.success]
-        return [m.to_dict() for m in failures[:limit]]
-    
+        with self._lock:
+            failures = list(self._failures)[-limit:] if limit > 0 else []
+        return [m.to_dict() for m in reversed(failures)]
+
     def get_slow_webhooks(self, threshold_ms: float = 5000, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get webhooks that took longer than threshold.
-        
+
         Args:
             threshold_ms: Duration threshold in milliseconds
             limit: Maximum number of results to return
-            
+
         Returns:
             List of slow webhook metrics
         """
-        slow = [m for m in reversed(self.metrics) if m.duration_ms > threshold_ms]
+        with self._lock:
+            slow = [m for m in reversed(self.metrics) if m.duration_ms > threshold_ms]
         return [m.to_dict() for m in slow[:limit]]
-    
+
     def cleanup_old_metrics(self, max_age_days: int = 30):
         """
         Remove metrics older than max_age_days.
-        
+
         Args:
             max_age_days: Maximum age in days
         """
         cutoff = datetime.utcnow() - timedelta(days=max_age_days)
-        original_count = len(self.metrics)
-        
-        self.metrics = [
-            m for m in self.metrics
-            if datetime.fromisoformat(m.timestamp) > cutoff
-        ]
-        
-        removed = original_count - len(self.metrics)
+
+        with self._lock:
+            original_count = len(self.metrics)
+            kept = [m for m in self.metrics if datetime.fromisoformat(m.timestamp) > cutoff]
+            removed = original_count - len(kept)
+            if removed > 0:
+                self.metrics = deque(kept, maxlen=self.max_metrics)
+                self._failures = deque((m for m in kept if not m.success), maxlen=MAX_RECENT_FAILURES)
+                first_hour = int(_epoch(cutoff.isoformat()) // 3600)
+                self._hours = {key: b for key, b in self._hours.items() if key >= first_hour}
+                self._file_lines = 2 * self.max_metrics  # Rewrite the file on the next flush
+
         if removed > 0:
-            self._save_metrics()
+            self.flush()
             logger.info(f"Cleaned up {removed} old webhook metrics")
-    
+
     def get_health_status(self) -> Dict[str, Any]:
         """
         Get overall webhook health status.
-        
+
         Returns:
             Health status dictionary
         """
         # Get stats for last hour
         stats_1h = self.get_stats(hours=1)
         stats_24h = self.get_stats(hours=24)
-        
+
         # Determine health status
         if stats_1h["total"] == 0:
             status = "unknown"
@@ -263,7 +436,7 @@ class WebhookMonitor:
         else:
             status = "unhealthy"
             message = "Webhook system is experiencing issues"
-        
+
         return {
             "status": status,
             "message": message,
@@ -272,6 +445,37 @@ class WebhookMonitor:
             "recent_failures": self.get_recent_failures(limit=5)
         }
 
+    def start_background_flush(self, interval: Optional[float] = None):
+        """
+        Start the periodic flush task (call from the running event loop).
+
+        Args:
+            interval: Seconds between flushes (default: settings.WEBHOOK_METRICS_FLUSH_INTERVAL)
+        """
+        if self._flush_task and not self._flush_task.done():
+            return
+
+        interval = interval or settings.WEBHOOK_METRICS_FLUSH_INTERVAL
+
+        async def run():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await asyncio.to_thread(self.flush)
+                except Exception as e:
+                    logger.error(f"Error flushing webhook metrics: {e}")
+
+        self._flush_task = asyncio.create_task(run())
+        logger.info(f"Started webhook metrics flush (interval: {interval}s)")
+
+    async def stop_background_flush(self):
+        """Stop the flush task and write the remaining metrics"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        self.flush()
+
 
 # Global monitor instance
 _global_monitor: Optional[WebhookMonitor] = None
@@ -283,4 +487,3 @@ def get_webhook_monitor() -> WebhookMonitor:
     if _global_monitor is None:
         _global_monitor = WebhookMonitor()
     return _global_monitor
-
@@ -6,15 +6,20 @@ Sends HTTP POST notifications to Laser OS when files are processed
 import logging
 import asyncio
 import hmac
+import json
 import hashlib
+import time
 import httpx
 from enum import Enum
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 from pydantic import BaseModel
 
 from module_n.config import settings
 from module_n.db.models import FileIngest
+from module_n.models.schemas import NormalizedMetadata
+from module_n.webhooks.monitor import get_webhook_monitor
+from module_n.metrics import get_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -78,35 +83,100 @@ def should_send_event(event_type: WebhookEventType) -> bool:
     return event_type.value in enabled_events
 
 
-async def send_webhook_with_retry(
+# Long-lived HTTP client (connection pool with keep-alive), one per event loop
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the pooled HTTP client used for webhook delivery.
+
+    Connections to Laser OS are kept alive and reused across webhooks instead
+    of opening a new client (TCP/TLS handshake) per attempt. The client is
+    bound to the running event loop; a new one is created if called from a
+    different loop (e.g. send_webhook_sync()).
+
+    Returns:
+        Shared httpx.AsyncClient
+    """
+    global _http_client, _http_client_loop
+
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.LASER_OS_TIMEOUT, connect=settings.WEBHOOK_HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.WEBHOOK_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WEBHOOK_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.WEBHOOK_HTTP_KEEPALIVE_EXPIRY
+            )
+        )
+        _http_client_loop = loop
+        logger.debug("Created pooled webhook HTTP client")
+    return _http_client
+
+
+async def close_http_client():
+    """Close the pooled HTTP client (call on shutdown)"""
+    global _http_client, _http_client_loop
+
+    client, _http_client, _http_client_loop = _http_client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        logger.info("Closed webhook HTTP client")
+
+
+def geometry_data(metadata: Optional[NormalizedMetadata]) -> Dict[str, Any]:
+    """
+    Measured part geometry of a parsed file, for the webhook's file_data.
+
+    Laser OS stores it on the design file (cut time estimates, nesting)
+    instead of reading the drawing again.
+
+    Args:
+        metadata: Parsed metadata of the file
+
+    Returns:
+        {'geometry': {cut_length_mm, pierce_count, width_mm, height_mm, area_mm2}},
+        or an empty dict if the parser measured no cut geometry
+    """
+    extracted = metadata.extracted if metadata else None
+    if not extracted or extracted.get('cut_length_mm') is None:
+        return {}
+
+    # Part size from the cut geometry (results cached before it was added: whole drawing)
+    bounding_box = extracted.get('cut_bounding_box') or extracted.get('bounding_box') or {}
+    return {
+        'geometry': {
+            'cut_length_mm': extracted['cut_length_mm'],
+            'pierce_count': extracted.get('pierce_count'),
+            'width_mm': bounding_box.get('width'),
+            'height_mm': bounding_box.get('height'),
+            'area_mm2': extracted.get('area_mm2'),
+        }
+    }
+
+
+def build_webhook_event(
     event_type: WebhookEventType,
     file_ingest: FileIngest,
     additional_data: Optional[Dict[str, Any]] = None,
-    retry: bool = True
-) -> bool:
+    file_data: Optional[Dict[str, Any]] = None
+) -> WebhookEvent:
     """
-    Send webhook notification to Laser OS with automatic retry logic and exponential backoff.
+    Build the webhook event for a file.
     
     Args:
         event_type: Type of webhook event
         file_ingest: FileIngest database record
         additional_data: Optional additional data to include
-        retry: Whether to retry on failure (default: True)
+        file_data: Optional data of this file only (e.g. geometry_data())
         
     Returns:
-        True if webhook sent successfully, False otherwise
+        WebhookEvent with the file's current data
     """
-    if not settings.LASER_OS_WEBHOOK_URL:
-        logger.warning("Webhook URL not configured, skipping notification")
-        return False
-    
-    # Check if event type should be sent
-    if not should_send_event(event_type):
-        logger.debug(f"Event type {event_type.value} is filtered out, skipping")
-        return True  # Return True to not treat as error
-    
-    # Build webhook payload
-    file_data = {
+    data = {
         "ingest_id": file_ingest.id,
         "original_filename": file_ingest.original_filename,
         "stored_filename": file_ingest.stored_filename,
@@ -128,96 +198,240 @@ async def send_webhook_with_retry(
     
     # Add additional data if provided
     if additional_data:
-        file_data.update(additional_data)
+        data.update(additional_data)
+    if file_data:
+        data.update(file_data)
     
-    # Create webhook event
-    event = WebhookEvent(
+    return WebhookEvent(
         event_type=event_type,
         timestamp=datetime.utcnow().isoformat(),
         ingest_id=file_ingest.id,
-        file_data=file_data
+        file_data=data
     )
+
+
+async def _post_with_retry(
+    url: str,
+    description: str,
+    max_attempts: int,
+    **request_kwargs
+) -> Tuple[bool, int, Optional[int], Optional[str]]:
+    """
+    POST to Laser OS, retrying timeouts, connection errors and 5xx responses
+    with exponential backoff (4xx responses are not retried).
     
-    # Determine retry attempts
-    max_attempts = settings.WEBHOOK_RETRY_ATTEMPTS if retry else 1
+    Args:
+        url: Webhook URL
+        description: What is being sent (for log messages)
+        max_attempts: Maximum number of attempts
+        **request_kwargs: Passed to the client's post() (json/content, headers)
+        
+    Returns:
+        (success, attempts made, last status code, last error message)
+    """
+    status_code = None
+    error_message = None
     
-    # Retry loop with exponential backoff
     for attempt in range(1, max_attempts + 1):
         try:
             # Log attempt
             if attempt == 1:
-                logger.info(f"Sending webhook: {event_type.value} for file {file_ingest.id}")
+                logger.info(f"Sending webhook: {description}")
             else:
-                logger.info(f"Retry attempt {attempt}/{max_attempts} for webhook {event_type.value} file {file_ingest.id}")
+                logger.info(f"Retry attempt {attempt}/{max_attempts} for webhook {description}")
             
-            logger.debug(f"Webhook URL: {settings.LASER_OS_WEBHOOK_URL}")
+            logger.debug(f"Webhook URL: {url}")
             
-            # Prepare payload
-            payload_dict = event.model_dump()
+            # Send webhook (pooled keep-alive connection)
+            response = await get_http_client().post(url, **request_kwargs)
             
-            # Prepare headers
-            headers = {"Content-Type": "application/json"}
-            
-            # Add signature if secret is configured
-            webhook_secret = getattr(settings, 'WEBHOOK_SECRET', None)
-            if webhook_secret:
-                import json
-                payload_str = json.dumps(payload_dict, sort_keys=True)
-                signature = generate_webhook_signature(payload_str, webhook_secret)
-                headers["X-Webhook-Signature"] = f"sha256={signature}"
-                logger.debug("Added webhook signature to headers")
-            
-            # Send webhook
-            async with httpx.AsyncClient(timeout=settings.LASER_OS_TIMEOUT) as client:
-                response = await client.post(
-                    settings.LASER_OS_WEBHOOK_URL,
-                    json=payload_dict,
-                    headers=headers
+            status_code = response.status_code
+            if response.status_code == 200:
+                logger.info(f"Webhook sent successfully: {description} (attempt {attempt})")
+                return True, attempt, status_code, None
+            else:
+                error_message = f"HTTP {response.status_code}"
+                logger.error(
+                    f"Webhook failed with status {response.status_code}: {response.text} (attempt {attempt})"
                 )
                 
-                if response.status_code == 200:
-                    logger.info(f"Webhook sent successfully for file {file_ingest.id} (attempt {attempt})")
-                    return True
-                else:
-                    logger.error(
-                        f"Webhook failed with status {response.status_code}: {response.text} (attempt {attempt})"
-                    )
-                    
-                    # Don't retry on 4xx errors (client errors)
-                    if 400 <= response.status_code < 500:
-                        logger.warning(f"Client error {response.status_code}, not retrying")
-                        return False
-                    
-                    # Retry on 5xx errors (server errors)
-                    if attempt < max_attempts:
-                        delay = settings.WEBHOOK_RETRY_DELAY * (2 ** (attempt - 1))  # Exponential backoff
-                        logger.info(f"Waiting {delay}s before retry...")
-                        await asyncio.sleep(delay)
-                    
+                # Don't retry on 4xx errors (client errors)
+                if 400 <= response.status_code < 500:
+                    logger.warning(f"Client error {response.status_code}, not retrying")
+                    return False, attempt, status_code, error_message
+                
         except httpx.TimeoutException:
-            logger.error(f"Webhook timeout for file {file_ingest.id} (attempt {attempt})")
-            if attempt < max_attempts:
-                delay = settings.WEBHOOK_RETRY_DELAY * (2 ** (attempt - 1))
-                logger.info(f"Waiting {delay}s before retry...")
-                await asyncio.sleep(delay)
+            error_message = "Timeout"
+            logger.error(f"Webhook timeout: {description} (attempt {attempt})")
                 
         except httpx.RequestError as e:
-            logger.error(f"Webhook request error for file {file_ingest.id}: {e} (attempt {attempt})")
-            if attempt < max_attempts:
-                delay = settings.WEBHOOK_RETRY_DELAY * (2 ** (attempt - 1))
-                logger.info(f"Waiting {delay}s before retry...")
-                await asyncio.sleep(delay)
+            error_message = str(e)
+            logger.error(f"Webhook request error: {description}: {e} (attempt {attempt})")
                 
         except Exception as e:
-            logger.error(f"Unexpected webhook error for file {file_ingest.id}: {e} (attempt {attempt})")
-            if attempt < max_attempts:
-                delay = settings.WEBHOOK_RETRY_DELAY * (2 ** (attempt - 1))
-                logger.info(f"Waiting {delay}s before retry...")
-                await asyncio.sleep(delay)
+            error_message = str(e)
+            logger.error(f"Unexpected webhook error: {description}: {e} (attempt {attempt})")
+        
+        # Retry on 5xx errors (server errors) and transport errors
+        if attempt < max_attempts:
+            delay = settings.WEBHOOK_RETRY_DELAY * (2 ** (attempt - 1))  # Exponential backoff
+            logger.info(f"Waiting {delay}s before retry...")
+            await asyncio.sleep(delay)
     
     # All retries exhausted
-    logger.error(f"Webhook failed after {max_attempts} attempts for file {file_ingest.id}")
-    return False
+    logger.error(f"Webhook failed after {max_attempts} attempts: {description}")
+    return False, max_attempts, status_code, error_message
+
+
+def _signature_headers(payload_str: str) -> Dict[str, str]:
+    """Signature header for a serialized payload (empty if no secret is configured)"""
+    webhook_secret = getattr(settings, 'WEBHOOK_SECRET', None)
+    if not webhook_secret:
+        return {}
+    signature = generate_webhook_signature(payload_str, webhook_secret)
+    logger.debug("Added webhook signature to headers")
+    return {"X-Webhook-Signature": f"sha256={signature}"}
+
+
+async def send_webhook_with_retry(
+    event_type: WebhookEventType,
+    file_ingest: FileIngest,
+    additional_data: Optional[Dict[str, Any]] = None,
+    retry: bool = True
+) -> bool:
+    """
+    Send webhook notification to Laser OS with automatic retry logic and exponential backoff.
+    
+    Args:
+        event_type: Type of webhook event
+        file_ingest: FileIngest database record
+        additional_data: Optional additional data to include
+        retry: Whether to retry on failure (default: True)
+        
+    Returns:
+        True if webhook sent successfully, False otherwise
+    """
+    if not settings.LASER_OS_WEBHOOK_URL:
+        logger.warning("Webhook URL not configured, skipping notification")
+        return False
+    
+    # Check if event type should be sent
+    if not should_send_event(event_type):
+        logger.debug(f"Event type {event_type.value} is filtered out, skipping")
+        return True  # Return True to not treat as error
+    
+    event = build_webhook_event(event_type, file_ingest, additional_data)
+    return await send_webhook_event(event, retry=retry)
+
+
+def _lag_ms(event: WebhookEvent) -> float:
+    """Milliseconds since the event was created"""
+    return (datetime.utcnow() - datetime.fromisoformat(event.timestamp)).total_seconds() * 1000
+
+
+async def send_webhook_event(event: WebhookEvent, retry: bool = True) -> bool:
+    """
+    Send an already built webhook event (e.g. from the outbox).
+    
+    Args:
+        event: Event built with build_webhook_event()
+        retry: Whether to retry on failure (default: True)
+        
+    Returns:
+        True if webhook sent successfully, False otherwise
+    """
+    if not settings.LASER_OS_WEBHOOK_URL:
+        logger.warning("Webhook URL not configured, skipping notification")
+        return False
+    
+    payload_dict = event.model_dump()
+    
+    # Prepare headers (signature if secret is configured)
+    headers = {"Content-Type": "application/json"}
+    headers.update(_signature_headers(json.dumps(payload_dict, sort_keys=True)))
+    
+    started = time.perf_counter()
+    success, attempts, status_code, error_message = await _post_with_retry(
+        settings.LASER_OS_WEBHOOK_URL,
+        f"{event.event_type} for file {event.ingest_id}",
+        settings.WEBHOOK_RETRY_ATTEMPTS if retry else 1,
+        json=payload_dict,
+        headers=headers
+    )
+    
+    get_metrics().observe('webhook_delivery', time.perf_counter() - started)
+
+    # Record the delivery in the webhook monitor (in memory, no I/O)
+    get_webhook_monitor().record(
+        event_type=event.event_type,
+        ingest_id=event.ingest_id,
+        success=success,
+        attempts=attempts,
+        duration_ms=(time.perf_counter() - started) * 1000,
+        status_code=status_code,
+        error_message=error_message,
+        lag_ms=_lag_ms(event) if success else None
+    )
+    return success
+
+
+async def send_webhook_batch(events: List[WebhookEvent], retry: bool = True) -> bool:
+    """
+    Send several webhook events to Laser OS in one signed POST.
+    
+    The batch goes to LASER_OS_WEBHOOK_BATCH_URL as
+    {"event_type": "batch", "timestamp": ..., "count": N, "events": [...]},
+    each event in the same format as a single webhook. The signature is
+    computed over the exact request body.
+    
+    Args:
+        events: Events built with build_webhook_event()
+        retry: Whether to retry on failure (default: True)
+        
+    Returns:
+        True if the batch was delivered, False otherwise
+    """
+    if not events:
+        return True
+    
+    if not settings.LASER_OS_WEBHOOK_BATCH_URL:
+        logger.warning("Webhook batch URL not configured, skipping notification")
+        return False
+    
+    payload_str = json.dumps({
+        "event_type": "batch",
+        "timestamp": datetime.utcnow().isoformat(),
+        "count": len(events),
+        "events": [event.model_dump() for event in events]
+    }, sort_keys=True)
+    
+    headers = {"Content-Type": "application/json"}
+    headers.update(_signature_headers(payload_str))
+    
+    started = time.perf_counter()
+    success, attempts, status_code, error_message = await _post_with_retry(
+        settings.LASER_OS_WEBHOOK_BATCH_URL,
+        f"batch of {len(events)} event(s)",
+        settings.WEBHOOK_RETRY_ATTEMPTS if retry else 1,
+        content=payload_str.encode('utf-8'),
+        headers=headers
+    )
+    
+    duration_ms = (time.perf_counter() - started) * 1000
+    get_metrics().observe('webhook_delivery', duration_ms / 1000)
+    monitor = get_webhook_monitor()
+    for event in events:
+        monitor.record(
+            event_type=event.event_type,
+            ingest_id=event.ingest_id,
+            success=success,
+            attempts=attempts,
+            duration_ms=duration_ms,
+            status_code=status_code,
+            error_message=error_message,
+            lag_ms=_lag_ms(event) if success else None
+        )
+    return success
 
 
 # Alias for backward compatibility
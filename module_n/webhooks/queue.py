@@ -1,21 +1,33 @@
 """
 Module N - Webhook Queue System
-Manages failed webhooks with persistence and background retry processing
+Durable webhook outbox in its own SQLite database, with background
+delivery/retry processing and claim/lease semantics for workers
 """
 
+import os
+import uuid
+import json
 import logging
 import asyncio
-import json
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, and_, or_, case, func, select, update, delete
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.exc import SQLAlchemyError
+
 from module_n.config import settings
+from module_n.db.engine import create_db_engine
 
 logger = logging.getLogger(__name__)
 
+# The queue lives in its own database file, so retries never contend with ingest for the write lock
+QueueBase = declarative_base()
+
 
 class QueuedWebhookStatus(str, Enum):
     """Status of queued webhook"""
@@ -25,6 +37,41 @@ class QueuedWebhookStatus(str, Enum):
     FAILED = "failed"
 
 
+class WebhookQueueEntry(QueueBase):
+    """
+    Queued webhook row; processing rows are leased to one worker until lease_expires_at
+    """
+    __tablename__ = 'webhook_queue'
+    
+    id = Column(String(36), primary_key=True)
+    event_type = Column(String(50), nullable=False)
+    ingest_id = Column(Integer, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON format
+    
+    # Delivery State
+    status = Column(String(20), nullable=False, default=QueuedWebhookStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    error_message = Column(Text, nullable=True)
+    
+    # Lease
+    claimed_by = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_attempt_at = Column(DateTime, nullable=True)
+    next_retry_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+Index('idx_webhook_queue_ready', WebhookQueueEntry.status, WebhookQueueEntry.next_retry_at)
+Index('idx_webhook_queue_created', WebhookQueueEntry.created_at)
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
 @dataclass
 class QueuedWebhook:
     """Queued webhook entry"""
@@ -49,11 +96,34 @@ class QueuedWebhook:
         """Create from dictionary"""
         return cls(**data)
 
+    @classmethod
+    def from_entry(cls, entry: WebhookQueueEntry) -> 'QueuedWebhook':
+        """Create from a queue row"""
+        return cls(
+            id=entry.id,
+            event_type=entry.event_type,
+            ingest_id=entry.ingest_id,
+            payload=json.loads(entry.payload),
+            status=QueuedWebhookStatus(entry.status),
+            attempts=entry.attempts,
+            max_attempts=entry.max_attempts,
+            created_at=_isoformat(entry.created_at),
+            last_attempt_at=_isoformat(entry.last_attempt_at),
+            next_retry_at=_isoformat(entry.next_retry_at),
+            error_message=entry.error_message
+        )
+
 
 class WebhookQueue:
     """
-    Webhook queue manager with file-based persistence.
-    Stores failed webhooks and retries them in the background.
+    Webhook queue manager backed by a SQLite database.
+
+    Adding a webhook is a single-row insert and the results of a delivery
+    batch are written back with one UPDATE per outcome, so the cost does
+    not grow with the backlog. Ready
+    webhooks are found through the (status, next_retry_at) index. Workers
+    claim a batch with claim(); claimed rows are leased, and a row whose
+    worker died becomes claimable again when its lease expires.
     """
     
     def __init__(self, queue_file: Optional[str] = None):
@@ -61,47 +131,71 @@ class WebhookQueue:
         Initialize webhook queue.
         
         Args:
-            queue_file: Path to queue file (default: data/webhook_queue.json)
+            queue_file: Path to the queue database (default: settings.WEBHOOK_QUEUE_FILE)
         """
-        if queue_file:
-            self.queue_file = Path(queue_file)
-        else:
-            self.queue_file = Path("data/webhook_queue.json")
+        self.queue_file = Path(queue_file or settings.WEBHOOK_QUEUE_FILE)
         
         # Ensure directory exists
         self.queue_file.parent.mkdir(parents=True, exist_ok=True)
         
-        # Load queue from file
-        self.queue: List[QueuedWebhook] = []
-        self._load_queue()
+        self._engine = create_db_engine(f"sqlite:///{self.queue_file}")
+        self._Session = sessionmaker(bind=self._engine, autoflush=False, expire_on_commit=False)
+        QueueBase.metadata.create_all(self._engine)
+        
+        self._import_legacy_queue()
         
         # Background task
         self._background_task: Optional[asyncio.Task] = None
         self._running = False
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
     
-    def _load_queue(self):
-        """Load queue from file"""
-        if self.queue_file.exists():
+    def _import_legacy_queue(self):
+        """Import entries from the old JSON queue file (data/webhook_queue.json) once"""
+        legacy_file = self.queue_file.with_suffix('.json')
+        if legacy_file == self.queue_file or not legacy_file.exists():
+            return
+        
+        try:
+            with open(legacy_file, 'r') as f:
+                data = json.load(f)
+            
+            session = self._Session()
             try:
-                with open(self.queue_file, 'r') as f:
-                    data = json.load(f)
-                    self.queue = [QueuedWebhook.from_dict(item) for item in data]
-                logger.info(f"Loaded {len(self.queue)} webhooks from queue")
-            except Exception as e:
-                logger.error(f"Error loading webhook queue: {e}")
-                self.queue = []
-        else:
-            self.queue = []
+                for item in data:
+                    queued = QueuedWebhook.from_dict(item)
+                    session.merge(WebhookQueueEntry(
+                        id=queued.id,
+                        event_type=queued.event_type,
+                        ingest_id=queued.ingest_id,
+                        payload=json.dumps(queued.payload, default=str),
+                        status=QueuedWebhookStatus(queued.status).value,
+                        attempts=queued.attempts,
+                        max_attempts=queued.max_attempts,
+                        error_message=queued.error_message,
+                        created_at=datetime.fromisoformat(queued.created_at),
+                        last_attempt_at=datetime.fromisoformat(queued.last_attempt_at) if queued.last_attempt_at else None,
+                        next_retry_at=datetime.fromisoformat(queued.next_retry_at) if queued.next_retry_at else datetime.utcnow()
+                    ))
+                session.commit()
+            finally:
+                session.close()
+            
+            legacy_file.rename(legacy_file.with_suffix('.json.imported'))
+            logger.info(f"Imported {len(data)} webhooks from {legacy_file}")
+        except Exception as e:
+            logger.error(f"Error importing legacy webhook queue {legacy_file}: {e}")
     
-    def _save_queue(self):
-        """Save queue to file"""
+    @property
+    def queue(self) -> List[QueuedWebhook]:
+        """All queued webhooks, oldest first (loads the whole table - for inspection only)"""
+        session = self._Session()
         try:
-            with open(self.queue_file, 'w') as f:
-                data = [item.to_dict() for item in self.queue]
-                json.dump(data, f, indent=2)
-            logger.debug(f"Saved {len(self.queue)} webhooks to queue")
-        except Exception as e:
-            logger.error(f"Error saving webhook queue: {e}")
+            entries = session.scalars(
+                select(WebhookQueueEntry).order_by(WebhookQueueEntry.created_at, WebhookQueueEntry.id)
+            ).all()
+            return [QueuedWebhook.from_entry(entry) for entry in entries]
+        finally:
+            session.close()
     
     def add(
         self,
@@ -122,52 +216,182 @@ class WebhookQueue:
         Returns:
             Queue entry ID
         """
-        # Generate unique ID
-        webhook_id = f"{event_type}_{ingest_id}_{datetime.utcnow().timestamp()}"
-        
-        # Create queued webhook
-        queued = QueuedWebhook(
-            id=webhook_id,
-            event_type=event_type,
-            ingest_id=ingest_id,
-            payload=payload,
-            status=QueuedWebhookStatus.PENDING,
-            attempts=0,
-            max_attempts=max_attempts or settings.WEBHOOK_RETRY_ATTEMPTS,
-            created_at=datetime.utcnow().isoformat()
-        )
+        webhook_id = uuid.uuid4().hex
+        now = datetime.utcnow()
         
-        # Add to queue
-        self.queue.append(queued)
-        self._save_queue()
+        session = self._Session()
+        try:
+            session.add(WebhookQueueEntry(
+                id=webhook_id,
+                event_type=event_type,
+                ingest_id=ingest_id,
+                payload=json.dumps(payload, default=str),
+                status=QueuedWebhookStatus.PENDING.value,
+                attempts=0,
+                max_attempts=max_attempts or settings.WEBHOOK_RETRY_ATTEMPTS,
+                created_at=now,
+                next_retry_at=now
+            ))
+            session.commit()
+        finally:
+            session.close()
         
         logger.info(f"Added webhook {webhook_id} to queue")
         return webhook_id
     
-    def get_pending(self) -> List[QueuedWebhook]:
-        """Get all pending webhooks ready for retry"""
-        now = datetime.utcnow()
-        pending = []
+    def add_many(
+        self,
+        items: List[Tuple[str, int, Dict[str, Any]]],
+        max_attempts: Optional[int] = None
+    ) -> List[str]:
+        """
+        Add several webhooks to the queue in one transaction.
         
-        for webhook in self.queue:
-            # Skip if not pending or processing
-            if webhook.status not in [QueuedWebhookStatus.PENDING, QueuedWebhookStatus.PROCESSING]:
-                continue
+        Args:
+            items: (event_type, ingest_id, payload) per webhook
+            max_attempts: Maximum delivery attempts (default: from settings)
             
-            # Skip if max attempts reached
-            if webhook.attempts >= webhook.max_attempts:
-                webhook.status = QueuedWebhookStatus.FAILED
-                continue
+        Returns:
+            Queue entry IDs, in the order of items
+        """
+        if not items:
+            return []
+        
+        now = datetime.utcnow()
+        max_attempts = max_attempts or settings.WEBHOOK_RETRY_ATTEMPTS
+        rows = [
+            {
+                'id': uuid.uuid4().hex,
+                'event_type': event_type,
+                'ingest_id': ingest_id,
+                'payload': json.dumps(payload, default=str),
+                'status': QueuedWebhookStatus.PENDING.value,
+                'attempts': 0,
+                'max_attempts': max_attempts,
+                'created_at': now,
+                'next_retry_at': now
+            }
+            for event_type, ingest_id, payload in items
+        ]
+        
+        session = self._Session()
+        try:
+            session.execute(WebhookQueueEntry.__table__.insert(), rows)
+            session.commit()
+        finally:
+            session.close()
+        
+        logger.debug(f"Added {len(rows)} webhooks to queue")
+        return [row['id'] for row in rows]
+    
+    def _ready(self, now: datetime):
+        """Condition for rows that can be (re)delivered now"""
+        return and_(
+            WebhookQueueEntry.attempts < WebhookQueueEntry.max_attempts,
+            or_(
+                and_(
+                    WebhookQueueEntry.status == QueuedWebhookStatus.PENDING.value,
+                    WebhookQueueEntry.next_retry_at <= now
+                ),
+                # Claimed by a worker that did not finish in time
+                and_(
+                    WebhookQueueEntry.status == QueuedWebhookStatus.PROCESSING.value,
+                    WebhookQueueEntry.lease_expires_at < now
+                )
+            )
+        )
+    
+    def _fail_exhausted(self, session):
+        """Mark pending rows that used up their attempts as failed"""
+        session.execute(
+            update(WebhookQueueEntry)
+            .where(
+                WebhookQueueEntry.status.in_([QueuedWebhookStatus.PENDING.value, QueuedWebhookStatus.PROCESSING.value]),
+                WebhookQueueEntry.attempts >= WebhookQueueEntry.max_attempts
+            )
+            .values(status=QueuedWebhookStatus.FAILED.value, claimed_by=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+    
+    def get_pending(self, limit: Optional[int] = None) -> List[QueuedWebhook]:
+        """
+        Get pending webhooks ready for retry (without claiming them)
+        
+        Args:
+            limit: Maximum number of webhooks (default: all)
+        """
+        now = datetime.utcnow()
+        session = self._Session()
+        try:
+            self._fail_exhausted(session)
+            session.commit()
             
-            # Check if ready for retry
-            if webhook.next_retry_at:
-                next_retry = datetime.fromisoformat(webhook.next_retry_at)
-                if now < next_retry:
-                    continue
+            query = select(WebhookQueueEntry).where(self._ready(now)).order_by(WebhookQueueEntry.next_retry_at)
+            if limit:
+                query = query.limit(limit)
+            return [QueuedWebhook.from_entry(entry) for entry in session.scalars(query).all()]
+        finally:
+            session.close()
+    
+    def claim(
+        self,
+        limit: Optional[int] = None,
+        lease_seconds: Optional[int] = None,
+        worker_id: Optional[str] = None
+    ) -> List[QueuedWebhook]:
+        """
+        Atomically claim ready webhooks for delivery.
+        
+        Claimed webhooks are marked processing and leased to the worker;
+        other workers skip them until the lease expires.
+        
+        Args:
+            limit: Maximum number of webhooks (default: settings.WEBHOOK_QUEUE_BATCH_SIZE)
+            lease_seconds: Lease length (default: settings.WEBHOOK_QUEUE_LEASE_SECONDS)
+            worker_id: Claiming worker (default: this queue's worker_id)
             
-            pending.append(webhook)
+        Returns:
+            Claimed webhooks, oldest retry time first
+        """
+        now = datetime.utcnow()
+        limit = limit or settings.WEBHOOK_QUEUE_BATCH_SIZE
+        lease = timedelta(seconds=lease_seconds or settings.WEBHOOK_QUEUE_LEASE_SECONDS)
         
-        return pending
+        ready_ids = (
+            select(WebhookQueueEntry.id)
+            .where(self._ready(now))
+            .order_by(WebhookQueueEntry.next_retry_at)
+            .limit(limit)
+            .scalar_subquery()
+        )
+        
+        session = self._Session()
+        try:
+            self._fail_exhausted(session)
+            # One UPDATE ... RETURNING, so two workers can never claim the same row
+            entries = session.scalars(
+                update(WebhookQueueEntry)
+                .where(WebhookQueueEntry.id.in_(ready_ids))
+                .values(
+                    status=QueuedWebhookStatus.PROCESSING.value,
+                    claimed_by=worker_id or self.worker_id,
+                    lease_expires_at=now + lease
+                )
+                .returning(WebhookQueueEntry)
+                .execution_options(synchronize_session=False)
+            ).all()
+            session.commit()
+            
+            claimed = sorted((QueuedWebhook.from_entry(entry) for entry in entries), key=lambda w: w.next_retry_at)
+            if claimed:
+                logger.debug(f"Claimed {len(claimed)} webhooks for {worker_id or self.worker_id}")
+            return claimed
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"Error claiming webhooks: {e}")
+            return []
+        finally:
+            session.close()
     
     def update_status(
         self,
@@ -176,35 +400,138 @@ class WebhookQueue:
         error_message: Optional[str] = None
     ):
         """
-        Update webhook status.
+        Update webhook status after a delivery attempt and release its lease.
         
         Args:
             webhook_id: Queue entry ID
             status: New status
             error_message: Optional error message
         """
-        for webhook in self.queue:
-            if webhook.id == webhook_id:
-                webhook.status = status
-                webhook.last_attempt_at = datetime.utcnow().isoformat()
-                webhook.attempts += 1
-                
-                if error_message:
-                    webhook.error_message = error_message
-                
-                # Calculate next retry time with exponential backoff
-                if status == QueuedWebhookStatus.PENDING and webhook.attempts < webhook.max_attempts:
-                    delay = settings.WEBHOOK_RETRY_DELAY * (2 ** webhook.attempts)
-                    next_retry = datetime.utcnow() + timedelta(seconds=delay)
-                    webhook.next_retry_at = next_retry.isoformat()
-                
-                self._save_queue()
-                break
+        now = datetime.utcnow()
+        session = self._Session()
+        try:
+            entry = session.get(WebhookQueueEntry, webhook_id)
+            if entry is None:
+                return
+            
+            entry.status = QueuedWebhookStatus(status).value
+            entry.last_attempt_at = now
+            entry.attempts += 1
+            entry.claimed_by = None
+            entry.lease_expires_at = None
+            
+            if error_message:
+                entry.error_message = error_message
+            
+            # Calculate next retry time with exponential backoff
+            if entry.status == QueuedWebhookStatus.PENDING.value and entry.attempts < entry.max_attempts:
+                delay = settings.WEBHOOK_RETRY_DELAY * (2 ** entry.attempts)
+                entry.next_retry_at = now + timedelta(seconds=delay)
+            
+            session.commit()
+        finally:
+            session.close()
+    
+    def mark_completed(self, webhook_ids: List[str]):
+        """
+        Mark delivered webhooks completed and release their leases (one UPDATE).
+        
+        Args:
+            webhook_ids: Queue entry IDs
+        """
+        if not webhook_ids:
+            return
+        
+        session = self._Session()
+        try:
+            session.execute(
+                update(WebhookQueueEntry)
+                .where(WebhookQueueEntry.id.in_(webhook_ids))
+                .values(
+                    status=QueuedWebhookStatus.COMPLETED.value,
+                    attempts=WebhookQueueEntry.attempts + 1,
+                    last_attempt_at=datetime.utcnow(),
+                    claimed_by=None,
+                    lease_expires_at=None
+                )
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+        finally:
+            session.close()
+    
+    def mark_failed(self, failures: List[Tuple[QueuedWebhook, str]]):
+        """
+        Reschedule failed deliveries and release their leases (one UPDATE).
+        
+        Each webhook is retried with exponential backoff, or marked failed
+        once it has used its last attempt. Attempt counts are the ones the
+        webhooks were claimed with (claimed rows are leased to this worker).
+        
+        Args:
+            failures: (webhook, error message) pairs
+        """
+        if not failures:
+            return
+        
+        now = datetime.utcnow()
+        statuses, errors, retry_times = {}, {}, {}
+        for webhook, error_message in failures:
+            attempts = webhook.attempts + 1
+            if attempts >= webhook.max_attempts:
+                statuses[webhook.id] = QueuedWebhookStatus.FAILED.value
+                errors[webhook.id] = "Max retry attempts reached"
+                logger.error(f"Webhook {webhook.id} failed after {webhook.max_attempts} attempts")
+            else:
+                statuses[webhook.id] = QueuedWebhookStatus.PENDING.value
+                errors[webhook.id] = error_message
+                retry_times[webhook.id] = now + timedelta(seconds=settings.WEBHOOK_RETRY_DELAY * (2 ** attempts))
+        
+        values = dict(
+            status=case(statuses, value=WebhookQueueEntry.id),
+            error_message=case(errors, value=WebhookQueueEntry.id),
+            attempts=WebhookQueueEntry.attempts + 1,
+            last_attempt_at=now,
+            claimed_by=None,
+            lease_expires_at=None
+        )
+        if retry_times:
+            values['next_retry_at'] = case(retry_times, value=WebhookQueueEntry.id, else_=WebhookQueueEntry.next_retry_at)
+        
+        session = self._Session()
+        try:
+            session.execute(
+                update(WebhookQueueEntry)
+                .where(WebhookQueueEntry.id.in_(list(statuses)))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+        finally:
+            session.close()
+    
+    def get_oldest_pending_age(self) -> Optional[float]:
+        """Seconds since the oldest undelivered (pending/processing) webhook was queued"""
+        session = self._Session()
+        try:
+            oldest = session.scalar(
+                select(func.min(WebhookQueueEntry.created_at)).where(
+                    WebhookQueueEntry.status.in_([QueuedWebhookStatus.PENDING.value, QueuedWebhookStatus.PROCESSING.value])
+                )
+            )
+        finally:
+            session.close()
+        
+        return (datetime.utcnow() - oldest).total_seconds() if oldest else None
     
     def remove(self, webhook_id: str):
         """Remove webhook from queue"""
-        self.queue = [w for w in self.queue if w.id != webhook_id]
-        self._save_queue()
+        session = self._Session()
+        try:
+            session.execute(delete(WebhookQueueEntry).where(WebhookQueueEntry.id == webhook_id))
+            session.commit()
+        finally:
+            session.close()
         logger.info(f"Removed webhook {webhook_id} from queue")
     
     def cleanup_completed(self, max_age_hours: int = 24):
@@ -215,101 +542,140 @@ class WebhookQueue:
             max_age_hours: Maximum age in hours for completed webhooks
         """
         cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
-        original_count = len(self.queue)
-        
-        self.queue = [
-            w for w in self.queue
-            if w.status != QueuedWebhookStatus.COMPLETED
-            or datetime.fromisoformat(w.created_at) > cutoff
-        ]
+        session = self._Session()
+        try:
+            removed = session.execute(
+                delete(WebhookQueueEntry).where(
+                    WebhookQueueEntry.status == QueuedWebhookStatus.COMPLETED.value,
+                    WebhookQueueEntry.created_at <= cutoff
+                )
+            ).rowcount
+            session.commit()
+        finally:
+            session.close()
         
-        removed = original_count - len(self.queue)
         if removed > 0:
-            self._save_queue()
             logger.info(f"Cleaned up {removed} completed webhooks")
     
     def get_stats(self) -> Dict[str, int]:
         """Get queue statistics"""
         stats = {
-            "total": len(self.queue),
+            "total": 0,
             "pending": 0,
             "processing": 0,
             "completed": 0,
             "failed": 0
         }
         
-        for webhook in self.queue:
-            if webhook.status == QueuedWebhookStatus.PENDING:
-                stats["pending"] += 1
-            elif webhook.status == QueuedWebhookStatus.PROCESSING:
-                stats["processing"] += 1
-            elif webhook.status == QueuedWebhookStatus.COMPLETED:
-                stats["completed"] += 1
-            elif webhook.status == QueuedWebhookStatus.FAILED:
-                stats["failed"] += 1
+        session = self._Session()
+        try:
+            rows = session.execute(
+                select(WebhookQueueEntry.status, func.count()).group_by(WebhookQueueEntry.status)
+            ).all()
+        finally:
+            session.close()
+        
+        for status, count in rows:
+            stats[status] = count
+            stats["total"] += count
         
         return stats
     
-    async def process_queue(self):
-        """Process pending webhooks in the queue"""
-        from module_n.webhooks.notifier import send_webhook_with_retry
-        from module_n.webhooks.notifier import WebhookEventType
-        from module_n.db.operations import get_file_ingest
+    async def process_queue(self) -> int:
+        """
+        Claim and deliver a batch of ready webhooks.
+        
+        Payloads are the events built at enqueue time; entries queued with
+        another payload are rebuilt from the file ingest record. With
+        WEBHOOK_BATCH_ENABLED, file.processed events go out in one batch
+        POST. Each delivery is a single attempt; failures are rescheduled
+        with exponential backoff until max_attempts. Database work runs in
+        worker threads, off the event loop.
+        
+        Returns:
+            Number of webhooks claimed
+        """
+        from module_n.webhooks.notifier import (
+            WebhookEventType,
+            send_webhook_batch,
+            send_webhook_event
+        )
         
-        pending = self.get_pending()
+        pending = await asyncio.to_thread(self.claim)
         
         if not pending:
-            return
+            return 0
         
         logger.info(f"Processing {len(pending)} pending webhooks")
         
+        events, failures = await asyncio.to_thread(self._prepare_events, pending)
+        
+        batched = []
+        if settings.WEBHOOK_BATCH_ENABLED:
+            batched = [webhook_id for webhook_id, event in events.items()
+                       if event.event_type == WebhookEventType.FILE_PROCESSED.value]
+        if len(batched) < 2:
+            batched = []
+        
+        async def deliver_single(webhook_id: str) -> Tuple[str, bool, Optional[str]]:
+            try:
+                return webhook_id, await send_webhook_event(events[webhook_id], retry=False), None
+            except Exception as e:
+                return webhook_id, False, str(e)
+        
+        # Single attempt per run: the queue handles retries
+        results = await asyncio.gather(*[deliver_single(webhook_id) for webhook_id in events if webhook_id not in batched])
+        if batched:
+            try:
+                success = await send_webhook_batch([events[webhook_id] for webhook_id in batched], retry=False)
+                error = None
+            except Exception as e:
+                success, error = False, str(e)
+            results.extend((webhook_id, success, error) for webhook_id in batched)
+        
+        by_id = {webhook.id: webhook for webhook in pending}
+        delivered = [webhook_id for webhook_id, success, _ in results if success]
+        failures += [
+            (by_id[webhook_id], error or "Webhook send failed, will retry")
+            for webhook_id, success, error in results if not success
+        ]
+        await asyncio.to_thread(self.mark_completed, delivered)
+        await asyncio.to_thread(self.mark_failed, failures)
+        
+        logger.info(f"Delivered {len(delivered)}/{len(pending)} queued webhooks")
+        return len(pending)
+    
+    def _prepare_events(self, pending: List[QueuedWebhook]) -> Tuple[Dict[str, Any], List[Tuple[QueuedWebhook, str]]]:
+        """
+        Build the event of every claimed webhook (blocking, run it in a thread).
+        
+        Entries whose file ingest no longer exists are removed.
+        
+        Returns:
+            Tuple of (events by webhook ID, (webhook, error) pairs that could not be built)
+        """
+        from module_n.webhooks.notifier import WebhookEvent, WebhookEventType, build_webhook_event
+        from module_n.db.operations import get_file_ingest
+        
+        events = {}
+        failures = []
         for webhook in pending:
             try:
-                # Mark as processing
-                webhook.status = QueuedWebhookStatus.PROCESSING
-                self._save_queue()
+                if 'file_data' in webhook.payload:
+                    events[webhook.id] = WebhookEvent(**webhook.payload)
+                    continue
                 
-                # Get file ingest
-                file_ingest = get_file_ingest(webhook.ingest_id)
+                # Queued without an event payload: rebuild from the file ingest
+                file_ingest = get_file_ingest(webhook.ingest_id, include_deleted=True)
                 if not file_ingest:
                     logger.error(f"File ingest {webhook.ingest_id} not found, removing from queue")
                     self.remove(webhook.id)
                     continue
-                
-                # Send webhook (without retry since queue handles retries)
-                event_type = WebhookEventType(webhook.event_type)
-                success = await send_webhook_with_retry(
-                    event_type=event_type,
-                    file_ingest=file_ingest,
-                    retry=False  # Don't retry, queue will handle it
-                )
-                
-                if success:
-                    self.update_status(webhook.id, QueuedWebhookStatus.COMPLETED)
-                    logger.info(f"Successfully processed queued webhook {webhook.id}")
-                else:
-                    # Check if max attempts reached
-                    if webhook.attempts + 1 >= webhook.max_attempts:
-                        self.update_status(
-                            webhook.id,
-                            QueuedWebhookStatus.FAILED,
-                            "Max retry attempts reached"
-                        )
-                        logger.error(f"Webhook {webhook.id} failed after {webhook.max_attempts} attempts")
-                    else:
-                        self.update_status(
-                            webhook.id,
-                            QueuedWebhookStatus.PENDING,
-                            "Webhook send failed, will retry"
-                        )
-                
+                events[webhook.id] = build_webhook_event(WebhookEventType(webhook.event_type), file_ingest)
             except Exception as e:
-                logger.error(f"Error processing webhook {webhook.id}: {e}")
-                self.update_status(
-                    webhook.id,
-                    QueuedWebhookStatus.PENDING,
-                    str(e)
-                )
+                logger.error(f"Error preparing webhook {webhook.id}: {e}")
+                failures.append((webhook, str(e)))
+        return events, failures
     
     async def start_background_processing(self, interval: int = 60):
         """
@@ -337,6 +703,10 @@ class WebhookQueue:
         """Stop background processing"""
         self._running = False
         logger.info("Stopping webhook queue background processing")
+    
+    def close(self):
+        """Close the queue database connections"""
+        self._engine.dispose()
 
 
 # Global queue instance
@@ -0,0 +1,277 @@
+"""
+Cut Time Estimator Tests for Laser OS.
+
+This module tests DXF geometry measurement (app.services.design_geometry) and
+the cut time formula and preset matching (app.services.cut_time_estimator).
+"""
+
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+from flask import Flask
+
+from app.models import DesignFile
+from app.services.design_geometry import (
+    GEOMETRY_VERSION, get_design_file_geometry, measure_dxf, measure_polylines, store_design_file_geometry
+)
+from app.services.cut_time_estimator import estimate_cut_minutes, find_preset
+
+
+def square(x, y, size):
+    """Closed square as a point list (first point repeated at the end)."""
+    return [(x, y), (x + size, y), (x + size, y + size), (x, y + size), (x, y)]
+
+
+class TestMeasurePolylines:
+    """Test contour chaining and measurement."""
+
+    def test_closed_square_with_hole(self):
+        """A plate with a square hole has two pierces and net area."""
+        result = measure_polylines([square(0, 0, 100), square(40, 40, 20)])
+
+        assert result['pierce_count'] == 2
+        assert result['open_contour_count'] == 0
+        assert result['cut_length_mm'] == pytest.approx(480.0)
+        assert result['area_mm2'] == pytest.approx(10000.0 - 400.0)
+        assert result['width_mm'] == pytest.approx(100.0)
+        assert result['height_mm'] == pytest.approx(100.0)
+        assert len(result['outlines']) == 1
+
+    def test_chains_loose_segments(self):
+        """Separate line segments, in any order and direction, form one loop."""
+        segments = [
+            [(100, 0), (100, 50)],
+            [(0, 0), (100, 0)],
+            [(0, 50), (100, 50)],  # reversed relative to the loop direction
+            [(0, 50), (0, 0)],
+        ]
+        result = measure_polylines(segments)
+
+        assert result['pierce_count'] == 1
+        assert result['open_contour_count'] == 0
+        assert result['area_mm2'] == pytest.approx(5000.0)
+
+    def test_open_chain_counted_once(self):
+        """An open chain started from its middle segment is one open contour."""
+        segments = [
+            [(10, 0), (20, 0)],
+            [(0, 0), (10, 0)],
+            [(20, 0), (30, 0)],
+        ]
+        result = measure_polylines(segments)
+
+        assert result['pierce_count'] == 0
+        assert result['open_contour_count'] == 1
+        assert result['cut_length_mm'] == pytest.approx(30.0)
+
+    def test_island_inside_hole_adds_area(self):
+        """Nesting depth alternates between material and hole."""
+        result = measure_polylines([square(0, 0, 100), square(10, 10, 80), square(40, 40, 20)])
+
+        assert result['pierce_count'] == 3
+        assert result['area_mm2'] == pytest.approx(10000.0 - 6400.0 + 400.0)
+
+    def test_grid_of_holes_and_separate_parts(self):
+        """Holes only count against the plate that contains them."""
+        holes = [square(10 + 20 * i, 10 + 20 * j, 5) for i in range(10) for j in range(10)]
+        result = measure_polylines([square(0, 0, 210), square(300, 0, 50)] + holes)
+
+        assert result['pierce_count'] == 102
+        assert result['area_mm2'] == pytest.approx(210.0 ** 2 - 100 * 25.0 + 2500.0)
+        assert len(result['outlines']) == 2
+
+
+class TestMeasureDXF:
+    """Test measuring a DXF file end to end."""
+
+    def test_lines_and_circle(self, tmp_path):
+        """Lines chain into the outline, the circle is a separate pierce."""
+        ezdxf = pytest.importorskip('ezdxf')
+
+        doc = ezdxf.new()
+        msp = doc.modelspace()
+        corners = [(0, 0), (200, 0), (200, 100), (0, 100)]
+        for start, end in zip(corners, corners[1:] + corners[:1]):
+            msp.add_line(start, end, dxfattribs={'layer': 'CUT'})
+        msp.add_circle((100, 50), 10, dxfattribs={'layer': 'HOLES'})
+        msp.add_text('MILD STEEL 3MM', dxfattribs={'layer': 'NOTES'})
+        msp.add_line((0, -20), (200, -20), dxfattribs={'layer': 'DIM'})
+
+        file_path = tmp_path / 'plate.dxf'
+        doc.saveas(file_path)
+
+        result = measure_dxf(str(file_path))
+
+        assert result['pierce_count'] == 2
+        assert result['open_contour_count'] == 0
+        assert result['cut_length_mm'] == pytest.approx(600.0 + 2 * 3.14159 * 10, rel=1e-3)
+        assert result['area_mm2'] == pytest.approx(20000.0 - 3.14159 * 100, rel=1e-3)
+        assert result['width_mm'] == pytest.approx(200.0)
+
+
+# Drawings from the starter library, plus the DXF features they don't use
+STARTER_LIBRARY = Path(__file__).resolve().parent.parent / 'dxf_starter_library_v1' / 'dxf_library'
+
+
+def draw_rounded_plate(doc, msp):
+    """Bulged polyline corners, a slot of lines and arcs, a CW bulge and a dimension line."""
+    msp.add_lwpolyline([(10, 0, 0), (190, 0, 0.41421356), (200, 10, 0), (200, 90, 0.41421356),
+                        (190, 100, 0), (10, 100, 0.41421356), (0, 90, 0), (0, 10, 0.41421356)],
+                       format='xyb', close=True)
+    msp.add_line((60, 40), (140, 40))
+    msp.add_arc((140, 50), 10, -90, 90)
+    msp.add_line((140, 60), (60, 60))
+    msp.add_arc((60, 50), 10, 90, 270)
+    msp.add_lwpolyline([(20, 70, -1), (30, 70, -1)], format='xyb', close=True)
+    msp.add_line((0, -20), (200, -20), dxfattribs={'layer': 'DIM'})
+
+
+def draw_block_sheet(doc, msp):
+    """Rotated and scaled block references; layer 0 entities take the INSERT's layer."""
+    block = doc.blocks.new('PART')
+    block.add_lwpolyline([(0, 0, 0), (40, 0, 0.4), (40, 20, 0), (0, 20, 0)], format='xyb', close=True)
+    block.add_circle((10, 10), 4)
+    msp.add_blockref('PART', (0, 0), dxfattribs={'rotation': 30, 'xscale': 2, 'yscale': 2})
+    msp.add_blockref('PART', (200, 0), dxfattribs={'rotation': 200, 'layer': 'CUT'})
+    msp.add_blockref('PART', (0, 200), dxfattribs={'layer': 'NOTES'})
+
+
+def draw_curves(doc, msp):
+    """Ellipse, spline and open contours."""
+    msp.add_ellipse((0, 0), (40, 0), 0.5)
+    msp.add_spline([(0, 30), (20, 50), (40, 30), (60, 50)])
+    msp.add_line((100, 0), (150, 0))
+    msp.add_arc((150, 10), 10, 270, 30)
+
+
+class TestMatchesModuleN:
+    """Test drawings measure the same here as in Module N (whose values arrive by webhook)."""
+
+    @pytest.fixture
+    def module_n_geometry(self):
+        parser = pytest.importorskip('module_n.parsers.dxf_parser')
+        notifier = pytest.importorskip('module_n.webhooks.notifier')
+
+        def measure(file_path):
+            metadata = parser.DXFParser().parse(str(file_path), Path(file_path).name)
+            return notifier.geometry_data(metadata)['geometry']
+        return measure
+
+    def assert_same(self, file_path, module_n_geometry):
+        expected = module_n_geometry(file_path)
+        result = measure_dxf(str(file_path))
+
+        assert {key: result[key] for key in expected} == expected
+
+    @pytest.mark.parametrize('draw', [draw_rounded_plate, draw_block_sheet, draw_curves],
+                             ids=lambda draw: draw.__name__)
+    def test_features(self, draw, tmp_path, module_n_geometry):
+        ezdxf = pytest.importorskip('ezdxf')
+        doc = ezdxf.new()
+        draw(doc, doc.modelspace())
+        file_path = tmp_path / 'drawing.dxf'
+        doc.saveas(file_path)
+
+        self.assert_same(file_path, module_n_geometry)
+
+    @pytest.mark.parametrize('file_path', sorted(STARTER_LIBRARY.rglob('*.dxf')), ids=lambda path: path.stem)
+    def test_starter_library(self, file_path, module_n_geometry):
+        pytest.importorskip('ezdxf')
+        self.assert_same(file_path, module_n_geometry)
+
+
+class TestDesignFileGeometry:
+    """Test stored measurements and the failure marker."""
+
+    @pytest.fixture
+    def app(self, tmp_path):
+        app = Flask(__name__)
+        app.config.update(UPLOAD_FOLDER=str(tmp_path))
+        with app.app_context():
+            yield app
+
+    def make_file(self, tmp_path, filename, content):
+        (tmp_path / filename).write_bytes(content)
+        return DesignFile(id=1, original_filename=filename, stored_filename=filename,
+                          file_path=filename, file_type='dxf')
+
+    def test_broken_file_is_marked(self, app, tmp_path, monkeypatch):
+        """An unreadable drawing is read once, then skipped."""
+        design_file = self.make_file(tmp_path, 'broken.dxf', b'not a drawing')
+        calls = []
+        monkeypatch.setattr('app.services.design_geometry.measure_dxf',
+                            lambda path: calls.append(path) or measure_dxf(path))
+
+        assert get_design_file_geometry(design_file) is None
+        assert design_file.geometry_version == GEOMETRY_VERSION
+        assert design_file.cut_length_mm is None
+        assert get_design_file_geometry(design_file) is None
+        assert len(calls) == 1
+
+    def test_without_measure_only_stored_geometry(self, app, tmp_path, monkeypatch):
+        """Request paths never read the drawing; stored (Module N) values are used."""
+        design_file = self.make_file(tmp_path, 'plate.dxf', b'not read')
+        monkeypatch.setattr('app.services.design_geometry.measure_dxf', pytest.fail)
+
+        assert get_design_file_geometry(design_file, measure=False) is None
+        assert design_file.geometry_version is None
+
+        store_design_file_geometry(design_file, {
+            'cut_length_mm': 662.83, 'pierce_count': 2, 'width_mm': 200.0, 'height_mm': 100.0, 'area_mm2': 19685.84
+        })
+        geometry = get_design_file_geometry(design_file, measure=False)
+
+        assert geometry['cut_length_mm'] == pytest.approx(662.83)
+        assert geometry['pierce_count'] == 2
+        assert get_design_file_geometry(design_file) == geometry
+
+
+class TestEstimateCutMinutes:
+    """Test the cut time formula."""
+
+    def test_cut_and_pierce_time(self):
+        """Cut length over speed plus pierce time, times quantity."""
+        # 3000 mm at 1500 mm/min = 2 min; 6 pierces x 0.5 s = 0.05 min
+        minutes = estimate_cut_minutes(3000, 6, cut_speed=1500, pierce_time=0.5, quantity=10)
+        assert minutes == pytest.approx(20.5)
+
+    def test_missing_pierce_time(self):
+        """Pierce time defaults to zero."""
+        assert estimate_cut_minutes(1000, 4, cut_speed=1000) == pytest.approx(1.0)
+
+    def test_invalid_cut_speed(self):
+        """A preset without cut speed cannot be used."""
+        with pytest.raises(ValueError):
+            estimate_cut_minutes(1000, 1, cut_speed=0)
+
+
+class TestFindPreset:
+    """Test preset matching by material and thickness."""
+
+    def make_preset(self, preset_id, material_type, thickness, cut_speed=2000, is_active=True):
+        return SimpleNamespace(
+            id=preset_id, material_type=material_type, thickness=thickness,
+            cut_speed=cut_speed, is_active=is_active
+        )
+
+    def test_closest_thickness(self):
+        """The closest thickness within tolerance wins."""
+        presets = [
+            self.make_preset(1, 'Mild Steel', 3.0),
+            self.make_preset(2, 'Mild Steel', 2.0),
+            self.make_preset(3, 'Stainless Steel', 2.0),
+        ]
+        assert find_preset('mild steel', 2.1, presets).id == 2
+
+    def test_skips_inactive_and_missing_speed(self):
+        """Inactive presets and presets without cut speed are ignored."""
+        presets = [
+            self.make_preset(1, 'Mild Steel', 2.0, is_active=False),
+            self.make_preset(2, 'Mild Steel', 2.0, cut_speed=None),
+        ]
+        assert find_preset('Mild Steel', 2.0, presets) is None
+
+    def test_outside_tolerance(self):
+        """No preset is used when the thickness is too far off."""
+        presets = [self.make_preset(1, 'Mild Steel', 3.0)]
+        assert find_preset('Mild Steel', 5.0, presets) is None
@@ -0,0 +1,172 @@
+"""
+File Preview Tests for Laser OS.
+
+This module tests SVG preview rendering and LightBurn shape reading in
+app.services.file_preview.
+"""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from app.services.file_preview import (
+    NO_PREVIEW, PREVIEW_VERSION, ensure_preview, generate_preview, has_preview,
+    preview_path, read_lbrn2, render_svg
+)
+
+
+LBRN2_PROJECT = """<?xml version="1.0" encoding="UTF-8"?>
+<LightBurnProject AppVersion="1.4.00" FormatVersion="1" MaterialHeight="3">
+    <Shape Type="Rect" CutIndex="0" W="100" H="50" Cr="0">
+        <XForm>1 0 0 1 50 25</XForm>
+    </Shape>
+    <Shape Type="Group">
+        <XForm>1 0 0 1 100 0</XForm>
+        <Children>
+            <Shape Type="Path" CutIndex="0" VertID="0" PrimID="0">
+                <XForm>1 0 0 1 0 0</XForm>
+                <VertList>V0 0c0x1c1x1V20 0c0x1c1x1V20 10c0x1c1x1</VertList>
+                <PrimList>L0 1L1 2</PrimList>
+            </Shape>
+        </Children>
+    </Shape>
+    <Shape Type="Path" CutIndex="0" VertID="0" PrimID="0">
+        <XForm>1 0 0 1 0 100</XForm>
+    </Shape>
+    <Shape Type="Text" CutIndex="1" Str="LABEL">
+        <XForm>1 0 0 1 10 10</XForm>
+    </Shape>
+</LightBurnProject>
+"""
+
+
+class TestReadLbrn2:
+    """Test reading LightBurn shapes."""
+
+    def test_shapes_and_transforms(self, tmp_path):
+        """Rectangles are centred on their XForm; group transforms apply to children."""
+        file_path = tmp_path / 'part.lbrn2'
+        file_path.write_text(LBRN2_PROJECT)
+
+        polylines = read_lbrn2(str(file_path))
+
+        assert len(polylines) == 3
+        rect, grouped, shared = polylines
+        assert min(x for x, _ in rect) == pytest.approx(0)
+        assert max(x for x, _ in rect) == pytest.approx(100)
+        assert max(y for _, y in rect) == pytest.approx(50)
+        assert grouped == [(100, 0), (120, 0), (120, 10)]
+        # Path that reuses the first path's vertex and primitive lists
+        assert shared == [(0, 100), (20, 100), (20, 110)]
+
+
+class TestRenderSvg:
+    """Test SVG rendering."""
+
+    def test_scaled_to_preview_size(self):
+        """The longest side is scaled to the preview size and Y is flipped."""
+        svg = render_svg([[(0, 0), (200, 0), (200, 100), (0, 100), (0, 0)]], size=100)
+
+        assert 'width="116" height="66"' in svg
+        # Bottom-left corner of the drawing is at the bottom of the image
+        assert 'M8.0 58.0L108.0 58.0L108.0 8.0L8.0 8.0Z' in svg
+
+    def test_dense_points_are_dropped(self):
+        """Points closer than half a pixel do not end up in the SVG."""
+        dense = [(i / 1000.0, 0) for i in range(10001)] + [(10, 10)]
+        svg = render_svg([dense], size=10)
+
+        assert svg.count('L') < 30
+
+    def test_empty_drawing(self):
+        assert render_svg([]) is None
+
+
+class TestGeneratePreview:
+    """Test content-addressed preview storage."""
+
+    def test_identical_files_share_preview(self, tmp_path):
+        """The same content renders once and maps to the same preview."""
+        preview_folder = tmp_path / 'previews'
+        first = tmp_path / 'a.lbrn2'
+        second = tmp_path / 'b.lbrn2'
+        first.write_text(LBRN2_PROJECT)
+        second.write_text(LBRN2_PROJECT)
+
+        digest = generate_preview(str(first), 'lbrn2', str(preview_folder))
+        target = preview_path(digest, str(preview_folder))
+        modified = os.path.getmtime(target)
+
+        assert generate_preview(str(second), 'lbrn2', str(preview_folder)) == digest
+        assert os.path.getmtime(target) == modified
+        assert open(target).read().startswith('<svg')
+
+    def test_dxf(self, tmp_path):
+        """DXF cut geometry is rendered; annotation layers are not."""
+        ezdxf = pytest.importorskip('ezdxf')
+
+        doc = ezdxf.new()
+        msp = doc.modelspace()
+        msp.add_lwpolyline([(0, 0), (200, 0), (200, 100), (0, 100)], close=True)
+        msp.add_line((0, -500), (200, -500), dxfattribs={'layer': 'DIM'})
+        file_path = tmp_path / 'plate.dxf'
+        doc.saveas(file_path)
+
+        digest = generate_preview(str(file_path), 'dxf', str(tmp_path))
+        svg = open(preview_path(digest, str(tmp_path))).read()
+
+        # Only the plate is drawn, so the preview keeps its 2:1 aspect ratio
+        assert 'width="496" height="256"' in svg
+
+
+def make_record(tmp_path, filename, content, file_type='dxf'):
+    """Stored file plus a stand-in DesignFile record."""
+    (tmp_path / filename).write_bytes(content)
+    return SimpleNamespace(
+        id=1, original_filename=filename, stored_filename=filename, file_path=filename,
+        file_type=file_type, preview_hash=None, preview_version=None
+    )
+
+
+class TestEnsurePreview:
+    """Test which files get previews and that failures are remembered."""
+
+    @pytest.fixture
+    def app(self, tmp_path):
+        app = Flask(__name__)
+        app.config.update(UPLOAD_FOLDER=str(tmp_path), PREVIEW_FOLDER=str(tmp_path / 'previews'))
+        with app.app_context():
+            yield app
+
+    def test_other_file_types_have_no_preview(self, app, tmp_path):
+        """PDFs and images (stored with file_type 'dxf') are never read."""
+        record = make_record(tmp_path, 'quote.pdf', b'%PDF-1.4')
+
+        assert not has_preview(record)
+        assert ensure_preview(record) is None
+        assert record.preview_hash is None
+        assert not os.path.exists(tmp_path / 'previews')
+
+    def test_failed_render_is_marked(self, app, tmp_path, monkeypatch):
+        """An unreadable drawing is tried once, then no longer offered."""
+        record = make_record(tmp_path, 'broken.lbrn2', b'not xml', file_type='lbrn2')
+        calls = []
+        monkeypatch.setattr('app.services.file_preview.generate_preview',
+                            lambda *args: calls.append(args) or generate_preview(*args))
+
+        assert ensure_preview(record) is None
+        assert (record.preview_hash, record.preview_version) == (NO_PREVIEW, PREVIEW_VERSION)
+        assert not has_preview(record)
+        assert ensure_preview(record) is None
+        assert len(calls) == 1
+
+    def test_rendered_preview_is_stored(self, app, tmp_path):
+        """A drawing renders once; later calls reuse the stored digest."""
+        record = make_record(tmp_path, 'part.lbrn2', LBRN2_PROJECT.encode(), file_type='lbrn2')
+
+        digest = ensure_preview(record)
+
+        assert digest and record.preview_hash == digest
+        assert ensure_preview(record) == digest
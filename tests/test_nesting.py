@@ -0,0 +1,100 @@
+"""
+Sheet Nesting Tests for Laser OS.
+
+This module tests the rectangle and true-shape packers in app.services.nesting.
+"""
+
+import pytest
+
+from app.services.nesting import nest_parts, parse_sheet_size
+
+
+def rectangle_part(name, width, height, quantity=1):
+    """Part dictionary for a solid rectangle."""
+    return {'name': name, 'width': width, 'height': height, 'area': width * height, 'quantity': quantity}
+
+
+# L-shaped bracket: 400 x 400 with 100 mm legs
+L_OUTLINE = [(0, 0), (400, 0), (400, 100), (100, 100), (100, 400), (0, 400)]
+
+
+class TestParseSheetSize:
+    """Test sheet size parsing."""
+
+    def test_valid(self):
+        assert parse_sheet_size('3000x1500') == (3000.0, 1500.0)
+        assert parse_sheet_size('2500 X 1250') == (2500.0, 1250.0)
+
+    def test_invalid(self):
+        assert parse_sheet_size('Custom') is None
+        assert parse_sheet_size(None) is None
+        assert parse_sheet_size('0x1500') is None
+
+
+@pytest.mark.parametrize('mode', ['rectangle', 'true_shape'])
+class TestNestParts:
+    """Behaviour shared by both nesting modes."""
+
+    def test_exact_grid(self, mode):
+        """Parts that tile the usable area exactly fit on one sheet."""
+        # No spacing or margin: 10 x 5 grid of 300 x 300 on 3000 x 1500
+        result = nest_parts([rectangle_part('tile', 300, 300, 50)], 3000, 1500, mode=mode, spacing=0, margin=0)
+
+        assert result['sheet_count'] == 1
+        assert result['placed'] == 50
+        assert result['utilisation'] == pytest.approx(100.0)
+
+    def test_overflow_to_second_sheet(self, mode):
+        """One part more than fits opens a second sheet."""
+        result = nest_parts([rectangle_part('tile', 300, 300, 51)], 3000, 1500, mode=mode, spacing=0, margin=0)
+
+        assert result['sheet_count'] == 2
+        assert [sheet['parts'] for sheet in result['sheets']] == [50, 1]
+
+    def test_rotates_to_fit(self, mode):
+        """A part taller than the sheet is rotated."""
+        result = nest_parts([rectangle_part('strip', 100, 2000)], 3000, 1500, mode=mode)
+
+        assert result['sheet_count'] == 1
+        assert result['unplaced'] == []
+
+    def test_part_too_large(self, mode):
+        """Parts larger than the sheet are reported, not placed."""
+        result = nest_parts(
+            [rectangle_part('huge', 4000, 2000), rectangle_part('small', 100, 100)],
+            3000, 1500, mode=mode
+        )
+
+        assert result['unplaced'] == ['huge']
+        assert result['placed'] == 1
+        assert result['sheet_count'] == 1
+
+
+class TestTrueShape:
+    """Test true-shape nesting against the rectangle packer."""
+
+    def test_interlocking_parts_use_fewer_sheets(self):
+        """L-shaped parts nest into each other's empty corner."""
+        parts = [{'name': 'L', 'width': 400, 'height': 400, 'area': 70000, 'quantity': 60, 'outlines': [L_OUTLINE]}]
+
+        rectangle = nest_parts(parts, 3000, 1500, mode='rectangle')
+        true_shape = nest_parts(parts, 3000, 1500, mode='true_shape')
+
+        assert true_shape['placed'] == rectangle['placed'] == 60
+        assert true_shape['sheet_count'] < rectangle['sheet_count']
+        assert true_shape['utilisation'] > rectangle['utilisation']
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        nest_parts([rectangle_part('tile', 100, 100)], 3000, 1500, mode='genetic')
+
+
+def test_typical_job_is_fast():
+    """A typical multi-part job nests in well under a second."""
+    parts = [rectangle_part(f'part-{i}', 40 + 13 * i, 30 + 7 * i, quantity=20) for i in range(25)]
+
+    result = nest_parts(parts, 3000, 1500)
+
+    assert result['placed'] == 500
+    assert result['elapsed_ms'] < 1000